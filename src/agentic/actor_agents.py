@@ -1,4 +1,5 @@
 import asyncio
+import contextvars
 import inspect
 import json
 import litellm
@@ -8,22 +9,23 @@ import threading
 import time
 import traceback
 import uuid
-import yaml
 from pprint import pprint
 
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from copy import deepcopy
-from dataclasses import dataclass
-from datetime import timedelta
-from jinja2 import Template, DebugUndefined
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from litellm.types.utils import Message
 from pathlib import Path
 from pydantic import BaseModel, ConfigDict
-from queue import Queue
-from typing import Any, Callable, List, Optional, Generator, Literal, Type
+from queue import Queue, Empty
+from typing import Any, AsyncGenerator, Callable, List, Optional, Generator, Literal, Type
 
 from agentic.swarm.types import (
     agent_secret_key,
     AgentFunction,
+    capture_tool_logs,
     ChatCompletionMessage,
     ChatCompletionMessageToolCall,
     Function,
@@ -72,8 +74,18 @@ from agentic.events import (
 )
 from agentic.db.models import Thread, ThreadLog
 from agentic.tools.utils.registry import tool_registry
-from agentic.db.db_manager import DatabaseManager
+from agentic.db.db_manager import DatabaseManager, get_db_manager
+from agentic import metrics, tracing
+from agentic.event_channel import EventChannel
+from agentic.utils.template import load_prompt_file, render_template
+from agentic.llm_cache import get_completion_cache
+from agentic.request_executor import request_executor, RequestRejected, REQUEST_RETENTION
 from agentic.models import get_special_model_params, mock_provider
+from agentic.utils.token_estimation import (
+    TokenLedger,
+    should_compress_context,
+    create_compressed_messages,
+)
 
 
 __CTX_VARS_NAME__ = "thread_context"
@@ -93,6 +105,46 @@ class AgentPauseContext:
     tool_function: Optional[Function] = None
 
 
+def llm_tool_schema(func: AgentFunction) -> dict:
+    """The JSON schema we send to the LLM for a tool function, with the thread context hidden"""
+    tool = function_to_json(func)
+    if isinstance(func, dict):
+        # Don't modify a schema that the caller marshalled themselves
+        tool = deepcopy(tool)
+    params = tool["function"]["parameters"]
+    for name in (__CTX_VARS_NAME__, __LEGACY_CTX_VARS_NAME__):
+        params["properties"].pop(name, None)
+        if name in params["required"]:
+            params["required"].remove(name)
+    return tool
+
+
+async def _aiter(iterable):
+    """Iterate a sync or async iterable from async code. Cached streams replay as
+    plain generators while live ones from litellm.acompletion are async."""
+    if hasattr(iterable, "__aiter__"):
+        async for item in iterable:
+            yield item
+    else:
+        for item in iterable:
+            yield item
+
+
+@dataclass(eq=False)
+class PreparedToolCall:
+    """A tool call from the LLM, resolved to its function and arguments but not yet run.
+    `func` is None when the LLM asked for a tool we don't have."""
+    tool_call: ChatCompletionMessageToolCall
+    name: str
+    func: Optional[Callable] = None
+    args: dict = field(default_factory=dict)
+    call_event: Optional[Event] = None
+    is_subagent_call: bool = False
+    target_agent: str = ""
+    # Events the tool queued with ThreadContext.log while it ran
+    logs: list = field(default_factory=list)
+
+
 litellm.drop_params = True
 
 # Pick the agent runtime
@@ -106,6 +158,14 @@ else:
 
 _AGENT_REGISTRY = []
 
+MEMORY_BLOCK_TEMPLATE = """
+    <memory blocks>
+    {% for memory in MEMORIES -%}
+    {{memory|trim}}
+    {%- endfor %}
+    </memory>
+    """
+
 @ray.remote
 class ActorBaseAgent:
     name: str = "Agent"
@@ -115,6 +175,10 @@ class ActorBaseAgent:
     functions: List[AgentFunction] = None
     tool_choice: str = None
     parallel_tool_calls: bool = True
+    # How many tool calls from a single completion may run at once. 1 runs them serially.
+    max_tool_concurrency: int = 1
+    # "exact" or "semantic" to reuse cached completions. None follows AGENTIC_LLM_CACHE.
+    llm_cache: Optional[str] = None
     paused_context: Optional[AgentPauseContext] = None
     debug: DebugLevel = DebugLevel(False)
     depth: int = 0
@@ -122,12 +186,17 @@ class ActorBaseAgent:
     history: list = []
     # Memories are static facts that are always injected into the context on every turn
     memories: list[str] = []
+    # (memories, rendered memory block)
+    _memory_block: Optional[tuple[tuple, str]] = None
     # The Actor who sent us our Prompt
     max_tokens: int = None
     thread_context: ThreadContext = None
     api_endpoint: str = None
     _prompter = None
     _callbacks: dict[CallbackType, CallbackFunc] = {}
+    # Tool schemas are rebuilt only when the function list changes
+    _tool_schemas: Optional[list[dict]] = None
+    _tool_schemas_key: tuple = ()
     result_model: Type[BaseModel]|None = None,
     # Reasoning support
     reasoning_effort: str = None  # Can be "low", "medium", "high" or None
@@ -142,6 +211,7 @@ class ActorBaseAgent:
         super().__init__()
         self.name = name
         self.history: list = []
+        self._token_ledger = TokenLedger()
 
         # Always register mock provider with litellm
         litellm.custom_provider_map = [
@@ -159,19 +229,59 @@ class ActorBaseAgent:
         stream: bool,
     ) -> ChatCompletionMessage:
         """Call the LLM completion endpoint"""
-        instructions = self.get_instructions(thread_context)
-        messages = [{"role": "system", "content": instructions}] + history
-
-        tools = [function_to_json(f) for f in self.functions]
-        # hide thread_context from model
-        for tool in tools:
-            params = tool["function"]["parameters"]
-            params["properties"].pop(__CTX_VARS_NAME__, None)
-            if __CTX_VARS_NAME__ in params["required"]:
-                params["required"].remove(__CTX_VARS_NAME__)
-            params["properties"].pop(__LEGACY_CTX_VARS_NAME__, None)
-            if __LEGACY_CTX_VARS_NAME__ in params["required"]:
-                params["required"].remove(__LEGACY_CTX_VARS_NAME__)
+        completion_params, messages = self._prepare_completion(history, thread_context, model_override, stream)
+        try:
+            return self._completion(completion_params)
+        except litellm.exceptions.ContextWindowExceededError as e:
+            self._fall_back_to_minimal_context(completion_params, messages, e)
+            # Try one more time with minimal context
+            return self._completion(completion_params)
+        except Exception as e:
+            traceback.print_exc()
+            raise RuntimeError("Error calling LLM: " + str(e))
+
+    async def _aget_llm_completion(
+        self,
+        history: List,
+        thread_context: ThreadContext,
+        model_override: str,
+        stream: bool,
+    ):
+        """Call the LLM completion endpoint with litellm.acompletion"""
+        completion_params, messages = self._prepare_completion(history, thread_context, model_override, stream)
+        try:
+            return await self._acompletion(completion_params)
+        except litellm.exceptions.ContextWindowExceededError as e:
+            self._fall_back_to_minimal_context(completion_params, messages, e)
+            return await self._acompletion(completion_params)
+        except Exception as e:
+            traceback.print_exc()
+            raise RuntimeError("Error calling LLM: " + str(e))
+
+    def _fall_back_to_minimal_context(self, completion_params: dict, messages: list, e: Exception):
+        # Emergency fallback
+        print(f"Emergency fallback: {str(e)}")
+
+        # Keep only the system message and most recent message
+        emergency_messages = [messages[0], messages[-1]]
+        completion_params["messages"] = emergency_messages
+        self.history = emergency_messages
+        self._token_ledger.discard_estimate()
+
+    def _prepare_completion(
+        self,
+        history: List,
+        thread_context: ThreadContext,
+        model_override: str,
+        stream: bool,
+    ) -> tuple[dict, list]:
+        """Build the litellm parameters for the next completion, compressing the context if
+        needed. Returns (completion_params, messages)."""
+        with tracing.span("llm.render_prompt"):
+            instructions = self.get_instructions(thread_context)
+            messages = [{"role": "system", "content": instructions}] + history
+
+            tools = self.get_tool_schemas()
 
         # Create parameters for litellm call
         completion_params = {
@@ -275,18 +385,16 @@ class ActorBaseAgent:
         # Get model name
         model_name = model_override or self.model
         
-        # Import token estimation utilities
-        from agentic.utils.token_estimation import (
-            should_compress_context,
-            create_compressed_messages
-        )
-        
-        # Check if we need to compress context
-        needs_compression, current_tokens, max_allowed = should_compress_context(
-            messages=messages, 
-            model=model_name,
-            safety_factor=0.3  # Use 30% safety margin
-        )
+        # Check if we need to compress context. The ledger only tokenizes messages
+        # added since the last call.
+        with tracing.span("llm.count_tokens") as span:
+            needs_compression, current_tokens, max_allowed = should_compress_context(
+                messages=messages, 
+                model=model_name,
+                safety_factor=0.3,  # Use 30% safety margin
+                ledger=self._token_ledger,
+            )
+            span.set_attributes(tokens=current_tokens, max_tokens=max_allowed)
         
         # Debug logging for token count
         if self.debug.debug_all():
@@ -295,37 +403,48 @@ class ActorBaseAgent:
         # Compress context if needed
         if needs_compression:
             # Create compressed messages
-            truncated_messages = create_compressed_messages(
-                messages=messages,
-                model=model_name,
-                current_tokens=current_tokens,
-                debug=self.debug.debug_all()
-            )
+            with tracing.span("llm.compress_context", tokens=current_tokens):
+                truncated_messages = create_compressed_messages(
+                    messages=messages,
+                    model=model_name,
+                    current_tokens=current_tokens,
+                    debug=self.debug.debug_all()
+                )
             
             # Update completion params with compressed messages
             completion_params["messages"] = truncated_messages
+            self._token_ledger.discard_estimate()
             
             # Update history but preserve system message
             self.history = [messages[0]] + truncated_messages[2:]
 
         debug_completion_start(self.debug, self.model, debug_params)
-        
-        try:
-            return litellm.completion(**completion_params)
-        except litellm.exceptions.ContextWindowExceededError as e:
-            # Emergency fallback
-            print(f"Emergency fallback: {str(e)}")
-            
-            # Keep only the system message and most recent message
-            emergency_messages = [messages[0], messages[-1]]
-            completion_params["messages"] = emergency_messages
-            self.history = emergency_messages
-            
-            # Try one more time with minimal context
+        return completion_params, messages
+
+    def _completion(self, completion_params: dict):
+        """Call litellm, going through the completion cache if it's enabled. The cache
+        outcome is reported in the FinishCompletion usage."""
+        cache = get_completion_cache(self.llm_cache)
+        if cache is None:
             return litellm.completion(**completion_params)
-        except Exception as e:
-            traceback.print_exc()
-            raise RuntimeError("Error calling LLM: " + str(e))
+
+        response, status = cache.lookup(completion_params)
+        self._callback_params[FinishCompletion.CACHE_KEY] = status
+        if response is not None:
+            return response
+        return cache.record(completion_params, litellm.completion(**completion_params))
+
+    async def _acompletion(self, completion_params: dict):
+        """Async version of _completion, using litellm.acompletion"""
+        cache = get_completion_cache(self.llm_cache)
+        if cache is None:
+            return await litellm.acompletion(**completion_params)
+
+        response, status = await asyncio.to_thread(cache.lookup, completion_params)
+        self._callback_params[FinishCompletion.CACHE_KEY] = status
+        if response is not None:
+            return response
+        return await cache.record_async(completion_params, await litellm.acompletion(**completion_params))
 
     def _execute_tool_calls(
         self,
@@ -335,237 +454,400 @@ class ActorBaseAgent:
     ) -> tuple[Response, list[Event]]:
         """When the LLM completion includes tool calls, now invoke the tool functions.
         Returns the LLM processing response, and a list of events to publish
+
+        If `max_tool_concurrency` is greater than 1 and the LLM asked for several tools at
+        once, the calls are dispatched concurrently. Either way the tool messages and events
+        come back in the same order as the LLM's tool calls.
         """
 
         function_map = {f.__name__: f for f in functions}
-        partial_response = Response(messages=[], agent=None)
+        prepared_calls = [
+            self._prepare_tool_call(tool_call, function_map, thread_context)
+            for tool_call in tool_calls
+        ]
+        runnable = [call for call in prepared_calls if call.func is not None]
 
-        events = []
+        if self.max_tool_concurrency > 1 and len(runnable) > 1:
+            outcomes = self._dispatch_concurrent(runnable)
+        else:
+            outcomes = {id(call): self._invoke_tool(call) for call in runnable}
 
-        for tool_call in tool_calls:
-            name = tool_call.function.name
-            is_subagent_call = False  # Initialize for this tool call
-            target_agent = ""  # Initialize target agent name
-            
+        return self._collect_tool_results(prepared_calls, outcomes, thread_context)
+
+    async def _aexecute_tool_calls(
+        self,
+        tool_calls: List[ChatCompletionMessageToolCall],
+        functions: List[AgentFunction],
+        thread_context: ThreadContext,
+    ) -> tuple[Response, list[Event]]:
+        """Async version of _execute_tool_calls. Coroutine tools are awaited on the running
+        event loop and other tools run in worker threads, so the loop is never blocked."""
+        function_map = {f.__name__: f for f in functions}
+        prepared_calls = [
+            self._prepare_tool_call(tool_call, function_map, thread_context)
+            for tool_call in tool_calls
+        ]
+        runnable = [call for call in prepared_calls if call.func is not None]
+
+        semaphore = asyncio.Semaphore(max(1, self.max_tool_concurrency))
+        # Sub-agent calls may pause for input, so like _dispatch_concurrent they run one at a time
+        generator_lock = asyncio.Lock()
+
+        async def invoke(call: PreparedToolCall):
+            async with semaphore:
+                if inspect.isgeneratorfunction(call.func):
+                    async with generator_lock:
+                        return await self._ainvoke_tool(call)
+                return await self._ainvoke_tool(call)
+
+        results = await asyncio.gather(*(invoke(call) for call in runnable))
+        outcomes = {id(call): outcome for call, outcome in zip(runnable, results)}
+        return self._collect_tool_results(prepared_calls, outcomes, thread_context)
+
+    def _collect_tool_results(
+        self,
+        prepared_calls: list[PreparedToolCall],
+        outcomes: dict[int, tuple[Any, list[Event]]],
+        thread_context: ThreadContext,
+    ) -> tuple[Response, list[Event]]:
+        """Build the tool messages and events, in the order the LLM asked for the calls"""
+        partial_response = Response(messages=[], agent=None)
+        events = []
+        pause_result = None
+        for call in prepared_calls:
             # handle missing tool case, skip to next tool
-            if name not in function_map:
+            if call.func is None:
                 debug_print(
-                    self.debug.debug_tools(), f"Tool {name} not found in function map."
+                    self.debug.debug_tools(), f"Tool {call.name} not found in function map."
                 )
                 partial_response.messages.append(
                     {
                         "role": "tool",
-                        "tool_call_id": tool_call.id,
-                        "tool_name": name,
-                        "content": f"Error: Tool {name} not found.",
+                        "tool_call_id": call.tool_call.id,
+                        "tool_name": call.name,
+                        "content": f"Error: Tool {call.name} not found.",
                     }
                 )
                 continue
 
-            try:
-                args = json.loads(tool_call.function.arguments)
-            except Exception as e:
-                debug_print(
-                    self.debug.debug_tools(),
-                    f"Error parsing tool call arguments: {e}\n"
-                    + f"Tool call: {tool_call.function.arguments}",
-                )
-                args = {}
-
-            func = function_map[name]
-            if __CTX_VARS_NAME__ in func.__code__.co_varnames:
-                args[__CTX_VARS_NAME__] = thread_context
-            if __LEGACY_CTX_VARS_NAME__ in func.__code__.co_varnames:
-                args[__LEGACY_CTX_VARS_NAME__] = thread_context
-
-            # Check if this is a subagent call (includes both call_agent and handoff_to_agent)
-            is_subagent_call = (
-                name in ["call_agent", "handoff_to_agent"] and 
-                'target_agent' in args and 'message' in args
-            )
-            
-            if is_subagent_call:
-                # Extract target agent name from arguments (prefer display name if available)
-                target_agent = args.get('_target_agent_display_name', args.get('target_agent', 'Unknown Agent'))
-                message = args.get('message', str(args))
-                events.append(SubAgentCall(self.name, target_agent, message, self.depth))
-            else:
-                events.append(ToolCall(
-                    agent=self.name,
-                    name=name,
-                    arguments=args,
-                    depth=self.depth,
-                    tool_call_id=tool_call.id
-                ))
-
-            # Call the function!!
-            raw_result = None
-            try:
-                if asyncio.iscoroutinefunction(function_map[name]):
-                    try:
-                        loop = asyncio.get_running_loop()
-                    except RuntimeError:
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                    
-                    raw_result = loop.run_until_complete(function_map[name](**args))
-                elif inspect.isgeneratorfunction(function_map[name]):
-                    # We use our generator for our call_child function. I guess we could let user's
-                    # write generate functions as long as they yield events. Or we could catch
-                    # strings and wrap them as events.
-                    for child_event in function_map[name](**args):
-                        if isinstance(child_event, TurnEnd):
-                            raw_result = child_event.result
-                            events.append(child_event)
-                        elif isinstance(child_event, Result):
-                            raw_result = child_event
-                        else:
-                            events.append(child_event)
-                    if raw_result is None:
-                        # Take last event as the function result
-                        raw_result = events.pop()
-
-                elif inspect.isasyncgenfunction(function_map[name]):
-                    # Thread the async function in an event loop and yield events
-                    async def run_async_gen():
-                        async for event in function_map[name](**args):
-                            events.append(event)
-                    asyncio.run(run_async_gen())
-                    # take the last yielded value as the function result
-                    raw_result = events.pop()
-
-                else:
-                    raw_result = function_map[name](**args)
-            except Exception as e:
-                tb_list = traceback.format_exception(type(e), e, e.__traceback__)
-                # Join all lines and split them to get individual lines
-                full_traceback = "".join(tb_list).strip().split("\n")
-                # Get the last 5 lines (or all if less than 5)
-                if self.debug.debug_all():
-                    last_three = full_traceback
-                else:
-                    last_three = (
-                        full_traceback[-5:] if len(full_traceback) >= 5 else full_traceback
-                    )
-                last_three = "\n".join(last_three)
-                raw_result = f"Tool error: {name}: {last_three}"
-
-                events.append(ToolError(
-                    agent=self.name,
-                    name=name,
-                    error=raw_result,
-                    depth=self.depth,
-                    tool_call_id=tool_call.id
-                ))
-
-            # Let tools return additional events to publish
-            if isinstance(raw_result, list):
-                for result in raw_result:
-                    if isinstance(result, Event):
-                        events.append(result)
-                raw_result = [result for result in raw_result if not isinstance(result, Event)]
-                if len(raw_result) == 0:
-                    raw_result = ""
-                
-            result: Result = (
-                raw_result
-                if isinstance(raw_result, Result)
-                else Result(value=str(raw_result))
-            )
-
-            result.tool_function = Function(
-                name=name,
-                arguments=tool_call.function.arguments,
-                _request_id=tool_call.id,
-            )
-
-            # Functions can queue log events when they run, and we publish after
-            for log_event in thread_context.get_logs():
-                events.append(log_event)
-            thread_context.reset_logs()
-
-            # Check if this was a subagent call to emit appropriate result event
-            if is_subagent_call:
-                events.append(SubAgentResult(self.name, target_agent, result.value, self.depth))
-            else:
-                events.append(ToolResult(
-                    agent=self.name,
-                    name=name,
-                    result=result.value,
-                    depth=self.depth,
-                    intermediate_result=False,
-                    tool_call_id=tool_call.id
-                ))
+            raw_result, call_events = outcomes[id(call)]
+            events.append(call.call_event)
+            events.extend(call_events)
+            result = self._finish_tool_call(call, raw_result, thread_context, events)
 
             partial_response.messages.append(
                 {
                     "role": "tool",
-                    "tool_call_id": tool_call.id,
-                    "name": name,
+                    "tool_call_id": call.tool_call.id,
+                    "name": call.name,
                     "content": result.value,
                 }
             )
             partial_response.last_tool_result = result
+            # The first tool that asks to pause wins, so a later sibling can't hide it
+            if pause_result is None and isinstance(result, (PauseForInputResult, OAuthFlowResult)):
+                pause_result = result
             # This was the simple way that Swarm did handoff
             if result.agent:
                 partial_response.agent = result.agent
 
+        if pause_result is not None:
+            partial_response.last_tool_result = pause_result
+
         return partial_response, events
 
-    def handle_prompt_or_resume(self, actor_message: Prompt | ResumeWithInput):
-        request_id = getattr(actor_message, 'request_id', None)
-        if not request_id:
-            raise ValueError("Request ID is required")
+    def _prepare_tool_call(
+        self,
+        tool_call: ChatCompletionMessageToolCall,
+        function_map: dict,
+        thread_context: ThreadContext,
+    ) -> PreparedToolCall:
+        """Resolve the tool function and arguments, and build the call event for one tool call"""
+        name = tool_call.function.name
+        if name not in function_map:
+            return PreparedToolCall(tool_call=tool_call, name=name)
+
+        try:
+            args = json.loads(tool_call.function.arguments)
+        except Exception as e:
+            debug_print(
+                self.debug.debug_tools(),
+                f"Error parsing tool call arguments: {e}\n"
+                + f"Tool call: {tool_call.function.arguments}",
+            )
+            args = {}
+
+        func = function_map[name]
+        if __CTX_VARS_NAME__ in func.__code__.co_varnames:
+            args[__CTX_VARS_NAME__] = thread_context
+        if __LEGACY_CTX_VARS_NAME__ in func.__code__.co_varnames:
+            args[__LEGACY_CTX_VARS_NAME__] = thread_context
+
+        # Check if this is a subagent call (includes both call_agent and handoff_to_agent)
+        is_subagent_call = (
+            name in ["call_agent", "handoff_to_agent"] and 
+            'target_agent' in args and 'message' in args
+        )
         
-        if isinstance(actor_message, Prompt):
-            self.thread_context = (
-                ThreadContext(
-                    agent_name=self.name,
-                    agent=self,
-                    debug_level=actor_message.debug,
-                    api_endpoint=self.api_endpoint,
-                    context=actor_message.request_context,
-                )
-                if self.thread_context is None
-                else self.thread_context.update(actor_message.request_context)
+        target_agent = ""
+        if is_subagent_call:
+            # Extract target agent name from arguments (prefer display name if available)
+            target_agent = args.get('_target_agent_display_name', args.get('target_agent', 'Unknown Agent'))
+            message = args.get('message', str(args))
+            call_event = SubAgentCall(self.name, target_agent, message, self.depth)
+        else:
+            call_event = ToolCall(
+                agent=self.name,
+                name=name,
+                arguments=args,
+                depth=self.depth,
+                tool_call_id=tool_call.id
             )
-            if not self.thread_context.thread_id and "thread_id" in actor_message.request_context:
-                self.thread_context.thread_id = actor_message.request_context["thread_id"]  
 
-            # Middleware to modify the input prompt (or change agent context)
-            if self._callbacks.get('handle_turn_start'):
-                self._callbacks['handle_turn_start'](actor_message, self.thread_context)
+        return PreparedToolCall(
+            tool_call=tool_call,
+            name=name,
+            func=func,
+            args=args,
+            call_event=call_event,
+            is_subagent_call=is_subagent_call,
+            target_agent=target_agent,
+        )
+
+    @contextmanager
+    def _tool_scope(self, call: PreparedToolCall):
+        """Trace and time one tool call, and collect its logs. Generator tools are our
+        sub-agent calls. The time is kept on the ToolCall event for the metrics."""
+        if call.is_subagent_call or inspect.isgeneratorfunction(call.func):
+            span = tracing.span("agent.subagent", agent=self.name, tool=call.name, target_agent=call.target_agent)
+        else:
+            span = tracing.span("tool.call", agent=self.name, tool=call.name, tool_call_id=call.tool_call.id)
+        started = time.perf_counter()
+        with span, capture_tool_logs() as logs:
+            try:
+                yield
+            finally:
+                call.logs = logs
+                if isinstance(call.call_event, ToolCall):
+                    call.call_event.elapsed = time.perf_counter() - started
+
+    def _invoke_tool(self, call: PreparedToolCall) -> tuple[Any, list[Event]]:
+        """Call the tool function. Returns the raw result plus any events the call produced."""
+        with self._tool_scope(call):
+            return self._call_tool(call)
+
+    def _call_tool(self, call: PreparedToolCall) -> tuple[Any, list[Event]]:
+        events = []
+        func = call.func
+        raw_result = None
+        try:
+            if asyncio.iscoroutinefunction(func):
+                try:
+                    loop = asyncio.get_running_loop()
+                except RuntimeError:
+                    loop = asyncio.new_event_loop()
+                    asyncio.set_event_loop(loop)
                 
-            self.debug = actor_message.debug
-            self.depth = actor_message.depth
-            self.history.append({"role": "user", "content": actor_message.payload})
-            yield PromptStarted(self.name, {"content": actor_message.payload}, self.depth)
+                raw_result = loop.run_until_complete(func(**call.args))
+            elif inspect.isgeneratorfunction(func):
+                # We use our generator for our call_child function. I guess we could let user's
+                # write generate functions as long as they yield events. Or we could catch
+                # strings and wrap them as events.
+                for child_event in func(**call.args):
+                    if isinstance(child_event, TurnEnd):
+                        raw_result = child_event.result
+                        events.append(child_event)
+                    elif isinstance(child_event, Result):
+                        raw_result = child_event
+                    else:
+                        events.append(child_event)
+                if raw_result is None:
+                    # Take last event as the function result
+                    raw_result = events.pop()
 
-        elif isinstance(actor_message, ResumeWithInput):
-            if not self.paused_context:
-                self.thread_context.debug(
-                    "Ignoring ResumeWithInput event, parent not paused: ",
-                    actor_message,
+            elif inspect.isasyncgenfunction(func):
+                # Thread the async function in an event loop and yield events
+                async def run_async_gen():
+                    async for event in func(**call.args):
+                        events.append(event)
+                asyncio.run(run_async_gen())
+                # take the last yielded value as the function result
+                raw_result = events.pop()
+
+            else:
+                raw_result = func(**call.args)
+        except Exception as e:
+            return self._tool_error_outcome(call, e, events)
+
+        return raw_result, events
+
+    async def _ainvoke_tool(self, call: PreparedToolCall) -> tuple[Any, list[Event]]:
+        """Async version of _invoke_tool"""
+        func = call.func
+        with self._tool_scope(call):
+            if asyncio.iscoroutinefunction(func):
+                try:
+                    return await func(**call.args), []
+                except Exception as e:
+                    return self._tool_error_outcome(call, e, [])
+            if inspect.isasyncgenfunction(func):
+                events = []
+                try:
+                    async for event in func(**call.args):
+                        events.append(event)
+                    # take the last yielded value as the function result
+                    return events.pop(), events
+                except Exception as e:
+                    return self._tool_error_outcome(call, e, events)
+            # Plain functions and generators (like sub-agent calls) would block the event loop
+            return await asyncio.to_thread(self._call_tool, call)
+
+    async def _invoke_async_tools(
+        self, calls: list[PreparedToolCall], limit: int
+    ) -> list[tuple[Any, list[Event]]]:
+        """Await a set of coroutine tools together on one event loop"""
+        semaphore = asyncio.Semaphore(limit)
+
+        async def invoke(call: PreparedToolCall):
+            async with semaphore:
+                with self._tool_scope(call):
+                    try:
+                        return await call.func(**call.args), []
+                    except Exception as e:
+                        return self._tool_error_outcome(call, e, [])
+
+        return await asyncio.gather(*(invoke(call) for call in calls))
+
+    def _dispatch_concurrent(self, calls: list[PreparedToolCall]) -> dict[int, tuple[Any, list[Event]]]:
+        """Run independent tool calls concurrently, bounded by `max_tool_concurrency`.
+
+        Plain sync tools run on a thread pool, and coroutine tools are awaited together on a
+        single event loop. Generator tools (sub-agent calls) stream their own events and
+        may pause for input, so they still run one at a time on the agent thread while the
+        pooled calls proceed in the background.
+        """
+        limit = min(self.max_tool_concurrency, len(calls))
+        async_calls = [call for call in calls if asyncio.iscoroutinefunction(call.func)]
+        inline_calls = [
+            call for call in calls
+            if inspect.isgeneratorfunction(call.func) or inspect.isasyncgenfunction(call.func)
+        ]
+        pooled_calls = [call for call in calls if call not in async_calls and call not in inline_calls]
+
+        outcomes = {}
+        with ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"{self.name}-tools") as pool:
+            # Each pooled call runs in a copy of this thread's context, so its tracing span
+            # nests under the current turn
+            async_future = None
+            if async_calls:
+                async_future = pool.submit(
+                    contextvars.copy_context().run, asyncio.run, self._invoke_async_tools(async_calls, limit)
                 )
-                return
-                
-            init_len = self.paused_context.orig_history_length
-            self.thread_context.update(actor_message.request_keys.copy())
+            futures = {
+                id(call): pool.submit(contextvars.copy_context().run, self._invoke_tool, call)
+                for call in pooled_calls
+            }
+
+            for call in inline_calls:
+                outcomes[id(call)] = self._invoke_tool(call)
+
+            for key, future in futures.items():
+                outcomes[key] = future.result()
+            if async_future:
+                for call, outcome in zip(async_calls, async_future.result()):
+                    outcomes[id(call)] = outcome
+
+        return outcomes
+
+    def _tool_error_outcome(
+        self, call: PreparedToolCall, e: Exception, events: list[Event]
+    ) -> tuple[str, list[Event]]:
+        # Called inside the tool call's span
+        tracing.current_span().record_error(e)
+        tb_list = traceback.format_exception(type(e), e, e.__traceback__)
+        # Join all lines and split them to get individual lines
+        full_traceback = "".join(tb_list).strip().split("\n")
+        # Get the last 5 lines (or all if less than 5)
+        if self.debug.debug_all():
+            last_three = full_traceback
+        else:
+            last_three = (
+                full_traceback[-5:] if len(full_traceback) >= 5 else full_traceback
+            )
+        last_three = "\n".join(last_three)
+        raw_result = f"Tool error: {call.name}: {last_three}"
+
+        events.append(ToolError(
+            agent=self.name,
+            name=call.name,
+            error=raw_result,
+            depth=self.depth,
+            tool_call_id=call.tool_call.id
+        ))
+        return raw_result, events
+
+    def _finish_tool_call(
+        self,
+        call: PreparedToolCall,
+        raw_result: Any,
+        thread_context: ThreadContext,
+        events: list[Event],
+    ) -> Result:
+        """Wrap the raw tool result and append the result events"""
+        # Let tools return additional events to publish
+        if isinstance(raw_result, list):
+            for result in raw_result:
+                if isinstance(result, Event):
+                    events.append(result)
+            raw_result = [result for result in raw_result if not isinstance(result, Event)]
+            if len(raw_result) == 0:
+                raw_result = ""
             
-            tool_function = self.paused_context.tool_function
-            if tool_function is None:
-                raise RuntimeError("Tool function not found on AgentResume event")
-                
+        result: Result = (
+            raw_result
+            if isinstance(raw_result, Result)
+            else Result(value=str(raw_result))
+        )
+
+        result.tool_function = Function(
+            name=call.name,
+            arguments=call.tool_call.function.arguments,
+            _request_id=call.tool_call.id,
+        )
+
+        # Functions can queue log events when they run, and we publish after
+        events.extend(call.logs)
+        events.extend(thread_context.take_logs())
+
+        # Check if this was a subagent call to emit appropriate result event
+        if call.is_subagent_call:
+            events.append(SubAgentResult(self.name, call.target_agent, result.value, self.depth))
+        else:
+            events.append(ToolResult(
+                agent=self.name,
+                name=call.name,
+                result=result.value,
+                depth=self.depth,
+                intermediate_result=False,
+                tool_call_id=call.tool_call.id
+            ))
+        return result
+
+    def handle_prompt_or_resume(self, actor_message: Prompt | ResumeWithInput):
+        request_id = self._request_id(actor_message)
+
+        if isinstance(actor_message, Prompt):
+            yield self._start_prompt(actor_message)
+
+        elif isinstance(actor_message, ResumeWithInput):
+            tool_call = self._start_resume(actor_message)
+            if tool_call is None:
+                return
             partial_response, events = self._execute_tool_calls(
-                [ChatCompletionMessageToolCall(
-                    id=(tool_function._request_id or ""),
-                    function=tool_function,
-                    type="function")],
-                self.functions,
-                self.thread_context
+                [tool_call], self.functions, self.thread_context
             )
             yield from events
-            self.history.extend(partial_response.messages)
+            self._finish_resume(partial_response)
 
         # Main conversation loop: allow 25 tool calls in a row before stopping
         init_len = len(self.history)
@@ -596,52 +878,179 @@ class ActorBaseAgent:
             # Yield to our publisher thread which will send queued events out to the client
             time.sleep(0)
 
-            if partial_response.last_tool_result:
-                if isinstance(partial_response.last_tool_result, PauseForInputResult):
-                    self.paused_context = AgentPauseContext(
-                        orig_history_length=init_len,
-                        tool_partial_response=partial_response,
-                        tool_function=partial_response.last_tool_result.tool_function
-                    )
-                    yield WaitForInput(self.name, partial_response.last_tool_result.request_keys)
-                    return
-                elif isinstance(partial_response.last_tool_result, OAuthFlowResult):
-                    self.paused_context = AgentPauseContext(
-                        orig_history_length=init_len,
-                        tool_partial_response=partial_response,
-                        tool_function=partial_response.last_tool_result.tool_function
-                    )
-                    # Add tool result message before yielding OAuthFlow event
-                    self.history.extend([{
-                        "role": "tool",
-                        "content": "OAuth authentication required. Please complete the authorization flow.",
-                        "tool_call_id": partial_response.last_tool_result.tool_function._request_id,
-                        "name": partial_response.last_tool_result.tool_function.name
-                    }])
-                    yield OAuthFlow(
-                        self.name,
-                        partial_response.last_tool_result.auth_url,
-                        partial_response.last_tool_result.tool_name,
-                        depth=self.depth
-                    )
-                    return
-                    
-                elif FinishAgentResult.matches_sentinel(partial_response.messages[-1]["content"]):
-                    self.history.extend(partial_response.messages)
-                    break
+            pause_event, finished = self._handle_tool_results(partial_response, init_len)
+            if pause_event is not None:
+                yield pause_event
+                return
+            if finished:
+                break
+
+        yield self._end_turn(init_len)
+
+    async def ahandle_prompt_or_resume(self, actor_message: Prompt | ResumeWithInput):
+        """Async version of handle_prompt_or_resume, used by AsyncLocalAgentProxy. The LLM
+        calls use litellm.acompletion and async tools are awaited on the caller's event loop."""
+        request_id = self._request_id(actor_message)
+
+        if isinstance(actor_message, Prompt):
+            yield self._start_prompt(actor_message)
+
+        elif isinstance(actor_message, ResumeWithInput):
+            tool_call = self._start_resume(actor_message)
+            if tool_call is None:
+                return
+            partial_response, events = await self._aexecute_tool_calls(
+                [tool_call], self.functions, self.thread_context
+            )
+            for event in events:
+                yield event
+            self._finish_resume(partial_response)
+
+        init_len = len(self.history)
+        while len(self.history) - init_len < 50:
+            async for event in self._ayield_completion_steps(request_id):
+                if not isinstance(event, FinishCompletion):
+                    yield event
 
-            self.history.extend(partial_response.messages)
+            assert isinstance(event, FinishCompletion)
+            response: Message = event.response
 
+            self.history.append(response)
+            if not response.tool_calls:
+                yield event
+                break
+
+            partial_response, events = await self._aexecute_tool_calls(
+                response.tool_calls,
+                self.functions,
+                self.thread_context
+            )
+            for tool_event in events:
+                yield tool_event
+            yield event
+
+            # Let other conversations on the loop run between turns
+            await asyncio.sleep(0)
+
+            pause_event, finished = self._handle_tool_results(partial_response, init_len)
+            if pause_event is not None:
+                yield pause_event
+                return
+            if finished:
+                break
+
+        yield self._end_turn(init_len)
+
+    def _request_id(self, actor_message: Prompt | ResumeWithInput) -> str:
+        request_id = getattr(actor_message, 'request_id', None)
+        if not request_id:
+            raise ValueError("Request ID is required")
+        return request_id
+
+    def _start_prompt(self, actor_message: Prompt) -> PromptStarted:
+        self.thread_context = (
+            ThreadContext(
+                agent_name=self.name,
+                agent=self,
+                debug_level=actor_message.debug,
+                api_endpoint=self.api_endpoint,
+                context=actor_message.request_context,
+            )
+            if self.thread_context is None
+            else self.thread_context.update(actor_message.request_context)
+        )
+        if not self.thread_context.thread_id and "thread_id" in actor_message.request_context:
+            self.thread_context.thread_id = actor_message.request_context["thread_id"]  
+
+        # Middleware to modify the input prompt (or change agent context)
+        if self._callbacks.get('handle_turn_start'):
+            self._callbacks['handle_turn_start'](actor_message, self.thread_context)
+            
+        self.debug = actor_message.debug
+        self.depth = actor_message.depth
+        self.history.append({"role": "user", "content": actor_message.payload})
+        return PromptStarted(self.name, {"content": actor_message.payload}, self.depth)
+
+    def _start_resume(self, actor_message: ResumeWithInput) -> Optional[ChatCompletionMessageToolCall]:
+        """Returns the paused tool call to run again, or None if there's nothing to resume"""
+        if not self.paused_context:
+            self.thread_context.debug(
+                "Ignoring ResumeWithInput event, parent not paused: ",
+                actor_message,
+            )
+            return None
+            
+        self.thread_context.update(actor_message.request_keys.copy())
+        
+        tool_function = self.paused_context.tool_function
+        if tool_function is None:
+            raise RuntimeError("Tool function not found on AgentResume event")
+            
+        return ChatCompletionMessageToolCall(
+            id=(tool_function._request_id or ""),
+            function=tool_function,
+            type="function",
+        )
+
+    def _finish_resume(self, partial_response: Response):
+        tool_function = self.paused_context.tool_function
+        # Tool calls that finished alongside the paused one still need their results in history
+        self.history.extend(
+            message for message in self.paused_context.tool_partial_response.messages
+            if message.get("tool_call_id") != tool_function._request_id
+        )
+        self.history.extend(partial_response.messages)
+
+    def _handle_tool_results(self, partial_response: Response, init_len: int) -> tuple[Optional[Event], bool]:
+        """Adds the tool results to the history. Returns (pause_event, finished): the
+        event to end the turn with if a tool paused it, and whether the agent is done."""
+        if partial_response.last_tool_result:
+            if isinstance(partial_response.last_tool_result, PauseForInputResult):
+                self.paused_context = AgentPauseContext(
+                    orig_history_length=init_len,
+                    tool_partial_response=partial_response,
+                    tool_function=partial_response.last_tool_result.tool_function
+                )
+                return WaitForInput(self.name, partial_response.last_tool_result.request_keys), False
+            elif isinstance(partial_response.last_tool_result, OAuthFlowResult):
+                self.paused_context = AgentPauseContext(
+                    orig_history_length=init_len,
+                    tool_partial_response=partial_response,
+                    tool_function=partial_response.last_tool_result.tool_function
+                )
+                # Add tool result message before yielding OAuthFlow event
+                self.history.extend([{
+                    "role": "tool",
+                    "content": "OAuth authentication required. Please complete the authorization flow.",
+                    "tool_call_id": partial_response.last_tool_result.tool_function._request_id,
+                    "name": partial_response.last_tool_result.tool_function.name
+                }])
+                return OAuthFlow(
+                    self.name,
+                    partial_response.last_tool_result.auth_url,
+                    partial_response.last_tool_result.tool_name,
+                    depth=self.depth
+                ), False
+                
+            elif FinishAgentResult.matches_sentinel(partial_response.messages[-1]["content"]):
+                self.history.extend(partial_response.messages)
+                return None, True
+
+        self.history.extend(partial_response.messages)
+        return None, False
+
+    def _end_turn(self, init_len: int) -> TurnEnd:
         # We have already emitted history for intervening events, and I think we just look at the
         # last message from TurnEnd anyway. So probably we just want to publish a single result here.
         # You can see it in TurnEnd.result which just returns the "content" part of the last message.
-        yield TurnEnd(
+        turn_end = TurnEnd(
             self.name,
             # result_model gets applied when TurnEnd is processed. We dont want to alter the the text response in history
             deepcopy(self.history[init_len:]),
             self.depth
         )
         self.paused_context = None
+        return turn_end
 
     def _yield_completion_steps(self, request_id: str):
         yield StartCompletion(self.name, self.depth)
@@ -657,37 +1066,124 @@ class ActorBaseAgent:
 
         litellm.success_callback = [custom_callback]
 
-        try:
-            completion = self._get_llm_completion(
-                history=self.history,
-                thread_context=self.thread_context,
-                model_override=None,
-                stream=True,
-            )
-        except RuntimeError as e:
-            yield FinishCompletion.create(
-                self.name,
-                Message(content=str(e), role="assistant"),
-                self.model,
-                0,
-                0,
-                timedelta(0),
-                self.depth
-            )
-            return
+        with tracing.span("llm.completion", agent=self.name, model=self.model) as span:
+            started = time.perf_counter()
+            try:
+                completion = self._get_llm_completion(
+                    history=self.history,
+                    thread_context=self.thread_context,
+                    model_override=None,
+                    stream=True,
+                )
+            except RuntimeError as e:
+                span.record_error(e)
+                yield FinishCompletion.create(
+                    self.name,
+                    Message(content=str(e), role="assistant"),
+                    self.model,
+                    0,
+                    0,
+                    timedelta(0),
+                    self.depth
+                )
+                return
 
-        chunks = []
-        for chunk in completion:
-            chunks.append(chunk)
-            delta = json.loads(chunk.choices[0].delta.model_dump_json())
-            if delta["role"] == "assistant":
-                delta["sender"] = self.name
-            if not delta.get("tool_calls") and delta.get("content"):
-                yield ChatOutput(self.name, delta, self.depth)
-            delta.pop("role", None)
-            delta.pop("sender", None)
+            chunks = []
+            first_chunk_at = None
+            for chunk in completion:
+                if first_chunk_at is None:
+                    first_chunk_at = time.perf_counter()
+                chunks.append(chunk)
+                delta = json.loads(chunk.choices[0].delta.model_dump_json())
+                if delta["role"] == "assistant":
+                    delta["sender"] = self.name
+                if not delta.get("tool_calls") and delta.get("content"):
+                    yield ChatOutput(self.name, delta, self.depth)
+            streamed_at = time.perf_counter()
+            if first_chunk_at is not None:
+                self._callback_params[FinishCompletion.TTFT_KEY] = first_chunk_at - started
+
+            yield from self._finish_completion(chunks)
+            self._record_completion_span(span, started, first_chunk_at, streamed_at)
+
+    async def _ayield_completion_steps(self, request_id: str):
+        """Async version of _yield_completion_steps. The global litellm success callback
+        isn't safe with many conversations on one loop, so timing and cost are measured here."""
+        yield StartCompletion(self.name, self.depth)
+
+        self._callback_params = {}
+        started = datetime.now()
 
+        with tracing.span("llm.completion", agent=self.name, model=self.model) as span:
+            started_at = time.perf_counter()
+            try:
+                completion = await self._aget_llm_completion(
+                    history=self.history,
+                    thread_context=self.thread_context,
+                    model_override=None,
+                    stream=True,
+                )
+            except RuntimeError as e:
+                span.record_error(e)
+                yield FinishCompletion.create(
+                    self.name,
+                    Message(content=str(e), role="assistant"),
+                    self.model,
+                    0,
+                    0,
+                    timedelta(0),
+                    self.depth
+                )
+                return
+
+            chunks = []
+            first_chunk_at = None
+            async for chunk in _aiter(completion):
+                if first_chunk_at is None:
+                    first_chunk_at = time.perf_counter()
+                chunks.append(chunk)
+                delta = json.loads(chunk.choices[0].delta.model_dump_json())
+                if delta["role"] == "assistant":
+                    delta["sender"] = self.name
+                if not delta.get("tool_calls") and delta.get("content"):
+                    yield ChatOutput(self.name, delta, self.depth)
+            streamed_at = time.perf_counter()
+            if first_chunk_at is not None:
+                self._callback_params[FinishCompletion.TTFT_KEY] = first_chunk_at - started_at
+
+            self._callback_params["elapsed"] = datetime.now() - started
+            for event in self._finish_completion(chunks, estimate_cost=True):
+                yield event
+            self._record_completion_span(span, started_at, first_chunk_at, streamed_at)
+
+    def _record_completion_span(
+        self, span: tracing.Span, started: float, first_chunk_at: Optional[float], streamed_at: float
+    ):
+        """Add the usage, time to first token and streaming rate to a completion's span.
+        The time to first token includes preparing the prompt."""
+        if not span.recording:
+            return
+        output_tokens = self._callback_params.get("output_tokens")
+        span.set_attributes(
+            input_tokens=self._callback_params.get("input_tokens"),
+            output_tokens=output_tokens,
+            cost=self._callback_params.get("cost"),
+            cache=self._callback_params.get(FinishCompletion.CACHE_KEY),
+        )
+        if first_chunk_at is not None:
+            stream_seconds = streamed_at - first_chunk_at
+            span.set_attributes(ttft_ms=(first_chunk_at - started) * 1000, stream_ms=stream_seconds * 1000)
+            if output_tokens and stream_seconds > 0:
+                span.set_attribute("tokens_per_second", output_tokens / stream_seconds)
+
+    def _finish_completion(self, chunks: list, estimate_cost: bool = False):
+        """Assemble the streamed chunks into the final message and yield the closing events"""
         llm_message = litellm.stream_chunk_builder(chunks, messages=self.history)
+        if estimate_cost:
+            try:
+                self._callback_params["cost"] = litellm.completion_cost(completion_response=llm_message)
+            except Exception:
+                pass
         input = self.history[-1:]
         output = llm_message.choices[0].message
         
@@ -727,6 +1223,7 @@ class ActorBaseAgent:
         usage = getattr(llm_message, "usage", None)
         if usage:
             self._callback_params["input_tokens"] = usage.prompt_tokens
+            self._token_ledger.record_usage(usage.prompt_tokens)
             self._callback_params["output_tokens"] = usage.completion_tokens
         else:
             # Fallback to manual calculation if usage not in response
@@ -758,7 +1255,9 @@ class ActorBaseAgent:
             self._callback_params.get("output_tokens"),
             self._callback_params.get("elapsed"),
             self.depth,
-            reasoning_content=reasoning_content
+            reasoning_content=reasoning_content,
+            cache=self._callback_params.get(FinishCompletion.CACHE_KEY),
+            time_to_first_token=self._callback_params.get(FinishCompletion.TTFT_KEY),
         )
 
     def call_child(
@@ -810,7 +1309,16 @@ class ActorBaseAgent:
     def add_child(self, actor_message: AddChild):
         self.add_tool(actor_message)
 
+    def get_tool_schemas(self) -> list[dict]:
+        """The tool schemas for our functions, as sent to the LLM. Cached per function list."""
+        key = tuple(id(f) for f in self.functions or [])
+        if self._tool_schemas is None or key != self._tool_schemas_key:
+            self._tool_schemas = [llm_tool_schema(f) for f in self.functions or []]
+            self._tool_schemas_key = key
+        return self._tool_schemas
+
     def add_tool(self, tool_func_or_cls):
+        self._tool_schemas = None
         if isinstance(tool_func_or_cls, AddChild):
             tool_func_or_cls = self._build_child_func(tool_func_or_cls)
 
@@ -839,41 +1347,33 @@ class ActorBaseAgent:
         """Ensure the appropriate API key is set for the given model."""
         from agentic.agentic_secrets import agentic_secrets
 
-        for key in agentic_secrets.list_secrets():
-            if key not in os.environ:
-                value = agentic_secrets.get_secret(key)
-                if value:
-                    os.environ[key] = value
+        agentic_secrets.copy_secrets_to_env(overwrite=False)
 
     def get_instructions(self, context: ThreadContext):
         # Support context var substitution in prompts
+        prompt = self.instructions_str
         try:
-            prompt = Template(
-                self.instructions_str, 
-                undefined=DebugUndefined
-            ).render(
-                context.get_context()
-            )
-            if self.memories:
-                prompt += """
-    <memory blocks>
-    {% for memory in MEMORIES -%}
-    {{memory|trim}}
-    {%- endfor %}
-    </memory>
-    """
-            # Fix for Jinja2 template rendering error if there is an unclosed comment, ensure all `{#` have a closing `#}`
-            while re.search(r"\{#(?!.*#\})", prompt, re.DOTALL):
-                prompt = re.sub(r"\{#(?!.*#\})", "{% raw %}{#{% endraw %}", prompt, count=1)
-
-            return Template(prompt).render(
-                context.get_context() | {"MEMORIES": self.memories}
-            )
+            variables = context.get_context()
+            prompt = render_template(self.instructions_str, variables, debug_undefined=True)
+            # Render again so context values can reference other context values
+            if not self.memories:
+                return render_template(prompt, variables)
+            return render_template(prompt, variables, keep_trailing_newline=True) + self._get_memory_block()
         except Exception as e:
             print("Error in prompt template, using raw prompt without subsitutions:", e)
             traceback.print_exc()
             return prompt
 
+    def _get_memory_block(self) -> str:
+        # Memories rarely change, so render the block once rather than on every completion
+        key = tuple(self.memories)
+        if self._memory_block is None or self._memory_block[0] != key:
+            self._memory_block = (
+                key,
+                render_template(MEMORY_BLOCK_TEMPLATE, {"MEMORIES": self.memories}, keep_trailing_newline=True),
+            )
+        return self._memory_block[1]
+
     def set_state(self, actor_message: SetState):
         self.inject_secrets_into_env()
         state = actor_message.payload
@@ -888,6 +1388,8 @@ class ActorBaseAgent:
             "api_endpoint",
             "result_model",
             "reasoning_effort",
+            "max_tool_concurrency",
+            "llm_cache",
         ]:
             if key in state:
                 setattr(self, remap.get(key, key), state[key])
@@ -900,6 +1402,7 @@ class ActorBaseAgent:
 
         # Update our functions
         if "functions" in state:
+            self._tool_schemas = None
             self.functions = []
             self.tools = []
             for f in state.get("functions"):
@@ -924,15 +1427,7 @@ class ActorBaseAgent:
         return self.tools
 
     def list_functions(self) -> list[str]:
-        def get_name(f):
-            if hasattr(f, "__name__"):
-                return f.__name__
-            elif isinstance(f, dict):
-                return f["name"]
-            else:
-                return str(f)
-
-        return [get_name(f) for f in self.functions]
+        return [tool["function"]["name"] for tool in self.get_tool_schemas()]
 
     def handle_request(self, method: str, data: dict):
         return f"Actor {self.name} processed {method} request with data: {data}"
@@ -946,7 +1441,7 @@ class ActorBaseAgent:
             args: Arguments to pass to the tool function
         """
         # Get the thread context from the database
-        db_manager = DatabaseManager()
+        db_manager = get_db_manager()
         thread = db_manager.get_thread(thread_id)
         if not thread:
             raise ValueError(f"No thread found with ID {thread_id}")
@@ -1065,6 +1560,9 @@ class BaseAgentProxy:
         reasoning_effort: str = None,
         reasoning_tools: list[str] = None,
         web_search_context_size: str = "medium",
+        max_tool_concurrency: int = 1,
+        max_concurrent_requests: Optional[int] = None,
+        llm_cache: Optional[str] = None,
     ):
         self.name = name
         self.welcome = welcome or f"Hello, I am {name}."
@@ -1075,6 +1573,10 @@ class BaseAgentProxy:
         self.reasoning_effort = reasoning_effort
         self.reasoning_tools = reasoning_tools or []
         self.web_search_context_size = web_search_context_size
+        self.max_tool_concurrency = max_tool_concurrency
+        # Limit on this agent's running requests. None uses AGENTIC_MAX_AGENT_REQUESTS.
+        self.max_concurrent_requests = max_concurrent_requests
+        self.llm_cache = llm_cache
         
         # Find template path if not provided
         from agentic.utils.template import find_template_path
@@ -1089,7 +1591,7 @@ class BaseAgentProxy:
         self.memories = memories
         self.debug = debug
         self._handle_turn_start = handle_turn_start
-        self.request_queues: dict[str,Queue] = {}
+        self.request_queues: dict[str,EventChannel] = {}
         self.result_model = result_model
         self.queue_done_sentinel = "QUEUE_DONE"
         
@@ -1098,10 +1600,10 @@ class BaseAgentProxy:
 
         # Process instructions
         if instructions and instructions.strip():
-            template = Template(instructions, undefined=DebugUndefined)
-            self.instructions = template.render(**self.prompt_variables)
+            prompt_variables = self.prompt_variables
+            self.instructions = render_template(instructions, prompt_variables, debug_undefined=True)
             # Allow one level of nested references
-            self.instructions = Template(self.instructions, undefined=DebugUndefined).render(**self.prompt_variables)
+            self.instructions = render_template(self.instructions, prompt_variables, debug_undefined=True)
             if self.instructions.strip() == "":
                 raise ValueError(
                     f"Instructions are required for {self.name}. Maybe interpolation failed from: {instructions}"
@@ -1217,10 +1719,8 @@ class BaseAgentProxy:
     def get_db_manager(self) -> DatabaseManager:
         """Get the database manager for this agent"""
         if self.db_path:
-            db_manager = DatabaseManager(self.db_path)
-        else:
-            db_manager = DatabaseManager()
-        return db_manager
+            return get_db_manager(self.db_path)
+        return get_db_manager()
 
     def get_threads(self, user_id: str|None) -> list[Thread]:
         """Get all threads for this agent"""
@@ -1247,17 +1747,7 @@ class BaseAgentProxy:
         """Dictionary of variables to make available to prompt templates."""
         if self.template_path is None:
             return {"name": self.name}  # Return default values when no template path exists
-            
-        path = Path(self.template_path)
-        if path.exists():
-            try:
-                with open(path, "r") as f:
-                    prompts = yaml.safe_load(f)
-                    return prompts or {"name": self.name}
-            except Exception as e:
-                print(f"Error loading prompt template: {e}")
-        
-        return {"name": self.name}
+        return load_prompt_file(str(self.template_path)) or {"name": self.name}
 
     @property
     def safe_name(self) -> str:
@@ -1268,11 +1758,7 @@ class BaseAgentProxy:
         """Ensure the appropriate API key is set for the given model."""
         from agentic.agentic_secrets import agentic_secrets
 
-        for key in agentic_secrets.list_secrets():
-            if key not in os.environ:
-                value = agentic_secrets.get_secret(key)
-                if value:
-                    os.environ[key] = value
+        agentic_secrets.copy_secrets_to_env(overwrite=False)
 
     def _get_funcs(self, thefuncs: list):
         """Get the functions to provide to the agent implementation"""
@@ -1327,14 +1813,19 @@ class BaseAgentProxy:
         # We load the thread history from the ThreadManager, and pass it to the agent.
         # We have to keep a flag to avoid loading all of history every time that 'start_request' is
         # is called. But the agent also has logic to only load its history once.
-        from .thread_manager import reconstruct_chat_history_from_thread_logs, validate_chat_history
+        # The history comes from the thread's snapshot, so only logs written since the last
+        # turn are replayed.
+        from .thread_manager import load_chat_history, validate_chat_history
 
         if thread_id == 'NEW':
             history = []
         else:
-            history = validate_chat_history(
-                reconstruct_chat_history_from_thread_logs(self.get_thread_logs(thread_id))
-            )
+            try:
+                history = load_chat_history(self.get_db_manager(), thread_id)
+            except Exception as e:
+                print(f"Error loading thread history: {e}")
+                history = []
+            history = validate_chat_history(history)
         update = {"history": history}
         self._update_state(update)
 
@@ -1361,39 +1852,40 @@ class BaseAgentProxy:
         if request_id in self.agent_instances:
             del self.agent_instances[request_id]
 
+    def _release_request_queue(self, request_id: str, queue: EventChannel):
+        # A resumed request reuses its request_id, so only remove the channel we were given
+        if self.request_queues.get(request_id) is queue:
+            del self.request_queues[request_id]
+
+    def _sweep_request_queues(self):
+        """Drop the channels of finished requests whose events were never collected"""
+        now = time.monotonic()
+        for request_id, queue in list(self.request_queues.items()):
+            if queue.closed_at is not None and now - queue.closed_at > REQUEST_RETENTION:
+                self._release_request_queue(request_id, queue)
+
     def start_request(self, request: str, request_context: dict = {}, 
                      continue_result: dict = {}, thread_id: Optional[str] = None,
-                     debug: DebugLevel = DebugLevel(DebugLevel.OFF)) -> StartRequestResponse:
-        """Start a new agent request"""
+                     debug: DebugLevel = DebugLevel(DebugLevel.OFF),
+                     priority: int = 0) -> StartRequestResponse:
+        """Start a new agent request. The request runs on the shared request executor, and
+        waits in its admission queue if the concurrency limits are reached. Lower `priority`
+        values run first. Raises `RequestRejected` if the admission queue is full."""
         self.debug.raise_level(debug)
+        self._sweep_request_queues()
 
         if not hasattr(depthLocal, 'depth'):
             depthLocal.depth = 0
         else:
             depthLocal.depth += 1
 
-        for key, value in request_context.items():
-            if isinstance(value, Callable):
-                request_context[key] = value()
-                
-        if isinstance(request, str):
-            request = self._check_for_prompt_match(request)
-
-        if not thread_id and "thread_id" in request_context:
-            thread_id = request_context["thread_id"]
-
-        # Create request ID if not provided in continue_result
-        request_id = continue_result.get("request_id") or str(uuid.uuid4())
-
-        agent_instance = self._get_agent_for_request(request_id)
-        if (self.thread_id != thread_id or not self.thread_id) and self.db_path:
-            if thread_id is not None:
-                self._reload_thread_history(thread_id)
-
-            self.init_thread_tracking(agent_instance, thread_id or self.thread_id)
+        request, request_id = self._prepare_request(request, request_context, continue_result, thread_id)
+        request_span = tracing.start_span(
+            "agent.request", agent=self.name, request_id=request_id, thread_id=self.thread_id
+        )
 
         # Initialize new request
-        queue = Queue()
+        queue = EventChannel()
         # pass the queue down ultimate to ThreadContext by putting it in the request_context
         request_context[EVENT_QUEUE_KEY] = queue
 
@@ -1408,18 +1900,63 @@ class BaseAgentProxy:
 
         def producer(queue, request_obj, continue_result):
             depthLocal.depth = request_obj.depth
-            for event in self._next_turn(request_obj, request_context=request_context, continue_result=continue_result, request_id=request_id):
-                queue.put(event)
-            queue.put(self.queue_done_sentinel)
-            # Cleanup the agent instance when done
-            self._cleanup_agent_instance(request_id)
+            try:
+                with tracing.activate(request_span):
+                    request_span.set_attribute("queued_ms", (time.time_ns() - request_span.start_ns) / 1e6)
+                    for event in self._next_turn(request_obj, request_context=request_context, continue_result=continue_result, request_id=request_id):
+                        # Once the consumer has gone away this drops the event, but the turn
+                        # still runs to the end so that it's fully logged
+                        queue.put(event)
+            finally:
+                queue.close()
+                # Cleanup the agent instance when done
+                self._cleanup_agent_instance(request_id)
             
         self.request_queues[request_id] = queue
 
-        t = threading.Thread(target=producer, args=(queue, request_obj, continue_result))
-        t.start()
+        try:
+            # The producer runs in a copy of this context, so the tracing span it activates
+            # can't leak into the next request on the same worker thread
+            request_executor.submit(
+                producer, queue, request_obj, continue_result,
+                key=self.name,
+                priority=priority,
+                limit=self.max_concurrent_requests,
+            )
+        except RequestRejected as e:
+            request_span.record_error(e)
+            request_span.end()
+            self._release_request_queue(request_id, queue)
+            self._cleanup_agent_instance(request_id)
+            depthLocal.depth -= 1
+            raise
         return StartRequestResponse(request_id=request_id, thread_id=self.thread_id)
 
+    def _prepare_request(self, request: str, request_context: dict, continue_result: dict,
+                         thread_id: Optional[str]) -> tuple[str, str]:
+        """Resolves the request text and its request ID, and points the agent at the request's
+        thread, loading its history if it changed. Returns (request, request_id)."""
+        for key, value in request_context.items():
+            if isinstance(value, Callable):
+                request_context[key] = value()
+                
+        if isinstance(request, str):
+            request = self._check_for_prompt_match(request)
+
+        if not thread_id and "thread_id" in request_context:
+            thread_id = request_context["thread_id"]
+
+        # Create request ID if not provided in continue_result
+        request_id = continue_result.get("request_id") or str(uuid.uuid4())
+
+        agent_instance = self._get_agent_for_request(request_id)
+        if (self.thread_id != thread_id or not self.thread_id) and self.db_path:
+            if thread_id is not None:
+                self._reload_thread_history(thread_id)
+
+            self.init_thread_tracking(agent_instance, thread_id or self.thread_id)
+        return request, request_id
+
     def get_events(self, request_id: str, timeout: Optional[float] = None) -> Generator[Event, Any, Any]:
         """Get events for a request"""
         queue = self.request_queues[request_id]
@@ -1430,27 +1967,37 @@ class BaseAgentProxy:
                 if timeout is not None:
                     remaining_time = timeout - (time.time() - start_time)
                     if remaining_time <= 0:
-                        # Timeout exceeded, set sentinel and return
-                        queue.put(self.queue_done_sentinel)
                         break
                     event = queue.get(timeout=remaining_time)
                 else:
                     event = queue.get()
-                    
-                if event == self.queue_done_sentinel:
-                    break
-                    
-                yield event
-                # yield to subscriber thread so it can publish events to clients
-                time.sleep(0)
-                
-            except Exception:
-                # Timeout or other exception, set sentinel and break
-                queue.put(self.queue_done_sentinel)
+            except EOFError:
+                # The request is done
+                self._release_request_queue(request_id, queue)
+                break
+            except Empty:
+                # Timed out, the caller can come back for the rest of the events
                 break
+            yield event
         
         depthLocal.depth -= 1
 
+    async def aget_events(self, request_id: str) -> AsyncGenerator[Event, None]:
+        """Get events for a request without blocking the event loop. If the consumer stops
+        early (eg. the client disconnects) the request's channel is cancelled, so the
+        agent never blocks on events that nobody will read."""
+        queue = self.request_queues[request_id]
+        try:
+            async for event in queue:
+                yield event
+        finally:
+            if not queue.closed:
+                queue.cancel()
+            self._release_request_queue(request_id, queue)
+            # The consumer may be on a different thread than the one that started the request
+            if getattr(depthLocal, "depth", 0) > 0:
+                depthLocal.depth -= 1
+
     def next_turn(self, request: str | Prompt, request_context: dict = {},
               request_id: str = None, continue_result: dict = {},
               debug: DebugLevel = DebugLevel(DebugLevel.OFF)) -> Generator[Event, Any, Any]:
@@ -1462,6 +2009,15 @@ class BaseAgentProxy:
         agent_instance = self._get_agent_for_request(request_id)
 
         # Prepare the prompt or resume input
+        actor_message = self._turn_input(request, request_context, request_id, continue_result, debug)
+        if isinstance(actor_message, Prompt):
+            return self._get_prompt_generator(agent_instance, actor_message)
+        else:
+            return self._get_resume_generator(agent_instance, actor_message)
+
+    def _turn_input(self, request: str | Prompt, request_context: dict, request_id: str,
+                    continue_result: dict, debug: DebugLevel) -> Prompt | ResumeWithInput:
+        """The message that starts or resumes the agent's turn"""
         if not continue_result:
             prompt = (
                 request if isinstance(request, Prompt)
@@ -1482,15 +2038,14 @@ class BaseAgentProxy:
             if hasattr(depthLocal, 'depth') and depthLocal.depth > prompt.depth:
                 prompt.depth = depthLocal.depth
 
-            return self._get_prompt_generator(agent_instance, prompt)
+            return prompt
 
         else:
-            resume_input = ResumeWithInput(
+            return ResumeWithInput(
                 self.name,
                 continue_result,
                 request_id=request_id
             )
-            return self._get_resume_generator(agent_instance, resume_input)
 
 
     def _next_turn(self, request: str | Prompt, request_context: dict = {},
@@ -1500,6 +2055,37 @@ class BaseAgentProxy:
         Wraps `next_turn` to add thread tracking and handle_event logging.
         Always used internally by the proxy to ensure consistent behavior.
         """
+        request_id, request_context = self._begin_turn(request, request_context, request_id, continue_result, debug)
+
+        with tracing.span("agent.turn", agent=self.name, request_id=request_id, resume=bool(continue_result)):
+            # Call the user’s or default next_turn
+            event_gen = self.next_turn(
+                request=request,
+                request_context=request_context,
+                request_id=request_id,
+                continue_result=continue_result,
+                debug=debug
+            )
+
+            # Central logging of all events
+            turn_metrics = metrics.TurnMetrics(self.name)
+            try:
+                for event in self._process_generator(event_gen):
+                    turn_metrics.observe(event)
+                    event = self._check_turn_event(event)
+                    if self._is_published(event):
+                        yield event
+
+                    callback = self._event_callback(event)
+                    if callback:
+                        self._run_event_callback(callback, event, request_context)
+            finally:
+                turn_metrics.close()
+
+    def _begin_turn(self, request: str | Prompt, request_context: dict, request_id: Optional[str],
+                    continue_result: dict, debug: DebugLevel) -> tuple[str, dict]:
+        """Resets the turn state and makes sure the thread is tracked. Returns
+        (request_id, request_context) with the thread_id added to the context."""
         self.cancelled = False
         self.debug.raise_level(debug)
 
@@ -1522,44 +2108,35 @@ class BaseAgentProxy:
 
         # Add thread_id into context explicitly so child agents inherit it
         request_context = {**request_context, "thread_id": self.thread_id}
+        return request_id, request_context
 
-        # Call the user’s or default next_turn
-        event_gen = self.next_turn(
-            request=request,
-            request_context=request_context,
-            request_id=request_id,
-            continue_result=continue_result,
-            debug=debug
-        )
+    def _check_turn_event(self, event: Event) -> Event:
+        if self.cancelled:
+            raise TurnCancelledError()
 
-        # Central logging of all events
-        for event in self._process_generator(event_gen):
-            if self.cancelled:
-                raise TurnCancelledError()
+        # Handle TurnEnd result validation
+        if isinstance(event, TurnEnd):
+            event = self._process_turn_end(event)
+        return event
 
-            # Handle TurnEnd result validation
-            if isinstance(event, TurnEnd):
-                event = self._process_turn_end(event)
+    def _is_published(self, event: Event) -> bool:
+        # don't yield log events, they should have been short-ciruit published directly
+        # into the event queue
+        return not (isinstance(event, ToolResult) and event.payload['is_log'] == True)
 
-            if isinstance(event, ToolResult) and event.payload['is_log'] == True:
-                pass # don't yield log events, they should have been short-ciruit published directly
-                     # into the event queue
-            else:
-                yield event
+    def _event_callback(self, event: Event) -> Optional[CallbackFunc]:
+        """The handle_event callback to log this event with, if any"""
+        if hasattr(event, "agent") and event.agent != self.name:
+            # skipping event with wrong agent name
+            return None
+        return self._agent.get_callback("handle_event") if hasattr(self, "_agent") else None
 
-            if hasattr(event, "agent") and event.agent != self.name:
-                # skipping event with wrong agent name
-                continue    
-
-            # Only now: do logging after yielding
-            callback = self._agent.get_callback("handle_event") if hasattr(self, "_agent") else None
-            if callback:
-                context = ThreadContext(agent=self._agent, agent_name=self.name, thread_id=self.thread_id, context=request_context)
-                try:
-                    callback(event, context)
-                except Exception as e:
-                    print(f"Error in handle_event callback: {e}")
-                        
+    def _run_event_callback(self, callback: CallbackFunc, event: Event, request_context: dict):
+        context = ThreadContext(agent=self._agent, agent_name=self.name, thread_id=self.thread_id, context=request_context)
+        try:
+            callback(event, context)
+        except Exception as e:
+            print(f"Error in handle_event callback: {e}")
         
     def _get_prompt_generator(self, agent_instance, prompt):
         """Get generator for a new prompt - to be implemented by subclasses"""
@@ -1658,6 +2235,8 @@ class RayAgentProxy(BaseAgentProxy):
             "reasoning_effort": self.reasoning_effort,
             "reasoning_tools": self.reasoning_tools,
             "web_search_context_size": self.web_search_context_size,
+            "max_tool_concurrency": self.max_tool_concurrency,
+            "llm_cache": self.llm_cache,
             # Functions will be added when creating instances
         }
         _AGENT_REGISTRY.append(self)
@@ -1683,6 +2262,8 @@ class RayAgentProxy(BaseAgentProxy):
                     "reasoning_effort": self.reasoning_effort,
                     "reasoning_tools": self.reasoning_tools,
                     "web_search_context_size": self.web_search_context_size,
+                    "max_tool_concurrency": self.max_tool_concurrency,
+                    "llm_cache": self.llm_cache,
                 },
             ),
         )
@@ -1784,6 +2365,8 @@ class LocalAgentProxy(BaseAgentProxy):
             "reasoning_effort": self.reasoning_effort,
             "reasoning_tools": self.reasoning_tools,
             "web_search_context_size": self.web_search_context_size,
+            "max_tool_concurrency": self.max_tool_concurrency,
+            "llm_cache": self.llm_cache,
             # Functions will be added when creating instances
         }
         _AGENT_REGISTRY.append(self)
@@ -1809,6 +2392,8 @@ class LocalAgentProxy(BaseAgentProxy):
                     "reasoning_effort": self.reasoning_effort,
                     "reasoning_tools": self.reasoning_tools,
                     "web_search_context_size": self.web_search_context_size,
+                    "max_tool_concurrency": self.max_tool_concurrency,
+                    "llm_cache": self.llm_cache,
                 },
             ),
         )        
@@ -1884,6 +2469,131 @@ class LocalAgentProxy(BaseAgentProxy):
         for event in generator:
             yield event
 
+# Events whose handle_event logging writes to the database right away. The async proxy
+# runs these off the event loop; other events are only buffered by the event sink.
+_BLOCKING_LOG_EVENTS = (PromptStarted, TurnEnd, WaitForInput, OAuthFlow)
+
+
+class AsyncLocalAgentProxy(LocalAgentProxy):
+    """Local agent proxy that runs each request as a task on the caller's event loop
+    instead of on the request executor's threads. LLM calls use litellm.acompletion,
+    coroutine tools are awaited directly and other tools run in worker threads, so one
+    loop can serve many concurrent conversations.
+
+    Start requests with `astart_request` and read them with `aget_events`. A custom
+    `next_turn` override is not used by the async path.
+
+    The requests of one agent share its history and thread, so they run one at a time.
+    Use an agent per conversation to run conversations concurrently.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Keep references to the running request tasks so they aren't garbage collected
+        self._tasks: set[asyncio.Task] = set()
+        self._request_slot: Optional[asyncio.Semaphore] = None
+
+    async def astart_request(self, request: str, request_context: dict = {},
+                             continue_result: dict = {}, thread_id: Optional[str] = None,
+                             debug: DebugLevel = DebugLevel(DebugLevel.OFF)) -> StartRequestResponse:
+        """Start a request as a task on the running event loop. If another request of this
+        agent is running, waits for it to finish first, since they share the agent's state."""
+        self.debug.raise_level(debug)
+        self._sweep_request_queues()
+
+        if self._request_slot is None:
+            self._request_slot = asyncio.Semaphore(1)
+        # Held until the request's task finishes, including while the thread is switched
+        await self._request_slot.acquire()
+        try:
+            return await self._astart_request(request, request_context, continue_result, thread_id)
+        except BaseException:
+            self._request_slot.release()
+            raise
+
+    async def _astart_request(self, request: str, request_context: dict, continue_result: dict,
+                              thread_id: Optional[str]) -> StartRequestResponse:
+        request_context = dict(request_context)
+        request, request_id = await asyncio.to_thread(
+            self._prepare_request, request, request_context, continue_result, thread_id
+        )
+
+        queue = EventChannel()
+        request_context[EVENT_QUEUE_KEY] = queue
+        request_obj = Prompt(
+            self.name,
+            request,
+            debug=self.debug,
+            depth=0,
+            request_context=request_context,
+            request_id=request_id,
+        )
+        self.request_queues[request_id] = queue
+        request_span = tracing.start_span(
+            "agent.request", agent=self.name, request_id=request_id, thread_id=self.thread_id
+        )
+
+        task = asyncio.create_task(
+            self._aproduce(queue, request_obj, request_context, continue_result, request_id, request_span)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return StartRequestResponse(request_id=request_id, thread_id=self.thread_id)
+
+    async def _aproduce(self, queue: EventChannel, request_obj: Prompt, request_context: dict,
+                        continue_result: dict, request_id: str, request_span: tracing.Span):
+        try:
+            with tracing.activate(request_span):
+                async for event in self._anext_turn(request_obj, request_context, request_id, continue_result):
+                    await queue.aput(event)
+        except TurnCancelledError:
+            pass
+        except Exception as e:
+            print(f"Error running request: {e}")
+            traceback.print_exc()
+        finally:
+            queue.close()
+            self._cleanup_agent_instance(request_id)
+            self._request_slot.release()
+
+    async def _anext_turn(self, request: str | Prompt, request_context: dict, request_id: str,
+                          continue_result: dict, debug: DebugLevel = DebugLevel(DebugLevel.OFF)):
+        """Async version of _next_turn"""
+        request_id, request_context = await asyncio.to_thread(
+            self._begin_turn, request, request_context, request_id, continue_result, debug
+        )
+        agent_instance = self._get_agent_for_request(request_id)
+        actor_message = self._turn_input(request, request_context, request_id, continue_result, debug)
+
+        with tracing.span("agent.turn", agent=self.name, request_id=request_id, resume=bool(continue_result)):
+            turn_metrics = metrics.TurnMetrics(self.name)
+            try:
+                async for event in agent_instance.ahandle_prompt_or_resume(actor_message):
+                    turn_metrics.observe(event)
+                    event = self._check_turn_event(event)
+                    if self._is_published(event):
+                        yield event
+
+                    callback = self._event_callback(event)
+                    if callback:
+                        if isinstance(event, _BLOCKING_LOG_EVENTS):
+                            await asyncio.to_thread(self._run_event_callback, callback, event, request_context)
+                        else:
+                            self._run_event_callback(callback, event, request_context)
+            finally:
+                turn_metrics.close()
+
+    async def agrab_final_result(self, request: str, request_context: dict = {}) -> Any:
+        """Async version of grab_final_result"""
+        request_id = (await self.astart_request(request, request_context, debug=self.debug)).request_id
+        event = None
+        async for event in self.aget_events(request_id):
+            pass
+        if isinstance(event, TurnEnd):
+            return event.result
+        return event
+
+
 if os.environ.get("AGENTIC_USE_RAY"):
     AgentProxyClass = RayAgentProxy
 else:
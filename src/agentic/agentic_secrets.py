@@ -1,12 +1,13 @@
 import os
 import sys
 import subprocess
-import sqlite3
 from pathlib import Path
 import base64
 import hashlib
 from typing import Optional
 
+from agentic.utils.kv_store import CachedTable
+
 # from cryptography.fernet import Fernet
 
 from cryptography.hazmat.primitives.ciphers.aead import ChaCha20Poly1305
@@ -86,61 +87,48 @@ def generate_fernet_key():
 
 
 class SecretManager:
+    """Encrypted secrets stored in a SQLite file. Lookups are served from an in-memory cache
+    of the decrypted values, which is refreshed when the file changes (see `CachedTable`)."""
+
     def __init__(self, db_path="agentsdb", cache_dir="~/.agentic", key=None):
         self.db_path = Path(cache_dir).expanduser() / db_path
         self.cache_dir = Path(cache_dir).expanduser()
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.key = key
         self.encrypter = FastEncryptor(key)
+        self._table: Optional[CachedTable] = None
+
+    @property
+    def _store(self) -> CachedTable:
+        # db_path may be changed after construction (the tests do), so follow it
+        if self._table is None or self._table.db_path != Path(self.db_path):
+            if self._table is not None:
+                self._table.close()
+            self._table = CachedTable(self.db_path, "secrets", decode=self.encrypter.decrypt)
+        return self._table
 
     def _get_connection(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(
-            "CREATE TABLE IF NOT EXISTS secrets (name TEXT PRIMARY KEY, value TEXT)"
-        )
-        conn.commit()
-        return conn, cursor
+        conn = self._store.connection()
+        return conn, conn.cursor()
 
     def set_secret(self, name, value):
-        conn, cursor = self._get_connection()
-        try:
-            encrypted_value = self.encrypter.encrypt(value.encode())
-            cursor.execute(
-                "INSERT OR REPLACE INTO secrets (name, value) VALUES (?, ?)",
-                (name, encrypted_value),
-            )
-            conn.commit()
-        finally:
-            conn.close()
+        encrypted_value = self.encrypter.encrypt(value.encode())
+        self._store.set(name, encrypted_value, value)
 
     def get_secret(self, name, default_value: Optional[str] = None):
-        conn, cursor = self._get_connection()
-        try:
-            cursor.execute("SELECT value FROM secrets WHERE name=?", (name,))
-            result = cursor.fetchone()
-            if result:
-                return self.encrypter.decrypt(result[0])
-            elif os.environ.get(name):
-                return os.environ.get(name)
-            elif default_value is not None:
-                return default_value
-        finally:
-            conn.close()
+        found, value = self._store.get(name)
+        if found:
+            return value
+        elif os.environ.get(name):
+            return os.environ.get(name)
+        elif default_value is not None:
+            return default_value
 
     def get_all_secrets(self) -> list[tuple[str, str]]:
-        res = []
-        for secret in self.list_secrets():
-            res.append((secret, self.get_secret(secret)))
-        return res
+        return list(self._store.values().items())
 
     def list_secrets(self):
-        conn, cursor = self._get_connection()
-        try:
-            cursor.execute("SELECT name FROM secrets")
-            return [row[0] for row in cursor.fetchall()]
-        finally:
-            conn.close()
+        return list(self._store.values().keys())
 
     def get_required_secret(self, name) -> str:
         val = self.get_secret(name)
@@ -155,18 +143,14 @@ class SecretManager:
         return val
 
     def delete_secret(self, name):
-        conn, cursor = self._get_connection()
-        try:
-            cursor.execute("DELETE FROM secrets WHERE name=?", (name,))
-            conn.commit()
-        finally:
-            conn.close()
-
-    def copy_secrets_to_env(self):
-        for secret in self.list_secrets():
-            value = self.get_secret(secret)
-            if value:
-                os.environ[secret] = value
+        self._store.delete(name)
+
+    def copy_secrets_to_env(self, overwrite: bool = True):
+        """Copy all secrets into os.environ. With `overwrite=False`, variables that are
+        already set are left alone."""
+        for name, value in self._store.values().items():
+            if value and (overwrite or name not in os.environ):
+                os.environ[name] = value
 
 
 agentic_secrets = SecretManager(key=generate_fernet_key())
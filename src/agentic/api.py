@@ -1,4 +1,6 @@
-from fastapi import FastAPI, APIRouter, Request, Depends, Path as FastAPIPath, HTTPException, Header
+from fastapi import FastAPI, APIRouter, Request, Response, Depends, Path as FastAPIPath, HTTPException, Header, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sse_starlette.sse import EventSourceResponse
 import json
@@ -6,14 +8,17 @@ import os
 import uvicorn
 from typing import List, Optional, Dict, Any, Callable, Annotated
 import asyncio
+import time
 import uuid
+from contextlib import aclosing
 
-from agentic.actor_agents import ProcessRequest, ResumeWithInputRequest
+from agentic import metrics
+from agentic.actor_agents import AsyncLocalAgentProxy, ProcessRequest, ResumeWithInputRequest
 from agentic.common import Agent
 from agentic.events import AgentDescriptor, DebugLevel
-from agentic.utils.json import make_json_serializable
 from agentic.swarm.types import ThreadContext
-from agentic.db.db_manager import DatabaseManager
+from agentic.db.db_manager import get_db_manager
+from agentic.request_executor import RequestRejected
 
 from agentic.events import (
     ToolResult,
@@ -23,6 +28,76 @@ from agentic.events import (
     FinishCompletion,
 )
 
+def _split(value: Optional[str]) -> Optional[list[str]]:
+    """Parse a comma separated query parameter"""
+    if value is None:
+        return None
+    return [part.strip() for part in value.split(",") if part.strip()]
+
+
+def _ndjson_response(rows) -> StreamingResponse:
+    """Stream rows as newline delimited JSON. The first page is read up front so bad
+    arguments are reported as a 400 rather than a broken stream."""
+    try:
+        first = next(rows, None)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    def render():
+        if first is None:
+            return
+        yield json.dumps(jsonable_encoder(first)) + "\n"
+        for row in rows:
+            yield json.dumps(jsonable_encoder(row)) + "\n"
+
+    return StreamingResponse(render(), media_type="application/x-ndjson")
+
+
+class MetricsMiddleware:
+    """Counts and times HTTP requests by agent and endpoint (the name of the route's handler).
+    Streamed responses are timed until the last chunk is sent."""
+
+    def __init__(self, app, agent_names: dict):
+        self.app = app
+        # Only registered agent names are used as labels, so unknown paths can't add series
+        self.agent_names = agent_names
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500
+        finished = False
+
+        def record():
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            endpoint = scope.get("endpoint")
+            endpoint = getattr(endpoint, "__name__", "unmatched") if endpoint else "unmatched"
+            agent = scope.get("path_params", {}).get("agent_name")
+            agent = agent if agent in self.agent_names else ""
+            metrics.HTTP_REQUESTS.inc(agent, endpoint, scope["method"], str(status))
+            metrics.HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, agent, endpoint)
+
+        async def send_and_record(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        metrics.HTTP_REQUESTS_ACTIVE.inc()
+        try:
+            await self.app(scope, receive, send_and_record)
+        finally:
+            metrics.HTTP_REQUESTS_ACTIVE.dec()
+            record()
+
+
 class AgentAPIServer:
     """
     A class that manages a FastAPI server for agent API endpoints.
@@ -83,7 +158,9 @@ class AgentAPIServer:
             allow_credentials=True,
             allow_methods=["*"],
             allow_headers=["*"],
+            expose_headers=["X-Next-Cursor"],
         )
+        self.app.add_middleware(MetricsMiddleware, agent_names=self.agent_registry)
         
         # Create router for agent endpoints
         agent_router = APIRouter()
@@ -122,6 +199,34 @@ class AgentAPIServer:
             """Discovery endpoint that lists all available agents"""
             return [f"/{name}" for name in self.agent_registry.keys()]
         
+        @self.app.get("/_usage")
+        async def get_usage(
+            group_by: str = "agent_id",
+            days: Optional[int] = 7,
+            thread_id: Optional[str] = None,
+            agent_id: Optional[str] = None,
+            user_id: Optional[str] = None,
+            model: Optional[str] = None,
+        ):
+            """LLM usage and cost summed over threads. group_by is a comma separated list of
+            thread_id, agent_id, user_id, model and day. days=0 covers all time."""
+            try:
+                return get_db_manager().get_usage(
+                    group_by=[name.strip() for name in group_by.split(",") if name.strip()],
+                    days=days,
+                    thread_id=thread_id,
+                    agent_id=agent_id,
+                    user_id=user_id,
+                    model=model,
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+
+        @self.app.get("/metrics")
+        async def get_metrics():
+            """Operational metrics in the Prometheus text format"""
+            return Response(content=metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
         @self.app.post("/login")
         async def login():
             """Just generates a random token to represent the current user"""
@@ -162,7 +267,7 @@ class AgentAPIServer:
                 raise HTTPException(status_code=400, detail="No authorization code provided in OAuth callback")
 
             # Get the thread context from the database
-            db_manager = DatabaseManager()
+            db_manager = get_db_manager()
             thread = db_manager.get_thread(thread_id)
             if not thread:
                 raise HTTPException(status_code=404, detail=f"No thread found with ID {thread_id}")
@@ -209,12 +314,19 @@ class AgentAPIServer:
         ):
             """Process a new request"""
             ctx = {"user": user} if user else {}
-            req_event = agent.start_request(
+            kwargs = dict(
                 request=request.prompt,
                 request_context=ctx,
                 thread_id=request.thread_id,
                 debug=DebugLevel(request.debug) if request.debug else self.debug
             )
+            if isinstance(agent, AsyncLocalAgentProxy):
+                # Runs as a task on the server's event loop
+                return await agent.astart_request(**kwargs)
+            try:
+                req_event = agent.start_request(**kwargs)
+            except RequestRejected as e:
+                raise HTTPException(status_code=429, detail=str(e))
 
             return req_event
                 
@@ -225,12 +337,18 @@ class AgentAPIServer:
             agent: Annotated[Agent, Depends(get_agent)],
         ):
             """Resume an existing request"""
-            return agent.start_request(
+            kwargs = dict(
                 request=json.dumps(request.continue_result),
                 continue_result=request.continue_result,
                 thread_id=request.thread_id,
                 debug=DebugLevel(request.debug) if request.debug else self.debug
             )
+            if isinstance(agent, AsyncLocalAgentProxy):
+                return await agent.astart_request(**kwargs)
+            try:
+                return agent.start_request(**kwargs)
+            except RequestRejected as e:
+                raise HTTPException(status_code=429, detail=str(e))
 
         # Reset endpoint. Need to use this for now to create a new session
         @agent_router.post("/{agent_name}/reset")
@@ -251,37 +369,23 @@ class AgentAPIServer:
             """Get events for a request"""
             if not stream:
                 # Non-streaming response
+                # Each event is encoded once, so the list is joined rather than re-serialized
                 results = []
-                for event in agent.get_events(request_id):
+                async for event in agent.aget_events(request_id):
                     self.debug_event(event)
-                    event_data = {
-                        "type": event.type,
-                        "agent": event.agent,
-                        "depth": event.depth,
-                        "payload": make_json_serializable(event.payload)
-                    }
-                    if event.type == "tool_result":
-                        event_data["result"] = make_json_serializable(event.result)
-                    results.append(event_data)
-                return results
+                    results.append(event.encode())
+                return Response(content=b"[" + b",".join(results) + b"]", media_type="application/json")
             else:
-                # Streaming response
+                # Streaming response. Waiting for events doesn't block the event loop, and if
+                # the client disconnects the generator is closed, which cancels the channel.
                 async def event_generator():
-                    for event in agent.get_events(request_id):
-                        self.debug_event(event)
-                        event_data = {
-                            "type": event.type,
-                            "agent": event.agent,
-                            "depth": event.depth,
-                            "payload": make_json_serializable(event.payload)
-                        }
-                        if event.type == "tool_result":
-                            event_data["result"] = make_json_serializable(event.result)
-                        yield {
-                            "data": json.dumps(event_data),
-                            "event": "message"
-                        }
-                        await asyncio.sleep(0.01)
+                    async with aclosing(agent.aget_events(request_id)) as events:
+                        async for event in events:
+                            self.debug_event(event)
+                            yield {
+                                "data": event.encode().decode(),
+                                "event": "message"
+                            }
                 return EventSourceResponse(event_generator())
         
         # Stream request endpoint
@@ -299,22 +403,55 @@ class AgentAPIServer:
         # Get threads endpoint
         @agent_router.get("/{agent_name}/threads")
         async def get_threads(
+            response: Response,
             agent: Annotated[Agent, Depends(get_agent)],
-            current_user: Optional[Any] = Depends(self.get_current_user)
+            current_user: Optional[Any] = Depends(self.get_current_user),
+            limit: Optional[int] = Query(None, ge=1),
+            cursor: Optional[str] = None,
+            fields: Optional[str] = None,
+            format: str = "json",
         ):
-            """Get all threads for this agent"""
-            threads = agent.get_threads(user_id=current_user)
-            return [thread.model_dump() for thread in threads]
+            """Get the threads for this agent, most recently updated first. Pass `limit` to page
+            through them: the cursor for the next page is returned in the X-Next-Cursor header.
+            `format=ndjson` streams every thread instead."""
+            db_manager = agent.get_db_manager()
+            query = dict(agent_id=agent.name, user_id=current_user, cursor=cursor, fields=_split(fields))
+            if format == "ndjson":
+                return _ndjson_response(db_manager.stream_threads(**query))
+            try:
+                threads, next_cursor = db_manager.query_threads(limit=limit, **query)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return threads
         
         # Get thread logs endpoint
         @agent_router.get("/{agent_name}/threads/{thread_id}/logs")
         async def get_thread_logs(
             thread_id: str, 
+            response: Response,
             agent: Annotated[Agent, Depends(get_agent)],
+            limit: Optional[int] = Query(None, ge=1),
+            cursor: Optional[str] = None,
+            event_names: Optional[str] = None,
+            fields: Optional[str] = None,
+            format: str = "json",
         ):
-            """Get logs for a specific thread"""
-            thread_logs = agent.get_thread_logs(thread_id)
-            return [thread_log.model_dump() for thread_log in thread_logs]
+            """Get logs for a specific thread, oldest first. Pass `limit` to page through them,
+            `event_names` to filter by event type, and `fields` to pick columns (leave out
+            "event" to skip the payloads). `format=ndjson` streams every log instead."""
+            db_manager = agent.get_db_manager()
+            query = dict(cursor=cursor, event_names=_split(event_names), fields=_split(fields))
+            if format == "ndjson":
+                return _ndjson_response(db_manager.stream_thread_logs(thread_id, **query))
+            try:
+                thread_logs, next_cursor = db_manager.query_thread_logs(thread_id, limit=limit, **query)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if next_cursor:
+                response.headers["X-Next-Cursor"] = next_cursor
+            return thread_logs
         
         # Webhook endpoint
         @agent_router.post("/{agent_name}/webhook/{thread_id}/{callback_name}")
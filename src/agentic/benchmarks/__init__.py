@@ -0,0 +1 @@
+"""Benchmarks for the agent runtime. Each module can be run with `python -m`."""
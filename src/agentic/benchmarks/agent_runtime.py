@@ -0,0 +1,403 @@
+"""
+End-to-end benchmarks of the agent runtime, driven by the mock model so they need no
+network or API keys. Each scenario runs turns through real agents, with thread logging
+on, and reports:
+
+    turn latency       p50/p95/p99 from starting a request to its last event
+    overhead per step  turn time minus the time the mock model and tools spent simulating
+                       the provider, divided by the number of completions in the turn
+    events/sec         events delivered to the caller per second of turn time
+    db rows/sec        thread log rows written per second
+    peak RSS           of the benchmark process, after the scenario
+
+    python -m agentic.benchmarks.agent_runtime
+    python -m agentic.benchmarks.agent_runtime --scenarios chat,tool_loop --turns 50 --output base.json
+    python -m agentic.benchmarks.agent_runtime --compare base.json
+
+Scenarios: chat, tool_loop, parallel_tools, handoff, resume and rag. `rag` searches an
+existing knowledge index (--rag-index) with RAGTool, so it needs Weaviate and the embedding
+model available locally, and it only runs when it's asked for.
+
+By default the mock model streams instantly, so the turn time is all framework overhead.
+Pass --tokens-per-second and --ttft to see the runtime under provider-like pacing.
+With --compare, the exit status is 1 if a scenario got slower than --threshold allows.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, UTC
+from typing import Any, Callable, Optional
+from uuid import uuid4
+
+try:
+    import resource
+except ImportError:
+    # Windows
+    resource = None
+
+from agentic.common import Agent, AsyncAgent
+from agentic.custom_models.mock_provider import MockStep
+from agentic.db.db_manager import get_db_manager
+from agentic.db.event_sink import flush_all_event_sinks, get_event_sink
+from agentic.models import mock_provider
+
+# The metrics that --compare checks, where bigger is worse
+COMPARED_METRICS = ("turn_p50_ms", "turn_p95_ms", "overhead_per_step_ms")
+
+
+@dataclass
+class BenchmarkConfig:
+    turns: int = 20
+    warmup: int = 2
+    tokens: int = 200
+    tokens_per_second: float = 0.0
+    time_to_first_token: float = 0.0
+    tool_steps: int = 20
+    parallel_tools: int = 8
+    tool_delay: float = 0.02
+    history_turns: int = 500
+    rag_index: str = "knowledge_base"
+    use_async: bool = False
+    db_path: str = ""
+
+
+@dataclass
+class Workload:
+    """What a scenario runs on each turn"""
+    make_agent: Callable[[], Any]
+    prompt: str
+    # LLM completions per turn, across every agent involved
+    steps: int
+    # Simulated tool time per turn, which isn't framework overhead
+    tool_wait: float = 0.0
+    # Every turn resumes this thread on a newly created agent
+    resume_thread_id: Optional[str] = None
+    cleanup: list[Callable[[], None]] = field(default_factory=list)
+
+
+def _reply(tokens: int) -> str:
+    return " ".join(f"word{i}" for i in range(tokens))
+
+
+def _agent(config: BenchmarkConfig, name: str, **kwargs):
+    agent_class = AsyncAgent if config.use_async else Agent
+    return agent_class(
+        name=name,
+        model=f"mock/{name.lower().replace(' ', '_')}",
+        db_path=config.db_path,
+        **kwargs,
+    )
+
+
+def chat(config: BenchmarkConfig) -> Workload:
+    """Single-turn chat: one streamed reply"""
+    mock_provider.set_script([MockStep(content=_reply(config.tokens))], model="mock/bench_chat")
+    agent = _agent(config, "Bench Chat")
+    return Workload(lambda: agent, "Tell me something", steps=1)
+
+
+def benchmark_step(n: int) -> str:
+    """Do one step of the task"""
+    return f"step {n} done"
+
+
+def tool_loop(config: BenchmarkConfig) -> Workload:
+    """The model calls a tool `tool_steps` times in a row before answering"""
+    # The agent stops a turn after 25 tool calls
+    steps = min(config.tool_steps, 24)
+    script = [MockStep(tool_calls=[("benchmark_step", {"n": i})]) for i in range(steps)]
+    mock_provider.set_script(script + [MockStep(content=_reply(config.tokens))], model="mock/bench_tools")
+    agent = _agent(config, "Bench Tools", tools=[benchmark_step])
+    return Workload(lambda: agent, "Work through the task", steps=steps + 1)
+
+
+def parallel_tools(config: BenchmarkConfig) -> Workload:
+    """One completion asks for `parallel_tools` slow tool calls at once"""
+    def benchmark_fetch(key: str) -> str:
+        """Fetch a value from a slow service"""
+        time.sleep(config.tool_delay)
+        return f"value for {key}"
+
+    calls = [("benchmark_fetch", {"key": str(i)}) for i in range(config.parallel_tools)]
+    mock_provider.set_script(
+        [MockStep(tool_calls=calls), MockStep(content=_reply(config.tokens))], model="mock/bench_parallel"
+    )
+    agent = _agent(
+        config, "Bench Parallel", tools=[benchmark_fetch], max_tool_concurrency=config.parallel_tools
+    )
+    return Workload(lambda: agent, "Fetch everything", steps=2, tool_wait=config.tool_delay)
+
+
+def handoff(config: BenchmarkConfig) -> Workload:
+    """The model delegates to a sub-agent and then answers with its result"""
+    mock_provider.set_script([MockStep(content=_reply(config.tokens // 2))], model="mock/bench_researcher")
+    mock_provider.set_script(
+        [
+            MockStep(tool_calls=[("call_bench_researcher", {"message": "Look this up"})]),
+            MockStep(content=_reply(config.tokens)),
+        ],
+        model="mock/bench_lead",
+    )
+    researcher = _agent(config, "Bench Researcher")
+    agent = _agent(config, "Bench Lead", tools=[researcher])
+    return Workload(lambda: agent, "Research this", steps=3)
+
+
+def resume(config: BenchmarkConfig) -> Workload:
+    """Every turn resumes a thread with `history_turns` earlier turns, on a new agent"""
+    mock_provider.set_script([MockStep(content=_reply(config.tokens))], model="mock/bench_resume")
+    db_manager = get_db_manager(config.db_path)
+    thread_id = db_manager.create_thread(
+        agent_id="Bench Resume", user_id="default", initial_prompt="question 0"
+    ).id
+
+    start = datetime.now(UTC) - timedelta(hours=1)
+    reply = _reply(config.tokens)
+    rows = []
+    for turn in range(config.history_turns):
+        for offset, (event_name, event) in enumerate([
+            ("prompt_started", {"content": f"question {turn}"}),
+            ("chat_output", {"content": reply, "role": "assistant"}),
+            ("turn_end", {"messages": [{"role": "assistant", "content": reply}]}),
+        ]):
+            rows.append({
+                "id": str(uuid4()),
+                "thread_id": thread_id,
+                "agent_id": "Bench Resume",
+                "user_id": "default",
+                "role": "system",
+                "depth": 0,
+                "created_at": start + timedelta(milliseconds=turn * 3 + offset),
+                "event_name": event_name,
+                "event": event,
+            })
+    db_manager.log_events(rows)
+
+    return Workload(
+        lambda: _agent(config, "Bench Resume"), "One more question", steps=1, resume_thread_id=thread_id
+    )
+
+
+def rag(config: BenchmarkConfig) -> Workload:
+    """The model searches a knowledge index and answers from the results"""
+    from agentic.tools.rag_tool import RAGTool
+
+    mock_provider.set_script(
+        [
+            MockStep(tool_calls=[("search_knowledge_index", {"query": "how does the agent runtime work", "limit": 3})]),
+            MockStep(content=_reply(config.tokens)),
+        ],
+        model="mock/bench_rag",
+    )
+    agent = _agent(config, "Bench RAG", tools=[RAGTool(default_index=config.rag_index)])
+    return Workload(lambda: agent, "Search the docs", steps=2)
+
+
+SCENARIOS: dict[str, Callable[[BenchmarkConfig], Workload]] = {
+    "chat": chat,
+    "tool_loop": tool_loop,
+    "parallel_tools": parallel_tools,
+    "handoff": handoff,
+    "resume": resume,
+    "rag": rag,
+}
+DEFAULT_SCENARIOS = ["chat", "tool_loop", "parallel_tools", "handoff", "resume"]
+
+
+def _run_turn(agent, prompt: str, thread_id: Optional[str]) -> int:
+    request_id = agent.start_request(prompt, thread_id=thread_id).request_id
+    return sum(1 for _ in agent.get_events(request_id))
+
+
+async def _arun_turn(agent, prompt: str, thread_id: Optional[str]) -> int:
+    request_id = (await agent.astart_request(prompt, thread_id=thread_id)).request_id
+    count = 0
+    async for _ in agent.aget_events(request_id):
+        count += 1
+    return count
+
+
+async def _run_turns(workload: Workload, config: BenchmarkConfig) -> list[tuple[float, float, int]]:
+    """Returns (seconds, simulated seconds, events) for each turn"""
+    results = []
+    for _ in range(config.warmup + config.turns):
+        agent = workload.make_agent()
+        # "NEW" starts every turn on a fresh thread, so histories don't pile up
+        thread_id = workload.resume_thread_id or "NEW"
+        simulated = mock_provider.simulated_seconds
+        start = time.perf_counter()
+        if config.use_async:
+            events = await _arun_turn(agent, workload.prompt, thread_id)
+        else:
+            events = await asyncio.to_thread(_run_turn, agent, workload.prompt, thread_id)
+        elapsed = time.perf_counter() - start
+        results.append((elapsed, mock_provider.simulated_seconds - simulated + workload.tool_wait, events))
+    return results[config.warmup:]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes and macOS bytes
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_scenario(name: str, config: BenchmarkConfig) -> dict:
+    workload = SCENARIOS[name](config)
+    sink = get_event_sink(get_db_manager(config.db_path))
+    flush_all_event_sinks()
+    rows_before = sink.stats.rows_written
+
+    start = time.perf_counter()
+    turns = asyncio.run(_run_turns(workload, config))
+    flush_all_event_sinks()
+    wall = time.perf_counter() - start
+
+    latencies = [t[0] for t in turns]
+    overheads = [max(0.0, elapsed - simulated) / workload.steps for elapsed, simulated, _ in turns]
+    return {
+        "turns": len(turns),
+        "steps_per_turn": workload.steps,
+        "turn_p50_ms": statistics.median(latencies) * 1000,
+        "turn_p95_ms": percentile(latencies, 95) * 1000,
+        "turn_p99_ms": percentile(latencies, 99) * 1000,
+        "overhead_per_step_ms": statistics.median(overheads) * 1000,
+        "events_per_second": sum(t[2] for t in turns) / sum(latencies),
+        "db_rows_per_second": (sink.stats.rows_written - rows_before) / wall,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scenarios: Optional[list[str]] = None, config: Optional[BenchmarkConfig] = None) -> dict:
+    config = config or BenchmarkConfig()
+    scenarios = scenarios or DEFAULT_SCENARIOS
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if not config.db_path:
+            config.db_path = os.path.join(tmp, "benchmark_threads.db")
+        mock_provider.set_timing(config.tokens_per_second, config.time_to_first_token)
+        try:
+            results = {name: run_scenario(name, config) for name in scenarios}
+        finally:
+            mock_provider.set_timing()
+            mock_provider.clear_scripts()
+            flush_all_event_sinks()
+
+    return {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(UTC).isoformat(),
+            "config": asdict(config) | {"db_path": None},
+        },
+        "scenarios": results,
+    }
+
+
+def compare(baseline: dict, current: dict, threshold: float = 0.1) -> tuple[list[str], bool]:
+    """Report lines for each scenario metric in both results, and whether any metric got
+    more than `threshold` (a fraction) worse"""
+    lines, regressed = [], False
+    for name, metrics in current["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        for metric in COMPARED_METRICS:
+            old, new = before.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressed = True
+            lines.append(f"{name:>15} {metric:>22}: {old:10.3f} -> {new:10.3f} ({change:+.1%}){flag}")
+    return lines, regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    defaults = BenchmarkConfig()
+    parser.add_argument("--scenarios", default=",".join(DEFAULT_SCENARIOS),
+                        help=f"Comma separated, from: {', '.join(SCENARIOS)}")
+    parser.add_argument("--turns", type=int, default=defaults.turns)
+    parser.add_argument("--warmup", type=int, default=defaults.warmup)
+    parser.add_argument("--tokens", type=int, default=defaults.tokens, help="Length of each reply")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--ttft", type=float, default=defaults.time_to_first_token, help="Time to first token")
+    parser.add_argument("--tool-steps", type=int, default=defaults.tool_steps)
+    parser.add_argument("--parallel-tools", type=int, default=defaults.parallel_tools)
+    parser.add_argument("--tool-delay", type=float, default=defaults.tool_delay)
+    parser.add_argument("--history-turns", type=int, default=defaults.history_turns)
+    parser.add_argument("--rag-index", default=defaults.rag_index)
+    parser.add_argument("--async", dest="use_async", action="store_true", help="Run the turns with AsyncAgent")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    parser.add_argument("--compare", help="A results file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Fraction a compared metric may get worse before it's a regression")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    config = BenchmarkConfig(
+        turns=args.turns,
+        warmup=args.warmup,
+        tokens=args.tokens,
+        tokens_per_second=args.tokens_per_second,
+        time_to_first_token=args.ttft,
+        tool_steps=args.tool_steps,
+        parallel_tools=args.parallel_tools,
+        tool_delay=args.tool_delay,
+        history_turns=args.history_turns,
+        rag_index=args.rag_index,
+        use_async=args.use_async,
+    )
+    results = run(args.scenarios.split(","), config)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for name, metrics in results["scenarios"].items():
+            print(name)
+            for key, value in metrics.items():
+                print(f"{key:>22}: {value:.3f}" if isinstance(value, float) else f"{key:>22}: {value}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            lines, regressed = compare(json.load(f), results, args.threshold)
+        print("\n".join(lines))
+        if regressed:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Measures the per-token cost of publishing a streamed reply: building each `ChatOutput`,
+encoding it for the SSE stream and serializing it for the thread log.
+
+    python -m agentic.benchmarks.event_encoding --tokens 10000
+
+The "legacy" numbers repeat the work the way it was done before events cached their
+encoding: a validated pydantic construction, then make_json_serializable + json.dumps
+for the stream and a second make_json_serializable pass for the database.
+"""
+import argparse
+import json
+import time
+
+from agentic.events import ChatOutput, Output
+from agentic.utils.json import make_json_serializable
+
+
+def _delta(i: int) -> dict:
+    # The shape of a streamed litellm delta, as the agent publishes it
+    return {
+        "content": f"token{i} ",
+        "role": "assistant",
+        "sender": "Benchmark Agent",
+        "function_call": None,
+        "tool_calls": None,
+        "audio": None,
+        "refusal": None,
+        "provider_specific_fields": None,
+    }
+
+
+def _legacy(deltas: list[dict]) -> float:
+    start = time.perf_counter()
+    for delta in deltas:
+        event = Output("Benchmark Agent", delta, 0)
+        event.type = "chat_output"
+        json.dumps({
+            "type": event.type,
+            "agent": event.agent,
+            "depth": event.depth,
+            "payload": make_json_serializable(event.payload),
+        })
+        make_json_serializable(event.payload.copy())
+    return time.perf_counter() - start
+
+
+def _current(deltas: list[dict]) -> float:
+    start = time.perf_counter()
+    for delta in deltas:
+        event = ChatOutput("Benchmark Agent", delta, 0)
+        event.encode()
+        # What the event sink keeps for the thread log
+        event.json_payload().copy()
+    return time.perf_counter() - start
+
+
+def run(tokens: int = 10_000, repeat: int = 5) -> dict:
+    deltas = [_delta(i) for i in range(tokens)]
+    legacy = min(_legacy(deltas) for _ in range(repeat))
+    current = min(_current(deltas) for _ in range(repeat))
+    return {
+        "tokens": tokens,
+        "legacy_events_per_second": tokens / legacy,
+        "events_per_second": tokens / current,
+        "legacy_us_per_event": legacy / tokens * 1e6,
+        "us_per_event": current / tokens * 1e6,
+        "speedup": legacy / current,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tokens", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5, help="Report the best of this many runs")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.tokens, args.repeat)
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for key, value in results.items():
+            print(f"{key:>26}: {value:.3f}" if isinstance(value, float) else f"{key:>26}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""
+Measures how many concurrent `/getevents?stream=true` clients one AgentAPIServer worker
+can serve.
+
+Every request streams `--events` chat events spaced `--interval` seconds apart, so a
+single stream takes about events * interval seconds. If the server never blocks its event
+loop, N concurrent streams should finish in about the same time as one. `--slow-clients`
+of the streams wait `--slow-interval` seconds between events, like an agent stuck on a
+slow provider; the other streams shouldn't be held up by them.
+
+    python -m agentic.benchmarks.sse_streaming --clients 300
+
+Pass `--blocking` to consume events the way the server used to (a blocking queue read
+inside the async generator, plus a fixed sleep per event) for comparison.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import socket
+import statistics
+import threading
+import time
+import uuid
+
+import httpx
+import uvicorn
+
+from agentic.api import AgentAPIServer
+from agentic.event_channel import EventChannel
+from agentic.events import ChatOutput, TurnEnd, StartRequestResponse
+
+
+class SlowStreamAgent:
+    """Stands in for an agent proxy: each request streams events from its own thread, like
+    an agent waiting on a slow LLM provider."""
+
+    def __init__(self, events: int, blocking: bool = False):
+        self.name = "Slow Stream Agent"
+        self.safe_name = "slow_stream_agent"
+        self.agent_config = {}
+        self.events = events
+        self.blocking = blocking
+        self.request_queues: dict[str, EventChannel] = {}
+
+    def start_request(self, request: str, **kwargs) -> StartRequestResponse:
+        request_id = str(uuid.uuid4())
+        channel = EventChannel()
+        self.request_queues[request_id] = channel
+        # The prompt is the delay between events
+        interval = float(request)
+
+        def produce():
+            for i in range(self.events):
+                time.sleep(interval)
+                channel.put(ChatOutput(self.name, {"content": f"token {i} "}))
+            channel.put(TurnEnd(self.name, []))
+            channel.close()
+
+        threading.Thread(target=produce, daemon=True).start()
+        return StartRequestResponse(request_id=request_id)
+
+    async def aget_events(self, request_id: str):
+        channel = self.request_queues.pop(request_id)
+        try:
+            if self.blocking:
+                for event in channel:
+                    yield event
+                    await asyncio.sleep(0.01)
+            else:
+                async for event in channel:
+                    yield event
+        finally:
+            channel.cancel()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _request(port: int, method: str, path: str, body: bytes = b"") -> tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+    # A bare HTTP/1.1 client. httpx's connection pool becomes the bottleneck long before
+    # the server does with hundreds of concurrent streams.
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: close\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    await writer.drain()
+    return reader, writer
+
+
+async def _stream_one(port: int, interval: float) -> tuple[float, float, int]:
+    start = time.perf_counter()
+    reader, writer = await _request(
+        port, "POST", "/slow_stream_agent/process", json.dumps({"prompt": str(interval)}).encode()
+    )
+    response = await reader.read()
+    writer.close()
+    request_id = json.loads(response.split(b"\r\n\r\n", 1)[1])["request_id"]
+
+    first_event = None
+    count = 0
+    reader, writer = await _request(port, "GET", f"/slow_stream_agent/getevents?request_id={request_id}&stream=true")
+    async for line in reader:
+        if line.startswith(b"data:"):
+            if first_event is None:
+                first_event = time.perf_counter() - start
+            count += 1
+    writer.close()
+    return first_event or 0.0, time.perf_counter() - start, count
+
+
+async def _run_clients(port: int, intervals: list[float]) -> list[tuple[float, float, int]]:
+    return await asyncio.gather(*[_stream_one(port, interval) for interval in intervals])
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def _serve(port: int, events: int, blocking: bool, backlog: int):
+    agent = SlowStreamAgent(events=events, blocking=blocking)
+    server = AgentAPIServer([agent], port=port)
+    uvicorn.run(server.app, host="127.0.0.1", port=port, log_level="warning", backlog=backlog, timeout_keep_alive=60)
+
+
+def _wait_for_server(port: int, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/_discovery")
+            return
+        except httpx.TransportError:
+            time.sleep(0.1)
+    raise TimeoutError("Benchmark server did not start")
+
+
+def run(
+    clients: int = 200,
+    events: int = 20,
+    interval: float = 0.05,
+    slow_clients: int = 0,
+    slow_interval: float = 0.5,
+    blocking: bool = False,
+) -> dict:
+    # The server runs in its own process so the load generator doesn't compete with it for the GIL
+    port = _free_port()
+    server = multiprocessing.get_context("spawn").Process(
+        target=_serve, args=(port, events, blocking, clients * 2), daemon=True
+    )
+    server.start()
+    try:
+        _wait_for_server(port)
+        start = time.perf_counter()
+        intervals = [slow_interval] * slow_clients + [interval] * (clients - slow_clients)
+        results = asyncio.run(_run_clients(port, intervals))
+        wall = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.join(10)
+
+    # Latency stats only cover the normal streams
+    fast = results[slow_clients:] or results
+    first_events = [r[0] for r in fast]
+    durations = [r[1] for r in fast]
+    total_events = sum(r[2] for r in results)
+    return {
+        "clients": clients,
+        "slow_clients": slow_clients,
+        "blocking": blocking,
+        "events_per_stream": events + 1,
+        "single_stream_seconds": events * interval,
+        "wall_seconds": wall,
+        "events_per_second": total_events / wall,
+        "incomplete_streams": sum(1 for r in results if r[2] != events + 1),
+        "first_event_p50": statistics.median(first_events),
+        "first_event_p95": _percentile(first_events, 95),
+        "stream_p50": statistics.median(durations),
+        "stream_p95": _percentile(durations, 95),
+        "stream_max": max(durations),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--events", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.05)
+    parser.add_argument("--slow-clients", type=int, default=0)
+    parser.add_argument("--slow-interval", type=float, default=0.5)
+    parser.add_argument("--blocking", action="store_true", help="Emulate the old blocking event consumer")
+    parser.add_argument("--json", action="store_true", help="Print the results as JSON")
+    args = parser.parse_args()
+
+    results = run(
+        args.clients, args.events, args.interval, args.slow_clients, args.slow_interval, args.blocking
+    )
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for key, value in results.items():
+            print(f"{key:>22}: {value:.3f}" if isinstance(value, float) else f"{key:>22}: {value}")
+
+
+if __name__ == "__main__":
+    main()
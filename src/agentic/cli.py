@@ -2,6 +2,7 @@ import typer
 import os
 import requests
 import inspect
+import glob
 from rich.markdown import Markdown
 from rich.console import Console
 from typing import Optional, List
@@ -239,6 +240,7 @@ dashboard_app = typer.Typer(name="dashboard", help="Manage the dashboard UI")
 index_app = typer.Typer(name="index", help="Manage vector indexes")
 index_document_app = typer.Typer(name="document", help="Manage documents in indexes")
 models_app = typer.Typer(name="models", help="Work with LLM models")
+threads_app = typer.Typer(name="threads", help="Manage agent threads")
 
 # Register command groups
 app.add_typer(secrets_app)
@@ -246,6 +248,7 @@ app.add_typer(dashboard_app)
 app.add_typer(index_app)
 index_app.add_typer(index_document_app)
 app.add_typer(models_app)
+app.add_typer(threads_app)
 
 # Secrets commands
 @secrets_app.command("set")
@@ -275,6 +278,82 @@ def secrets_delete(name: str):
     """Delete a secret"""
     typer.echo(secrets.delete_secret(name))
 
+# Threads commands
+@threads_app.command("rebuild-history")
+def threads_rebuild_history(
+    thread_id: Optional[str] = typer.Option(None, "--thread-id", help="Only rebuild this thread"),
+    db_path: str = typer.Option("agent_threads.db", "--db-path", help="Thread database file"),
+):
+    """Rebuild the chat history snapshots used to resume threads"""
+    from agentic.db.db_manager import get_db_manager
+    from agentic.thread_manager import rebuild_history_snapshots
+
+    count = rebuild_history_snapshots(get_db_manager(db_path), thread_id)
+    typer.echo(f"Rebuilt history snapshots for {count} thread(s)")
+
+@threads_app.command("check-history")
+def threads_check_history(
+    thread_id: Optional[str] = typer.Option(None, "--thread-id", help="Only check this thread"),
+    db_path: str = typer.Option("agent_threads.db", "--db-path", help="Thread database file"),
+):
+    """Check that the chat history snapshots match a full reconstruction from the thread logs"""
+    from agentic.db.db_manager import get_db_manager
+    from agentic.thread_manager import check_history_snapshot
+
+    db_manager = get_db_manager(db_path)
+    thread_ids = [thread_id] if thread_id else db_manager.get_all_thread_ids()
+    mismatched = [tid for tid in thread_ids if not check_history_snapshot(db_manager, tid)]
+    for tid in mismatched:
+        typer.echo(f"Mismatch: {tid}")
+    typer.echo(f"Checked {len(thread_ids)} thread(s), {len(mismatched)} mismatched")
+    if mismatched:
+        raise typer.Exit(1)
+
+@threads_app.command("usage")
+def threads_usage(
+    by: str = typer.Option("agent_id", "--by", help="Comma separated: thread_id, agent_id, user_id, model, day"),
+    days: int = typer.Option(7, "--days", help="Only the last N days (0 for all time)"),
+    agent_id: Optional[str] = typer.Option(None, "--agent-id", help="Only this agent"),
+    user_id: Optional[str] = typer.Option(None, "--user-id", help="Only this user"),
+    model: Optional[str] = typer.Option(None, "--model", help="Only this model"),
+    db_path: str = typer.Option("agent_threads.db", "--db-path", help="Thread database file"),
+):
+    """Show LLM usage and cost summed over threads"""
+    from rich.table import Table
+    from agentic.db.db_manager import get_db_manager, USAGE_FIELDS
+
+    group_by = [name.strip() for name in by.split(",") if name.strip()]
+    try:
+        rows = get_db_manager(db_path).get_usage(
+            group_by=group_by, days=days, agent_id=agent_id, user_id=user_id, model=model,
+        )
+    except ValueError as e:
+        typer.echo(str(e))
+        raise typer.Exit(1)
+
+    table = Table(*group_by, *USAGE_FIELDS)
+    for row in rows:
+        table.add_row(
+            *[str(row[name]) for name in group_by],
+            str(row["input_tokens"]),
+            str(row["output_tokens"]),
+            f"${row['cost']:.4f}",
+            f"{row['elapsed_time']:.1f}s",
+            str(row["call_count"]),
+        )
+    Console().print(table)
+
+@threads_app.command("backfill-usage")
+def threads_backfill_usage(
+    thread_id: Optional[str] = typer.Option(None, "--thread-id", help="Only rebuild this thread"),
+    db_path: str = typer.Option("agent_threads.db", "--db-path", help="Thread database file"),
+):
+    """Rebuild the usage rollups from the thread logs"""
+    from agentic.db.db_manager import get_db_manager
+
+    count = get_db_manager(db_path).backfill_usage_rollups(thread_id)
+    typer.echo(f"Counted {count} completion(s)")
+
 # Dashboard commands
 @dashboard_app.callback()
 def dashboard_callback():
@@ -352,24 +431,20 @@ def run(
 def index_list():
     """List all available Weaviate indexes"""
     from agentic.utils.rag_helper import (
-        init_weaviate,
+        rag_resources,
         list_collections,
     )
 
     console = Console()
-    client = None
     try:
         with Status("[bold green]Initializing Weaviate...", console=console):
-            client = init_weaviate()
+            client = rag_resources.get_client()
         indexes = list_collections(client)
         console.print(Markdown(f"## Available Indexes ({len(indexes)})"))
         for idx in indexes:
             console.print(f"- {idx}\n")
     except Exception as e:
         console.print(f"[bold red]Error: {str(e)}[/bold red]")
-    finally:
-        if client:
-            client.close()
 
 @index_app.command("rename")
 def index_rename(
@@ -380,14 +455,13 @@ def index_rename(
 ):
     """Rename a Weaviate index/collection"""
     from agentic.utils.rag_helper import (
-        init_weaviate,
+        rag_resources,
         rename_collection,
     )
     console = Console()
-    client = None
     try:
         with Status("[bold green]Initializing Weaviate...", console=console):
-            client = init_weaviate()
+            client = rag_resources.get_client()
         
         # Check if source exists first
         if not client.collections.exists(source_name):
@@ -399,6 +473,8 @@ def index_rename(
             typer.confirm("Are you sure?", abort=True)
             
         success = rename_collection(client, source_name, target_name, overwrite=overwrite)
+        rag_resources.forget_collection(source_name)
+        rag_resources.forget_collection(target_name)
         if success:
             console.print(f"[green]✅ Successfully renamed index to '{target_name}'[/green]")
         else:
@@ -408,9 +484,6 @@ def index_rename(
                 console.print("[red]❌ Failed to rename index[/red]")
     except Exception as e:
         console.print(f"[bold red]Error: {str(e)}[/bold red]")
-    finally:
-        if client:
-            client.close()
 
 @index_app.command("delete")
 def index_delete(
@@ -419,13 +492,13 @@ def index_delete(
 ):
     """Delete entire Weaviate index (collection)"""
     from agentic.utils.rag_helper import (
-        init_weaviate,
+        rag_resources,
     )
     console = Console()
     
     try:
         with Status("[bold green]Initializing Weaviate...", console=console):
-            client = init_weaviate()
+            client = rag_resources.get_client()
             
         if not client.collections.exists(index_name):
             console.print(f"[yellow]⚠️ Index '{index_name}' does not exist[/yellow]")
@@ -437,14 +510,12 @@ def index_delete(
             
         with Status("[bold green]Deleting index...", console=console):
             client.collections.delete(index_name)
+            rag_resources.forget_collection(index_name)
             
         console.print(f"[green]✅ Successfully deleted index '{index_name}'[/green]")
         
     except Exception as e:
         console.print(f"[bold red]Error: {str(e)}[/bold red]")
-    finally:
-        if client:
-            client.close()
 
 @index_app.command("search")
 def index_search(
@@ -461,14 +532,13 @@ def index_search(
 ):
     """Search documents with hybrid search support"""
     from agentic.utils.rag_helper import (
-        init_weaviate,
-        init_embedding_model,
+        rag_resources,
         search_collection
     )
     console = Console()
     try:
         with Status("[bold green]Initializing Weaviate...", console=console):
-            client = init_weaviate()
+            client = rag_resources.get_client()
             
         if not client.collections.exists(index_name):
             console.print(f"[yellow]⚠️ Index '{index_name}' does not exist[/yellow]")
@@ -484,7 +554,7 @@ def index_search(
             filters[key.strip()] = value.strip()
         
         with Status("[bold green]Initializing model...", console=console):
-            embed_model = init_embedding_model(embedding_model)
+            embed_model = rag_resources.get_embedding_model(embedding_model)
             
         with Status("[bold green]Searching...", console=console):
             results = search_collection(
@@ -508,9 +578,6 @@ def index_search(
             
     except Exception as e:
         console.print(f"[bold red]Error: {str(e)}[/bold red]")
-    finally:
-        if client:
-            client.close()
 
 # Index document commands
 @index_document_app.command("add")
@@ -531,19 +598,57 @@ def document_add(
         ". ,! ,? ,\n",
         help="Comma-separated delimiters for fallback chunk splitting"
     ),
+    workers: int = typer.Option(
+        None,
+        min=0,
+        help="Processes used to parse files when adding a directory or glob pattern"
+    ),
 ):
-    """Add a document to an index"""
+    """Add a document to an index. Pass a directory or a glob pattern to add many documents at once."""
     from agentic.utils.rag_helper import rag_index_file
     console = Console()
 
+    if file_path.startswith(("http://", "https://")):
+        file_paths = [file_path]
+    elif os.path.isdir(file_path):
+        file_paths = sorted(str(p) for p in Path(file_path).rglob("*") if p.is_file())
+    else:
+        file_paths = sorted(glob.glob(file_path)) or [file_path]
+
     try:
-        rag_index_file(
-            file_path,
+        if file_paths == [file_path]:
+            rag_index_file(
+                file_path,
+                index_name,
+                chunk_threshold,
+                chunk_delimiters,
+                embedding_model,
+            )
+            return
+
+        from agentic.utils.rag_pipeline import IngestionPipeline, DEFAULT_WORKERS
+
+        def report(stats):
+            console.print(
+                f"[green]{stats.files_done}/{stats.files_total} files "
+                f"({stats.files_indexed} indexed, {stats.files_skipped} unchanged, {stats.files_failed} failed) "
+                f"| {stats.chunks_indexed} chunks | {stats.files_per_second:.1f} files/s"
+            )
+
+        stats = IngestionPipeline(
             index_name,
-            chunk_threshold,
-            chunk_delimiters,
-            embedding_model,
-        )    
+            workers=DEFAULT_WORKERS if workers is None else workers,
+            chunk_threshold=chunk_threshold,
+            chunk_delimiters=chunk_delimiters,
+            embedding_model=embedding_model,
+            progress=report,
+        ).run(file_paths)
+        for failed_path, error in stats.errors:
+            console.print(f"[red]❌ {failed_path}: {error}[/red]")
+        console.print(
+            f"[bold green]✅ Indexed {stats.files_indexed} documents ({stats.chunks_indexed} chunks) "
+            f"in {stats.elapsed:.1f}s"
+        )
     except Exception as e:
         console.print(f"[bold red]Error: {str(e)}")
         raise typer.Exit(1)
@@ -552,13 +657,13 @@ def document_add(
 def document_list(index_name: str):
     """List all documents in an index with basic info"""
     from agentic.utils.rag_helper import (
-        init_weaviate,
+        rag_resources,
         list_documents_in_collection,
     )
     console = Console()
     try:
         with Status("[bold green]Initializing Weaviate...", console=console):
-            client = init_weaviate()
+            client = rag_resources.get_client()
         if not client.collections.exists(index_name):
             console.print(f"[yellow]⚠️ Index '{index_name}' does not exist[/yellow]")
             raise typer.Exit(0)
@@ -575,15 +680,12 @@ def document_list(index_name: str):
             )
     except Exception as e:
         console.print(f"[bold red]Error: {str(e)}[/bold red]")
-    finally:
-        if client:
-            client.close()
 
 @index_document_app.command("show")
 def document_show(index_name: str, document_identifier: str):
     """Show detailed metadata for a specific document using its ID or filename/path"""
     from agentic.utils.rag_helper import (
-        init_weaviate,
+        rag_resources,
         get_document_id_from_path,
         get_document_metadata,
     )
@@ -591,7 +693,7 @@ def document_show(index_name: str, document_identifier: str):
     console = Console()
     try:
         with Status("[bold green]Initializing Weaviate...", console=console):
-            client = init_weaviate()
+            client = rag_resources.get_client()
         collection = client.collections.get(index_name)
         
         # Determine if input is a document ID or filename
@@ -621,9 +723,6 @@ def document_show(index_name: str, document_identifier: str):
         console.print(Markdown("\n## Summary\n" + metadata['summary'] + "\n\n"))
     except Exception as e:
         console.print(f"[bold red]Error: {str(e)}[/bold red]")
-    finally:
-        if client:
-            client.close()
 
 @index_document_app.command("delete")
 def document_delete(
@@ -633,7 +732,7 @@ def document_delete(
 ):
     """Delete a document using its ID or filename/path"""
     from agentic.utils.rag_helper import (
-        init_weaviate,
+        rag_resources,
         delete_document_from_index,
         check_document_in_index,
         get_document_id_from_path,
@@ -644,7 +743,7 @@ def document_delete(
     
     try:
         with Status("[bold green]Initializing Weaviate...", console=console):
-            client = init_weaviate()
+            client = rag_resources.get_client()
             
         if not client.collections.exists(index_name):
             console.print(f"[yellow]⚠️ Index '{index_name}' does not exist[/yellow]")
@@ -684,9 +783,6 @@ def document_delete(
         
     except Exception as e:
         console.print(f"[bold red]Error: {str(e)}[/bold red]")
-    finally:
-        if client:
-            client.close()
 
 # Models commands
 @models_app.command("list")
@@ -2,11 +2,12 @@ from .runner import RayAgentRunner
 from .events import SetState, AddChild, PauseForInputResult, WaitForInput
 from .actor_agents import (
     AgentProxyClass,
+    AsyncLocalAgentProxy,
     handoff,
 )
 from .swarm.types import ThreadContext, RunContext
 from .workflow import Pipeline
-from jinja2 import Template
+from .utils.template import render_template
 import os
 import pickle
 import tempfile
@@ -16,11 +17,12 @@ from pydantic import BaseModel, Field
 
 # Common aliases
 Agent = AgentProxyClass
+AsyncAgent = AsyncLocalAgentProxy
 AgentRunner = RayAgentRunner
 
 def make_prompt(template: str, thread_context: ThreadContext, **kwargs) -> str:
     context = thread_context._context.copy() | kwargs
-    return Template(template).render(context)
+    return render_template(template, context)
 
 
 P = ParamSpec('P')
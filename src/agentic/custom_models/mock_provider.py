@@ -1,3 +1,10 @@
+import asyncio
+import json
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+
 import litellm
 from litellm import CustomLLM
 from typing import Iterator, AsyncIterator, Dict, List, Any, Optional
@@ -7,11 +14,25 @@ import re
 # Default response if not set
 DEFAULT_MOCK_RESPONSE = "This is a mock response."
 
+
+@dataclass
+class MockStep:
+    """One scripted completion: text to stream, and the tool calls to make as
+    (name, arguments) pairs."""
+    content: str = ""
+    tool_calls: list[tuple[str, dict]] = field(default_factory=list)
+
+
 class MockSettings:
     def __init__(self):
         self.pattern = ""
         self.response = DEFAULT_MOCK_RESPONSE
         self.available_tools = {}
+        # Streaming speed. 0 streams instantly.
+        self.tokens_per_second = 0.0
+        self.time_to_first_token = 0.0
+        # Scripted steps by model name ("" for any mock model)
+        self.scripts: Dict[str, list[MockStep]] = {}
 
     def set(self, pattern: str, response: str):
         """Set the pattern and response template"""
@@ -38,10 +59,33 @@ class MockSettings:
 mock_settings = MockSettings()
 
 class MockModelProvider(CustomLLM):
-    """Mock LLM provider for testing purposes."""
+    """Mock LLM provider for testing purposes.
+
+    Replies are streamed a word at a time, optionally paced by `set_timing` to look like
+    a real provider. A script set with `set_script` makes the model run a fixed sequence
+    of steps, like calling tools several times before answering; the step is picked from
+    the number of assistant messages since the last user message, so concurrent
+    conversations each follow the script independently.
+    """
     def __init__(self):
         super().__init__()
         self.settings = mock_settings
+        self._registered_tool_names: Optional[tuple] = None
+        # Seconds spent sleeping to simulate the provider, so benchmarks can subtract it
+        self.simulated_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def set_timing(self, tokens_per_second: float = 0.0, time_to_first_token: float = 0.0) -> None:
+        """Pace streamed responses. Zero for both streams instantly."""
+        self.settings.tokens_per_second = tokens_per_second
+        self.settings.time_to_first_token = time_to_first_token
+
+    def set_script(self, steps: List[MockStep], model: str = "") -> None:
+        """Script the completions for one model (eg. "mock/planner"), or every mock model"""
+        self.settings.scripts[model.removeprefix("mock/")] = list(steps)
+
+    def clear_scripts(self) -> None:
+        self.settings.scripts = {}
 
     def set_response(self, pattern_or_response: str, response: str = None) -> None:
         """Set the response pattern and template"""
@@ -59,6 +103,31 @@ class MockModelProvider(CustomLLM):
     def clear_tools(self) -> None:
         """Clear registered tools"""
         self.settings.clear_tools()
+        self._registered_tool_names = None
+
+    def register_tools(self, tools: Optional[list]) -> None:
+        """Register the tools sent with a completion request. Agents send the same cached
+        schemas on every step, so we skip the work when the tool list hasn't changed."""
+        if not tools:
+            return
+        names = tuple(
+            tool["function"]["name"] if isinstance(tool, dict) else getattr(tool, "__name__", None)
+            for tool in tools
+        )
+        if names == self._registered_tool_names:
+            return
+        self._registered_tool_names = names
+
+        available_tools = self.settings.get_tools()
+        for tool in tools:
+            if isinstance(tool, dict) and "function" in tool and "name" in tool["function"]:
+                # This is the OpenAI/LiteLLM tool format. Don't replace a callable
+                # registered through mock_settings with its schema.
+                if not callable(available_tools.get(tool["function"]["name"])):
+                    self.register_tool(tool["function"]["name"], tool["function"])
+            elif hasattr(tool, "__name__") and callable(tool):
+                # This is a function directly provided as a tool
+                self.register_tool(tool.__name__, tool)
 
     def get_mock_response(self, input_text: str = "") -> str:
         """Get the current mock response, applying pattern matching if configured"""
@@ -112,14 +181,7 @@ class MockModelProvider(CustomLLM):
                            if m["role"] == "user"), "")
         
         # Register tools
-        if "tools" in kwargs:
-            for tool in kwargs.get("tools", []):
-                if isinstance(tool, dict) and "function" in tool and "name" in tool["function"]:
-                    # This is the OpenAI/LiteLLM tool format
-                    self.register_tool(tool["function"]["name"], tool["function"])
-                elif hasattr(tool, "__name__") and callable(tool):
-                    # This is a function directly provided as a tool
-                    self.register_tool(tool.__name__, tool)
+        self.register_tools(kwargs.get("tools"))
         
         # Process message to check for tool calls
         mock_response = self.get_mock_response(last_message)
@@ -136,14 +198,7 @@ class MockModelProvider(CustomLLM):
                            if m["role"] == "user"), "")
         
         # Register tools from kwargs if present
-        if "tools" in kwargs:
-            for tool in kwargs.get("tools", []):
-                if isinstance(tool, dict) and "function" in tool and "name" in tool["function"]:
-                    # This is the OpenAI/LiteLLM tool format
-                    self.register_tool(tool["function"]["name"], tool["function"])
-                elif hasattr(tool, "__name__") and callable(tool):
-                    # This is a function directly provided as a tool
-                    self.register_tool(tool.__name__, tool)
+        self.register_tools(kwargs.get("tools"))
         
         return litellm.completion(
             model="gpt-3.5-turbo",
@@ -153,30 +208,99 @@ class MockModelProvider(CustomLLM):
     
     def streaming(self, model: str, messages: List[Dict[str, str]], *args, **kwargs) -> Iterator[GenericStreamingChunk]:
         """Return a mock streaming response"""
-        last_message = next((m["content"] for m in reversed(messages) 
-                         if m["role"] == "user"), "")
-        
-        generic_streaming_chunk: GenericStreamingChunk = {
-            "finish_reason": "stop",
-            "index": 0,
-            "is_finished": True,
-            "text": self.get_mock_response(last_message),
-            "tool_use": None,
-            "usage": {"completion_tokens": 0, "prompt_tokens": 0, "total_tokens": 0},
-        }
-        yield generic_streaming_chunk
+        for delay, chunk in self._paced_chunks(model, messages):
+            if delay:
+                self._sleep(delay)
+            yield chunk
     
     async def astreaming(self, model: str, messages: List[Dict[str, str]], *args, **kwargs) -> AsyncIterator[GenericStreamingChunk]:
         """Async version of streaming"""
-        last_message = next((m["content"] for m in reversed(messages) 
-                           if m["role"] == "user"), "")
-        
-        generic_streaming_chunk: GenericStreamingChunk = {
-            "finish_reason": "stop",
-            "index": 0,
-            "is_finished": True,
-            "text": self.get_mock_response(last_message),
-            "tool_use": None,
-            "usage": {"completion_tokens": 0, "prompt_tokens": 0, "total_tokens": 0},
+        for delay, chunk in self._paced_chunks(model, messages):
+            if delay:
+                start = time.perf_counter()
+                await asyncio.sleep(delay)
+                self._add_simulated(time.perf_counter() - start)
+            yield chunk
+
+    def _sleep(self, delay: float):
+        start = time.perf_counter()
+        time.sleep(delay)
+        self._add_simulated(time.perf_counter() - start)
+
+    def _add_simulated(self, seconds: float):
+        with self._lock:
+            self.simulated_seconds += seconds
+
+    def _scripted_step(self, model: str, messages: List[Dict[str, Any]]) -> Optional[MockStep]:
+        scripts = self.settings.scripts
+        script = scripts.get(model.removeprefix("mock/"), scripts.get(""))
+        if not script:
+            return None
+        step = 0
+        for message in reversed(messages):
+            role = message.get("role") if isinstance(message, dict) else getattr(message, "role", None)
+            if role == "user":
+                break
+            if role == "assistant":
+                step += 1
+        if step >= len(script):
+            # The script is done, but the agent asked again
+            return MockStep(content=self.settings.response)
+        return script[step]
+
+    def _paced_chunks(self, model: str, messages: List[Dict[str, Any]]) -> Iterator[tuple[float, GenericStreamingChunk]]:
+        """The response as (delay, chunk) pairs: a chunk per word, then one per tool call"""
+        step = self._scripted_step(model, messages)
+        if step is None:
+            last_message = next((m["content"] for m in reversed(messages)
+                               if m["role"] == "user"), "")
+            step = MockStep(content=str(self.get_mock_response(last_message)))
+
+        pieces = re.findall(r"\S+\s*|\s+", step.content) or [""]
+        chunks: list[GenericStreamingChunk] = [
+            {
+                "finish_reason": "",
+                "index": 0,
+                "is_finished": False,
+                "text": piece,
+                "tool_use": None,
+                "usage": None,
+            }
+            for piece in pieces
+        ]
+        for index, (name, arguments) in enumerate(step.tool_calls):
+            chunks.append({
+                "finish_reason": "",
+                "index": 0,
+                "is_finished": False,
+                "text": "",
+                "tool_use": {
+                    "id": f"call_{uuid.uuid4().hex[:24]}",
+                    "type": "function",
+                    "function": {"name": name, "arguments": json.dumps(arguments)},
+                    "index": index,
+                },
+                "usage": None,
+            })
+        prompt_tokens = sum(len(str(_content(m) or "").split()) for m in messages)
+        chunks[-1]["is_finished"] = True
+        chunks[-1]["finish_reason"] = "tool_calls" if step.tool_calls else "stop"
+        chunks[-1]["usage"] = {
+            "completion_tokens": len(chunks),
+            "prompt_tokens": prompt_tokens,
+            "total_tokens": prompt_tokens + len(chunks),
         }
-        yield generic_streaming_chunk
+
+        tps = self.settings.tokens_per_second
+        for i, chunk in enumerate(chunks):
+            if i == 0:
+                delay = self.settings.time_to_first_token
+            else:
+                delay = 1.0 / tps if tps > 0 else 0.0
+            yield delay, chunk
+
+
+def _content(message) -> Any:
+    if isinstance(message, dict):
+        return message.get("content")
+    return getattr(message, "content", None)
@@ -1,13 +1,16 @@
-from datetime import datetime, UTC
+import base64
+from datetime import date, datetime, timedelta, UTC
 import os
-from typing import Dict, Optional
+import threading
+from typing import Dict, Iterable, Iterator, Optional
 from sqlmodel import Session, SQLModel, create_engine, select, asc, desc
+from sqlalchemy import Engine, event, insert, update, delete, and_, or_, func, inspect, text
 from pathlib import Path
 from copy import deepcopy
 import sqlite3
 import shutil
-from agentic.utils.json import make_json_serializable
-from agentic.db.models import Thread, ThreadLog
+from agentic.utils.json import dumps_str, loads, make_json_serializable
+from agentic.db.models import Thread, ThreadLog, ThreadHistorySnapshot, UsageRollup
 from agentic.utils.directory_management import get_runtime_filepath
 
 # Database migration helper
@@ -84,36 +87,194 @@ def _add_depth_column_if_missing(db_path: str):
         
         conn.close()
 
+USAGE_FIELDS = ("input_tokens", "output_tokens", "cost", "elapsed_time", "call_count")
+USAGE_GROUPS = ("thread_id", "agent_id", "user_id", "model", "day")
+
+def _usage_deltas(rows: Iterable[Dict]) -> Dict[tuple, Dict[str, float]]:
+    """Sum the usage in any completion_end rows, keyed on the UsageRollup primary key"""
+    deltas = {}
+    for row in rows:
+        if row["event_name"] != "completion_end":
+            continue
+        usage = (row["event"] or {}).get("usage")
+        if not usage:
+            continue
+        created_at = row["created_at"]
+        if created_at.tzinfo is not None:
+            created_at = created_at.astimezone(UTC)
+        key = (
+            row["thread_id"],
+            row["agent_id"],
+            row["user_id"],
+            usage.get("model") or "unknown",
+            created_at.date(),
+        )
+        totals = deltas.setdefault(key, dict.fromkeys(USAGE_FIELDS, 0))
+        totals["input_tokens"] += usage.get("input_tokens") or 0
+        totals["output_tokens"] += usage.get("output_tokens") or 0
+        totals["cost"] += usage.get("cost") or 0
+        totals["elapsed_time"] += usage.get("elapsed_time") or 0
+        totals["call_count"] += 1
+    return deltas
+
+def _add_usage(session: Session, deltas: Dict[tuple, Dict[str, float]]):
+    """Add usage deltas to the rollup rows, creating them as needed"""
+    if not deltas:
+        return
+    values = [dict(zip(USAGE_GROUPS, key), **totals) for key, totals in deltas.items()]
+    dialect = session.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        if dialect == "sqlite":
+            from sqlalchemy.dialects.sqlite import insert as upsert
+        else:
+            from sqlalchemy.dialects.postgresql import insert as upsert
+        table = UsageRollup.__table__
+        statement = upsert(table)
+        statement = statement.on_conflict_do_update(
+            index_elements=list(USAGE_GROUPS),
+            set_={name: table.c[name] + statement.excluded[name] for name in USAGE_FIELDS},
+        )
+        session.execute(statement, values)
+        return
+
+    for value in values:
+        rollup = session.get(UsageRollup, tuple(value[name] for name in USAGE_GROUPS))
+        if rollup is None:
+            session.add(UsageRollup(**value))
+        else:
+            for name in USAGE_FIELDS:
+                setattr(rollup, name, getattr(rollup, name) + value[name])
+            session.add(rollup)
+
+def encode_cursor(timestamp: datetime, row_id: str) -> str:
+    """An opaque page cursor pointing at the row (timestamp, row_id)"""
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{row_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> tuple[datetime, str]:
+    try:
+        timestamp, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(timestamp), row_id
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+def _after(time_column, id_column, timestamp: datetime, row_id: str):
+    """Rows that sort after (timestamp, row_id) in ascending order"""
+    return or_(time_column > timestamp, and_(time_column == timestamp, id_column > row_id))
+
+def _before(time_column, id_column, timestamp: datetime, row_id: str):
+    """Rows that sort after (timestamp, row_id) in descending order"""
+    return or_(time_column < timestamp, and_(time_column == timestamp, id_column < row_id))
+
+def _columns(model, fields: Optional[Iterable[str]], required: tuple[str, ...]) -> list:
+    """The columns to select. The keyset columns in `required` are always included."""
+    if fields is None:
+        names = list(model.model_fields)
+    else:
+        fields = list(fields)
+        unknown = [name for name in fields if name not in model.model_fields]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(model.model_fields)}")
+        names = list(dict.fromkeys([*required, *fields]))
+    return [getattr(model, name) for name in names]
+
+DB_POOL_SIZE = int(os.environ.get("AGENTIC_DB_POOL_SIZE", "10"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get("AGENTIC_SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+def _database_url(db_path: str) -> str:
+    if 'AGENTIC_DATABASE_URL' in os.environ:
+        return os.environ['AGENTIC_DATABASE_URL']
+    return f"sqlite:///{get_runtime_filepath(db_path)}"
+
+def _create_engine(url: str) -> Engine:
+    # JSON columns (thread log events, history snapshots) go through the fast encoder
+    json_args = {"json_serializer": dumps_str, "json_deserializer": loads}
+    if not url.startswith("sqlite"):
+        return create_engine(
+            url, echo=False, pool_size=DB_POOL_SIZE, max_overflow=DB_POOL_SIZE, pool_pre_ping=True,
+            **json_args,
+        )
+
+    engine = create_engine(
+        url,
+        echo=False,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_POOL_SIZE,
+        connect_args={"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000},
+        **json_args,
+    )
+
+    @event.listens_for(engine, "connect")
+    def _configure_sqlite(dbapi_connection, connection_record):
+        # WAL lets readers run alongside the event sink's writer, and NORMAL sync is
+        # still safe against corruption in WAL mode
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.close()
+
+    return engine
+
+_managers: Dict[str, "DatabaseManager"] = {}
+_managers_lock = threading.Lock()
+
+def get_db_manager(db_path: str = "agent_threads.db") -> "DatabaseManager":
+    """
+    The process-wide DatabaseManager for `db_path` (or AGENTIC_DATABASE_URL when it's set).
+    Its engine and connection pool are shared by every caller, and the migrations run
+    only when it is first created. Prefer this to constructing a DatabaseManager.
+    """
+    url = _database_url(db_path)
+    with _managers_lock:
+        manager = _managers.get(url)
+        if manager is None:
+            manager = DatabaseManager(db_path)
+            _managers[url] = manager
+        return manager
+
+def close_db_managers():
+    """Dispose the shared engines. The next get_db_manager call creates them again,
+    migrations included."""
+    with _managers_lock:
+        managers = list(_managers.values())
+        _managers.clear()
+    for manager in managers:
+        manager.engine.dispose()
+
 # Database setup and management
 class DatabaseManager:
     def __init__(self, db_path: str = "agent_threads.db"):
         if 'AGENTIC_DATABASE_URL' in os.environ:
             # Use the database URL from environment variable if set
-            dburl = os.environ['AGENTIC_DATABASE_URL']
             _add_depth_column_if_missing(db_path)
-            self.engine = create_engine(dburl, echo=False)
             self.db_path = None
         else:
             self.db_path = get_runtime_filepath(db_path)
             # Check and perform migration if needed
             _check_and_migrate_database(self.db_path)
             _add_depth_column_if_missing(self.db_path)
-            self.engine = create_engine(f"sqlite:///{self.db_path}", echo=False)
+        self.engine = _create_engine(_database_url(db_path))
 
         self.create_db_and_tables()
 
     def create_db_and_tables(self):
+        # Databases from before usage rollups existed need them filled in from their logs
+        tables = inspect(self.engine).get_table_names()
+        needs_usage_backfill = "thread_logs" in tables and "usage_rollups" not in tables
         SQLModel.metadata.create_all(self.engine)
         # Check if ThreadLog table is missing the 'depth' column and add it if necessary
-        with self.get_session() as session:
-            try:
-                # Use text() for raw SQL queries in SQLModel/SQLAlchemy
-                from sqlalchemy import text
+        columns = [column["name"] for column in inspect(self.engine).get_columns("thread_logs")]
+        if "depth" not in columns:
+            with self.get_session() as session:
                 session.exec(text("ALTER TABLE thread_logs ADD COLUMN depth INTEGER DEFAULT 0;"))
                 session.commit()
-            except Exception as e:
-                # Rollback the transaction on error
-                session.rollback()
+        # create_all only adds indexes along with new tables
+        for model in (Thread, ThreadLog):
+            for index in model.__table__.indexes:
+                index.create(self.engine, checkfirst=True)
+        if needs_usage_backfill:
+            print("Building usage rollups from existing thread logs...")
+            self.backfill_usage_rollups()
 
     def get_session(self) -> Session:
         return Session(self.engine)
@@ -165,6 +326,7 @@ class DatabaseManager:
                 event=event_data,
             )
             session.add(log)
+            _add_usage(session, _usage_deltas([log.model_dump()]))
             
             # Update the parent thread
             thread = session.get(Thread, thread_id)
@@ -176,6 +338,27 @@ class DatabaseManager:
             session.refresh(log)
             return log
 
+    def log_events(self, rows: list[Dict]) -> None:
+        """Insert a batch of already-serialized thread log rows in one transaction.
+        Each parent thread's updated_at is bumped once, to its newest row."""
+        if not rows:
+            return
+
+        latest_by_thread = {}
+        for row in rows:
+            current = latest_by_thread.get(row["thread_id"])
+            if current is None or row["created_at"] > current:
+                latest_by_thread[row["thread_id"]] = row["created_at"]
+
+        with self.get_session() as session:
+            session.execute(insert(ThreadLog), rows)
+            _add_usage(session, _usage_deltas(rows))
+            for thread_id, updated_at in latest_by_thread.items():
+                session.execute(
+                    update(Thread).where(Thread.id == thread_id).values(updated_at=updated_at)
+                )
+            session.commit()
+
     def update_thread(self,
                    thread_id: int,
                    description: Optional[str] = None,
@@ -202,7 +385,45 @@ class DatabaseManager:
 
     def get_thread_logs(self, thread_id: int) -> list[ThreadLog]:
         with self.get_session() as session:
-            return session.exec(select(ThreadLog).where(ThreadLog.thread_id == thread_id).order_by(asc(ThreadLog.created_at))).all()
+            return session.exec(
+                select(ThreadLog)
+                .where(ThreadLog.thread_id == thread_id)
+                .order_by(asc(ThreadLog.created_at), asc(ThreadLog.id))
+            ).all()
+
+    def get_thread_logs_after(self, thread_id: str, created_at: datetime, log_id: str) -> list[ThreadLog]:
+        """Logs that come after the row (created_at, log_id), in the same order as get_thread_logs"""
+        with self.get_session() as session:
+            return session.exec(
+                select(ThreadLog)
+                .where(ThreadLog.thread_id == thread_id)
+                .where(_after(ThreadLog.created_at, ThreadLog.id, created_at, log_id))
+                .order_by(asc(ThreadLog.created_at), asc(ThreadLog.id))
+            ).all()
+
+    def get_history_snapshot(self, thread_id: str) -> Optional[ThreadHistorySnapshot]:
+        with self.get_session() as session:
+            return session.get(ThreadHistorySnapshot, thread_id)
+
+    def save_history_snapshot(self, snapshot: ThreadHistorySnapshot) -> None:
+        snapshot.updated_at = datetime.now(UTC)
+        with self.get_session() as session:
+            session.merge(snapshot)
+            session.commit()
+
+    def delete_history_snapshots(self, thread_id: Optional[str] = None) -> int:
+        """Delete the snapshot for one thread, or all of them. Returns how many were deleted."""
+        with self.get_session() as session:
+            query = delete(ThreadHistorySnapshot)
+            if thread_id is not None:
+                query = query.where(ThreadHistorySnapshot.thread_id == thread_id)
+            result = session.execute(query)
+            session.commit()
+            return result.rowcount
+
+    def get_all_thread_ids(self) -> list[str]:
+        with self.get_session() as session:
+            return list(session.exec(select(Thread.id)).all())
 
     def get_threads_by_user(self, user_id: str) -> list[Thread]:
         with self.get_session() as session:
@@ -216,34 +437,152 @@ class DatabaseManager:
             if user_id is not None:
                 query = query.where(Thread.user_id == user_id)
             
-            return session.exec(query.order_by(desc(Thread.updated_at))).all()
+            return session.exec(query.order_by(desc(Thread.updated_at), desc(Thread.id))).all()
+
+    def query_threads(
+        self,
+        agent_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> tuple[list[Dict], Optional[str]]:
+        """
+        A page of threads as dicts, most recently updated first. Returns (rows, next_cursor),
+        where next_cursor is None on the last page. `fields` limits the columns returned;
+        id and updated_at are always included since the cursor is built from them.
+        """
+        query = select(*_columns(Thread, fields, ("id", "updated_at")))
+        if agent_id is not None:
+            query = query.where(Thread.agent_id == agent_id)
+        if user_id is not None:
+            query = query.where(Thread.user_id == user_id)
+        if cursor:
+            query = query.where(_before(Thread.updated_at, Thread.id, *decode_cursor(cursor)))
+        query = query.order_by(desc(Thread.updated_at), desc(Thread.id))
+        return self._page(query, limit, "updated_at")
+
+    def query_thread_logs(
+        self,
+        thread_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        event_names: Optional[Iterable[str]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> tuple[list[Dict], Optional[str]]:
+        """
+        A page of a thread's logs as dicts, oldest first. Returns (rows, next_cursor).
+        `event_names` keeps only those events, and `fields` limits the columns returned
+        (leave out "event" to skip the payloads); id and created_at are always included.
+        """
+        query = select(*_columns(ThreadLog, fields, ("id", "created_at"))).where(ThreadLog.thread_id == thread_id)
+        if event_names is not None:
+            query = query.where(ThreadLog.event_name.in_(list(event_names)))
+        if cursor:
+            query = query.where(_after(ThreadLog.created_at, ThreadLog.id, *decode_cursor(cursor)))
+        query = query.order_by(asc(ThreadLog.created_at), asc(ThreadLog.id))
+        return self._page(query, limit, "created_at")
+
+    def stream_threads(self, batch_size: int = 500, **kwargs) -> Iterator[Dict]:
+        """Every thread matching the query_threads arguments, read one page at a time"""
+        cursor = kwargs.pop("cursor", None)
+        while True:
+            rows, cursor = self.query_threads(limit=batch_size, cursor=cursor, **kwargs)
+            yield from rows
+            if cursor is None:
+                return
+
+    def stream_thread_logs(self, thread_id: str, batch_size: int = 500, **kwargs) -> Iterator[Dict]:
+        """Every log matching the query_thread_logs arguments, read one page at a time"""
+        cursor = kwargs.pop("cursor", None)
+        while True:
+            rows, cursor = self.query_thread_logs(thread_id, limit=batch_size, cursor=cursor, **kwargs)
+            yield from rows
+            if cursor is None:
+                return
+
+    def _page(self, query, limit: Optional[int], time_field: str) -> tuple[list[Dict], Optional[str]]:
+        # Read one extra row to find out if there is another page
+        if limit is not None:
+            query = query.limit(limit + 1)
+        with self.get_session() as session:
+            rows = [dict(row._mapping) for row in session.exec(query)]
+        if limit is None or len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1][time_field], rows[-1]["id"])
 
     def get_thread_usage(self, thread_id: str) -> Dict[str, Dict[str, float]]:
-        """Calculate total usage for a thread by summing completion events"""
-        logs = self.get_thread_logs(thread_id)
-        
-        usage_by_model = {}
-        for log in logs:
-            if log.event_name == "completion_end" and "usage" in log.event:
-                usage = log.event["usage"]
-                model = usage.get("model", "unknown")
-                
-                if model not in usage_by_model:
-                    usage_by_model[model] = {
-                        "input_tokens": 0,
-                        "output_tokens": 0,
-                        "cost": 0,
-                        "elapsed_time": 0,
-                        "call_count": 0
-                    }
-                
-                usage_by_model[model]["input_tokens"] += usage.get("input_tokens", 0)
-                usage_by_model[model]["output_tokens"] += usage.get("output_tokens", 0)
-                usage_by_model[model]["cost"] += usage.get("cost", 0)
-                usage_by_model[model]["elapsed_time"] += usage.get("elapsed_time", 0)
-                usage_by_model[model]["call_count"] += 1
-        
-        return usage_by_model
+        """Total usage for a thread, by model"""
+        return {
+            row["model"]: {name: row[name] for name in USAGE_FIELDS}
+            for row in self.get_usage(group_by=["model"], thread_id=thread_id)
+        }
+
+    def get_usage(
+        self,
+        group_by: Iterable[str] = ("agent_id",),
+        days: Optional[int] = None,
+        since: Optional[date] = None,
+        until: Optional[date] = None,
+        thread_id: Optional[str] = None,
+        agent_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        model: Optional[str] = None,
+    ) -> list[Dict]:
+        """
+        Sum usage across threads, grouped by any of "thread_id", "agent_id", "user_id",
+        "model" and "day". `days` limits it to the last N UTC days including today, and
+        `since` and `until` are inclusive UTC days. Rows are returned most expensive first,
+        e.g. get_usage(["agent_id"], days=7) for the cost by agent over the last week.
+        """
+        if days:
+            since = datetime.now(UTC).date() - timedelta(days=days - 1)
+        group_by = list(group_by)
+        unknown = [name for name in group_by if name not in USAGE_GROUPS]
+        if unknown:
+            raise ValueError(f"Can't group usage by {', '.join(unknown)}. Choose from {', '.join(USAGE_GROUPS)}")
+
+        columns = [getattr(UsageRollup, name) for name in group_by]
+        totals = [func.sum(getattr(UsageRollup, name)).label(name) for name in USAGE_FIELDS]
+        query = select(*columns, *totals)
+        for name, value in (("thread_id", thread_id), ("agent_id", agent_id), ("user_id", user_id), ("model", model)):
+            if value is not None:
+                query = query.where(getattr(UsageRollup, name) == value)
+        if since is not None:
+            query = query.where(UsageRollup.day >= since)
+        if until is not None:
+            query = query.where(UsageRollup.day <= until)
+        query = query.group_by(*columns).order_by(desc("cost"))
+
+        with self.get_session() as session:
+            rows = session.exec(query).all()
+        return [dict(row._mapping) for row in rows]
+
+    def backfill_usage_rollups(self, thread_id: Optional[str] = None) -> int:
+        """Rebuild the usage rollups of one thread, or every thread, from their logs.
+        Returns the number of completion events counted."""
+        thread_ids = [thread_id] if thread_id else self.get_all_thread_ids()
+        with self.get_session() as session:
+            query = delete(UsageRollup)
+            if thread_id is not None:
+                query = query.where(UsageRollup.thread_id == thread_id)
+            session.execute(query)
+            session.commit()
+
+        count = 0
+        for tid in thread_ids:
+            with self.get_session() as session:
+                logs = session.exec(
+                    select(ThreadLog)
+                    .where(ThreadLog.thread_id == tid)
+                    .where(ThreadLog.event_name == "completion_end")
+                ).all()
+                deltas = _usage_deltas(log.model_dump() for log in logs)
+                _add_usage(session, deltas)
+                session.commit()
+            count += sum(totals["call_count"] for totals in deltas.values())
+        return count
     
     def get_thread_summary(self, thread_id: str) -> Dict:
         """Get thread summary including usage statistics"""
@@ -0,0 +1,318 @@
+import atexit
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, asdict
+from datetime import datetime, UTC
+from queue import Queue, Empty
+from typing import Any, Callable, Dict, Literal, Optional
+
+from agentic import metrics
+from agentic.db.models import new_id
+from agentic.utils.json import make_json_serializable
+
+# How hard the sink tries to get events onto disk:
+#   "sync"  - write every event immediately (one transaction per event, the old behavior)
+#   "turn"  - batch in the background, and block at the end of each turn until the batch is written
+#   "async" - batch in the background and never block the agent; a crash can lose the last batch
+Durability = Literal["sync", "turn", "async"]
+
+DEFAULT_DURABILITY: Durability = os.environ.get("AGENTIC_LOG_DURABILITY", "turn")  # type: ignore
+
+_CLOSE = object()
+
+logger = logging.getLogger(__name__)
+
+
+def check_durability(durability: str) -> Durability:
+    if durability not in ("sync", "turn", "async"):
+        raise ValueError(f"Unknown log durability mode: {durability!r} (AGENTIC_LOG_DURABILITY must be sync, turn or async)")
+    return durability  # type: ignore
+
+
+@dataclass
+class EventSinkStats:
+    events_received: int = 0
+    events_coalesced: int = 0
+    rows_written: int = 0
+    flush_count: int = 0
+    queue_depth: int = 0
+    max_queue_depth: int = 0
+    last_flush_ms: float = 0.0
+    total_flush_ms: float = 0.0
+    write_errors: int = 0
+    # Rows lost in failed writes (a coalesced assistant message is one row)
+    events_dropped: int = 0
+
+    @property
+    def avg_flush_ms(self) -> float:
+        return self.total_flush_ms / self.flush_count if self.flush_count else 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self) | {"avg_flush_ms": self.avg_flush_ms}
+
+
+class EventSink:
+    """
+    Write-behind sink for thread log events.
+
+    Events are queued and written by a background thread in batches, either when
+    `max_batch_size` rows are pending or `flush_interval` seconds after the first pending
+    row. Consecutive `chat_output` deltas for the same agent are coalesced into a single
+    row per assistant message, so a streamed reply costs one insert instead of one per token.
+
+    `stats` is updated by the agent threads and the writer, under `_stats_lock`.
+    """
+
+    def __init__(
+        self,
+        db_manager,
+        durability: Durability = DEFAULT_DURABILITY,
+        max_batch_size: int = 200,
+        flush_interval: float = 0.5,
+        max_queue_size: int = 10_000,
+    ):
+        self.db_manager = db_manager
+        self.durability = check_durability(durability)
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.stats = EventSinkStats()
+        self._queue: Queue = Queue(maxsize=max_queue_size)
+        self._writer: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._order_lock = threading.Lock()
+
+    def log_event(
+        self,
+        thread_id: str,
+        agent_id: str,
+        user_id: str,
+        role: str,
+        depth: int,
+        event_name: str,
+        event_data: Dict,
+        serialized: bool = False,
+    ) -> None:
+        """Queue an event for writing. In "sync" mode the event is written before returning.
+        Pass `serialized=True` when event_data is already JSON-safe (like `Event.json_payload()`)."""
+        if self.durability == "sync":
+            self.db_manager.log_event(
+                thread_id=thread_id,
+                agent_id=agent_id,
+                user_id=user_id,
+                role=role,
+                depth=depth,
+                event_name=event_name,
+                event_data=event_data,
+            )
+            with self._stats_lock:
+                self.stats.events_received += 1
+                self.stats.rows_written += 1
+            return
+
+        # Serialize now, since events can be mutated after they are published. Serialized
+        # payloads are shared with the event, and only need a copy for chat_output coalescing.
+        if serialized:
+            event_data = event_data.copy() if isinstance(event_data, dict) else event_data
+        else:
+            event_data = make_json_serializable(event_data.copy())
+        row = {
+            "thread_id": thread_id,
+            "agent_id": agent_id,
+            "user_id": user_id,
+            "role": role,
+            "depth": depth,
+            "event_name": event_name,
+            "event": event_data,
+            "version": 1,
+        }
+        self._ensure_writer()
+        # Logs are read back in (created_at, id) order. Both are taken as the row is queued,
+        # so rows from concurrent agent threads sort in the order they're written.
+        with self._order_lock:
+            row["created_at"] = datetime.now(UTC)
+            row["id"] = new_id()
+            self._queue.put(row)
+        depth_now = self._queue.qsize()
+        with self._stats_lock:
+            self.stats.events_received += 1
+            self.stats.queue_depth = depth_now
+            if depth_now > self.stats.max_queue_depth:
+                self.stats.max_queue_depth = depth_now
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every event queued so far has been written. Returns False on timeout."""
+        if self.durability == "sync" or self._writer is None:
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def call_after_writes(self, fn: Callable[[], Any]) -> None:
+        """Call `fn` once every event queued so far has been written. It runs on the writer
+        thread, so it must not wait on the sink. In "sync" mode it's called right away."""
+        if self.durability == "sync" or self._writer is None:
+            _call(fn)
+        else:
+            self._queue.put(fn)
+
+    def end_of_turn(self) -> None:
+        """Called when a turn finishes (or pauses). Waits for the writes unless running "async"."""
+        if self.durability == "turn":
+            self.flush()
+
+    def close(self, timeout: Optional[float] = 10) -> None:
+        """Write any pending events and stop the writer thread"""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            self._queue.put(_CLOSE)
+            writer.join(timeout)
+
+    def _ensure_writer(self):
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._run, name="agentic-event-sink", daemon=True
+                )
+                self._writer.start()
+
+    def _run(self):
+        rows: list[dict] = []
+        # The assistant message currently being streamed, held open so later deltas can join it
+        open_chat: Optional[dict] = None
+        deadline: Optional[float] = None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except Empty:
+                item = None
+
+            if item is None:
+                # Time trigger. A still-streaming message stays open until it completes.
+                self._write(rows)
+                rows = []
+                deadline = None
+                continue
+
+            if item is _CLOSE or isinstance(item, threading.Event) or callable(item):
+                if open_chat is not None:
+                    rows.append(open_chat)
+                    open_chat = None
+                self._write(rows)
+                rows = []
+                deadline = None
+                if item is _CLOSE:
+                    return
+                if isinstance(item, threading.Event):
+                    item.set()
+                else:
+                    _call(item)
+                continue
+
+            if item["event_name"] == "chat_output":
+                if open_chat is not None and _same_stream(open_chat, item):
+                    open_chat["event"]["content"] = (
+                        (open_chat["event"].get("content") or "") + (item["event"].get("content") or "")
+                    )
+                    with self._stats_lock:
+                        self.stats.events_coalesced += 1
+                else:
+                    if open_chat is not None:
+                        rows.append(open_chat)
+                    open_chat = item
+            else:
+                if open_chat is not None:
+                    rows.append(open_chat)
+                    open_chat = None
+                rows.append(item)
+
+            if deadline is None:
+                deadline = time.monotonic() + self.flush_interval
+            if len(rows) >= self.max_batch_size:
+                self._write(rows)
+                rows = []
+                deadline = None
+
+    def _write(self, rows: list[dict]):
+        queue_depth = self._queue.qsize()
+        if not rows:
+            with self._stats_lock:
+                self.stats.queue_depth = queue_depth
+            return
+        start = time.perf_counter()
+        written = True
+        try:
+            self.db_manager.log_events(rows)
+        except Exception:
+            written = False
+            logger.exception("Dropped %d thread log events after a failed write", len(rows))
+        elapsed = time.perf_counter() - start
+        metrics.THREAD_LOG_WRITE_SECONDS.observe(elapsed)
+        elapsed_ms = elapsed * 1000
+        with self._stats_lock:
+            self.stats.queue_depth = queue_depth
+            if written:
+                self.stats.rows_written += len(rows)
+            else:
+                self.stats.write_errors += 1
+                self.stats.events_dropped += len(rows)
+            self.stats.flush_count += 1
+            self.stats.last_flush_ms = elapsed_ms
+            self.stats.total_flush_ms += elapsed_ms
+
+
+def _call(fn: Callable[[], Any]):
+    try:
+        fn()
+    except Exception:
+        logger.exception("Error in thread log callback")
+
+
+def _same_stream(a: dict, b: dict) -> bool:
+    return (
+        a["thread_id"] == b["thread_id"]
+        and a["agent_id"] == b["agent_id"]
+        and a["depth"] == b["depth"]
+    )
+
+
+_sinks: dict[str, EventSink] = {}
+_sinks_lock = threading.Lock()
+
+
+def get_event_sink(db_manager, durability: Optional[Durability] = None) -> EventSink:
+    """Return the process-wide sink for the database behind `db_manager` and the durability
+    mode, creating it if needed. Each mode gets its own sink, so a caller always gets the
+    guarantee it asked for."""
+    durability = check_durability(durability or DEFAULT_DURABILITY)
+    key = f"{db_manager.engine.url}#{durability}"
+    with _sinks_lock:
+        sink = _sinks.get(key)
+        if sink is None:
+            sink = EventSink(db_manager, durability=durability)
+            _sinks[key] = sink
+        return sink
+
+
+def event_sinks() -> list[EventSink]:
+    """Every sink created in this process"""
+    with _sinks_lock:
+        return list(_sinks.values())
+
+
+def flush_all_event_sinks(timeout: Optional[float] = None):
+    for sink in event_sinks():
+        sink.flush(timeout)
+
+
+@atexit.register
+def _close_event_sinks():
+    for sink in event_sinks():
+        sink.close()
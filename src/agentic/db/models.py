@@ -1,13 +1,45 @@
-from datetime import datetime
+import secrets
+import threading
+import time
+from datetime import date, datetime
 from typing import Dict, Optional
-from sqlmodel import Field, SQLModel, JSON, Column
-from uuid import uuid4
+from sqlmodel import Field, SQLModel, JSON, Column, Index
+from uuid import UUID
+
+_id_lock = threading.Lock()
+_last_id_ms = 0
+_id_counter = 0
+
+def new_id() -> str:
+    """A time-ordered (version 7) UUID, larger than any made before in this process. Rows are
+    paged by (timestamp, id), so rows with the same timestamp sort in the order they were made."""
+    global _last_id_ms, _id_counter
+    with _id_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_id_ms:
+            _id_counter = 0
+        else:
+            # The 12-bit counter orders ids within a millisecond, borrowing from the next one
+            # if it runs out
+            ms = _last_id_ms
+            _id_counter += 1
+            if _id_counter > 0xFFF:
+                ms += 1
+                _id_counter = 0
+        _last_id_ms = ms
+        value = (ms << 80) | (0x7 << 76) | (_id_counter << 64) | (0b10 << 62) | secrets.randbits(62)
+    return str(UUID(int=value))
 
 # Define database models
 class Thread(SQLModel, table=True):
     __tablename__ = "threads"
+    __table_args__ = (
+        # Keyset pagination of an agent's or user's threads, newest first
+        Index("ix_threads_agent_updated", "agent_id", "updated_at", "id"),
+        Index("ix_threads_user_updated", "user_id", "updated_at", "id"),
+    )
     
-    id: str = Field(primary_key=True, default_factory=lambda: str(uuid4()))
+    id: str = Field(primary_key=True, default_factory=new_id)
     agent_id: str = Field(index=True)
     user_id: str = Field(index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -18,8 +50,12 @@ class Thread(SQLModel, table=True):
 
 class ThreadLog(SQLModel, table=True):
     __tablename__ = "thread_logs"
+    __table_args__ = (
+        # Keyset pagination of a thread's logs, oldest first
+        Index("ix_thread_logs_thread_created", "thread_id", "created_at", "id"),
+    )
 
-    id: str = Field(primary_key=True, default_factory=lambda: str(uuid4()))
+    id: str = Field(primary_key=True, default_factory=new_id)
     thread_id: str = Field(index=True, foreign_key="threads.id")
     agent_id: str = Field(index=True)
     user_id: str = Field(index=True)
@@ -29,3 +65,34 @@ class ThreadLog(SQLModel, table=True):
     event: Dict = Field(sa_column=Column(JSON))
     depth: int = Field(default=0)
     version: int = Field(default=1)
+
+class ThreadHistorySnapshot(SQLModel, table=True):
+    """The chat history reconstructed from a thread's logs, up to and including the log row
+    identified by (last_log_created_at, last_log_id). Resuming a thread reads this and
+    replays only the rows that come after it."""
+    __tablename__ = "thread_history_snapshots"
+
+    thread_id: str = Field(primary_key=True, foreign_key="threads.id")
+    last_log_created_at: datetime
+    last_log_id: str
+    log_count: int = Field(default=0)
+    # The state of ChatHistoryBuilder: {"history": [...], "pending": message or None}
+    state: Dict = Field(sa_column=Column(JSON))
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+class UsageRollup(SQLModel, table=True):
+    """LLM usage summed from a thread's completion_end events, one row per thread, agent,
+    user, model and (UTC) day. Maintained as thread logs are written, so usage queries
+    aggregate these rows instead of the logs."""
+    __tablename__ = "usage_rollups"
+
+    thread_id: str = Field(primary_key=True, foreign_key="threads.id")
+    agent_id: str = Field(primary_key=True, index=True)
+    user_id: str = Field(primary_key=True, index=True)
+    model: str = Field(primary_key=True, index=True)
+    day: date = Field(primary_key=True, index=True)
+    input_tokens: int = Field(default=0)
+    output_tokens: int = Field(default=0)
+    cost: float = Field(default=0)
+    elapsed_time: float = Field(default=0)
+    call_count: int = Field(default=0)
@@ -0,0 +1,176 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from queue import Empty, Full
+from typing import Any, AsyncGenerator, Generator, Optional
+
+# How many undelivered events a request may buffer before its agent thread waits for the consumer
+DEFAULT_EVENT_BUFFER = int(os.environ.get("AGENTIC_EVENT_BUFFER", "10000"))
+# How long a full buffer may go unread before the consumer is considered gone (0 waits forever)
+DEFAULT_PUT_TIMEOUT = float(os.environ.get("AGENTIC_EVENT_BUFFER_TIMEOUT", "300"))
+
+logger = logging.getLogger(__name__)
+
+
+class EventChannel:
+    """
+    Carries the events of one request from the agent thread that produces them to the
+    consumer reading them. Either side can be a plain thread (`put`, `get`, `__iter__`) or a
+    coroutine (`aput`, `aget`, `__aiter__`); coroutines wait without blocking their event loop.
+
+    The channel is bounded: when `maxsize` events are waiting, `put` blocks the producer
+    until the consumer catches up. If the consumer goes away it calls `cancel`, after
+    which the producer is released and any further events are dropped. A consumer that
+    never reads (or never shows up) can't cancel, so if the buffer stays full for
+    `put_timeout` seconds the channel cancels itself.
+
+    `put` has the same signature as `Queue.put`, so the channel can be handed to code
+    that publishes into a queue (like `ThreadContext.log`).
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_EVENT_BUFFER, put_timeout: float = DEFAULT_PUT_TIMEOUT):
+        self.maxsize = maxsize
+        self.put_timeout = put_timeout if put_timeout > 0 else None
+        self._items: deque = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._cancelled = False
+        # When the channel was closed, on the time.monotonic() clock
+        self.closed_at: Optional[float] = None
+        self._async_waiters: list[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    def put(self, event: Any, block: bool = True, timeout: Optional[float] = None) -> None:
+        """Publish an event. Raises `queue.Full` if the buffer stays full for `timeout` seconds.
+        Without a `timeout`, the channel is cancelled after waiting `put_timeout` seconds."""
+        with self._cond:
+            if self.maxsize > 0 and len(self._items) >= self.maxsize and not self._cancelled:
+                if not block:
+                    raise Full
+                if not self._cond.wait_for(
+                    lambda: len(self._items) < self.maxsize or self._cancelled,
+                    timeout if timeout is not None else self.put_timeout,
+                ):
+                    if timeout is not None:
+                        raise Full
+                    self._abandon()
+            if self._cancelled or self._closed:
+                return
+            self._items.append(event)
+            self._notify()
+
+    async def aput(self, event: Any) -> None:
+        """Publish an event from a coroutine. When the buffer is full this waits for the
+        consumer without blocking the event loop."""
+        loop = asyncio.get_running_loop()
+        deadline = None if self.put_timeout is None else loop.time() + self.put_timeout
+        while True:
+            with self._cond:
+                if self.maxsize <= 0 or len(self._items) < self.maxsize or self._cancelled:
+                    if self._cancelled or self._closed:
+                        return
+                    self._items.append(event)
+                    self._notify()
+                    return
+                if deadline is not None and loop.time() >= deadline:
+                    self._abandon()
+                    continue
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            try:
+                await asyncio.wait_for(waiter, None if deadline is None else deadline - loop.time())
+            except asyncio.TimeoutError:
+                pass
+
+    def close(self) -> None:
+        """Called by the producer when there will be no more events"""
+        with self._cond:
+            self._closed = True
+            self.closed_at = self.closed_at or time.monotonic()
+            self._notify()
+
+    def cancel(self) -> None:
+        """Called by the consumer when it stops listening. Releases a blocked producer."""
+        with self._cond:
+            self._cancelled = True
+            self._closed = True
+            self.closed_at = self.closed_at or time.monotonic()
+            self._items.clear()
+            self._notify()
+
+    def _abandon(self):
+        logger.warning(
+            "No one read this request's events for %ss; dropping them. "
+            "Set AGENTIC_EVENT_BUFFER_TIMEOUT to wait longer.", self.put_timeout
+        )
+        self.cancel()
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        """Return the next event, blocking the calling thread. Raises `EOFError` once the
+        channel is closed and drained, or `queue.Empty` after `timeout` seconds."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._items or self._closed, timeout):
+                raise Empty
+            return self._pop()
+
+    async def aget(self) -> Any:
+        """Return the next event without blocking the event loop. Raises `EOFError` once
+        the channel is closed and drained."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._cond:
+                if self._items or self._closed:
+                    return self._pop()
+                waiter = loop.create_future()
+                self._async_waiters.append((loop, waiter))
+            await waiter
+
+    def __iter__(self) -> Generator[Any, Any, None]:
+        while True:
+            try:
+                yield self.get()
+            except EOFError:
+                return
+
+    async def __aiter__(self) -> AsyncGenerator[Any, None]:
+        while True:
+            try:
+                yield await self.aget()
+            except EOFError:
+                return
+
+    def _pop(self) -> Any:
+        if not self._items:
+            raise EOFError
+        item = self._items.popleft()
+        # Wake a producer waiting for room
+        self._notify()
+        return item
+
+    def _notify(self):
+        self._cond.notify_all()
+        waiters, self._async_waiters = self._async_waiters, []
+        for loop, waiter in waiters:
+            try:
+                loop.call_soon_threadsafe(_wake, waiter)
+            except RuntimeError:
+                # The consumer's loop has been closed
+                pass
+
+
+def _wake(waiter: asyncio.Future):
+    if not waiter.done():
+        waiter.set_result(None)
@@ -5,11 +5,12 @@ import json
 from pprint import pformat
 from datetime import timedelta
 from litellm.types.utils import Message
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
 from typing import Any, Optional, Dict
 
 from .swarm.types import Result, DebugLevel
 from agentic.db.models import ThreadLog
+from agentic.utils.json import dumps, loads
 
 
 # Shutup stupid pydantic warnings
@@ -25,6 +26,46 @@ class Event(BaseModel):
         arbitrary_types_allowed=True
     )
 
+    # The serialized forms, computed once and shared by the API stream and the thread log.
+    # Events shouldn't be changed once they are published; the setters below reset these.
+    _json_payload: Any = PrivateAttr(default=None)
+    _encoded: Optional[bytes] = PrivateAttr(default=None)
+
+    def _init_unvalidated(self, **fields):
+        """Set the fields without pydantic validation, for events built once per streamed token"""
+        object.__setattr__(self, "__dict__", fields)
+        object.__setattr__(self, "__pydantic_fields_set__", set(fields))
+        object.__setattr__(self, "__pydantic_extra__", None)
+        object.__setattr__(self, "__pydantic_private__", {"_json_payload": None, "_encoded": None})
+
+    def _reset_encoding(self):
+        # Private attributes are read through __pydantic_private__ directly, since
+        # attribute access to them is slow enough to show up per token
+        self.__pydantic_private__.update(_json_payload=None, _encoded=None)
+
+    def json_payload(self) -> Any:
+        """The payload converted to JSON-safe values. Don't modify the result."""
+        private = self.__pydantic_private__
+        if private["_json_payload"] is None:
+            private["_json_payload"] = loads(dumps(self.payload))
+        return private["_json_payload"]
+
+    def to_dict(self) -> dict:
+        """The event as sent to API clients"""
+        return {
+            "type": self.type,
+            "agent": self.agent,
+            "depth": self.depth,
+            "payload": self.json_payload(),
+        }
+
+    def encode(self) -> bytes:
+        """The event as JSON bytes (see `to_dict`), encoded once and cached"""
+        private = self.__pydantic_private__
+        if private["_encoded"] is None:
+            private["_encoded"] = dumps(self.to_dict())
+        return private["_encoded"]
+
     def to_llm_message(self) -> Optional[Message]:
         """Convert event to LLM message format if applicable"""
         return None
@@ -97,6 +138,7 @@ class Prompt(Event):
     # Make a set method for 'message'
     def set_message(self, message: str):
         self.payload = message
+        self._reset_encoding()
 
     @classmethod
     def from_thread_log(cls, log: 'ThreadLog') -> Optional['Prompt']:
@@ -210,8 +252,7 @@ class Output(Event):
 
 class ChatOutput(Output):
     def __init__(self, agent: str, payload: dict, depth: int = 0):
-        super().__init__(agent=agent, message=payload, depth=depth)
-        self.type = "chat_output"
+        self._init_unvalidated(agent=agent, type="chat_output", payload=payload, depth=depth)
 
     @classmethod
     def assistant_message(cls, agent: str, content: str, depth: int = 0):
@@ -255,6 +296,8 @@ class ChatOutput(Output):
 class ToolCall(Event):
     arguments: dict = {}
     tool_call_id: str = None
+    # Seconds the tool ran for, set by the agent once the call finishes. Not serialized.
+    elapsed: Optional[float] = Field(default=None, exclude=True)
 
     def __init__(self, agent: str, name: str, arguments: dict, depth: int = 0, tool_call_id: str = None):
         super().__init__(
@@ -336,6 +379,9 @@ class ToolResult(Event):
         name = self.payload["name"]
         return "  " * (self.depth + 1) + f"[TOOL: {name}] <<\n{self.result}]\n"
 
+    def to_dict(self) -> dict:
+        return super().to_dict() | {"result": self.json_payload()["result"]}
+
     def to_llm_message(self) -> Optional[Dict[str, Any]]:
         """Convert event to LLM message format"""
         # Skip log messages
@@ -538,7 +584,11 @@ class FinishCompletion(Event):
     INPUT_TOKENS_KEY: typing.ClassVar[str] = "input_tokens"
     OUTPUT_TOKENS_KEY: typing.ClassVar[str] = "output_tokens"
     ELAPSED_TIME_KEY: typing.ClassVar[str] = "elapsed_time"
+    # Seconds until the first streamed chunk arrived
+    TTFT_KEY: typing.ClassVar[str] = "time_to_first_token"
     REASONING_CONTENT_KEY: typing.ClassVar[str] = "reasoning_content"
+    # "hit", "semantic_hit" or "miss" when the completion cache is enabled
+    CACHE_KEY: typing.ClassVar[str] = "cache"
     usage: dict = {}
     metadata: dict = {}
     llm_message: Message = None
@@ -588,6 +638,8 @@ class FinishCompletion(Event):
         elapsed_time: float | None,
         depth: int = 0,
         reasoning_content: str = None,
+        cache: str = None,
+        time_to_first_token: float | None = None,
     ):
         usage = {
             cls.MODEL_KEY: model,
@@ -596,6 +648,10 @@ class FinishCompletion(Event):
             cls.OUTPUT_TOKENS_KEY: output_tokens or 0,
             cls.ELAPSED_TIME_KEY: elapsed_time or 0,
         }
+        if cache:
+            usage[cls.CACHE_KEY] = cache
+        if time_to_first_token is not None:
+            usage[cls.TTFT_KEY] = time_to_first_token
 
         metadata = {}
         
@@ -674,6 +730,7 @@ class TurnEnd(Event):
 
     def set_result(self, result: Any):
         self.messages[-1]['content'] = result
+        self._reset_encoding()
 
     @property
     def thread_context(self):
@@ -8,7 +8,7 @@ from .agentic_secrets import agentic_secrets
 from litellm import completion
 import litellm
 from litellm import token_counter
-from jinja2 import Template
+from .utils.template import render_template
 from dataclasses import dataclass
 from pydantic import BaseModel
 
@@ -64,8 +64,7 @@ def llm_generate(prompt: str, **kwargs) -> str:
 
     model = kwargs.get("model") or DEFAULT_MODEL
     setup_model_key(model)
-    template = Template(prompt)
-    prompt = template.render(**kwargs)
+    prompt = render_template(prompt, kwargs)
 
     msg = {"content": prompt, "role": "user"}
     response = completion(model=model, messages=[msg])
@@ -99,8 +98,7 @@ def llm_generate_with_format(prompt: str, return_format: Type[T], **kwargs) -> T
 
     model = kwargs.get("model") or DEFAULT_MODEL
     setup_model_key(model)
-    template = Template(prompt)
-    prompt = template.render(**kwargs)
+    prompt = render_template(prompt, kwargs)
 
     msg = {"content": prompt, "role": "user"}
 
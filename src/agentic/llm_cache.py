@@ -0,0 +1,320 @@
+# An opt-in on-disk cache for LLM completions. Enable it per agent with Agent(llm_cache="exact")
+# or for every agent with AGENTIC_LLM_CACHE=exact|semantic.
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncGenerator, AsyncIterable, Generator, Iterable, Optional
+
+import numpy as np
+from litellm.types.utils import ModelResponse, ModelResponseStream
+
+CACHE_MODES = ("exact", "semantic")
+DEFAULT_CACHE_PATH = "~/.agentic/llm_cache.db"
+DEFAULT_TTL_SECONDS = float(os.environ.get("AGENTIC_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+DEFAULT_MAX_ENTRIES = int(os.environ.get("AGENTIC_LLM_CACHE_MAX_ENTRIES", "10000"))
+DEFAULT_MAX_BYTES = int(float(os.environ.get("AGENTIC_LLM_CACHE_MAX_MB", "256")) * 1024 * 1024)
+DEFAULT_SIMILARITY = float(os.environ.get("AGENTIC_LLM_CACHE_SIMILARITY", "0.97"))
+DEFAULT_EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+
+# Completion parameters that don't change the response
+_IGNORED_PARAMS = {"messages", "stream", "stream_options"}
+
+HIT = "hit"
+SEMANTIC_HIT = "semantic_hit"
+MISS = "miss"
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    semantic_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+
+
+def _json_default(value: Any):
+    if isinstance(value, type) and hasattr(value, "model_json_schema"):
+        # A pydantic response_format class
+        return value.model_json_schema()
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+def _canonical(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, default=_json_default)
+
+
+def _as_dict(message: Any) -> dict:
+    return message.model_dump() if hasattr(message, "model_dump") else message
+
+
+def _split_prompt(messages: list) -> tuple[list, str]:
+    """Splits the messages into the latest user turn's text and everything else (the
+    system prompt, earlier turns and any tool calls after the user turn)."""
+    for index in range(len(messages) - 1, -1, -1):
+        message = _as_dict(messages[index])
+        if message.get("role") == "user":
+            content = message.get("content")
+            if not isinstance(content, str):
+                content = _canonical(content)
+            return messages[:index] + messages[index + 1:], content
+    return messages, ""
+
+
+class CompletionCache:
+    """
+    Caches completion responses in a SQLite file, keyed on the model, messages, tools,
+    response_format and the other parameters that shape the response.
+
+    Streamed responses are stored as their chunk sequence and replayed chunk by chunk,
+    so callers can't tell a cached stream from a live one. Entries expire after
+    `ttl_seconds`, and the least recently used entries are evicted once there are more
+    than `max_entries` or they take more than `max_bytes`.
+
+    With `semantic=True`, a request that misses the exact key can still be served by a
+    cached response to a similar prompt: same model, parameters and conversation up to
+    the latest user turn, and a user turn whose embedding has cosine similarity of at
+    least `similarity`. Only that turn is embedded, since the embedding model truncates
+    long input and a long system prompt would make every conversation look alike.
+    Embeddings come from the fastembed model used for RAG.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE_PATH,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        semantic: bool = False,
+        similarity: float = DEFAULT_SIMILARITY,
+        embedding_model: str = DEFAULT_EMBEDDING_MODEL,
+    ):
+        self.path = Path(path).expanduser()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.semantic = semantic
+        self.similarity = similarity
+        self.embedding_model = embedding_model
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._stats = CacheStats()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS completions ("
+                "key TEXT PRIMARY KEY, scope TEXT, created REAL, accessed REAL, "
+                "size INTEGER, response TEXT, embedding BLOB)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS completions_scope ON completions (scope)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS completions_accessed ON completions (accessed)")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def keys(params: dict) -> tuple[str, str, str]:
+        """Returns (key, scope, prompt). The scope covers every parameter and message except
+        the latest user turn, `prompt`, so semantic matches are only considered between
+        otherwise identical requests."""
+        shaping = {k: v for k, v in params.items() if k not in _IGNORED_PARAMS and v is not None}
+        messages = list(params.get("messages", []))
+        context, prompt = _split_prompt(messages)
+        scope = hashlib.sha256((_canonical(shaping) + _canonical(context)).encode()).hexdigest()
+        key = hashlib.sha256((scope + _canonical(messages)).encode()).hexdigest()
+        return key, scope, prompt
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(**self._stats.__dict__)
+
+    def lookup(self, params: dict) -> tuple[Optional[Any], str]:
+        """Returns (response, status). On a hit the response is rebuilt the way the
+        request asked for it: a chunk iterator for `stream=True`, otherwise a ModelResponse."""
+        key, scope, prompt = self.keys(params)
+        stored, status = self._get(key), HIT
+        if stored is None and self.semantic:
+            stored, status = self._get_similar(scope, prompt), SEMANTIC_HIT
+
+        response = None
+        if stored is not None:
+            # A response is only reused in the form it was cached in
+            if params.get("stream") and stored["kind"] == "stream":
+                response = _replay(stored["chunks"])
+            elif not params.get("stream") and stored["kind"] == "response":
+                response = ModelResponse(**stored["response"])
+
+        with self._lock:
+            if response is None:
+                self._stats.misses += 1
+                return None, MISS
+            if status == HIT:
+                self._stats.hits += 1
+            else:
+                self._stats.semantic_hits += 1
+        return response, status
+
+    def record(self, params: dict, response: Any) -> Any:
+        """Cache a live response. Streams are wrapped so they are stored once they have
+        been read to the end; the wrapper yields the same chunks."""
+        key, scope, prompt = self.keys(params)
+        if params.get("stream"):
+            return self._record_stream(key, scope, prompt, response)
+        self._put(key, scope, prompt, {"kind": "response", "response": json.loads(response.model_dump_json(warnings=False))})
+        return response
+
+    def _record_stream(self, key: str, scope: str, prompt: str, stream: Iterable) -> Generator[Any, None, None]:
+        chunks = []
+        for chunk in stream:
+            chunks.append(json.loads(chunk.model_dump_json(warnings=False)))
+            yield chunk
+        self._put(key, scope, prompt, {"kind": "stream", "chunks": chunks})
+
+    async def record_async(self, params: dict, response: Any) -> Any:
+        """Like record, for responses from litellm.acompletion. Streams are wrapped in an
+        async generator, and the store happens off the event loop."""
+        key, scope, prompt = self.keys(params)
+        if params.get("stream"):
+            return self._record_async_stream(key, scope, prompt, response)
+        stored = {"kind": "response", "response": json.loads(response.model_dump_json(warnings=False))}
+        await asyncio.to_thread(self._put, key, scope, prompt, stored)
+        return response
+
+    async def _record_async_stream(
+        self, key: str, scope: str, prompt: str, stream: AsyncIterable
+    ) -> AsyncGenerator[Any, None]:
+        chunks = []
+        async for chunk in stream:
+            chunks.append(json.loads(chunk.model_dump_json(warnings=False)))
+            yield chunk
+        await asyncio.to_thread(self._put, key, scope, prompt, {"kind": "stream", "chunks": chunks})
+
+    def _get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT response, created FROM completions WHERE key=?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if self._expired(row[1]):
+                conn.execute("DELETE FROM completions WHERE key=?", (key,))
+                conn.commit()
+                return None
+            conn.execute("UPDATE completions SET accessed=? WHERE key=?", (time.time(), key))
+            conn.commit()
+            return json.loads(row[0])
+
+    def _get_similar(self, scope: str, prompt: str) -> Optional[dict]:
+        query = self._embed(prompt)
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT key, embedding, created FROM completions "
+                "WHERE scope=? AND embedding IS NOT NULL",
+                (scope,),
+            ).fetchall()
+        rows = [row for row in rows if not self._expired(row[2])]
+        if not rows:
+            return None
+        vectors = np.stack([np.frombuffer(row[1], dtype=np.float32) for row in rows])
+        scores = vectors @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity:
+            return None
+        return self._get(rows[best][0])
+
+    def _put(self, key: str, scope: str, prompt: str, stored: dict):
+        response = json.dumps(stored)
+        embedding = None
+        if self.semantic:
+            embedding = self._embed(prompt).tobytes()
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO completions "
+                "(key, scope, created, accessed, size, response, embedding) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, scope, now, now, len(response), response, embedding),
+            )
+            self._stats.stores += 1
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection):
+        evicted = conn.execute(
+            "DELETE FROM completions WHERE created < ?", (time.time() - self.ttl_seconds,)
+        ).rowcount
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+        if count > self.max_entries or total > self.max_bytes:
+            doomed = []
+            for key, size in conn.execute("SELECT key, size FROM completions ORDER BY accessed"):
+                if count <= self.max_entries and total <= self.max_bytes:
+                    break
+                doomed.append((key,))
+                count -= 1
+                total -= size
+            conn.executemany("DELETE FROM completions WHERE key=?", doomed)
+            evicted += len(doomed)
+        self._stats.evictions += evicted
+
+    def _expired(self, created: float) -> bool:
+        return time.time() - created > self.ttl_seconds
+
+    def _embed(self, text: str) -> np.ndarray:
+        from agentic.utils.rag_helper import rag_resources
+
+        model = rag_resources.get_embedding_model(self.embedding_model)
+        vector = np.asarray(next(iter(model.embed([text]))), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def clear(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM completions")
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def _replay(chunks: list[dict]) -> Generator[ModelResponseStream, None, None]:
+    for chunk in chunks:
+        yield ModelResponseStream(**chunk)
+
+
+_caches: dict[str, CompletionCache] = {}
+_caches_lock = threading.Lock()
+
+
+def completion_caches() -> dict[str, CompletionCache]:
+    """The caches created in this process, by mode"""
+    with _caches_lock:
+        return dict(_caches)
+
+
+def get_completion_cache(mode: Optional[str] = None) -> Optional[CompletionCache]:
+    """The process-wide cache for `mode` ("exact" or "semantic"). With no mode, the
+    AGENTIC_LLM_CACHE setting is used. Returns None when caching is off."""
+    mode = mode if mode is not None else os.environ.get("AGENTIC_LLM_CACHE", "")
+    mode = mode.lower()
+    if mode not in CACHE_MODES:
+        return None
+    with _caches_lock:
+        if mode not in _caches:
+            _caches[mode] = CompletionCache(semantic=(mode == "semantic"))
+        return _caches[mode]
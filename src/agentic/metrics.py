@@ -0,0 +1,293 @@
+# In-process operational metrics, served in the Prometheus text format by the API server at
+# /metrics. Counters and histograms are updated as events pass through each agent's turn loop
+# (see TurnMetrics) and by the API server's middleware. The request queue, thread log and
+# completion cache numbers are read from their own stats when the metrics are scraped.
+import bisect
+import threading
+from typing import Callable, Iterable, Optional
+
+from agentic.events import Event, FinishCompletion, ToolCall, ToolError, ToolResult
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+# Reads the current values of a collected metric, keyed by label values
+Collector = Callable[[], dict[tuple, float]]
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), collect: Optional[Collector] = None):
+        self.name = name
+        self.help = help
+        self.label_names = labels
+        self.collect = collect
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def value(self, *labels) -> float:
+        with self._lock:
+            return self._values.get(tuple(labels), 0.0)
+
+    def samples(self) -> Iterable[tuple[str, tuple, float]]:
+        """(name suffix, label values, value) for each series"""
+        if self.collect is not None:
+            values = self.collect()
+        else:
+            with self._lock:
+                values = dict(self._values)
+        for labels, value in values.items():
+            yield "", labels, value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.label_names, labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+
+class Gauge(Metric):
+    kind = "gauge"
+
+    def set(self, value: float, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels, amount: float = 1.0):
+        self.inc(*labels, amount=-amount)
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> [count per bucket (the last one is +Inf), sum, count]
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, *labels) -> int:
+        with self._lock:
+            series = self._series.get(tuple(labels))
+            return series[2] if series else 0
+
+    def samples(self) -> Iterable[tuple[str, tuple, float]]:
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield "_bucket", labels + (_format_value(bound),), cumulative
+            yield "_sum", labels, total
+            yield "_count", labels, count
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        bucket_labels = self.label_names + ("le",)
+        for suffix, labels, value in self.samples():
+            names = bucket_labels if suffix == "_bucket" else self.label_names
+            lines.append(f"{self.name}{suffix}{_format_labels(names, labels)} {_format_value(value)}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: list[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help: str, labels: tuple[str, ...] = (), collect: Optional[Collector] = None) -> Counter:
+        return self.register(Counter(name, help, labels, collect))
+
+    def gauge(self, name: str, help: str, labels: tuple[str, ...] = (), collect: Optional[Collector] = None) -> Gauge:
+        return self.register(Gauge(name, help, labels, collect))
+
+    def histogram(self, name: str, help: str, labels: tuple[str, ...] = (), buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help, labels, buckets))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                print(f"Error collecting metric {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_labels(names: tuple[str, ...], values: tuple) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value) -> str:
+    return str("" if value is None else value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, int) or float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _executor_stats():
+    from agentic.request_executor import request_executor
+
+    return request_executor.stats()
+
+
+def _event_sink_totals(field: str) -> dict[tuple, float]:
+    from agentic.db.event_sink import event_sinks
+
+    return {(): sum(getattr(sink.stats, field) for sink in event_sinks())}
+
+
+def _completion_cache_lookups() -> dict[tuple, float]:
+    from agentic.llm_cache import completion_caches
+
+    values = {}
+    for mode, cache in completion_caches().items():
+        stats = cache.stats()
+        values[(mode, "hit")] = stats.hits
+        values[(mode, "semantic_hit")] = stats.semantic_hits
+        values[(mode, "miss")] = stats.misses
+    return values
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "agentic_http_requests_total", "HTTP requests handled by the API server", ("agent", "endpoint", "method", "status")
+)
+HTTP_REQUEST_SECONDS = registry.histogram(
+    "agentic_http_request_duration_seconds", "Time to handle an HTTP request, including streaming the response",
+    ("agent", "endpoint"),
+)
+HTTP_REQUESTS_ACTIVE = registry.gauge("agentic_http_requests_active", "HTTP requests being handled")
+
+TURNS_ACTIVE = registry.gauge("agentic_agent_turns_active", "Agent turns running", ("agent",))
+REQUESTS_RUNNING = registry.gauge(
+    "agentic_agent_requests_running", "Requests running on the request executor", ("agent",),
+    collect=lambda: {(key,): count for key, count in _executor_stats().running_by_key.items()},
+)
+REQUESTS_QUEUED = registry.gauge(
+    "agentic_agent_requests_queued", "Requests waiting for a slot on the request executor", ("agent",),
+    collect=lambda: {(key,): count for key, count in _executor_stats().queued_by_key.items()},
+)
+REQUESTS_REJECTED = registry.counter(
+    "agentic_agent_requests_rejected_total", "Requests rejected because the request queue was full",
+    collect=lambda: {(): _executor_stats().rejected},
+)
+
+COMPLETIONS = registry.counter(
+    "agentic_llm_completions_total", "LLM completions", ("model", "cache")
+)
+COMPLETION_SECONDS = registry.histogram(
+    "agentic_llm_completion_duration_seconds", "Time for an LLM completion", ("model",)
+)
+TIME_TO_FIRST_TOKEN_SECONDS = registry.histogram(
+    "agentic_llm_time_to_first_token_seconds", "Time until the first streamed chunk of an LLM completion", ("model",)
+)
+LLM_TOKENS = registry.counter("agentic_llm_tokens_total", "LLM tokens used", ("model", "direction"))
+LLM_COST = registry.counter("agentic_llm_cost_dollars_total", "Estimated LLM cost", ("model",))
+CACHE_LOOKUPS = registry.counter(
+    "agentic_llm_cache_lookups_total", "Completion cache lookups", ("mode", "result"), collect=_completion_cache_lookups
+)
+
+TOOL_CALLS = registry.counter("agentic_tool_calls_total", "Tool calls", ("tool",))
+TOOL_ERRORS = registry.counter("agentic_tool_errors_total", "Tool calls that raised an error", ("tool",))
+TOOL_CALL_SECONDS = registry.histogram("agentic_tool_call_duration_seconds", "Time a tool call ran", ("tool",))
+
+THREAD_LOG_WRITE_SECONDS = registry.histogram(
+    "agentic_thread_log_write_seconds", "Time to write a batch of thread log rows"
+)
+THREAD_LOG_ROWS = registry.counter(
+    "agentic_thread_log_rows_written_total", "Thread log rows written",
+    collect=lambda: _event_sink_totals("rows_written"),
+)
+THREAD_LOG_QUEUE_DEPTH = registry.gauge(
+    "agentic_thread_log_queue_depth", "Thread log events waiting to be written",
+    collect=lambda: _event_sink_totals("queue_depth"),
+)
+THREAD_LOG_WRITE_ERRORS = registry.counter(
+    "agentic_thread_log_write_errors_total", "Failed thread log writes",
+    collect=lambda: _event_sink_totals("write_errors"),
+)
+THREAD_LOG_ROWS_DROPPED = registry.counter(
+    "agentic_thread_log_rows_dropped_total", "Thread log rows lost in failed writes",
+    collect=lambda: _event_sink_totals("events_dropped"),
+)
+
+
+class TurnMetrics:
+    """Updates the metrics from the events of one agent turn, including its sub-agents' events.
+    Tool calls are timed from their ToolCall event to the matching ToolResult."""
+
+    def __init__(self, agent: str):
+        self.agent = agent
+        self._tool_calls: dict[str, ToolCall] = {}
+        TURNS_ACTIVE.inc(agent)
+
+    def observe(self, event: Event):
+        kind = type(event)
+        if kind is FinishCompletion:
+            self._completion(event.usage)
+        elif kind is ToolCall:
+            self._tool_calls[event.tool_call_id] = event
+        elif kind is ToolError:
+            TOOL_ERRORS.inc(event.payload["name"])
+        elif kind is ToolResult:
+            call = self._tool_calls.pop(event.tool_call_id, None)
+            if call is not None:
+                name = call.payload["name"]
+                TOOL_CALLS.inc(name)
+                if call.elapsed is not None:
+                    TOOL_CALL_SECONDS.observe(call.elapsed, name)
+
+    def _completion(self, usage: dict):
+        model = usage.get(FinishCompletion.MODEL_KEY) or ""
+        COMPLETIONS.inc(model, usage.get(FinishCompletion.CACHE_KEY) or "")
+        elapsed = usage.get(FinishCompletion.ELAPSED_TIME_KEY)
+        if elapsed:
+            COMPLETION_SECONDS.observe(elapsed, model)
+        ttft = usage.get(FinishCompletion.TTFT_KEY)
+        if ttft is not None:
+            TIME_TO_FIRST_TOKEN_SECONDS.observe(ttft, model)
+        LLM_TOKENS.inc(model, "input", amount=usage.get(FinishCompletion.INPUT_TOKENS_KEY) or 0)
+        LLM_TOKENS.inc(model, "output", amount=usage.get(FinishCompletion.OUTPUT_TOKENS_KEY) or 0)
+        if usage.get(FinishCompletion.COST_KEY):
+            LLM_COST.inc(model, amount=usage[FinishCompletion.COST_KEY])
+
+    def close(self):
+        TURNS_ACTIVE.dec(self.agent)
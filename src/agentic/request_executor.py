@@ -0,0 +1,245 @@
+import bisect
+import contextvars
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+# How many agent requests may run at once in this process
+DEFAULT_MAX_REQUESTS = int(os.environ.get("AGENTIC_MAX_CONCURRENT_REQUESTS", "32"))
+# How many requests each agent may run at once. 0 means only the global limit applies.
+DEFAULT_MAX_AGENT_REQUESTS = int(os.environ.get("AGENTIC_MAX_AGENT_REQUESTS", "0"))
+# How many requests may wait for a free slot before new ones are rejected
+DEFAULT_MAX_QUEUED = int(os.environ.get("AGENTIC_MAX_QUEUED_REQUESTS", "256"))
+# How long a finished request's events are kept for a client that hasn't collected them
+REQUEST_RETENTION = float(os.environ.get("AGENTIC_REQUEST_RETENTION", "600"))
+# Idle worker threads exit after this many seconds
+WORKER_IDLE_TIMEOUT = 60.0
+
+
+class RequestRejected(Exception):
+    """Raised by `RequestExecutor.submit` when the admission queue is full."""
+
+    def __init__(self, message: str, queued: int, running: int):
+        super().__init__(message)
+        self.queued = queued
+        self.running = running
+
+
+@dataclass
+class ExecutorStats:
+    running: int = 0
+    queued: int = 0
+    workers: int = 0
+    submitted: int = 0
+    rejected: int = 0
+    completed: int = 0
+    failed: int = 0
+    # Inline requests are sub-agent calls which bypass the queue (see `submit`)
+    inline: int = 0
+    wait_seconds_total: float = 0.0
+    wait_seconds_max: float = 0.0
+    running_by_key: dict[str, int] = field(default_factory=dict)
+    queued_by_key: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def wait_seconds_avg(self) -> float:
+        started = self.submitted - self.queued - self.inline
+        return self.wait_seconds_total / started if started > 0 else 0.0
+
+
+@dataclass(order=True)
+class _Job:
+    priority: int
+    seq: int
+    key: str = field(compare=False)
+    limit: int = field(compare=False)
+    fn: Callable = field(compare=False)
+    args: tuple = field(compare=False)
+    submitted_at: float = field(compare=False)
+    context: contextvars.Context = field(compare=False)
+
+
+# The executor running the current request. It's a context variable rather than a thread
+# local so it follows the request onto the threads its tool calls run on.
+_current_executor: contextvars.ContextVar[Optional["RequestExecutor"]] = contextvars.ContextVar(
+    "agentic_request_executor", default=None
+)
+
+
+class RequestExecutor:
+    """
+    Runs agent requests on a bounded pool of reusable worker threads.
+
+    At most `max_workers` requests run at once, and at most `max_per_key` for any one
+    key (the agent name). Requests beyond those limits wait in an admission queue, ordered
+    by priority (lower runs first) and then by arrival. Once `max_queued` requests are
+    waiting, `submit` raises `RequestRejected` so a server can answer 429.
+
+    A request submitted from inside a running request (a sub-agent call) runs immediately
+    on its own thread. Its parent is holding a slot while it waits for the result, so
+    queueing the child behind other requests could deadlock the pool.
+
+    Each request runs in a copy of the context it was submitted from, so context variables
+    (like the active tracing span) it sets can't leak into the next request on the thread.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_MAX_REQUESTS,
+        max_per_key: int = DEFAULT_MAX_AGENT_REQUESTS,
+        max_queued: int = DEFAULT_MAX_QUEUED,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.max_per_key = max_per_key
+        self.max_queued = max_queued
+        self._cond = threading.Condition()
+        self._pending: list[_Job] = []
+        self._seq = itertools.count()
+        self._running_by_key: dict[str, int] = {}
+        self._workers = 0
+        self._idle = 0
+        self._shutdown = False
+        self._stats = ExecutorStats()
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args,
+        key: str = "",
+        priority: int = 0,
+        limit: Optional[int] = None,
+    ) -> None:
+        """Queue `fn(*args)` to run. `limit` overrides `max_per_key` for this key."""
+        context = contextvars.copy_context()
+        if _current_executor.get() is self:
+            with self._cond:
+                self._stats.submitted += 1
+                self._stats.inline += 1
+            threading.Thread(target=context.run, args=(self._run_inline, fn, args), daemon=True).start()
+            return
+
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("RequestExecutor has been shut down")
+            if len(self._pending) >= self.max_queued:
+                self._stats.rejected += 1
+                raise RequestRejected(
+                    f"Too many requests: {len(self._pending)} waiting, {self._running()} running",
+                    queued=len(self._pending),
+                    running=self._running(),
+                )
+            job = _Job(
+                priority=priority,
+                seq=next(self._seq),
+                key=key,
+                limit=self.max_per_key if limit is None else limit,
+                fn=fn,
+                args=args,
+                submitted_at=time.monotonic(),
+                context=context,
+            )
+            bisect.insort(self._pending, job)
+            self._stats.submitted += 1
+            if self._idle > 0:
+                self._cond.notify_all()
+            if self._idle < len(self._pending) and self._workers < self.max_workers:
+                self._workers += 1
+                threading.Thread(target=self._worker, daemon=True, name="agentic-request").start()
+
+    def stats(self) -> ExecutorStats:
+        """A snapshot of the executor's counters and current load"""
+        with self._cond:
+            stats = ExecutorStats(**{
+                k: v for k, v in self._stats.__dict__.items()
+                if k not in ("running_by_key", "queued_by_key")
+            })
+            stats.running = self._running()
+            stats.queued = len(self._pending)
+            stats.workers = self._workers
+            stats.running_by_key = {k: v for k, v in self._running_by_key.items() if v}
+            for job in self._pending:
+                stats.queued_by_key[job.key] = stats.queued_by_key.get(job.key, 0) + 1
+            return stats
+
+    def shutdown(self, wait: bool = True, timeout: Optional[float] = None) -> None:
+        """Stop accepting requests. Requests already queued still run."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            if wait:
+                self._cond.wait_for(lambda: self._workers == 0, timeout)
+
+    def _running(self) -> int:
+        return sum(self._running_by_key.values())
+
+    def _next_job(self) -> Optional[_Job]:
+        # The queue is bounded, so a scan past keys at their limit is cheap
+        for index, job in enumerate(self._pending):
+            if job.limit <= 0 or self._running_by_key.get(job.key, 0) < job.limit:
+                return self._pending.pop(index)
+        return None
+
+    def _worker(self):
+        with self._cond:
+            while True:
+                job = self._next_job()
+                if job is None:
+                    if self._shutdown and not self._pending:
+                        break
+                    self._idle += 1
+                    woken = self._cond.wait(WORKER_IDLE_TIMEOUT)
+                    self._idle -= 1
+                    if not woken and not self._pending:
+                        break
+                    continue
+
+                waited = time.monotonic() - job.submitted_at
+                self._stats.wait_seconds_total += waited
+                self._stats.wait_seconds_max = max(self._stats.wait_seconds_max, waited)
+                self._running_by_key[job.key] = self._running_by_key.get(job.key, 0) + 1
+
+                self._cond.release()
+                try:
+                    job.context.run(self._run_job, job.fn, job.args)
+                    failed = False
+                except Exception as e:
+                    print(f"Error running request: {e}")
+                    failed = True
+                finally:
+                    self._cond.acquire()
+
+                self._running_by_key[job.key] -= 1
+                if failed:
+                    self._stats.failed += 1
+                else:
+                    self._stats.completed += 1
+                # A job for this key may have been waiting on its limit
+                self._cond.notify_all()
+
+            self._workers -= 1
+            self._cond.notify_all()
+
+    def _run_job(self, fn: Callable, args: tuple):
+        # Requests this one starts, from any thread that copies its context, run inline
+        _current_executor.set(self)
+        fn(*args)
+
+    def _run_inline(self, fn: Callable, args: tuple):
+        failed = False
+        try:
+            self._run_job(fn, args)
+        except Exception as e:
+            print(f"Error running request: {e}")
+            failed = True
+        with self._cond:
+            if failed:
+                self._stats.failed += 1
+            else:
+                self._stats.completed += 1
+
+
+# The process-wide executor shared by all agent proxies
+request_executor = RequestExecutor()
@@ -13,6 +13,7 @@ from rich.live import Live
 from rich.markdown import Markdown
 
 from agentic.actor_agents import BaseAgentProxy, _AGENT_REGISTRY
+from agentic.request_executor import request_executor, RequestRejected
 from agentic.utils.directory_management import get_runtime_directory
 from agentic.events import (
     DebugLevel,
@@ -191,6 +192,8 @@ class RayAgentRunner:
                 sys.exit(0)
             except KeyboardInterrupt:
                 print("\nKeyboardInterrupt. Type 'exit()' to quit.")
+            except RequestRejected as e:
+                print(f"Request rejected: {e}")
             except Exception as e:
                 traceback.print_exc()
                 print(f"Error: {e}")
@@ -274,6 +277,12 @@ class RayAgentRunner:
             for func in self.facade.list_functions():
                 print(f"  {func}")
 
+        elif line == ".requests":
+            stats = request_executor.stats()
+            print(f"running: {stats.running}  queued: {stats.queued}  workers: {stats.workers}")
+            print(f"completed: {stats.completed}  failed: {stats.failed}  rejected: {stats.rejected}")
+            print(f"queue wait avg: {stats.wait_seconds_avg:.3f}s  max: {stats.wait_seconds_max:.3f}s")
+
         elif line == ".reset":
             self.facade.reset_history()
             print("Session cleared")
@@ -297,6 +306,7 @@ class RayAgentRunner:
             .run <agent name> - switch the active agent
             .debug [<level>] - enable debug. Defaults to 'tools', or one of 'llm', 'tools', 'all', 'off'
             .settings - show the current config settings
+            .requests - show request concurrency and queue stats
             .help - Show this help
             .quit - Quit the REPL
             """
@@ -1,4 +1,6 @@
+import contextvars
 import time
+from contextlib import contextmanager
 from queue import Queue
 from openai.types.chat import ChatCompletionMessage
 from openai.types.chat.chat_completion_message_tool_call import (
@@ -15,6 +17,22 @@ from pydantic import BaseModel
 AgentFunction = Callable[[], Union[str, "SwarmAgent", dict]] | dict
 
 
+# The log buffer of the tool call running in this context. Tool calls can run concurrently,
+# so their logs are kept apart instead of in the ThreadContext they share.
+_tool_call_logs: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar("agentic_tool_call_logs", default=None)
+
+
+@contextmanager
+def capture_tool_logs():
+    """Collect the events that ThreadContext.log() queues in this context into the yielded list"""
+    logs: list = []
+    token = _tool_call_logs.set(logs)
+    try:
+        yield logs
+    finally:
+        _tool_call_logs.reset(token)
+
+
 def agent_secret_key(agent_name: str, key: str) -> str:
     return f"{agent_name}/{key}"
 
@@ -127,7 +145,9 @@ class ThreadContext:
         if self._event_queue:
             self._event_queue.put(event)
             time.sleep(0)
-        self._log_queue.append(event)
+        logs = _tool_call_logs.get()
+        # Outside a tool call (or on a thread the tool started itself) fall back to the shared queue
+        (logs if logs is not None else self._log_queue).append(event)
         return event
     
     def get_logs(self):
@@ -136,14 +156,20 @@ class ThreadContext:
     def reset_logs(self):
         self._log_queue = []
 
+    def take_logs(self) -> list:
+        """Return the shared queued logs and empty the queue"""
+        logs, self._log_queue = self._log_queue, []
+        return logs
+
     def set_setting(self, key, value):
         settings.set(self.agent_name + "/" + key, value)
 
     def get_secret(self, key, default=None):
-        return agentic_secrets.get_secret(
-            agent_secret_key(self.agent_name, key),
-            agentic_secrets.get_secret(key, self.get(key, default)),
-        )
+        # The agent-scoped secret wins, and the fallbacks are only looked up if it's missing
+        value = agentic_secrets.get_secret(agent_secret_key(self.agent_name, key))
+        if value is None:
+            value = agentic_secrets.get_secret(key, self.get(key, default))
+        return value
 
     def set_secret(self, key, value):
         return agentic_secrets.set_secret(
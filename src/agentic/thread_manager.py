@@ -1,44 +1,68 @@
 import json
+import re
 from typing import Optional, Dict, Callable, Any, List
 from uuid import uuid4
 from litellm import Message
 import traceback
+from agentic import tracing
 from .events import (
     Event,
     PromptStarted,
+    TurnEnd,
+    WaitForInput,
+    OAuthFlow,
 )
 from agentic.common import ThreadContext
-from agentic.db.models import ThreadLog
-from agentic.db.db_manager import DatabaseManager
+from agentic.db.models import ThreadLog, ThreadHistorySnapshot
+from agentic.db.db_manager import DatabaseManager, get_db_manager
+from agentic.db.event_sink import DEFAULT_DURABILITY, EventSink, Durability, check_durability, get_event_sink
 from agentic.events import ChatOutput
 from agentic.event_factory import EventFactory
 from agentic.utils.directory_management import get_runtime_filepath
+from agentic.utils.json import make_json_serializable
 
 class ThreadManager:
     """
     Context manager that tracks agent threads and logs events to the database.
     This is automatically initialized for all agents unless disabled with db_path=None.
+
+    Events are written through a shared write-behind EventSink, which batches inserts
+    and is flushed when a turn ends or pauses. See `agentic.db.event_sink` for the
+    durability modes.
     """
     
-    def __init__(self, initial_thread_id: Optional[str] = None, db_path: str = "agent_threads.db"):
+    def __init__(
+        self,
+        initial_thread_id: Optional[str] = None,
+        db_path: str = "agent_threads.db",
+        durability: Optional[Durability] = None,
+    ):
         self.initial_thread_id: Optional[str] = initial_thread_id
         # Should this not be propagated from the next_turn?
         self.db_path = get_runtime_filepath(db_path)
-        self.db_manager = DatabaseManager(db_path=self.db_path)
+        self.db_manager = get_db_manager(self.db_path)
+        # Fail here rather than on the first event, where logging errors are only printed
+        self.durability = check_durability(durability or DEFAULT_DURABILITY)
+
+    @property
+    def event_sink(self) -> EventSink:
+        return get_event_sink(self.db_manager, durability=self.durability)
     
     def handle_event(self, event: Event, thread_context: ThreadContext) -> None:
         """Generic event handler that processes all events and logs them appropriately"""
        # Initialize thread on first prompt
         if isinstance(event, PromptStarted):
             prompt = event.payload["content"] if isinstance(event.payload, dict) else str(event.payload)
-            thread = self.db_manager.get_thread(thread_id=self.initial_thread_id)
-            if not thread:
-                thread = self.db_manager.create_thread(
-                    thread_id=self.initial_thread_id,
-                    agent_id=thread_context.agent_name,
-                    user_id=str(thread_context.get("user") or "default"),
-                    initial_prompt=prompt,
-                )
+            with tracing.span("db.create_thread") as span:
+                thread = self.db_manager.get_thread(thread_id=self.initial_thread_id)
+                span.set_attribute("created", not thread)
+                if not thread:
+                    thread = self.db_manager.create_thread(
+                        thread_id=self.initial_thread_id,
+                        agent_id=thread_context.agent_name,
+                        user_id=str(thread_context.get("user") or "default"),
+                        initial_prompt=prompt,
+                    )
             thread_context.thread_id = thread.id
         
         # Skip if no thread initialized
@@ -50,15 +74,25 @@ class ThreadManager:
         
         # Just dump the entire event as JSON
         try:
-            self.db_manager.log_event(
+            self.event_sink.log_event(
                 thread_id=thread_context.thread_id,
                 agent_id=thread_context.agent_name,
                 user_id=str(thread_context.get("user") or "default"),
                 role=role,
                 depth=event.depth,
                 event_name=event.type,
-                event_data=event.payload
+                event_data=event.json_payload(),
+                serialized=True,
             )
+            # Make the turn durable before the caller can start the next one
+            if isinstance(event, (TurnEnd, WaitForInput, OAuthFlow)):
+                with tracing.span("db.flush", durability=self.event_sink.durability):
+                    self.event_sink.end_of_turn()
+            if isinstance(event, TurnEnd) and event.depth == 0:
+                thread_id = thread_context.thread_id
+                self.event_sink.call_after_writes(
+                    lambda: refresh_history_snapshot(self.db_manager, thread_id)
+                )
         except Exception as e:
             traceback.print_exc()
             print(f"Error logging event {event.type} for thread {thread_context.thread_id}: {e}.")
@@ -85,6 +119,49 @@ def disable_thread_tracking(agent) -> None:
 
 # Below is Claude-generated code for reconstructing chat history from thread logs
 
+class ChatHistoryBuilder:
+    """
+    Builds LLM chat history from thread logs one row at a time. Consecutive ChatOutput
+    deltas are collected into a single assistant message, which stays pending until the
+    next message arrives.
+
+    The builder's `state()` can be saved and used to construct a new builder later, so
+    history can be kept up to date by feeding it only the rows logged since.
+    """
+
+    def __init__(self, state: Optional[Dict[str, Any]] = None):
+        state = state or {}
+        self.history: List[Dict[str, Any]] = list(state.get("history") or [])
+        self._pending: Optional[Dict[str, Any]] = state.get("pending")
+        self._pending_parts: List[str] = [self._pending["content"]] if self._pending else []
+
+    def add(self, log: ThreadLog) -> None:
+        event = EventFactory.from_thread_log(log)
+        if not event:
+            return
+        llm_message = event.to_llm_message()
+        if not llm_message:
+            return
+        if isinstance(event, ChatOutput):
+            if self._pending is None:
+                self._pending = llm_message
+            self._pending_parts.append(llm_message["content"])
+        else:
+            if self._pending is not None:
+                self._pending["content"] = "".join(self._pending_parts)
+                self.history.append(self._pending)
+                self._pending = None
+                self._pending_parts = []
+            self.history.append(llm_message)
+
+    def state(self) -> Dict[str, Any]:
+        """A JSON-serializable copy of the builder's state"""
+        pending = None
+        if self._pending is not None:
+            pending = {**self._pending, "content": "".join(self._pending_parts)}
+        return make_json_serializable({"history": self.history, "pending": pending})
+
+
 def reconstruct_chat_history_from_thread_logs(thread_logs: List[ThreadLog]) -> List[Dict[str, Any]]:
     """
     Reconstruct LLM chat history from ThreadLog database records.
@@ -95,29 +172,72 @@ def reconstruct_chat_history_from_thread_logs(thread_logs: List[ThreadLog]) -> L
     Returns:
         List of chat messages in the format expected by the LLM
     """
-    history = []
-    current_assistant_message = None
-    
+    builder = ChatHistoryBuilder()
     for log in thread_logs:
-        event = EventFactory.from_thread_log(log)
-        if event:
-            llm_message = event.to_llm_message()
-            if llm_message:
-                # Compile chat outputs
-                if isinstance(event, ChatOutput):
-                    if current_assistant_message:
-                        current_assistant_message["content"] += llm_message["content"]
-                    else:
-                        current_assistant_message = llm_message
-                else:
-                    if current_assistant_message:
-                        history.append(current_assistant_message)
-                        current_assistant_message = None
-
-                    history.append(llm_message)
-    
+        builder.add(log)
+    return builder.history
+
+
+def refresh_history_snapshot(db_manager: DatabaseManager, thread_id: str) -> ChatHistoryBuilder:
+    """Bring the thread's history snapshot up to date by replaying the logs written since it
+    was taken (or all of them, if there is no snapshot yet). Returns the up to date builder."""
+    snapshot = db_manager.get_history_snapshot(thread_id)
+    if snapshot:
+        builder = ChatHistoryBuilder(snapshot.state)
+        log_count = snapshot.log_count
+        logs = db_manager.get_thread_logs_after(thread_id, snapshot.last_log_created_at, snapshot.last_log_id)
+    else:
+        builder = ChatHistoryBuilder()
+        log_count = 0
+        logs = db_manager.get_thread_logs(thread_id)
+
+    if logs:
+        for log in logs:
+            builder.add(log)
+        db_manager.save_history_snapshot(
+            ThreadHistorySnapshot(
+                thread_id=thread_id,
+                last_log_created_at=logs[-1].created_at,
+                last_log_id=logs[-1].id,
+                log_count=log_count + len(logs),
+                state=builder.state(),
+            )
+        )
+    return builder
+
+
+def load_chat_history(db_manager: DatabaseManager, thread_id: str) -> List[Dict[str, Any]]:
+    """The chat history of a thread, read from its snapshot plus any newer logs"""
+    return refresh_history_snapshot(db_manager, thread_id).history
+
+
+def check_history_snapshot(db_manager: DatabaseManager, thread_id: str) -> bool:
+    """Compare the snapshot-based history of a thread against a full reconstruction
+    from its logs. Returns True if they match."""
+    from_snapshot = refresh_history_snapshot(db_manager, thread_id).history
+    from_logs = reconstruct_chat_history_from_thread_logs(db_manager.get_thread_logs(thread_id))
+    return _comparable(from_snapshot) == _comparable(from_logs)
+
+
+def _comparable(history: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Tool calls logged without an id get a made up one each time they are reconstructed
+    history = make_json_serializable(history)
+    for message in history:
+        for call in message.get("tool_calls") or []:
+            if re.fullmatch(r"call_\d+", str(call.get("id"))):
+                call["id"] = None
     return history
 
+
+def rebuild_history_snapshots(db_manager: DatabaseManager, thread_id: Optional[str] = None) -> int:
+    """Discard and rebuild the history snapshots of one thread, or every thread.
+    Returns the number of threads rebuilt."""
+    thread_ids = [thread_id] if thread_id else db_manager.get_all_thread_ids()
+    for tid in thread_ids:
+        db_manager.delete_history_snapshots(tid)
+        refresh_history_snapshot(db_manager, tid)
+    return len(thread_ids)
+
 # NOT USED YET
 def reconstruct_chat_history_with_filtering(
     thread_logs: List[ThreadLog], 
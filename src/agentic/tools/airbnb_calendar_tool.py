@@ -1,11 +1,11 @@
 from typing import List, Callable, Optional, Dict
-import requests
 import json
 from datetime import datetime, date, timedelta, time
 import icalendar
 from agentic.common import ThreadContext
 from agentic.tools.utils.registry import tool_registry, Dependency
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.http_client import http_client
 
 @tool_registry.register(
     name="AirbnbCalendarTool",
@@ -62,7 +62,7 @@ class AirbnbCalendarTool(BaseAgenticTool):
             if calendar_url.startswith('webcal://'):
                 calendar_url = 'https://' + calendar_url[9:]
                 
-            response = requests.get(calendar_url)
+            response = http_client.get(calendar_url)
             if response.status_code != 200:
                 raise IOError(f"Failed to fetch calendar: HTTP {response.status_code}")
             
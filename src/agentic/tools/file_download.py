@@ -1,11 +1,10 @@
 from typing import Callable
 from urllib.parse import urlparse
-import httpx
 import aiofiles
 import html2text
-import requests
 
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.http_client import http_client
 from agentic.tools.utils.registry import tool_registry
 
 @tool_registry.register(
@@ -29,20 +28,19 @@ class FileDownloadTool(BaseAgenticTool):
         self, url: str, file_name_hint: str = ""
     ) -> tuple[str, str]:
         # Returns the saved file name, and the original URL mime type
-        async with httpx.AsyncClient(follow_redirects=True) as client:
-            r = await client.get(url)
-            save_file = file_name_hint or self.get_last_path_component(url)
+        r = await http_client.aget(url)
+        save_file = file_name_hint or self.get_last_path_component(url)
 
-            if r.status_code == 200:
-                mime_type = r.headers.get("content-type", "").split(";")[0]
+        if r.status_code == 200:
+            mime_type = r.headers.get("content-type", "").split(";")[0]
 
-                async with aiofiles.open(save_file, "wb") as f:
-                    async for chunk in r.aiter_bytes(chunk_size=8192):
-                        if chunk:
-                            await f.write(chunk)
-                return save_file, mime_type
-            else:
-                raise ValueError(f"Error: {r.status_code} {r.text}")
+            async with aiofiles.open(save_file, "wb") as f:
+                async for chunk in r.aiter_bytes(chunk_size=8192):
+                    if chunk:
+                        await f.write(chunk)
+            return save_file, mime_type
+        else:
+            raise ValueError(f"Error: {r.status_code} {r.text}")
 
     async def download_url_as_file(self, url: str, file_name_hint: str = "") -> str:
         """Downloads a file from the web and stores it locally. Returns the
@@ -70,7 +68,7 @@ class FileDownloadTool(BaseAgenticTool):
 
     def download_file_content(self, url: str, limit: int = 4000) -> str:
         """Downloads a file from the web and returns its contents directly."""
-        r = requests.get(url)
+        r = http_client.get(url)
 
         if r.status_code == 200:
             mime_type = r.headers.get("content-type") or ""
@@ -80,4 +78,4 @@ class FileDownloadTool(BaseAgenticTool):
             else:
                 return r.text[0:limit]
         else:
-            return f"Error: {r.status_code} {r.reason}"
+            return f"Error: {r.status_code} {r.reason_phrase}"
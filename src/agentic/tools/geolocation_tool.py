@@ -2,9 +2,9 @@ from typing import Callable, Dict, Optional
 import datetime
 
 import tzlocal
-import requests
 
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.http_client import http_client
 from agentic.tools.utils.registry import tool_registry
 
 @tool_registry.register(
@@ -73,7 +73,7 @@ class GeolocationTool(BaseAgenticTool):
         try:
             # Step 1: Get the public IP address
             # We use ipify.org, a simple and reliable service for this.
-            ip_response = requests.get('https://api.ipify.org?format=json')
+            ip_response = await http_client.aget('https://api.ipify.org?format=json')
             ip_response.raise_for_status()  # Raise an exception for bad status codes
             ip_data = ip_response.json()
             public_ip = ip_data['ip'] 
@@ -116,7 +116,7 @@ class GeolocationTool(BaseAgenticTool):
             
             # Get the location based on the IP address
             # We use ipinfo.io, which provides a free geolocation API.
-            location_response = requests.get(f'https://ipinfo.io/{ip}/json')
+            location_response = await http_client.aget(f'https://ipinfo.io/{ip}/json')
             location_response.raise_for_status()
             location_data = location_response.json()
 
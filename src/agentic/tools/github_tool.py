@@ -2,7 +2,9 @@ from typing import Any, Callable, List, Dict, Optional, Tuple
 
 from git import Repo, GitCommandError
 from httpx._types import QueryParamTypes
+import asyncio
 import httpx
+import math
 import os
 import base64
 import pandas as pd
@@ -10,9 +12,33 @@ import pandas as pd
 from agentic.common import ThreadContext
 from agentic.events import OAuthFlowResult
 from agentic.tools.oauth_tool import OAuthTool, OAuthConfig
+from agentic.tools.utils.github_api import (
+    GitHubAPI,
+    GitHubAPIError,
+    GitHubResponse,
+    get_response_cache,
+    rate_limits as github_rate_limits,
+)
+from agentic.tools.utils.http_client import http_client
 from agentic.tools.utils.registry import tool_registry, Dependency
 from agentic.utils.directory_management import get_runtime_filepath
 
+# REST API states to GraphQL ones
+ISSUE_STATES = {'open': ['OPEN'], 'closed': ['CLOSED']}
+PULL_REQUEST_STATES = {'open': ['OPEN'], 'closed': ['CLOSED', 'MERGED']}
+
+
+def _login(author: Optional[Dict[str, Any]]) -> Optional[str]:
+    # Deleted accounts have no author
+    return author.get('login') if author else None
+
+
+def _slim_comments(comments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {'author': _login(comment['author']), 'created_at': comment['createdAt'], 'body': comment['body']}
+        for comment in comments
+    ]
+
 @tool_registry.register(
     name="GithubTool",
     description="A tool for interacting with GitHub repositories.",
@@ -304,9 +330,8 @@ class GithubTool(OAuthTool):
 
             # Test API key
             url = "https://api.github.com/user"
-            async with httpx.AsyncClient() as client:
-                headers = {"Authorization": f"token {api_key}"}
-                response = await client.get(url, headers=headers)
+            headers = {"Authorization": f"token {api_key}"}
+            response = await http_client.aget(url, headers=headers)
 
             if response.status_code != 200:
                 return f"Invalid GitHub API key. Status code: {response.status_code}"
@@ -316,13 +341,12 @@ class GithubTool(OAuthTool):
                 try:
                     owner, name = default_repo.split('/')
                     # Test if the repository exists
-                    async with httpx.AsyncClient() as client:
-                        repo_url = f"https://api.github.com/repos/{owner}/{name}"
-                        headers = {"Authorization": f"token {api_key}"}
-                        repo_response = await client.get(repo_url, headers=headers)
-                        
-                        if repo_response.status_code != 200:
-                            return f"Default repository '{default_repo}' not found or not accessible"
+                    repo_url = f"https://api.github.com/repos/{owner}/{name}"
+                    headers = {"Authorization": f"token {api_key}"}
+                    repo_response = await http_client.aget(repo_url, headers=headers)
+                    
+                    if repo_response.status_code != 200:
+                        return f"Default repository '{default_repo}' not found or not accessible"
                 except ValueError:
                     return f"Invalid default repository format: {default_repo}. Expected format: owner/repo"
 
@@ -335,9 +359,9 @@ class GithubTool(OAuthTool):
             return str(e)
         
         
-    async def _github_request(self, method: str, endpoint: str, thread_context: ThreadContext, data: Optional[Dict[str, Any]] = None, params: Optional[QueryParamTypes] = None) -> Dict[str, Any]:
+    async def _github_api(self, thread_context: ThreadContext) -> GitHubAPI | Dict[str, Any]:
         """
-        Async helper method to make GitHub API requests.
+        The GitHub API client for this thread's credentials, or an error or OAuth flow result.
         """
         # First try API key
         api_key = thread_context.get_secret("GITHUB_API_KEY", self.api_key)
@@ -358,30 +382,45 @@ class GithubTool(OAuthTool):
 
         # Use OAuth token if available, otherwise use API key
         token = oauth_token or api_key
-        
-        url = f"https://api.github.com{endpoint}"
-        headers = {
-            'Authorization': f'token {token}',
-            'Accept': 'application/vnd.github.v3+json'
-        }
-        
-        async with httpx.AsyncClient() as client:
-            if method.upper() == 'GET':
-                response = await client.get(url, headers=headers, params=params)
-            elif method.upper() == 'POST':
-                response = await client.post(url, headers=headers, json=data, params=params)
-            elif method.upper() == 'DELETE':
-                response = await client.delete(url, headers=headers, params=params)
-            elif method.upper() == 'PATCH':
-                response = await client.patch(url, headers=headers, json=data, params=params)
-            else:
-                return {'status': 'error', 'message': f"Unsupported HTTP method: {method}"}
+        return GitHubAPI(token, cache=get_response_cache(), rate_limits=github_rate_limits)
+
+    @staticmethod
+    def _result(response: GitHubResponse) -> Dict[str, Any]:
+        if not response.ok:
+            return {'status': 'error', 'message': f"API request failed: {response.text}"}
+        result = {'status': 'success', 'results': response.data}
+        if response.truncated:
+            result['truncated'] = True
+        return result
+
+    async def _github_request(self, method: str, endpoint: str, thread_context: ThreadContext, data: Optional[Dict[str, Any]] = None, params: Optional[QueryParamTypes] = None) -> Dict[str, Any]:
+        """
+        Async helper method to make GitHub API requests.
+        """
+        if method.upper() not in ('GET', 'POST', 'DELETE', 'PATCH'):
+            return {'status': 'error', 'message': f"Unsupported HTTP method: {method}"}
+        api = await self._github_api(thread_context)
+        if isinstance(api, dict):
+            return api
+        try:
+            response = await api.request(method, endpoint, params=params, json=data)
+        except GitHubAPIError as e:
+            return {'status': 'error', 'message': str(e)}
+        return self._result(response)
+
+    async def _github_list(self, endpoint: str, thread_context: ThreadContext, params: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        """
+        Like _github_request for listings, fetching every page. `kwargs` are passed to GitHubAPI.paginate.
+        """
+        api = await self._github_api(thread_context)
+        if isinstance(api, dict):
+            return api
+        try:
+            response = await api.paginate(endpoint, params, **kwargs)
+        except GitHubAPIError as e:
+            return {'status': 'error', 'message': str(e)}
+        return self._result(response)
 
-            if response.status_code in [200, 201, 204]:
-                return {'status': 'success', 'results': response.json()}
-            else:
-                return {'status': 'error', 'message': f"API request failed: {response.text}"}
-        
     def _get_repo_info(self, thread_context: ThreadContext, repo_owner: Optional[str] = None, repo_name: Optional[str] = None) -> Tuple[str, str]:
         """
         Helper method to get repository owner and name, flexibly using defaults when needed.
@@ -466,7 +505,8 @@ class GithubTool(OAuthTool):
             mentioned: Optional[str] = None,
             since: Optional[str] = None,
             repo_owner: Optional[str] = None,
-            repo_name: Optional[str] = None
+            repo_name: Optional[str] = None,
+            include_comments: bool = False
         ) -> pd.DataFrame:
         """
         Get a list of issues for a repository, excluding pull requests.
@@ -478,10 +518,15 @@ class GithubTool(OAuthTool):
         :param since: Only issues after this date will be returned, must be in ISO-8601 format YYYY-MM-DDTHH:MM:SSZ
         :param repo_owner: Repository owner (if None, uses default_repo owner)
         :param repo_name: Repository name (if None, uses default_repo name)
+        :param include_comments: Also return the comments of each issue
         :return: List of issues
         """
         owner, name = self._get_repo_info(thread_context, repo_owner, repo_name)
 
+        if include_comments:
+            return await self._get_github_issues_with_comments(
+                thread_context, owner, name, state, labels, assignee, creator, mentioned, since
+            )
 
         params = {
             'state': state,
@@ -495,7 +540,7 @@ class GithubTool(OAuthTool):
         # remove None values from params
         params = {k: v for k, v in params.items() if v is not None}
 
-        response = await self._github_request('GET', f'/repos/{owner}/{name}/issues', thread_context, params=params)
+        response = await self._github_list(f'/repos/{owner}/{name}/issues', thread_context, params=params)
         results = response.get('results', [])
 
         # Filter out pull requests
@@ -519,6 +564,61 @@ class GithubTool(OAuthTool):
             for issue in issues_only
         ]
         return pd.DataFrame(slim_issues)
+
+    async def _get_github_issues_with_comments(
+            self,
+            thread_context: ThreadContext,
+            owner: str,
+            name: str,
+            state: str,
+            labels: Optional[str],
+            assignee: Optional[str],
+            creator: Optional[str],
+            mentioned: Optional[str],
+            since: Optional[str]
+        ) -> pd.DataFrame | str:
+        """
+        get_github_issues with each issue's comments, from one GraphQL query per 50 issues.
+        """
+        api = await self._github_api(thread_context)
+        if isinstance(api, dict):
+            return api.get('flow') or f"Error: {api.get('message')}"
+
+        filters = {
+            'states': ISSUE_STATES.get(state),
+            'labels': labels.split(',') if labels else None,
+            # GraphQL has no filter for unassigned issues, so those are filtered below
+            'assignee': assignee if assignee != 'none' else None,
+            'createdBy': creator,
+            'mentioned': mentioned,
+            'since': since,
+        }
+        try:
+            issues = await api.list_issues(owner, name, {k: v for k, v in filters.items() if v is not None})
+        except GitHubAPIError as e:
+            return f"Error: {e}"
+        if assignee == 'none':
+            issues = [issue for issue in issues if not issue['assignees']['nodes']]
+
+        slim_issues = [
+            {
+                'number': issue['number'],
+                'title': issue['title'],
+                'url': issue['url'],
+                'state': issue['state'].lower(),
+                'created_at': issue['createdAt'],
+                'updated_at': issue['updatedAt'],
+                'closed_at': issue['closedAt'],
+                'labels': [label['name'] for label in issue['labels']['nodes']],
+                'assignee': issue['assignees']['nodes'][0]['login'] if issue['assignees']['nodes'] else None,
+                'creator': _login(issue['author']),
+                'comments': issue['comments']['totalCount'],
+                'description': issue['body'],
+                'comment_list': _slim_comments(issue['comments']['nodes']),
+            }
+            for issue in issues
+        ]
+        return pd.DataFrame(slim_issues)
   
     async def get_github_issue_comments(self, thread_context: ThreadContext, issue_number: int, repo_owner: Optional[str] = None, repo_name: Optional[str] = None) -> dict[str, Any]:
         """
@@ -567,13 +667,15 @@ class GithubTool(OAuthTool):
         return await self._github_request('POST', f'/repos/{owner}/{name}/pulls', thread_context, data)
 
     async def get_pull_requests(self, thread_context: ThreadContext, state: str = 'open',
-                        repo_owner: Optional[str] = None, repo_name: Optional[str] = None, since: Optional[str] = None) -> List[Dict[str, Any]]:
+                        repo_owner: Optional[str] = None, repo_name: Optional[str] = None, since: Optional[str] = None,
+                        include_reviews: bool = False) -> List[Dict[str, Any]]:
         """
         Get a list of pull requests for a repository.
         :param state: State of pull requests to return. Can be either 'open', 'closed', or 'all'
         :param repo_owner: Repository owner (if None, uses default_repo owner)
         :param repo_name: Repository name (if None, uses default_repo name)
         :param since: Only pull requests updated at or after this time are returned. This is a timestamp in ISO 8601 format: YYYY-MM-DDTHH:MM:SSZ.
+        :param include_reviews: Also return the comments and reviews of each pull request
         :return: List of pull requests
         """
         params = {'state': state}
@@ -581,7 +683,65 @@ class GithubTool(OAuthTool):
             params['since'] = since
         params = {k: v for k, v in params.items() if v is not None}
         owner, name = self._get_repo_info(thread_context, repo_owner, repo_name)
-        return await self._github_request('GET', f'/repos/{owner}/{name}/pulls', thread_context, params=params)
+        if include_reviews:
+            return await self._get_pull_requests_with_reviews(thread_context, owner, name, state, since)
+        return await self._github_list(f'/repos/{owner}/{name}/pulls', thread_context, params=params)
+
+    async def _get_pull_requests_with_reviews(self, thread_context: ThreadContext, owner: str, name: str,
+                                              state: str, since: Optional[str]) -> Dict[str, Any]:
+        """
+        get_pull_requests with each pull request's comments and reviews, from one GraphQL query per 50 pull requests.
+        """
+        api = await self._github_api(thread_context)
+        if isinstance(api, dict):
+            return api
+        try:
+            pulls = await api.list_pull_requests(owner, name, PULL_REQUEST_STATES.get(state))
+        except GitHubAPIError as e:
+            return {'status': 'error', 'message': str(e)}
+        if since:
+            pulls = [pr for pr in pulls if pr['updatedAt'] >= since]
+
+        slim_pulls = [
+            {
+                'number': pr['number'],
+                'title': pr['title'],
+                'url': pr['url'],
+                'state': pr['state'].lower(),
+                'draft': pr['isDraft'],
+                'head': pr['headRefName'],
+                'base': pr['baseRefName'],
+                'creator': _login(pr['author']),
+                'created_at': pr['createdAt'],
+                'updated_at': pr['updatedAt'],
+                'closed_at': pr['closedAt'],
+                'merged_at': pr['mergedAt'],
+                'labels': [label['name'] for label in pr['labels']['nodes']],
+                'description': pr['body'],
+                'comments': _slim_comments(pr['comments']['nodes']),
+                'reviews': [
+                    {
+                        'author': _login(review['author']),
+                        'state': review['state'],
+                        'body': review['body'],
+                        'submitted_at': review['submittedAt'],
+                        'comments': [
+                            {
+                                'author': _login(comment['author']),
+                                'path': comment['path'],
+                                'line': comment['line'],
+                                'created_at': comment['createdAt'],
+                                'body': comment['body'],
+                            }
+                            for comment in review['comments']['nodes']
+                        ],
+                    }
+                    for review in pr['reviews']['nodes']
+                ],
+            }
+            for pr in pulls
+        ]
+        return {'status': 'success', 'results': slim_pulls}
 
     async def get_pr_reviews(self, thread_context: ThreadContext, pr_number: int, state: str = 'open',
                         repo_owner: Optional[str] = None, repo_name: Optional[str] = None) -> List[Dict[str, Any]]:
@@ -699,7 +859,7 @@ class GithubTool(OAuthTool):
         :return: List of repositories
         """
         params = {'sort': sort, 'direction': direction}
-        response = await self._github_request('GET', f'/user/repos', thread_context, params=params)
+        response = await self._github_list('/user/repos', thread_context, params=params)
 
         # Check for API request errors
         if isinstance(response, dict) and response.get('status') == 'error':
@@ -748,22 +908,25 @@ class GithubTool(OAuthTool):
 
     async def search_in_repo(self, thread_context: ThreadContext, query: str, 
                     repo_owner: Optional[str] = None, 
-                    repo_name: Optional[str] = None) -> List[Dict[str, str]]:
+                    repo_name: Optional[str] = None,
+                    max_results: int = 100) -> List[Dict[str, str]]:
         """
         Search for code within a specific repository.
         
         :param query: Search terms or code snippet to find
         :param repo_owner: Repository owner (if None, uses default_repo owner)
         :param repo_name: Repository name (if None, uses default_repo name)
+        :param max_results: The most matching files to return
         :return: List of dictionaries with file paths, URLs, and code snippets
         """
         owner, name = self._get_repo_info(thread_context, repo_owner, repo_name)
         
-        # Construct search endpoint
-        endpoint = f'/search/code?q={query}+repo:{owner}/{name}'
-        
         # Perform search
-        response = await self._github_request('GET', endpoint, thread_context)
+        per_page = min(max_results, 100)
+        response = await self._github_list(
+            '/search/code', thread_context, params={'q': f'{query} repo:{owner}/{name}'},
+            per_page=per_page, max_pages=math.ceil(max_results / per_page), items_key='items',
+        )
         
         # Check if results is an error dictionary
         if isinstance(response, dict) and response.get('status') == 'error':
@@ -773,11 +936,8 @@ class GithubTool(OAuthTool):
             return []
         
         results = response.get('results', {})
-        
-        # Process search results
-        search_results = []
-        
-        for item in results.get('items', []):
+
+        async def search_file(item: Dict[str, Any]) -> Optional[Dict[str, Any]]:
             try:
                 # Fetch file contents
                 file_path = item.get('path', 'Unknown')
@@ -800,22 +960,25 @@ class GithubTool(OAuthTool):
                                 'line_url': line_url
                             })
                     
-                    search_results.append({
+                    return {
                         'file_path': file_path,
                         'file_url': item.get('html_url', ''),
                         'repository': f'{owner}/{name}',
                         'matching_lines': matching_lines,
-                    })
+                    }
             except Exception as e:
                 # If fetching file contents fails, still add basic info
-                search_results.append({
+                return {
                     'file_path': file_path,
                     'file_url': item.get('html_url', ''),
                     'repository': f'{owner}/{name}',
                     'error': str(e)
-                })
+                }
+            return None
 
-        return search_results
+        # Fetch the files concurrently, within the HTTP client's limit per host
+        search_results = await asyncio.gather(*(search_file(item) for item in results.get('items', [])[:max_results]))
+        return [result for result in search_results if result is not None]
     
     async def download_repo_file(self, thread_context: ThreadContext, file_path: str, 
                         repo_owner: Optional[str] = None, 
@@ -859,18 +1022,17 @@ class GithubTool(OAuthTool):
                 # Use the last component of the file path as the default file name
                 local_file_name = file_path.split('/')[-1]
             # Download the file content
-            async with httpx.AsyncClient() as client:
-                response = await client.get(download_url)
-                if response.status_code != 200:
-                    return f"Error: Failed to download file. Status code: {response.status_code}"
-                
-                # Save file content
-                try:
-                    with open(local_file_name, 'wb') as f:
-                        f.write(response.content)
-                    return local_file_name
-                except IOError as e:
-                    return f"Error saving file: {str(e)}"
+            response = await http_client.aget(download_url)
+            if response.status_code != 200:
+                return f"Error: Failed to download file. Status code: {response.status_code}"
+            
+            # Save file content
+            try:
+                with open(local_file_name, 'wb') as f:
+                    f.write(response.content)
+                return local_file_name
+            except IOError as e:
+                return f"Error saving file: {str(e)}"
         
         except Exception as e:
             return f"Unexpected error during file download: {str(e)}"
\ No newline at end of file
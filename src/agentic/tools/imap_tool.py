@@ -1,5 +1,4 @@
 # pip install beautifulsoup4
-# pip install sqlmodel
 
 import os
 import re
@@ -16,18 +15,10 @@ from bs4 import BeautifulSoup
 from agentic.common import ThreadContext
 from agentic.tools.utils.registry import tool_registry, Dependency
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.imap_sync import IMAPSync, MailCache, get_mail_cache, imap_connections
 
-from sqlmodel import SQLModel, Field, Session, select
-
-
-class EmailMsgsProcessed(SQLModel, table=True):
-    #    uid:  Optional[int] = Field(default=None, primary_key=True)          # the uid of a message
-    uid: Optional[str] = Field(default=None, primary_key=True)
-    from_field: str  # save some info in case multiple mailboxes or servers where UIDs might overlap..
-    to_field: str  #
-    subject_field: str  #
-    processed: Optional[int]  #
-    agent_id: str  # Save the agent as another agen may want to see this message.
+IMAP_SERVER = "imap.gmail.com"
+IMAP_PORT = 993
 
 
 @tool_registry.register(
@@ -42,7 +33,12 @@ class EmailMsgsProcessed(SQLModel, table=True):
     ],
 )
 class IMAPTool(BaseAgenticTool):
-    """Access an Email Inbox using IMAP protocol."""
+    """Access an Email Inbox using IMAP protocol.
+
+    Connections are pooled per account, and message headers and bodies are cached locally
+    and synced incrementally (see agentic.tools.utils.imap_sync), so repeated listings
+    only fetch what's new.
+    """
 
     email_address: Optional[str] = None
     app_password: Optional[str] = None
@@ -98,19 +94,25 @@ to learn how to create an app password. You need to supply this password to use
 
         return gmail_folders.get(folder, f'"{folder}"')
 
+    def _connect(self, thread_context: ThreadContext):
+        """A pooled, logged-in connection for the configured account"""
+        self.email_address = thread_context.get_secret("IMAP_USERNAME")
+        self.app_password = thread_context.get_secret("IMAP_PASSWORD")
+        return imap_connections.connection(IMAP_SERVER, IMAP_PORT, self.email_address, self.app_password)
+
+    def _account(self) -> str:
+        return f"{self.email_address}@{IMAP_SERVER}"
+
+    def _sync(self) -> IMAPSync:
+        return IMAPSync(get_mail_cache())
+
     def list_folders(self, thread_context: ThreadContext) -> List[str]:
         """
         List all available folders in the email account.
 
         :return: List of folder names
         """
-        self.email_address = thread_context.get_secret("IMAP_USERNAME")
-        self.app_password = thread_context.get_secret("IMAP_PASSWORD")
-        imap = None
-        try:
-            imap = imaplib.IMAP4_SSL("imap.gmail.com", 993)
-            imap.login(self.email_address, self.app_password)
-
+        with self._connect(thread_context) as imap:
             _, folders = imap.list()
             folder_list = []
 
@@ -123,9 +125,6 @@ to learn how to create an app password. You need to supply this password to use
                     folder_list.append(match.group(1))
 
             return folder_list
-        finally:
-            if imap:
-                imap.logout()
 
     def list_emails(
         self,
@@ -146,86 +145,68 @@ to learn how to create an app password. You need to supply this password to use
         Returns:
             List of dictionaries containing email information
         """
-        self.email_address = thread_context.get_secret("IMAP_USERNAME")
-        self.app_password = thread_context.get_secret("IMAP_PASSWORD")
-        imap_server = "imap.gmail.com"
-        imap_port = 993
-
         thread_context.info(f"Starting to list emails with limit={limit}")
 
-        imap = None
         try:
-            thread_context.info(f"Connecting to IMAP server: {imap_server}:{imap_port}")
-            imap = imaplib.IMAP4_SSL(imap_server, imap_port)
-
-            thread_context.info(f"Logging in with email: {self.email_address}")
-            imap.login(self.email_address, self.app_password)
-
-            # Select the specified folder
-            actual_folder = self._get_gmail_folder_name(folder)
-            thread_context.info(f"Selecting folder: {actual_folder}")
-            status, folder_info = imap.select(actual_folder)
-            if status != "OK":
-                raise ValueError(
-                    f"Failed to select folder '{actual_folder}'. Status: {status}"
-                )
-
-            # Construct search criteria
-            if subject_words:
-                # Properly format subject search with quotes
-                search_criteria = [f'SUBJECT "{subject_words}"']
-                thread_context.info(
-                    f"Searching for emails with subject containing: {subject_words}"
-                )
-            else:
-                search_criteria = ["ALL"]
-                thread_context.info("Searching for all emails")
-
-            # Use 'days_back' to limit the search to emails within the last 'days_back' days
-            if days_back_from_today > 0:
-                today = datetime.now() - timedelta(days=(days_back_from_today - 1))
-                tomorrow = today + timedelta(days=1)
+            with self._connect(thread_context) as imap:
+                account = self._account()
+                sync = self._sync()
+
+                # Select the specified folder, fetching the headers of any new messages
+                actual_folder = self._get_gmail_folder_name(folder)
+                thread_context.info(f"Selecting folder: {actual_folder}")
+                new_count = sync.select(imap, account, actual_folder)
+                thread_context.info(f"Synced {new_count} new message headers")
+
+                # Construct search criteria
+                if subject_words:
+                    # Properly format subject search with quotes
+                    search_criteria = [f'SUBJECT "{subject_words}"']
+                    thread_context.info(
+                        f"Searching for emails with subject containing: {subject_words}"
+                    )
+                else:
+                    search_criteria = ["ALL"]
+                    thread_context.info("Searching for all emails")
 
-                # Format dates in DD-Mon-YYYY format as required by IMAP
-                today_str = today.strftime("%d-%b-%Y")
-                tomorrow_str = tomorrow.strftime("%d-%b-%Y")
+                # Use 'days_back' to limit the search to emails within the last 'days_back' days
+                if days_back_from_today > 0:
+                    today = datetime.now() - timedelta(days=(days_back_from_today - 1))
+                    tomorrow = today + timedelta(days=1)
 
-                date_criterion = f'SINCE "{today_str}" BEFORE "{tomorrow_str}"'
-                search_criteria.append(date_criterion)
+                    # Format dates in DD-Mon-YYYY format as required by IMAP
+                    today_str = today.strftime("%d-%b-%Y")
+                    tomorrow_str = tomorrow.strftime("%d-%b-%Y")
 
-            if direct_mail_only:
-                search_criteria.append('NOT BODY "unsubscribe"')
-                search_criteria.append('NOT BODY "Manage preferences"')
-                search_criteria.append('NOT BODY "subscription"')
+                    date_criterion = f'SINCE "{today_str}" BEFORE "{tomorrow_str}"'
+                    search_criteria.append(date_criterion)
 
-            # Perform the search
-            thread_context.info(f"Executing search with criteria: {search_criteria}")
-            _, message_numbers = imap.search(None, *search_criteria)
-            message_numbers = message_numbers[0].split()
+                if direct_mail_only:
+                    search_criteria.append('NOT BODY "unsubscribe"')
+                    search_criteria.append('NOT BODY "Manage preferences"')
+                    search_criteria.append('NOT BODY "subscription"')
 
-            thread_context.info(f"Found {len(message_numbers)} matching messages")
+                # Perform the search
+                thread_context.info(f"Executing search with criteria: {search_criteria}")
+                uids = sync.search(imap, *search_criteria)
+                thread_context.info(f"Found {len(uids)} matching messages")
 
-            # Get the most recent 'limit' emails
-            message_numbers = message_numbers[-limit:]
+                # Get the most recent 'limit' emails, from the cache where we have them
+                uids = uids[-limit:]
+                sync.fetch_headers(imap, account, actual_folder, uids)
+                headers = sync.cache.headers(account, actual_folder, uids)
 
             email_list = []
-            for num in reversed(message_numbers):
-                thread_context.info(f"Fetching message ID: {num.decode()}")
-                _, msg_data = imap.fetch(num, "(RFC822.HEADER)")
-                email_header = msg_data[0][1]
-                email_message = email.message_from_bytes(email_header)
-
-                # Extract and decode email information
-                subject = IMAPTool.decode_email_header(email_message["subject"])
-                sender = IMAPTool.decode_email_header(email_message["from"])
-                date_str = email_message["date"]
-
+            for uid in reversed(uids):
+                header = headers.get(uid)
+                if header is None:
+                    continue
                 email_list.append(
                     {
-                        "id": num.decode(),
-                        "subject": subject,
-                        "sender": sender,
-                        "date": date_str,
+                        "id": str(uid),
+                        "subject": header.subject,
+                        "sender": header.sender,
+                        "date": header.date,
                     }
                 )
 
@@ -241,15 +222,6 @@ to learn how to create an app password. You need to supply this password to use
 
             thread_context.info(traceback.format_exc())
             return [{"error": f"Error: {str(e)}"}]
-        finally:
-            if imap:
-                try:
-                    thread_context.info("Closing IMAP connection")
-                    imap.close()
-                    thread_context.info("Logging out from IMAP server")
-                    imap.logout()
-                except Exception as e:
-                    thread_context.info(f"Error during IMAP cleanup: {str(e)[0:50]}")
 
     def date_based_search(
         self, imap, limit: int, search_criteria: List[str]
@@ -323,12 +295,9 @@ to learn how to create an app password. You need to supply this password to use
         self, thread_context: ThreadContext, to: str, subject: str, body: str
     ) -> str:
         """Save a draft email message"""
-        self.email_address = thread_context.get_secret("IMAP_USERNAME")
-        self.app_password = thread_context.get_secret("IMAP_PASSWORD")
-
         # Create a multipart message
         msg = MIMEMultipart()
-        sender_email = self.email_address
+        sender_email = thread_context.get_secret("IMAP_USERNAME")
         msg["From"] = sender_email
         msg["To"] = to
         msg["Subject"] = subject
@@ -337,12 +306,9 @@ to learn how to create an app password. You need to supply this password to use
         msg.attach(MIMEText(body, "plain"))
 
         try:
-            imap = imaplib.IMAP4_SSL("imap.gmail.com", 993)
-            imap.login(self.email_address, self.app_password)
-
-            imap.select('"[Gmail]/Drafts"')  # for Gmail
-            message_bytes = msg.as_bytes()
-            imap.append('"[Gmail]/Drafts"', "\\Draft", None, message_bytes)
+            with self._connect(thread_context) as imap:
+                message_bytes = msg.as_bytes()
+                imap.append('"[Gmail]/Drafts"', "\\Draft", None, message_bytes)
 
             return f"Saved draft message to {to}."
         except Exception as e:
@@ -423,9 +389,10 @@ to learn how to create an app password. You need to supply this password to use
             is_read_func=self.is_email_read,
         )
 
-        thread_context.info(
-            f"No new emails found in folder '{folder}' matching the criteria."
-        )
+        if not result:
+            thread_context.info(
+                f"No new emails found in folder '{folder}' matching the criteria."
+            )
 
         return result
 
@@ -444,9 +411,10 @@ to learn how to create an app password. You need to supply this password to use
         """
         Base function for retrieving and processing emails from a specified IMAP folder.
 
-        This method connects to the IMAP server, searches for emails based on the provided criteria,
-        and processes them according to the specified reading tracking functions. It supports
-        various search parameters and can handle different email folder locations.
+        This method syncs the folder from the IMAP server, searches for emails based on the provided
+        criteria, and processes them according to the specified reading tracking functions. Message
+        bodies come from the local cache, and the missing ones are fetched in one batch. Retrieved
+        messages are marked as seen on the server, so they no longer match "UNSEEN".
 
         Notes:
             - The folder parameter should use the exact IMAP folder name (case-sensitive)
@@ -464,7 +432,8 @@ to learn how to create an app password. You need to supply this password to use
             * "FLAGGED": Starred/flagged messages
             * "UNFLAGGED": Unstarred/unflagged messages
             - The method uses the provided mark_as_read_func and is_read_func to track
-            which emails have been processed, allowing for different tracking implementations
+            which emails have been processed, allowing for different tracking implementations.
+            They're called with (cache, account, folder, uid, agent_id[, email_message]).
         """
         thread_context.debug(
             f"Starting retrieve_emails with limit={limit}, "
@@ -483,11 +452,6 @@ to learn how to create an app password. You need to supply this password to use
             elif isinstance(message, str):
                 search_criteria = message
 
-        self.email_address = thread_context.get_secret("IMAP_USERNAME")
-        self.app_password = thread_context.get_secret("IMAP_PASSWORD")
-        imap_server = "imap.gmail.com"
-        imap_port = 993
-
         # Handle since_date conversion
         if since_date:
             try:
@@ -525,71 +489,73 @@ to learn how to create an app password. You need to supply this password to use
             since_date = datetime.now() - timedelta(days=30)
             date_criterion = since_date.strftime("%d-%b-%Y")
 
-        imap = None
         try:
-            imap = imaplib.IMAP4_SSL(imap_server, imap_port)
-            imap.login(self.email_address, self.app_password)
-
-            actual_folder = self._get_gmail_folder_name(folder)
-            thread_context.debug(f"Selecting folder: {actual_folder}")
-            status, folder_info = imap.select(actual_folder)
-            if status != "OK":
-                raise ValueError(
-                    f"Failed to select folder '{actual_folder}'. Status: {status}"
-                )
+            with self._connect(thread_context) as imap:
+                account = self._account()
+                sync = self._sync()
 
-            # Build search criteria list
-            search_terms = [search_criteria] if search_criteria else []
+                actual_folder = self._get_gmail_folder_name(folder)
+                thread_context.debug(f"Selecting folder: {actual_folder}")
+                sync.select(imap, account, actual_folder, readonly=False)
 
-            # Add date criterion
-            search_terms.append(f'SINCE "{date_criterion}"')
+                # Build search criteria list
+                search_terms = [search_criteria] if search_criteria else []
 
-            # Add recipient criterion if specified
-            if to_address:
-                search_terms.append(f'TO "{to_address}"')
-            # Add subject criterion if specified
-            if subject_words:
-                search_terms.append(f'HEADER Subject "{subject_words}"')
+                # Add date criterion
+                search_terms.append(f'SINCE "{date_criterion}"')
 
-            # Combine all criteria with AND logic
-            final_search_criteria = "(" + ") (".join(search_terms) + ")"
+                # Add recipient criterion if specified
+                if to_address:
+                    search_terms.append(f'TO "{to_address}"')
+                # Add subject criterion if specified
+                if subject_words:
+                    search_terms.append(f'HEADER Subject "{subject_words}"')
+
+                # Combine all criteria with AND logic
+                final_search_criteria = "(" + ") (".join(search_terms) + ")"
 
-            thread_context.debug(
-                f"Searching for emails with criteria: {final_search_criteria}"
-            )
-            try:
-                _, message_numbers = imap.search(None, final_search_criteria)
-            except imaplib.IMAP4.error as e:
-                thread_context.error(f"IMAP SEARCH error: {str(e)}")
-                fallback_criteria = f'SINCE "{date_criterion}"'
-                _, message_numbers = imap.search(None, fallback_criteria)
                 thread_context.debug(
-                    f"Falling back to retrieving all emails since {date_criterion}"
+                    f"Searching for emails with criteria: {final_search_criteria}"
                 )
+                try:
+                    uids = sync.search(imap, final_search_criteria)
+                except imaplib.IMAP4.error as e:
+                    thread_context.error(f"IMAP SEARCH error: {str(e)}")
+                    uids = sync.search(imap, f'SINCE "{date_criterion}"')
+                    thread_context.debug(
+                        f"Falling back to retrieving all emails since {date_criterion}"
+                    )
 
-            message_numbers = message_numbers[0].split()
-            thread_context.debug(f"Search returned: {len(message_numbers)} messages")
-
-            message_ids = message_numbers[-limit:]
+                thread_context.debug(f"Search returned: {len(uids)} messages")
 
-            email_list = []
-            processed_count = 0
-            for num in reversed(message_numbers):  # Process all found messages
-                if processed_count >= limit:
-                    break
+                # The newest messages this agent hasn't processed yet
+                agent_id = thread_context.agent_name
+                selected = []
+                for uid in reversed(uids):
+                    if len(selected) >= limit:
+                        break
+                    if not is_read_func(sync.cache, account, actual_folder, uid, agent_id):
+                        selected.append(uid)
 
-                thread_context.debug(f"Fetching message ID: {num}")
-                _, msg_data = imap.fetch(num, "(RFC822)")
-                email_body = msg_data[0][1]
-                email_message = email.message_from_bytes(email_body)
+                bodies = sync.fetch_bodies(imap, account, actual_folder, selected)
+                # Bodies are fetched with BODY.PEEK (or come from the cache), so flag the
+                # retrieved messages as read explicitly
+                try:
+                    sync.mark_seen(imap, [uid for uid in selected if uid in bodies])
+                except imaplib.IMAP4.error as e:
+                    thread_context.error(f"Error marking emails as seen: {str(e)}")
 
-                uid = str(int.from_bytes(num, "big"))
+            email_list = []
+            for uid in selected:
+                if uid not in bodies:
+                    continue
+                email_message = email.message_from_bytes(bodies[uid])
 
                 processed_email = self.process_email(email_message, "/tmp")
                 processed_email["to"] = email_message["To"]
                 email_list.append(processed_email)
 
-                processed_count += 1
+                mark_as_read_func(sync.cache, account, actual_folder, uid, agent_id, email_message)
 
             thread_context.debug(f"Successfully retrieved {len(email_list)} emails")
             return email_list
@@ -750,37 +716,27 @@ to learn how to create an app password. You need to supply this password to use
 
     @staticmethod
     def mark_email_as_read(
-        session: Session,
-        uid: str,
+        cache: MailCache,
+        account: str,
+        folder: str,
+        uid: int,
         agent_id: str,
         email_message: email.message.EmailMessage,
     ):
-        """Mark an email as read in the database."""
-        email_msg_info = EmailMsgsProcessed(
-            uid=uid,
-            from_field=email_message["From"],
-            to_field=email_message["To"],
-            subject_field=email_message["Subject"],
-            processed=1,
-            agent_id=agent_id,
-        )
-        session.add(email_msg_info)
-        session.commit()
-        session.refresh(email_msg_info)
+        """Mark an email as read by this agent in the mail cache."""
+        cache.mark_processed(account, folder, uid, agent_id, email_message)
 
     @staticmethod
-    def is_email_read(session: Session, uid: str, agent_id: str) -> bool:
-        """Check if an email has been read."""
-        statement = select(EmailMsgsProcessed.processed).where(
-            (EmailMsgsProcessed.uid == uid) & (EmailMsgsProcessed.agent_id == agent_id)
-        )
-        result = session.exec(statement).first()
-        return result is not None and result == 1
+    def is_email_read(cache: MailCache, account: str, folder: str, uid: int, agent_id: str) -> bool:
+        """Check if an email has been read by this agent."""
+        return cache.is_processed(account, folder, uid, agent_id)
 
     @staticmethod
     def dummy_mark_as_read(
-        session: Session,
-        uid: str,
+        cache: MailCache,
+        account: str,
+        folder: str,
+        uid: int,
         agent_id: str,
         email_message: email.message.EmailMessage,
     ):
@@ -788,7 +744,7 @@ to learn how to create an app password. You need to supply this password to use
         pass
 
     @staticmethod
-    def dummy_is_read(session: Session, uid: str, agent_id: str) -> bool:
+    def dummy_is_read(cache: MailCache, account: str, folder: str, uid: int, agent_id: str) -> bool:
         """Dummy function that always returns False."""
         return False
 
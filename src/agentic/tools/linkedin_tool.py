@@ -4,6 +4,7 @@ import pandas as pd
 from typing import Dict, Callable, ClassVar, Optional
 
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.http_client import http_client
 from agentic.tools.utils.registry import tool_registry
 
 @tool_registry.register(
@@ -51,13 +52,12 @@ class LinkedinDataTool(BaseAgenticTool):
 
         params = {"keyword": keyword}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.BASE_URL}/search-locations",
-                headers=self.get_headers(),
-                params=params,
-                timeout=30,
-            )
+        response = await http_client.aget(
+            f"{self.BASE_URL}/search-locations",
+            headers=self.get_headers(),
+            params=params,
+            timeout=30,
+        )
 
         response.raise_for_status()
         results = response.json()
@@ -81,13 +81,12 @@ class LinkedinDataTool(BaseAgenticTool):
 
         params = {"url": profile_url}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.BASE_URL}/get-profile-data-by-url",
-                headers=self.get_headers(),
-                params=params,
-                timeout=30,
-            )
+        response = await http_client.aget(
+            f"{self.BASE_URL}/get-profile-data-by-url",
+            headers=self.get_headers(),
+            params=params,
+            timeout=30,
+        )
 
         response.raise_for_status()
         profile_data = response.json()
@@ -214,48 +213,47 @@ End Year: {edu.get('end', {}).get('year', '')}"""
             params = {"username": company_username_or_domain}
 
         # Make the API request
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    endpoint,
-                    headers=self.get_headers(),
-                    params=params,
-                    timeout=30,
-                )
-                response.raise_for_status()
-                company_data = response.json()
-
-                # Check if the API request was successful
-                if not company_data.get("success"):
-                    error_message = company_data.get("message", "Unknown error")
-                    return f"Error: {error_message}"
-
-                # Extract data and handle cases where data might be None
-                data = company_data.get("data", {})
-                if data is None:
-                    return "No company data found"
-
-                # Convert data to list format for DataFrame
-                if isinstance(data, dict):
-                    items = [data]  # Single company result
-                elif isinstance(data, list):
-                    items = data  # Multiple company results
-                else:
-                    items = []  # No results
-
-                if not items:
-                    return "No company information found"
-
-                # Convert to DataFrame for consistent output format
-                df = pd.DataFrame(items)
-                return df
-
-            except httpx.HTTPStatusError as e:
-                return f"Error: API request failed with status code {e.response.status_code}"
-            except httpx.RequestError as e:
-                return f"Error: Failed to make API request - {str(e)}"
-            except Exception as e:
-                return f"Error: Unexpected error occurred - {str(e)}"
+        try:
+            response = await http_client.aget(
+                endpoint,
+                headers=self.get_headers(),
+                params=params,
+                timeout=30,
+            )
+            response.raise_for_status()
+            company_data = response.json()
+
+            # Check if the API request was successful
+            if not company_data.get("success"):
+                error_message = company_data.get("message", "Unknown error")
+                return f"Error: {error_message}"
+
+            # Extract data and handle cases where data might be None
+            data = company_data.get("data", {})
+            if data is None:
+                return "No company data found"
+
+            # Convert data to list format for DataFrame
+            if isinstance(data, dict):
+                items = [data]  # Single company result
+            elif isinstance(data, list):
+                items = data  # Multiple company results
+            else:
+                items = []  # No results
+
+            if not items:
+                return "No company information found"
+
+            # Convert to DataFrame for consistent output format
+            df = pd.DataFrame(items)
+            return df
+
+        except httpx.HTTPStatusError as e:
+            return f"Error: API request failed with status code {e.response.status_code}"
+        except httpx.RequestError as e:
+            return f"Error: Failed to make API request - {str(e)}"
+        except Exception as e:
+            return f"Error: Unexpected error occurred - {str(e)}"
 
     async def linkedin_people_search(
         self,
@@ -305,13 +303,12 @@ End Year: {edu.get('end', {}).get('year', '')}"""
         if company:
             params["company"] = company
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.BASE_URL}/search-people",
-                headers=self.get_headers(),
-                params=params,
-                timeout=30,
-            )
+        response = await http_client.aget(
+            f"{self.BASE_URL}/search-people",
+            headers=self.get_headers(),
+            params=params,
+            timeout=30,
+        )
 
         response.raise_for_status()
         search_results = response.json()
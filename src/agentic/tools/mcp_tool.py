@@ -1,10 +1,8 @@
 from typing import Any, Optional, Dict, List, Callable
-import asyncio
 import json
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from litellm import experimental_mcp_client
+from mcp import StdioServerParameters
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.mcp_client import mcp_manager
 from agentic.tools.utils.registry import tool_registry, Dependency
 from agentic.events import ChatOutput, Event
 
@@ -23,13 +21,18 @@ from agentic.events import ChatOutput, Event
 
 
 class MCPTool(BaseAgenticTool):
-    """Universal wrapper for MCP tools that can work with any MCP server."""
+    """Universal wrapper for MCP tools that can work with any MCP server.
+
+    MCPTools for the same server config share one pooled server process and session (see
+    agentic.tools.utils.mcp_client), so several agents and concurrent tool calls don't each
+    start a server."""
     
     def __init__(self, 
                  command: str,
                  args: list[str],
                  tool_name: Optional[str] = None,
-                 env: Optional[Dict[str, str]] = None):
+                 env: Optional[Dict[str, str]] = None,
+                 max_concurrency: Optional[int] = None):
         """
         Initialize an MCP tool wrapper.
         
@@ -38,6 +41,8 @@ class MCPTool(BaseAgenticTool):
             args: Arguments for the command (e.g. ["./mcp_server.py"])
             tool_name: Optional specific tool name to use from the MCP server
             env: Optional environment variables to pass to the MCP server
+            max_concurrency: Optional limit on calls in flight to the server
+                (default AGENTIC_MCP_MAX_CONCURRENCY, or 8)
         """
         super().__init__()
         self.server_params = StdioServerParameters(
@@ -47,15 +52,10 @@ class MCPTool(BaseAgenticTool):
         )
         self.tool_name = tool_name
         self.name = f"MCP-{tool_name}" if tool_name else "MCPTool"  # Add name attribute
-        self._session = None
-        self._tools = None
-        self._stdio = None
-        self._tool_schema_map = {}  # Store tool schemas for reference
         self._event_handlers = []  # Store event handlers
-        
-        # Initialize in a new event loop
-        self._loop = asyncio.new_event_loop()
-        self._loop.run_until_complete(self._init_session())
+        self._server = mcp_manager.acquire(self.server_params, max_concurrency)
+        self._released = False
+        self._init_tools()
     
     def register_event_handler(self, handler):
         """Register an event handler function to receive events from this tool."""
@@ -69,39 +69,33 @@ class MCPTool(BaseAgenticTool):
             except Exception as e:
                 print(f"Error in event handler: {e}")
 
-    async def _init_session(self):
-        """Initialize the MCP session if not already initialized."""
-        if self._session is None:
-            self._stdio = stdio_client(self.server_params)
-            read, write = await self._stdio.__aenter__()
-            self._session = ClientSession(read, write)
-            await self._session.__aenter__()
-            await self._session.initialize()
-            
-            # Load available tools
-            self._tools = await experimental_mcp_client.load_mcp_tools(
-                session=self._session,
-                format="openai"
-            )
-            
-            # Store tool schemas for reference
-            for tool in self._tools:
-                self._tool_schema_map[tool["function"]["name"]] = tool["function"].get("parameters", {})
-                
-            # Update name if we have only one tool
-            if len(self._tools) == 1 and not self.tool_name:
-                first_tool = self._tools[0]["function"]["name"]
-                self.name = f"MCP-{first_tool}"
+    @property
+    def _tools(self) -> list[dict]:
+        # Read from the server each time, since it lists them again when its version changes
+        return self._server.tools()
+
+    @property
+    def _tool_schema_map(self) -> Dict[str, dict]:
+        return {tool["function"]["name"]: tool["function"].get("parameters", {}) for tool in self._tools}
+
+    def _init_tools(self):
+        """Load the server's tools, from the tool cache if it has them."""
+        tools = self._tools
+        # Update name if we have only one tool
+        if len(tools) == 1 and not self.tool_name:
+            first_tool = tools[0]["function"]["name"]
+            self.name = f"MCP-{first_tool}"
 
     def get_tools(self) -> List[Callable]:
         """Get the available MCP tools in OpenAI format."""
-        if self._tools is None:
+        tools = self._tools
+        if tools is None:
             raise RuntimeError("MCP session not initialized")
             
         # Convert MCP tools to callable functions
         tool_functions = []
         
-        for tool in self._tools:
+        for tool in tools:
             if self.tool_name and tool["function"]["name"] != self.tool_name:
                 continue
                 
@@ -215,9 +209,8 @@ class MCPTool(BaseAgenticTool):
             }
         }
         
-        result = self._loop.run_until_complete(
-            self.call_tool(openai_tool)
-        )
+        # Runs on the pool's event loop, so other calls can be in flight at the same time
+        result = mcp_manager.run(self.call_tool(openai_tool))
         
         # Generate a chat output event with the result
         # This ensures the UI can display the result properly
@@ -249,30 +242,12 @@ class MCPTool(BaseAgenticTool):
 
     async def call_tool(self, openai_tool: dict) -> Any:
         """Call an MCP tool with given arguments."""
-        if self._session is None:
-            await self._init_session()
-            
-        result = await experimental_mcp_client.call_openai_tool(
-            session=self._session,
-            openai_tool=openai_tool
-        )
-        return result
+        return await mcp_manager.run_async(self._server.call_tool(openai_tool))
 
     async def cleanup(self):
-        """Cleanup MCP session."""
-        if self._session:
-            await self._session.__aexit__(None, None, None)
-            self._session = None
-        if self._stdio:
-            await self._stdio.__aexit__(None, None, None)
-            self._stdio = None
-
-    def __del__(self):
-        """Ensure cleanup on deletion."""
-        if self._session or self._stdio:
-            try:
-                self._loop.run_until_complete(self.cleanup())
-            except:
-                pass  # Ignore cleanup errors during deletion
-            finally:
-                self._loop.close() 
\ No newline at end of file
+        """Release the MCP server. It's shared with other MCPTools for the same server, so
+        it's only stopped once all of them have been cleaned up."""
+        if self._released:
+            return
+        self._released = True
+        await mcp_manager.run_async(mcp_manager.release(self._server))
@@ -1,7 +1,6 @@
 import aiohttp
 import json
 import os
-import requests
 import weaviate
 
 from datetime import datetime, timedelta
@@ -13,11 +12,12 @@ from sqlalchemy.orm import sessionmaker
 from typing import Callable, Optional, List
 
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.http_client import http_client
 from agentic.tools.utils.registry import tool_registry, Dependency, ConfigRequirement
 from agentic.agentic_secrets import agentic_secrets
 from agentic.common import ThreadContext
 from agentic.utils.directory_management import get_runtime_directory
-from agentic.utils.rag_helper import init_weaviate, create_collection, init_embedding_model, init_chunker, search_collection
+from agentic.utils.rag_helper import create_collection, search_collection, rag_resources
 
 
 class MeetingSummary(BaseModel):
@@ -80,6 +80,8 @@ class MeetingBaasTool(BaseAgenticTool):
         self._engine = None
         self._initialized = False
         self._weaviate_client = None
+        # The embedded client is shared process-wide, so only a local connection is ours to close
+        self._owns_weaviate_client = False
         self._vector_store = None
         self._embed_model = None
         self._rag_initialized = False
@@ -114,20 +116,22 @@ class MeetingBaasTool(BaseAgenticTool):
                     port=8079,
                     grpc_port=50060
                 )
+                self._owns_weaviate_client = True
                 print("Connected to existing Weaviate instance")
             except Exception as e:
                 print(f"Could not connect to existing instance: {e}")
-                print("Creating new embedded instance...")
-                # If connection fails, create new embedded instance
-                self._weaviate_client = init_weaviate()
+                print("Using shared embedded instance...")
+                # If connection fails, use the process-wide embedded instance
+                self._weaviate_client = rag_resources.get_client()
+                self._owns_weaviate_client = False
                 
             try:
                 create_collection(self._weaviate_client, "meeting_summaries")
                 self._vector_store = self._weaviate_client.collections.get("meeting_summaries")
-                self._embed_model = init_embedding_model("BAAI/bge-small-en-v1.5")
+                self._embed_model = rag_resources.get_embedding_model("BAAI/bge-small-en-v1.5")
                 self._rag_initialized = True
             except Exception as e:
-                if self._weaviate_client:
+                if self._weaviate_client and self._owns_weaviate_client:
                     self._weaviate_client.close()
                 self._weaviate_client = None
                 self._vector_store = None
@@ -147,7 +151,7 @@ class MeetingBaasTool(BaseAgenticTool):
     def __getstate__(self):
         """Custom serialization for Ray."""
         state = self.__dict__.copy()
-        if self._weaviate_client:
+        if self._weaviate_client and self._owns_weaviate_client:
             self._weaviate_client.close()
         state.pop('_weaviate_client', None)
         state.pop('_vector_store', None)
@@ -212,7 +216,7 @@ class MeetingBaasTool(BaseAgenticTool):
                 "webhook_url": webhook_url
             }
             
-            response = requests.post(
+            response = http_client.post(
                 "https://api.meetingbaas.com/bots",
                 headers=headers,
                 json=data
@@ -261,7 +265,7 @@ class MeetingBaasTool(BaseAgenticTool):
                     self.meeting_baas_api_key = agentic_secrets.get_required_secret("MEETING_BAAS_API_KEY")  
                     
                 headers = {"x-meeting-baas-api-key": self.meeting_baas_api_key}  
-                response = requests.get(  
+                response = http_client.get(  
                     f"https://api.meetingbaas.com/bots/meeting_data",  
                     headers=headers,  
                     params={"bot_id": meeting_id}  
@@ -481,7 +485,7 @@ class MeetingBaasTool(BaseAgenticTool):
             self._initialize_rag()
 
             # Initialize chunker
-            chunker = init_chunker(threshold=0.5, delimiters=".,!,?,\n")
+            chunker = rag_resources.get_chunker(threshold=0.5, delimiters=".,!,?,\n")
 
             # Prepare metadata
             metadata = {
@@ -731,7 +735,7 @@ class MeetingBaasTool(BaseAgenticTool):
 
     def __del__(self):
         """Cleanup when the tool is destroyed"""
-        if self._weaviate_client:
+        if self._weaviate_client and self._owns_weaviate_client:
             try:
                 self._weaviate_client.close()
             except:
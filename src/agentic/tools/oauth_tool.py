@@ -4,10 +4,10 @@ from urllib.parse import urlencode
 import os
 from dotenv import load_dotenv
 
-import httpx
 from agentic.common import ThreadContext
 from agentic.events import OAuthFlowResult
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.http_client import http_client
 
 @dataclass
 class OAuthConfig:
@@ -108,22 +108,21 @@ class OAuthTool(BaseAgenticTool):
         if extra_data:
             data.update(extra_data)
 
-        async with httpx.AsyncClient() as client:
-            headers = {"Accept": "application/json"}
-            response = await client.post(
-                self.oauth_config.token_url,
-                json=data,
-                headers=headers
-            )
-
-            if response.status_code == 200:
-                token_data = response.json()
-                access_token = token_data.get("access_token")
-                if access_token:
-                    thread_context.set_oauth_token(self.oauth_config.tool_name, access_token)
-                    # Allow child class to handle additional token data
-                    await self._handle_token_response(token_data, thread_context)
-                    return access_token
+        headers = {"Accept": "application/json"}
+        response = await http_client.apost(
+            self.oauth_config.token_url,
+            json=data,
+            headers=headers
+        )
+
+        if response.status_code == 200:
+            token_data = response.json()
+            access_token = token_data.get("access_token")
+            if access_token:
+                thread_context.set_oauth_token(self.oauth_config.tool_name, access_token)
+                # Allow child class to handle additional token data
+                await self._handle_token_response(token_data, thread_context)
+                return access_token
         return None
 
     def _get_extra_auth_params(self, thread_context: ThreadContext) -> Dict[str, Any]:
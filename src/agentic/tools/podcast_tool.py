@@ -1,10 +1,10 @@
 from typing import Callable
-import requests
 from bs4 import BeautifulSoup
 import openai
 
 from agentic.tools.text_to_speech_tool import TextToSpeechTool
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.http_client import http_client
 from agentic.tools.utils.registry import tool_registry, ConfigRequirement, Dependency
 
 @tool_registry.register(
@@ -52,7 +52,7 @@ class PodcastTool(BaseAgenticTool):
         is_summarize: bool = True,
         sum_wc: int = 500
     ):
-        r = requests.get(download_url)
+        r = http_client.get(download_url)
         soup = BeautifulSoup(r.text, 'html.parser')
         content = ""
         success = False
@@ -96,7 +96,7 @@ class PodcastTool(BaseAgenticTool):
         self,
         site_url: str
     ):
-        r = requests.get(site_url)
+        r = http_client.get(site_url)
         urls = set()
         soup = BeautifulSoup(r.text, 'html.parser')
         for link in soup.find_all("a"):
@@ -6,15 +6,12 @@ from agentic.tools.utils.registry import tool_registry, Dependency
 from agentic.tools.base import BaseAgenticTool
 from agentic.utils.rag_helper import (
     list_collections,
-    init_weaviate,
     list_documents_in_collection,
-    create_collection,
     prepare_document_metadata,
     check_document_exists,
-    init_embedding_model,
-    init_chunker,
-    rag_index_file,
+    rag_resources,
 )
+from agentic.utils.rag_pipeline import IngestionPipeline
 
 from agentic.utils.summarizer import generate_document_summary
 from agentic.utils.file_reader import read_file
@@ -38,20 +35,26 @@ class RAGTool(BaseAgenticTool):
     def __init__(
         self,
         default_index: str = "knowledge_base",
-        index_paths: list[str] = []
+        index_paths: list[str] = [],
+        index_workers: int = 0,
     ):
         # Construct the RAG tool. You can pass a list of files and we will ensure that
         # they are added to the index on startup. Paths can include glob patterns also,
-        # like './docs/*.md'.
+        # like './docs/*.md'. Files are parsed inline, since tools are usually created at
+        # module level; set `index_workers` to parse them in that many processes, which
+        # needs the tool to be created under `if __name__ == "__main__":`.
         self.default_index = default_index
         self.index_paths = index_paths
         if self.index_paths:
-            client = init_weaviate()
-            if default_index not in list_collections(client):
-                create_collection(client, default_index, VectorDistances.COSINE)
+            file_paths = []
             for path in index_paths:
-                for file_path in [path] if path.startswith("http") else glob.glob(path):
-                    rag_index_file(file_path, self.default_index, client=client, ignore_errors=True)
+                file_paths.extend([path] if path.startswith("http") else glob.glob(path))
+            IngestionPipeline(
+                default_index,
+                workers=index_workers,
+                client=rag_resources.get_client(),
+                ignore_errors=True,
+            ).run(file_paths)
 
     def get_tools(self) -> List[Callable]:
         return [
@@ -70,17 +73,15 @@ class RAGTool(BaseAgenticTool):
     ) -> str:
         """Save content to a knowledge index. Accepts both text and file paths/URLs."""
         try:
-            client = init_weaviate()
             index_name = index_name or self.default_index
-            create_collection(client, index_name, VectorDistances.COSINE)
+            collection = rag_resources.get_collection(index_name)
 
-            embed_model = init_embedding_model("BAAI/bge-small-en-v1.5")
-            chunker = init_chunker(0.5, ". ,! ,? ,\n")
+            embed_model = rag_resources.get_embedding_model("BAAI/bge-small-en-v1.5")
+            chunker = rag_resources.get_chunker(0.5, ". ,! ,? ,\n")
 
             text, mime_type = read_file(str(content))
             metadata = prepare_document_metadata(content, text, mime_type, "openai/gpt-4o-mini")
-            
-            collection = client.collections.get(index_name)
+
             exists, status = check_document_exists(
                 collection, 
                 metadata["document_id"],
@@ -128,29 +129,23 @@ class RAGTool(BaseAgenticTool):
             return f"✅ Indexed {len(chunks)} chunks in {index_name}"
         
         except Exception as e:
+            rag_resources.report_failure()
             return f"Error: {str(e)}"
-        finally:
-            if client:
-                client.close()
         
     def list_indexes(self) -> str:
         """List all knowledge indexes"""
         try:
-            client = init_weaviate()
-            indexes = list_collections(client)
+            indexes = list_collections(rag_resources.get_client())
             return f"Available indexes: {', '.join(indexes)}"
         except Exception as e:
+            rag_resources.report_failure()
             return f"Error listing indexes: {str(e)}"
-        finally:
-            if client:
-                client.close()
     
     def search_knowledge_index(self, query: str = None, limit: int = 1, hybrid: bool = False) -> str:
         """Search a knowledge index for relevant documents"""
         try:
-            embed_model = init_embedding_model("BAAI/bge-small-en-v1.5")
-            client = init_weaviate()
-            collection = client.collections.get(self.default_index)
+            embed_model = rag_resources.get_embedding_model("BAAI/bge-small-en-v1.5")
+            collection = rag_resources.get_collection(self.default_index, create=False)
 
             query_vector = list(embed_model.embed([query]))[0].tolist()
         
@@ -185,29 +180,23 @@ class RAGTool(BaseAgenticTool):
             }
             for obj in result.objects]
         except Exception as e:
-            return [{"error": f"Search failed: {str(e)}"}] 
-        finally:
-            if client:
-                client.close()
+            rag_resources.report_failure()
+            return [{"error": f"Search failed: {str(e)}"}]
 
     def list_documents(self) -> str:
         """List all documents in a knowledge index"""
         try:
-            client = init_weaviate()
-            collection = client.collections.get(self.default_index)
+            collection = rag_resources.get_collection(self.default_index, create=False)
             documents = list_documents_in_collection(collection)
             return documents
         except Exception as e:
+            rag_resources.report_failure()
             return f"Error listing documents: {str(e)}"
-        finally:
-            if client:
-                client.close()
 
     def review_full_document(self, document_id: str = None) -> str:
         """Review a full document from a knowledge index"""
         try:
-            client = init_weaviate()
-            collection = client.collections.get(self.default_index)
+            collection = rag_resources.get_collection(self.default_index, create=False)
 
             # Get all chunks for the document ordered by chunk_index
             result = collection.query.fetch_objects(
@@ -225,7 +214,5 @@ class RAGTool(BaseAgenticTool):
 
             return f"Document: {filename}\n\n{full_text}"
         except Exception as e:
-            return f"Error retrieving document: {str(e)}"
-        finally:
-            if client:
-                client.close()
\ No newline at end of file
+            rag_resources.report_failure()
+            return f"Error retrieving document: {str(e)}"
\ No newline at end of file
@@ -6,6 +6,7 @@ import httpx
 from typing import Callable
 
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.http_client import http_client
 from agentic.tools.utils.registry import tool_registry
 
 @tool_registry.register(
@@ -34,20 +35,19 @@ class ScaleSerpBrowserTool(BaseAgenticTool):
             "language": "en",
             "nb_results": 8,
         }
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                params=params,
-                timeout=90,
-            )
-            results = response.json()
-            if "organic_results" not in results:
-                return []
-            else:
-                return [
-                    (serp["url"], serp["title"])
-                    for serp in results["organic_results"][0:5]
-                ]
+        response = await http_client.aget(
+            url,
+            params=params,
+            timeout=90,
+        )
+        results = response.json()
+        if "organic_results" not in results:
+            return []
+        else:
+            return [
+                (serp["url"], serp["title"])
+                for serp in results["organic_results"][0:5]
+            ]
 
     async def browse_web_tool(
         self,
@@ -72,19 +72,20 @@ class ScaleSerpBrowserTool(BaseAgenticTool):
                     "api_key": api_key,
                 }
                 try:
-                    async with httpx.AsyncClient() as client:
-                        response = await client.get(
-                            "https://api.scaleserp.com/search",
-                            params=params,
-                            timeout=90,
-                        )
-                        results = response.json()
-
-                        if "organic_results" not in results:
-                            return "ScaleSerp return no results."
-
-                        for serp in results["organic_results"][0:5]:
-                            urls.append((serp["link"], serp["title"]))
+                    response = await http_client.aget(
+                        "https://api.scaleserp.com/search",
+                        params=params,
+                        timeout=90,
+                        # Fall back to ScrapingBee after a failure instead of retrying
+                        retries=0,
+                    )
+                    results = response.json()
+
+                    if "organic_results" not in results:
+                        return "ScaleSerp return no results."
+
+                    for serp in results["organic_results"][0:5]:
+                        urls.append((serp["link"], serp["title"]))
                 except httpx.TimeoutException:
                     # Let's try Scrapingbee
                     print("Timed out! Fallback to ScrapingBee")
@@ -133,23 +134,22 @@ class ScaleSerpBrowserTool(BaseAgenticTool):
     async def download_pages(
         self, url_titles: list[tuple], max_concurrency=10
     ) -> list[dict]:
-        async with httpx.AsyncClient() as client:
-            sem = asyncio.Semaphore(max_concurrency)
+        sem = asyncio.Semaphore(max_concurrency)
 
-            async def bounded_fetch(client, url, title):
-                async with sem:
-                    return await self.download_page(client, url, title)
+        async def bounded_fetch(url, title):
+            async with sem:
+                return await self.download_page(url, title)
 
-            tasks = [bounded_fetch(client, url[0], url[1]) for url in url_titles]
-            results = await asyncio.gather(*tasks)
+        tasks = [bounded_fetch(url[0], url[1]) for url in url_titles]
+        results = await asyncio.gather(*tasks)
 
         return results
 
-    async def download_page(self, client, url, title) -> dict:
+    async def download_page(self, url, title) -> dict:
         try:
             if not url.startswith("http"):
                 url = "https://" + url
-            response = await client.get(url, follow_redirects=True)
+            response = await http_client.aget(url)
             response.raise_for_status()  # Raise an exception for HTTP errors
             return {"url": url, "title": title, "content": response.content.decode()}
 
@@ -1,9 +1,9 @@
 from typing import List, Callable
 import pandas as pd
-import httpx
 
 from agentic.common import ThreadContext, PauseForInputResult
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.http_client import http_client
 from agentic.tools.utils.registry import tool_registry, Dependency
 
 TAVILY_API_URL = "https://api.tavily.com"
@@ -45,12 +45,11 @@ class TavilySearchTool(BaseAgenticTool):
             "include_answer": "advanced",
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{TAVILY_API_URL}/search",
-                json=params,
-                timeout=90,
-            )
+        response = await http_client.apost(
+            f"{TAVILY_API_URL}/search",
+            json=params,
+            timeout=90,
+        )
 
         response.raise_for_status()
         results = response.json()
@@ -96,12 +95,11 @@ class TavilySearchTool(BaseAgenticTool):
             "include_images": include_images,
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{TAVILY_API_URL}/search",
-                json=params,
-                timeout=90,
-            )
+        response = await http_client.apost(
+            f"{TAVILY_API_URL}/search",
+            json=params,
+            timeout=90,
+        )
 
         response.raise_for_status()
         results = response.json()
@@ -122,12 +120,11 @@ class TavilySearchTool(BaseAgenticTool):
             "include_images": include_images,
         }
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{TAVILY_API_URL}/extract",
-                json=params,
-                timeout=90,
-            )
+        response = await http_client.apost(
+            f"{TAVILY_API_URL}/extract",
+            json=params,
+            timeout=90,
+        )
 
         return response.json()
 
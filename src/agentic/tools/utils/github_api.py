@@ -0,0 +1,477 @@
+# A GitHub API client for GithubTool, on top of the shared HTTP client:
+#
+#   - GET responses are cached locally with their ETags, and repeated requests are sent with
+#     If-None-Match. GitHub answers 304 Not Modified when nothing changed, and 304s don't count
+#     against the rate limit.
+#   - paginate() reads the Link header of the first page and fetches the remaining pages
+#     concurrently, up to a page cap.
+#   - The X-RateLimit-* headers are tracked per token and rate limit resource (core, search,
+#     graphql...). When a budget runs out, requests wait for its reset if that's soon and fail
+#     with GitHubRateLimitError otherwise, and page fan-out is kept within the budget left.
+#   - list_issues() and list_pull_requests() use the GraphQL API to list issues or pull
+#     requests together with their comments and reviews, 50 per request, instead of one
+#     REST request per item.
+#
+#   AGENTIC_GITHUB_CACHE              the response cache (~/.agentic/github_cache.db)
+#   AGENTIC_GITHUB_MAX_PAGES          pages fetched per listing (default 10, of 100 items each)
+#   AGENTIC_GITHUB_PAGE_CONCURRENCY   pages fetched at once (default 4)
+#   AGENTIC_GITHUB_MAX_RATE_WAIT      seconds to wait for a rate limit reset (default 60)
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+import httpx
+
+from agentic.tools.utils.http_client import SharedHTTPClient, http_client, retry_after
+
+API_URL = "https://api.github.com"
+DEFAULT_CACHE_PATH = os.environ.get("AGENTIC_GITHUB_CACHE", "~/.agentic/github_cache.db")
+MAX_PAGES = int(os.environ.get("AGENTIC_GITHUB_MAX_PAGES", "10"))
+PAGE_CONCURRENCY = int(os.environ.get("AGENTIC_GITHUB_PAGE_CONCURRENCY", "4"))
+MAX_RATE_WAIT = float(os.environ.get("AGENTIC_GITHUB_MAX_RATE_WAIT", "60"))
+# Least recently used responses are dropped past this many
+MAX_CACHE_ENTRIES = 10000
+GRAPHQL_PAGE_SIZE = 50
+GRAPHQL_MAX_ITEMS = 200
+
+_LINK_RE = re.compile(r'<([^>]+)>\s*;\s*rel="([^"]+)"')
+
+
+class GitHubAPIError(RuntimeError):
+    pass
+
+
+class GitHubRateLimitError(GitHubAPIError):
+    pass
+
+
+def parse_links(header: Optional[str]) -> dict[str, str]:
+    """The URLs of a Link header by rel, eg. {"next": ..., "last": ...}"""
+    return {rel: url for url, rel in _LINK_RE.findall(header or "")}
+
+
+def page_number(url: Optional[str]) -> Optional[int]:
+    if not url:
+        return None
+    page = httpx.URL(url).params.get("page")
+    return int(page) if page and page.isdigit() else None
+
+
+def rate_limit_resource(path: str) -> str:
+    """The rate limit bucket a request counts against, until the response says otherwise"""
+    if path.startswith("/graphql"):
+        return "graphql"
+    if path.startswith("/search/code"):
+        return "code_search"
+    if path.startswith("/search"):
+        return "search"
+    return "core"
+
+
+@dataclass
+class GitHubResponse:
+    status_code: int
+    data: Any
+    text: str = ""
+    links: dict[str, str] = field(default_factory=dict)
+    # Served from the cache after a 304
+    cached: bool = False
+    # A listing that had more pages than were fetched
+    truncated: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300
+
+    @classmethod
+    def from_httpx(cls, response: httpx.Response) -> "GitHubResponse":
+        try:
+            data = response.json() if response.content else None
+        except ValueError:
+            data = None
+        return cls(response.status_code, data, response.text, parse_links(response.headers.get("Link")))
+
+
+@dataclass
+class CachedResponse:
+    etag: Optional[str]
+    last_modified: Optional[str]
+    link: Optional[str]
+    body: bytes
+
+
+class ResponseCache:
+    """GET response bodies with their validators, keyed by token and URL. Tokens are hashed
+    into the key, so one token's responses are never served to another."""
+
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH, max_entries: int = MAX_CACHE_ENTRIES):
+        self.path = Path(path).expanduser()
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._puts = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, link TEXT, body BLOB, used REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses (used)")
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def key(token_key: str, url: str, params: Optional[dict] = None) -> str:
+        full_url = str(httpx.URL(url).copy_merge_params(params or {}))
+        return hashlib.sha256(f"{token_key}\n{full_url}".encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT etag, last_modified, link, body FROM responses WHERE key=?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE responses SET used=? WHERE key=?", (time.time(), key))
+            conn.commit()
+            return CachedResponse(*row)
+
+    def put(self, key: str, etag: Optional[str], last_modified: Optional[str], link: Optional[str], body: bytes):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (key, etag, last_modified, link, body, time.time()),
+            )
+            self._puts += 1
+            if self._puts % 100 == 0:
+                self.prune()
+            conn.commit()
+
+    def prune(self):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+@dataclass
+class RateLimit:
+    limit: int
+    remaining: int
+    # Epoch seconds
+    reset: float
+
+
+class RateLimiter:
+    """Tracks the rate limit budgets from response headers, per token and resource. Each
+    request takes one from the budget before it's sent, so requests that are in flight
+    together don't overrun it."""
+
+    def __init__(self, max_wait: float = MAX_RATE_WAIT):
+        self.max_wait = max_wait
+        self._limits: dict[tuple[str, str], RateLimit] = {}
+        self._lock = threading.Lock()
+
+    def get(self, token_key: str, resource: str) -> Optional[RateLimit]:
+        with self._lock:
+            return self._limits.get((token_key, resource))
+
+    def budget(self, token_key: str, resource: str) -> Optional[int]:
+        """Requests left until the reset, or None if that's not known"""
+        limit = self.get(token_key, resource)
+        if limit is None or limit.reset <= time.time():
+            return None
+        return limit.remaining
+
+    async def acquire(self, token_key: str, resource: str):
+        while True:
+            with self._lock:
+                limit = self._limits.get((token_key, resource))
+                if limit is None or limit.reset <= time.time():
+                    return
+                if limit.remaining > 0:
+                    limit.remaining -= 1
+                    return
+                wait = limit.reset - time.time() + 1
+            if wait > self.max_wait:
+                raise GitHubRateLimitError(
+                    f"GitHub API rate limit ({resource}) exceeded, it resets in {int(wait)} seconds"
+                )
+            await asyncio.sleep(wait)
+
+    def update(self, token_key: str, resource: str, headers: httpx.Headers):
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset = headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        resource = headers.get("X-RateLimit-Resource", resource)
+        try:
+            limit = RateLimit(int(headers.get("X-RateLimit-Limit", remaining)), int(remaining), float(reset))
+        except ValueError:
+            return
+        with self._lock:
+            self._limits[(token_key, resource)] = limit
+
+
+_ISSUE_FIELDS = """
+        number title url state createdAt updatedAt closedAt body
+        author { login }
+        assignees(first: 10) { nodes { login } }
+        labels(first: 20) { nodes { name } }
+        comments(first: $comments) { totalCount nodes { author { login } body createdAt url } }"""
+
+ISSUES_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $cursor: String, $comments: Int!, $filter: IssueFilters) {
+  repository(owner: $owner, name: $name) {
+    items: issues(first: $first, after: $cursor, filterBy: $filter, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {%s
+      }
+    }
+  }
+}""" % _ISSUE_FIELDS
+
+PULL_REQUESTS_QUERY = """
+query($owner: String!, $name: String!, $first: Int!, $cursor: String, $comments: Int!, $states: [PullRequestState!]) {
+  repository(owner: $owner, name: $name) {
+    items: pullRequests(first: $first, after: $cursor, states: $states, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {%s
+        mergedAt isDraft headRefName baseRefName
+        reviews(first: $comments) {
+          totalCount
+          nodes {
+            author { login } state body submittedAt url
+            comments(first: 20) { nodes { author { login } body path line createdAt url } }
+          }
+        }
+      }
+    }
+  }
+}""" % _ISSUE_FIELDS
+
+
+class GitHubAPI:
+    """GitHub API requests made with one token"""
+
+    def __init__(
+        self,
+        token: str,
+        cache: Optional[ResponseCache] = None,
+        rate_limits: Optional[RateLimiter] = None,
+        base_url: str = API_URL,
+        client: SharedHTTPClient = http_client,
+        page_concurrency: int = PAGE_CONCURRENCY,
+    ):
+        self.token = token
+        self.token_key = hashlib.sha256(token.encode()).hexdigest()[:16]
+        self.cache = cache
+        self.rate_limits = rate_limits or RateLimiter()
+        self.base_url = base_url.rstrip("/")
+        self.client = client
+        self.page_concurrency = page_concurrency
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {"Authorization": f"token {self.token}", "Accept": "application/vnd.github.v3+json"}
+
+    def url(self, path: str) -> str:
+        return path if path.startswith(("http://", "https://")) else f"{self.base_url}{path}"
+
+    async def request(
+        self, method: str, path: str, params: Optional[dict] = None, json: Optional[Any] = None
+    ) -> GitHubResponse:
+        """Send a request to an API path, or to a URL from a Link header. GETs are revalidated
+        against the cache."""
+        method = method.upper()
+        url = self.url(path)
+        resource = rate_limit_resource(httpx.URL(url).path)
+        headers = self.headers
+        key = cached = None
+        if method == "GET" and self.cache is not None:
+            key = ResponseCache.key(self.token_key, url, params)
+            cached = self.cache.get(key)
+            if cached is not None:
+                if cached.etag:
+                    headers["If-None-Match"] = cached.etag
+                if cached.last_modified:
+                    headers["If-Modified-Since"] = cached.last_modified
+
+        for attempt in range(2):
+            await self.rate_limits.acquire(self.token_key, resource)
+            response = await self.client.arequest(method, url, headers=headers, params=params, json=json)
+            self.rate_limits.update(self.token_key, resource, response.headers)
+            if attempt or response.status_code not in (403, 429):
+                break
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                # The budget is spent: acquire() waits for the reset, or raises
+                continue
+            # A secondary rate limit
+            wait = retry_after(response)
+            if wait is None or wait > self.rate_limits.max_wait:
+                break
+            await asyncio.sleep(wait)
+
+        if response.status_code == 304 and cached is not None:
+            return GitHubResponse(
+                200, _loads(cached.body), cached.body.decode(errors="replace"), parse_links(cached.link), cached=True
+            )
+        if key is not None and response.status_code == 200:
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                self.cache.put(key, etag, last_modified, response.headers.get("Link"), response.content)
+        return GitHubResponse.from_httpx(response)
+
+    async def paginate(
+        self,
+        path: str,
+        params: Optional[dict] = None,
+        max_pages: int = MAX_PAGES,
+        per_page: int = 100,
+        items_key: Optional[str] = None,
+    ) -> GitHubResponse:
+        """GET every page of a listing, up to `max_pages`, as one response. Its data is the
+        combined list, or for responses that wrap the list (eg. search results), the first
+        page with `items_key` holding every page's items. Returns the first failed response
+        if any page fails."""
+        params = {**(params or {}), "per_page": per_page}
+        first = await self.request("GET", path, params)
+        if not first.ok:
+            return first
+        pages = [first]
+        last = page_number(first.links.get("last"))
+        if last is not None:
+            pages.extend(await self._fetch_pages(path, params, range(2, min(last, max_pages) + 1)))
+            truncated = last > max_pages
+        else:
+            # No last page to fan out to (eg. cursor pagination), so follow the next links
+            next_url = first.links.get("next")
+            while next_url and len(pages) < max_pages:
+                page = await self.request("GET", next_url)
+                pages.append(page)
+                if not page.ok:
+                    break
+                next_url = page.links.get("next")
+            truncated = bool(next_url) and pages[-1].ok
+        for page in pages:
+            if not page.ok:
+                return page
+
+        if items_key is None:
+            data = [item for page in pages for item in (page.data or [])]
+        else:
+            data = dict(first.data)
+            data[items_key] = [item for page in pages for item in page.data.get(items_key, [])]
+        return GitHubResponse(200, data, links=first.links, cached=all(page.cached for page in pages), truncated=truncated)
+
+    async def _fetch_pages(self, path: str, params: dict, numbers: range) -> list[GitHubResponse]:
+        resource = rate_limit_resource(httpx.URL(self.url(path)).path)
+        budget = self.rate_limits.budget(self.token_key, resource)
+        concurrency = self.page_concurrency if budget is None else max(1, min(self.page_concurrency, budget))
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(number: int) -> GitHubResponse:
+            async with semaphore:
+                return await self.request("GET", path, {**params, "page": number})
+
+        return list(await asyncio.gather(*(fetch(number) for number in numbers)))
+
+    async def graphql(self, query: str, variables: Optional[dict] = None) -> dict:
+        """Run a GraphQL query and return its data. Raises GitHubAPIError on errors."""
+        response = await self.request("POST", "/graphql", json={"query": query, "variables": variables or {}})
+        if not response.ok:
+            raise GitHubAPIError(f"GraphQL request failed: {response.text}")
+        if response.data.get("errors"):
+            messages = "; ".join(error.get("message", "") for error in response.data["errors"])
+            raise GitHubAPIError(f"GraphQL query failed: {messages}")
+        return response.data["data"]
+
+    async def list_issues(
+        self,
+        owner: str,
+        name: str,
+        filters: Optional[dict] = None,
+        max_items: int = GRAPHQL_MAX_ITEMS,
+        comments: int = 20,
+    ) -> list[dict]:
+        """Issues with their first `comments` comments, newest first. `filters` is a GraphQL
+        IssueFilters object, eg. {"states": ["OPEN"], "labels": ["bug"], "since": ...}."""
+        return await self._graphql_items(ISSUES_QUERY, owner, name, {"filter": filters, "comments": comments}, max_items)
+
+    async def list_pull_requests(
+        self,
+        owner: str,
+        name: str,
+        states: Optional[list[str]] = None,
+        max_items: int = GRAPHQL_MAX_ITEMS,
+        comments: int = 20,
+    ) -> list[dict]:
+        """Pull requests with their first `comments` comments and reviews, newest first"""
+        return await self._graphql_items(
+            PULL_REQUESTS_QUERY, owner, name, {"states": states, "comments": comments}, max_items
+        )
+
+    async def _graphql_items(self, query: str, owner: str, name: str, variables: dict, max_items: int) -> list[dict]:
+        items: list[dict] = []
+        cursor = None
+        while len(items) < max_items:
+            data = await self.graphql(query, {
+                **variables,
+                "owner": owner,
+                "name": name,
+                "first": min(GRAPHQL_PAGE_SIZE, max_items - len(items)),
+                "cursor": cursor,
+            })
+            if data.get("repository") is None:
+                raise GitHubAPIError(f"Repository {owner}/{name} not found")
+            connection = data["repository"]["items"]
+            items.extend(connection["nodes"])
+            if not connection["pageInfo"]["hasNextPage"]:
+                break
+            cursor = connection["pageInfo"]["endCursor"]
+        return items
+
+
+def _loads(body: bytes) -> Any:
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+_cache_lock = threading.Lock()
+_response_cache: Optional[ResponseCache] = None
+
+rate_limits = RateLimiter()
+
+
+def get_response_cache() -> ResponseCache:
+    global _response_cache
+    with _cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
@@ -0,0 +1,231 @@
+# A shared HTTP client for tools. Every tool request goes through one httpx.AsyncClient that
+# runs on a background event loop, so keep-alive connections (and HTTP/2, when the h2 package
+# is installed) are reused across calls, agents and threads, whichever loop or thread the
+# tool runs on. Use the async functions from async tools and the sync ones from sync tools:
+#
+#   from agentic.tools.utils.http_client import http_client
+#
+#   response = await http_client.aget(url, params=params)
+#   response = http_client.post(url, json=body, headers=headers)
+#
+# Responses are read in full and are ordinary httpx.Responses. Requests to one host are
+# limited to AGENTIC_HTTP_MAX_PER_HOST at a time (default 10), time out after
+# AGENTIC_HTTP_TIMEOUT seconds (default 30), and are retried with backoff up to
+# AGENTIC_HTTP_RETRIES times (default 2) on connection errors, and on 429/502/503/504
+# responses, honoring Retry-After. Calls that may not be safe to repeat (POST, PATCH) are
+# only retried when the server says it didn't process them (429, or a connect error).
+# Read timeouts aren't retried: a server that took the whole timeout once will likely do so
+# again, so the caller hears about it after one timeout rather than retries + 1 of them.
+# Pass retries=0 to send a request exactly once.
+import asyncio
+import atexit
+import os
+import random
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Optional
+
+import httpx
+
+DEFAULT_MAX_PER_HOST = int(os.environ.get("AGENTIC_HTTP_MAX_PER_HOST", "10"))
+DEFAULT_TIMEOUT = float(os.environ.get("AGENTIC_HTTP_TIMEOUT", "30"))
+DEFAULT_RETRIES = int(os.environ.get("AGENTIC_HTTP_RETRIES", "2"))
+# Longest Retry-After we'll wait for. Longer ones return the response.
+MAX_RETRY_WAIT = float(os.environ.get("AGENTIC_HTTP_MAX_RETRY_WAIT", "60"))
+
+RETRY_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+
+
+@dataclass
+class HostLimits:
+    max_concurrency: int = DEFAULT_MAX_PER_HOST
+    timeout: float = DEFAULT_TIMEOUT
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, which is seconds or an HTTP date"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class SharedHTTPClient:
+    """Owns the background event loop, the pooled client and the per-host limits"""
+
+    def __init__(
+        self,
+        max_per_host: int = DEFAULT_MAX_PER_HOST,
+        timeout: float = DEFAULT_TIMEOUT,
+        retries: int = DEFAULT_RETRIES,
+        backoff: float = 0.5,
+    ):
+        self.default_limits = HostLimits(max_per_host, timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self._hosts: dict[str, HostLimits] = {}
+        self._semaphores: dict[str, asyncio.Semaphore] = {}
+        self._client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="agentic-http", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def configure_host(self, host: str, max_concurrency: Optional[int] = None, timeout: Optional[float] = None):
+        """Set the concurrency limit or timeout for one host, eg. "api.github.com". Takes
+        effect for requests that start afterwards."""
+        current = self._hosts.get(host, self.default_limits)
+        self._hosts[host] = HostLimits(
+            max_concurrency if max_concurrency is not None else current.max_concurrency,
+            timeout if timeout is not None else current.timeout,
+        )
+        self._semaphores.pop(host, None)
+
+    def limits(self, host: str) -> HostLimits:
+        return self._hosts.get(host, self.default_limits)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=_http2_available(),
+                follow_redirects=True,
+                limits=httpx.Limits(max_connections=None, max_keepalive_connections=100, keepalive_expiry=60),
+            )
+        return self._client
+
+    def _semaphore(self, host: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(host)
+        if semaphore is None:
+            semaphore = self._semaphores[host] = asyncio.Semaphore(self.limits(host).max_concurrency)
+        return semaphore
+
+    def _backoff(self, attempt: int) -> float:
+        return self.backoff * 2 ** attempt * (0.5 + random.random() / 2)
+
+    async def _send(self, method: str, url: str, retries: Optional[int], kwargs: dict) -> httpx.Response:
+        # Runs on the client's loop
+        method = method.upper()
+        host = httpx.URL(url).host
+        retries = self.retries if retries is None else retries
+        kwargs.setdefault("timeout", self.limits(host).timeout)
+        client = self._get_client()
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore(host):
+                    response = await client.request(method, url, **kwargs)
+            except (httpx.ConnectError, httpx.ConnectTimeout):
+                if attempt >= retries:
+                    raise
+                wait = self._backoff(attempt)
+            except httpx.RemoteProtocolError:
+                if attempt >= retries or method not in IDEMPOTENT_METHODS:
+                    raise
+                wait = self._backoff(attempt)
+            else:
+                if (
+                    attempt >= retries
+                    or response.status_code not in RETRY_STATUSES
+                    or (method not in IDEMPOTENT_METHODS and response.status_code != 429)
+                ):
+                    return response
+                wait = retry_after(response)
+                if wait is None:
+                    wait = self._backoff(attempt)
+                elif wait > MAX_RETRY_WAIT:
+                    return response
+            attempt += 1
+            await asyncio.sleep(wait)
+
+    def _submit(self, coro: Awaitable) -> Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def arequest(self, method: str, url: str, retries: Optional[int] = None, **kwargs) -> httpx.Response:
+        """Send a request from any event loop. `kwargs` are passed to httpx, eg. params,
+        headers, json, data, files, auth or timeout."""
+        coro = self._send(method, url, retries, kwargs)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is not None and running is self._loop:
+            return await coro
+        return await asyncio.wrap_future(self._submit(coro))
+
+    def request(self, method: str, url: str, retries: Optional[int] = None, **kwargs) -> httpx.Response:
+        """Send a request and wait for the response. Not for use on the client's own loop."""
+        return self._submit(self._send(method, url, retries, kwargs)).result()
+
+    async def aget(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest("GET", url, **kwargs)
+
+    async def apost(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest("POST", url, **kwargs)
+
+    async def apatch(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest("PATCH", url, **kwargs)
+
+    async def aput(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest("PUT", url, **kwargs)
+
+    async def adelete(self, url: str, **kwargs) -> httpx.Response:
+        return await self.arequest("DELETE", url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def patch(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("PATCH", url, **kwargs)
+
+    def put(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("PUT", url, **kwargs)
+
+    def delete(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("DELETE", url, **kwargs)
+
+    def close(self):
+        """Close the pooled connections. The client reopens on the next request."""
+        if self._client is None or self._loop is None:
+            return
+        client, self._client = self._client, None
+        try:
+            self._submit(client.aclose()).result(timeout=5)
+        except Exception as e:
+            print(f"Error closing the HTTP client: {e}")
+
+
+http_client = SharedHTTPClient()
+atexit.register(http_client.close)
@@ -0,0 +1,466 @@
+# Incremental IMAP sync for IMAPTool. Logged-in connections are pooled per account, messages
+# are fetched by UID in ranged batches, and headers, bodies and the agents' read tracking are
+# kept in a local SQLite cache, so listing a mailbox costs a few round trips instead of one
+# FETCH per message:
+#
+#   1. SELECT (read-only) reports the folder's UIDVALIDITY and UIDNEXT. A new UIDVALIDITY
+#      means the server renumbered the folder, and its cache is dropped.
+#   2. If UIDNEXT moved since the last sync, the headers of the new messages are fetched.
+#   3. Searches still run on the server (UID SEARCH); the matching headers come from the
+#      cache, and only the missing ones are fetched. Bodies are fetched, and cached, on demand.
+#
+#   AGENTIC_IMAP_CACHE    the cache database (~/.agentic/imap_cache.db)
+import email
+import email.message
+import hashlib
+import hmac
+import imaplib
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from email.header import decode_header
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+DEFAULT_CACHE_PATH = os.environ.get("AGENTIC_IMAP_CACHE", "~/.agentic/imap_cache.db")
+FETCH_BATCH_SIZE = 200
+# Headers fetched the first time a folder is synced. Older ones are fetched when a search needs them.
+INITIAL_SYNC_LIMIT = 500
+IDLE_TIMEOUT = 300.0
+
+_UID_RE = re.compile(rb"UID (\d+)")
+
+
+def decode_header_value(header) -> str:
+    if header is None:
+        return ""
+    decoded = ""
+    for part, encoding in decode_header(str(header)):
+        if isinstance(part, bytes):
+            decoded += part.decode(encoding or "utf-8", errors="ignore")
+        else:
+            decoded += part
+    return decoded
+
+
+def uid_ranges(uids: Iterable[int]) -> str:
+    """A UID set in IMAP sequence-set syntax, eg. [1, 2, 3, 7] -> "1:3,7" """
+    ranges = []
+    start = prev = None
+    for uid in sorted(set(uids)):
+        if start is None:
+            start = prev = uid
+        elif uid == prev + 1:
+            prev = uid
+        else:
+            ranges.append(f"{start}:{prev}" if start != prev else str(start))
+            start = prev = uid
+    if start is not None:
+        ranges.append(f"{start}:{prev}" if start != prev else str(start))
+    return ",".join(ranges)
+
+
+def parse_fetch(data: list) -> dict[int, bytes]:
+    """UID -> literal from the response to a UID FETCH of one message part"""
+    results = {}
+    for item in data:
+        if isinstance(item, tuple) and len(item) >= 2:
+            match = _UID_RE.search(item[0])
+            if match:
+                results[int(match.group(1))] = item[1]
+    return results
+
+
+def _check(status: str, data: list, command: str):
+    if status != "OK":
+        detail = data[0].decode(errors="ignore") if data and isinstance(data[0], bytes) else data
+        raise imaplib.IMAP4.error(f"{command} failed: {detail}")
+
+
+@dataclass
+class CachedHeader:
+    uid: int
+    subject: str
+    sender: str
+    recipients: str
+    date: str
+    header: bytes
+
+
+class MailCache:
+    """Headers, bodies and folder sync state for each account, plus which messages each
+    agent has processed. Accounts are keyed as user@host."""
+
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path).expanduser()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS folders ("
+                "account TEXT, folder TEXT, uidvalidity INTEGER, uidnext INTEGER, synced REAL, "
+                "PRIMARY KEY (account, folder))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS messages ("
+                "account TEXT, folder TEXT, uid INTEGER, subject TEXT, sender TEXT, recipients TEXT, "
+                "date TEXT, header BLOB, body BLOB, PRIMARY KEY (account, folder, uid))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS processed ("
+                "account TEXT, folder TEXT, uid INTEGER, agent_id TEXT, sender TEXT, recipients TEXT, "
+                "subject TEXT, processed REAL, PRIMARY KEY (account, folder, uid, agent_id))"
+            )
+            self._conn.commit()
+        return self._conn
+
+    def folder_state(self, account: str, folder: str) -> Optional[tuple[int, int]]:
+        """(uidvalidity, uidnext) as of the last sync"""
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT uidvalidity, uidnext FROM folders WHERE account=? AND folder=?", (account, folder)
+            ).fetchone()
+            return tuple(row) if row else None
+
+    def set_folder_state(self, account: str, folder: str, uidvalidity: int, uidnext: int):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO folders VALUES (?, ?, ?, ?, ?)",
+                (account, folder, uidvalidity, uidnext, time.time()),
+            )
+            conn.commit()
+
+    def reset_folder(self, account: str, folder: str):
+        """Forget a folder's messages, when its UIDs are no longer valid"""
+        with self._lock:
+            conn = self._connection()
+            for table in ("folders", "messages", "processed"):
+                conn.execute(f"DELETE FROM {table} WHERE account=? AND folder=?", (account, folder))
+            conn.commit()
+
+    def prune(self, account: str, folder: str, keep_uids: set[int]):
+        """Drop cached messages that are no longer in the folder"""
+        with self._lock:
+            conn = self._connection()
+            cached = {row[0] for row in conn.execute(
+                "SELECT uid FROM messages WHERE account=? AND folder=?", (account, folder)
+            )}
+            gone = [(account, folder, uid) for uid in cached - keep_uids]
+            conn.executemany("DELETE FROM messages WHERE account=? AND folder=? AND uid=?", gone)
+            conn.commit()
+
+    def store_headers(self, account: str, folder: str, headers: dict[int, bytes]):
+        rows = []
+        for uid, header in headers.items():
+            message = email.message_from_bytes(header)
+            rows.append((
+                account, folder, uid,
+                decode_header_value(message["subject"]),
+                decode_header_value(message["from"]),
+                decode_header_value(message["to"]),
+                message["date"] or "",
+                header,
+            ))
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "INSERT INTO messages (account, folder, uid, subject, sender, recipients, date, header) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (account, folder, uid) DO UPDATE SET "
+                "subject=excluded.subject, sender=excluded.sender, recipients=excluded.recipients, "
+                "date=excluded.date, header=excluded.header",
+                rows,
+            )
+            conn.commit()
+
+    def store_bodies(self, account: str, folder: str, bodies: dict[int, bytes]):
+        with self._lock:
+            conn = self._connection()
+            conn.executemany(
+                "UPDATE messages SET body=? WHERE account=? AND folder=? AND uid=?",
+                [(body, account, folder, uid) for uid, body in bodies.items()],
+            )
+            conn.commit()
+
+    def headers(self, account: str, folder: str, uids: Iterable[int]) -> dict[int, CachedHeader]:
+        uids = list(uids)
+        results = {}
+        with self._lock:
+            conn = self._connection()
+            # Stay under SQLite's limit on query parameters
+            for start in range(0, len(uids), 500):
+                chunk = uids[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                for row in conn.execute(
+                    f"SELECT uid, subject, sender, recipients, date, header FROM messages "
+                    f"WHERE account=? AND folder=? AND uid IN ({marks})",
+                    (account, folder, *chunk),
+                ):
+                    results[row[0]] = CachedHeader(*row)
+        return results
+
+    def bodies(self, account: str, folder: str, uids: Iterable[int]) -> dict[int, bytes]:
+        uids = list(uids)
+        results = {}
+        with self._lock:
+            conn = self._connection()
+            for start in range(0, len(uids), 500):
+                chunk = uids[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                for uid, body in conn.execute(
+                    f"SELECT uid, body FROM messages WHERE account=? AND folder=? "
+                    f"AND uid IN ({marks}) AND body IS NOT NULL",
+                    (account, folder, *chunk),
+                ):
+                    results[uid] = body
+        return results
+
+    def max_uid(self, account: str, folder: str) -> int:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT MAX(uid) FROM messages WHERE account=? AND folder=?", (account, folder)
+            ).fetchone()
+            return row[0] or 0
+
+    def is_processed(self, account: str, folder: str, uid: int, agent_id: str) -> bool:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT 1 FROM processed WHERE account=? AND folder=? AND uid=? AND agent_id=?",
+                (account, folder, uid, agent_id),
+            ).fetchone()
+            return row is not None
+
+    def mark_processed(
+        self, account: str, folder: str, uid: int, agent_id: str, message: email.message.Message
+    ):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO processed VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    account, folder, uid, agent_id,
+                    decode_header_value(message["From"]),
+                    decode_header_value(message["To"]),
+                    decode_header_value(message["Subject"]),
+                    time.time(),
+                ),
+            )
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class IMAPConnectionPool:
+    """Logged-in connections, kept per account (host, port, user) and password, so a
+    connection is only reused by callers with the same credentials. A connection is used by
+    one caller at a time; idle ones are checked with NOOP before they're handed out again."""
+
+    def __init__(
+        self,
+        max_idle_per_account: int = 2,
+        idle_timeout: float = IDLE_TIMEOUT,
+        factory: Callable[[str, int], imaplib.IMAP4] = imaplib.IMAP4_SSL,
+    ):
+        self.max_idle_per_account = max_idle_per_account
+        self.idle_timeout = idle_timeout
+        self.factory = factory
+        self._idle: dict[tuple, list[tuple[imaplib.IMAP4, float]]] = {}
+        self._lock = threading.Lock()
+        # Passwords are only kept as keyed hashes
+        self._secret = os.urandom(32)
+
+    def _key(self, host: str, port: int, username: str, password: str) -> tuple:
+        digest = hmac.new(self._secret, password.encode(), hashlib.sha256).hexdigest()
+        return (host, port, username, digest)
+
+    @contextmanager
+    def connection(self, host: str, port: int, username: str, password: str) -> Iterator[imaplib.IMAP4]:
+        key = self._key(host, port, username, password)
+        imap = self._checkout(key)
+        if imap is None:
+            imap = self.factory(host, port)
+            try:
+                imap.login(username, password)
+            except Exception:
+                _logout(imap)
+                raise
+            # The password worked, so connections logged in with an older one are dropped
+            self._evict_other_passwords(key)
+        try:
+            yield imap
+        except (imaplib.IMAP4.abort, OSError):
+            # The connection is broken
+            _logout(imap)
+            raise
+        except BaseException:
+            self._checkin(key, imap)
+            raise
+        self._checkin(key, imap)
+
+    def _checkout(self, key: tuple) -> Optional[imaplib.IMAP4]:
+        while True:
+            with self._lock:
+                idle = self._idle.get(key)
+                if not idle:
+                    return None
+                imap, released = idle.pop()
+            if time.monotonic() - released < self.idle_timeout:
+                try:
+                    if imap.noop()[0] == "OK":
+                        return imap
+                except Exception:
+                    pass
+            _logout(imap)
+
+    def _checkin(self, key: tuple, imap: imaplib.IMAP4):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_account:
+                idle.append((imap, time.monotonic()))
+                return
+        _logout(imap)
+
+    def _evict_other_passwords(self, key: tuple):
+        with self._lock:
+            stale = [other for other in self._idle if other[:3] == key[:3] and other != key]
+            connections = [imap for other in stale for imap, _ in self._idle.pop(other)]
+        for imap in connections:
+            _logout(imap)
+
+    def close(self):
+        with self._lock:
+            connections = [imap for idle in self._idle.values() for imap, _ in idle]
+            self._idle.clear()
+        for imap in connections:
+            _logout(imap)
+
+
+def _logout(imap: imaplib.IMAP4):
+    try:
+        imap.logout()
+    except Exception:
+        pass
+
+
+class IMAPSync:
+    """Keeps the cache of one account's folders up to date over a pooled connection"""
+
+    def __init__(self, cache: MailCache, batch_size: int = FETCH_BATCH_SIZE, initial_sync_limit: int = INITIAL_SYNC_LIMIT):
+        self.cache = cache
+        self.batch_size = batch_size
+        self.initial_sync_limit = initial_sync_limit
+
+    def select(self, imap: imaplib.IMAP4, account: str, folder: str, readonly: bool = True) -> int:
+        """Select `folder` (read-only unless flags will be changed) and bring its cached
+        headers up to date. Returns the number of new messages whose headers were fetched."""
+        status, data = imap.select(folder, readonly=readonly)
+        _check(status, data, f"SELECT {folder}")
+        uidvalidity, uidnext = self._folder_ids(imap, folder)
+
+        state = self.cache.folder_state(account, folder)
+        if state is not None and state[0] != uidvalidity:
+            self.cache.reset_folder(account, folder)
+            state = None
+
+        if state is not None and state[1] == uidnext:
+            return 0
+        if state is None:
+            # First sync: prune anything stale and fetch the newest headers
+            uids = self.search(imap, "ALL")
+            self.cache.prune(account, folder, set(uids))
+            new_uids = uids[-self.initial_sync_limit:] if self.initial_sync_limit else []
+        else:
+            start = max(state[1], self.cache.max_uid(account, folder) + 1)
+            # "n:*" always matches the last message, even when its UID is below n
+            new_uids = [uid for uid in self.search(imap, f"UID {start}:*") if uid >= start]
+
+        fetched = self.fetch_headers(imap, account, folder, new_uids)
+        self.cache.set_folder_state(account, folder, uidvalidity, uidnext)
+        return fetched
+
+    def _folder_ids(self, imap: imaplib.IMAP4, folder: str) -> tuple[int, int]:
+        """UIDVALIDITY and UIDNEXT, from the SELECT response or else a STATUS command"""
+        _, validity = imap.response("UIDVALIDITY")
+        _, uidnext = imap.response("UIDNEXT")
+        if validity and validity[0] is not None and uidnext and uidnext[0] is not None:
+            return int(validity[-1]), int(uidnext[-1])
+        status, data = imap.status(folder, "(UIDVALIDITY UIDNEXT)")
+        _check(status, data, f"STATUS {folder}")
+        text = data[0].decode() if isinstance(data[0], bytes) else str(data[0])
+        validity = re.search(r"UIDVALIDITY (\d+)", text)
+        uidnext = re.search(r"UIDNEXT (\d+)", text)
+        if not validity or not uidnext:
+            raise imaplib.IMAP4.error(f"Server did not report UIDVALIDITY/UIDNEXT for {folder}")
+        return int(validity.group(1)), int(uidnext.group(1))
+
+    def search(self, imap: imaplib.IMAP4, *criteria: str) -> list[int]:
+        """UIDs matching the criteria, in ascending order"""
+        status, data = imap.uid("SEARCH", None, *criteria)
+        _check(status, data, "UID SEARCH")
+        return sorted(int(uid) for uid in (data[0] or b"").split())
+
+    def fetch_headers(self, imap: imaplib.IMAP4, account: str, folder: str, uids: list[int]) -> int:
+        """Fetch and cache the headers of `uids` that aren't cached yet"""
+        cached = self.cache.headers(account, folder, uids)
+        missing = [uid for uid in uids if uid not in cached]
+        fetched = self._fetch(imap, missing, "RFC822.HEADER")
+        if fetched:
+            self.cache.store_headers(account, folder, fetched)
+        return len(fetched)
+
+    def fetch_bodies(self, imap: imaplib.IMAP4, account: str, folder: str, uids: list[int]) -> dict[int, bytes]:
+        """The full messages for `uids`, from the cache or fetched in batches. BODY.PEEK
+        leaves the messages' \\Seen flags alone."""
+        self.fetch_headers(imap, account, folder, uids)
+        bodies = self.cache.bodies(account, folder, uids)
+        missing = [uid for uid in uids if uid not in bodies]
+        fetched = self._fetch(imap, missing, "BODY.PEEK[]")
+        if fetched:
+            self.cache.store_bodies(account, folder, fetched)
+            bodies.update(fetched)
+        return bodies
+
+    def mark_seen(self, imap: imaplib.IMAP4, uids: list[int]):
+        """Set the \\Seen flag of `uids` in the folder, which must be selected with readonly=False"""
+        uids = sorted(uids)
+        for start in range(0, len(uids), self.batch_size):
+            batch = uids[start:start + self.batch_size]
+            status, data = imap.uid("STORE", uid_ranges(batch), "+FLAGS", "(\\Seen)")
+            _check(status, data, "UID STORE")
+
+    def _fetch(self, imap: imaplib.IMAP4, uids: list[int], part: str) -> dict[int, bytes]:
+        results = {}
+        uids = sorted(uids)
+        for start in range(0, len(uids), self.batch_size):
+            batch = uids[start:start + self.batch_size]
+            status, data = imap.uid("FETCH", uid_ranges(batch), f"(UID {part})")
+            _check(status, data, "UID FETCH")
+            results.update(parse_fetch(data))
+        return results
+
+
+imap_connections = IMAPConnectionPool()
+
+_cache_lock = threading.Lock()
+_mail_cache: Optional[MailCache] = None
+
+
+def get_mail_cache() -> MailCache:
+    global _mail_cache
+    with _cache_lock:
+        if _mail_cache is None:
+            _mail_cache = MailCache()
+        return _mail_cache
@@ -0,0 +1,350 @@
+# A process-wide manager for MCP server sessions. Every MCPTool with the same server command,
+# args and env shares one server subprocess and session, which runs on a background event loop
+# so tool calls don't block the agent's thread and can be in flight together. Crashed servers
+# are restarted, and each server's tool catalog is saved to disk so that, once it's cached,
+# creating an MCPTool doesn't wait for the server to start.
+#
+#   AGENTIC_MCP_MAX_CONCURRENCY      calls in flight per server (default 8)
+#   AGENTIC_MCP_CALL_TIMEOUT         seconds to wait for a tool result (default 300)
+#   AGENTIC_MCP_TOOL_CACHE           the tool catalog file (~/.agentic/mcp_tools.json)
+import asyncio
+import atexit
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from pathlib import Path
+from typing import Any, Awaitable, Optional
+
+from litellm import experimental_mcp_client
+from mcp import ClientSession, StdioServerParameters
+from mcp.client.stdio import stdio_client
+
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("AGENTIC_MCP_MAX_CONCURRENCY", "8"))
+DEFAULT_CALL_TIMEOUT = float(os.environ.get("AGENTIC_MCP_CALL_TIMEOUT", "300"))
+DEFAULT_CATALOG_PATH = os.environ.get("AGENTIC_MCP_TOOL_CACHE", "~/.agentic/mcp_tools.json")
+
+# Consecutive failed starts before a server is left stopped until its next call
+MAX_START_ATTEMPTS = 3
+MAX_RESTART_DELAY = 30.0
+
+
+class MCPServerError(RuntimeError):
+    pass
+
+
+def server_key(params: StdioServerParameters) -> str:
+    """Identifies a server config. Env values are hashed in with the rest, not stored."""
+    config = json.dumps(
+        [params.command, list(params.args), sorted((params.env or {}).items()), str(params.cwd or "")]
+    )
+    return hashlib.sha256(config.encode()).hexdigest()[:24]
+
+
+class ToolCatalog:
+    """Server tool lists in OpenAI format, saved as JSON and keyed by server_key. Each entry
+    records the server name and version that reported it."""
+
+    def __init__(self, path: str | Path = DEFAULT_CATALOG_PATH):
+        self.path = Path(path).expanduser()
+        self._lock = threading.Lock()
+        self._entries: Optional[dict] = None
+
+    def _load(self) -> dict:
+        if self._entries is None:
+            try:
+                self._entries = json.loads(self.path.read_text())
+            except FileNotFoundError:
+                self._entries = {}
+            except (OSError, ValueError) as e:
+                print(f"Ignoring unreadable MCP tool cache {self.path}: {e}")
+                self._entries = {}
+        return self._entries
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._load().get(key)
+
+    def put(self, key: str, command: str, version: str, tools: list[dict]):
+        with self._lock:
+            entries = self._load()
+            entries[key] = {"command": command, "version": version, "tools": tools, "updated": time.time()}
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_suffix(".tmp")
+                tmp.write_text(json.dumps(entries, indent=1))
+                tmp.replace(self.path)
+            except OSError as e:
+                print(f"Could not save the MCP tool cache {self.path}: {e}")
+
+
+class _ReadStream:
+    """Wraps the stream of messages from the server to notice when it ends, which is how a
+    crashed server shows up. The session otherwise leaves pending requests waiting."""
+
+    def __init__(self, stream, on_close):
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aenter__(self):
+        await self._stream.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._on_close()
+        return await self._stream.__aexit__(*exc_info)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return await self._stream.__anext__()
+        except StopAsyncIteration:
+            self._on_close()
+            raise
+
+
+class MCPServer:
+    """One MCP server subprocess and its session. Everything but `tools()` and the
+    properties runs on the manager's event loop."""
+
+    def __init__(self, manager: "MCPClientManager", params: StdioServerParameters, max_concurrency: int):
+        self.manager = manager
+        self.params = params
+        self.key = server_key(params)
+        self.max_concurrency = max_concurrency
+        self.version: Optional[str] = None
+        self.restarts = 0
+        # MCPTools holding the server (see MCPClientManager.acquire)
+        self.holders = 0
+        self._tools: Optional[list[dict]] = None
+        self._session: Optional[ClientSession] = None
+        self._task: Optional[asyncio.Task] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._lost: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._error: Optional[BaseException] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def connected(self) -> bool:
+        return self._session is not None
+
+    @property
+    def description(self) -> str:
+        return " ".join([self.params.command, *self.params.args])
+
+    def tools(self) -> list[dict]:
+        """The server's tools in OpenAI format. Served from the catalog when it's cached, while
+        the server starts in the background; otherwise waits for the server to list them."""
+        if self._tools is None:
+            cached = self.manager.catalog.get(self.key)
+            if cached is not None:
+                self._tools = cached["tools"]
+                self.version = cached.get("version")
+                self.manager.submit(self.start())
+            else:
+                self.manager.run(self.refresh_tools())
+        return self._tools
+
+    async def start(self):
+        """Start the server if it isn't running, and wait until its session is ready"""
+        await self._session_or_raise()
+
+    async def refresh_tools(self) -> list[dict]:
+        session = await self._session_or_raise()
+        tools = await experimental_mcp_client.load_mcp_tools(session=session, format="openai")
+        self._tools = [json.loads(json.dumps(tool, default=dict)) for tool in tools]
+        self.manager.catalog.put(self.key, self.description, self.version or "", self._tools)
+        return self._tools
+
+    async def call_tool(self, openai_tool: dict) -> Any:
+        """Call a tool, waiting for a free slot if `max_concurrency` calls are in flight"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            session = await self._session_or_raise()
+            lost = self._lost
+            call = asyncio.ensure_future(
+                experimental_mcp_client.call_openai_tool(session=session, openai_tool=openai_tool)
+            )
+            watch = asyncio.ensure_future(lost.wait())
+            try:
+                await asyncio.wait({call, watch}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                watch.cancel()
+            if not call.done():
+                call.cancel()
+                raise MCPServerError(f"MCP server '{self.description}' exited during the call")
+            if call.exception() is not None and lost.is_set():
+                raise MCPServerError(f"MCP server '{self.description}' exited during the call") from call.exception()
+            return call.result()
+
+    async def _session_or_raise(self) -> ClientSession:
+        if self._session is not None:
+            return self._session
+        if self._task is None or self._task.done():
+            self._stopping = False
+            self._error = None
+            self._ready = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._supervise())
+        await self._ready.wait()
+        if self._session is None:
+            raise MCPServerError(f"MCP server '{self.description}' failed to start: {self._error}")
+        return self._session
+
+    async def _supervise(self):
+        """Keeps the server running, restarting it with backoff when it exits unexpectedly"""
+        failed_starts = 0
+        while not self._stopping:
+            started = await self._run_once()
+            if self._stopping:
+                break
+            if started:
+                failed_starts = 0
+                self.restarts += 1
+                print(f"MCP server '{self.description}' exited, restarting")
+            else:
+                failed_starts += 1
+                if failed_starts >= MAX_START_ATTEMPTS:
+                    break
+            await asyncio.sleep(min(0.5 * 2 ** failed_starts, MAX_RESTART_DELAY))
+        # Wake anyone waiting on a server that won't start
+        self._ready.set()
+
+    async def _run_once(self) -> bool:
+        """Run one server process until it exits or is stopped. Returns whether it started."""
+        lost = self._lost = asyncio.Event()
+        started = False
+
+        def on_lost():
+            # New calls wait for the restart instead of using the dead session
+            if not lost.is_set():
+                lost.set()
+                self._session = None
+                if not self._stopping:
+                    self._ready.clear()
+
+        try:
+            async with stdio_client(self.params) as (read, write):
+                async with ClientSession(
+                    _ReadStream(read, on_lost), write, read_timeout_seconds=timedelta(seconds=DEFAULT_CALL_TIMEOUT)
+                ) as session:
+                    result = await session.initialize()
+                    version = f"{result.serverInfo.name}@{result.serverInfo.version}"
+                    self._session = session
+                    started = True
+                    self._ready.set()
+                    if version != self.version:
+                        # A new server version may have different tools
+                        self.version = version
+                        if self._tools is not None or self.manager.catalog.get(self.key) is not None:
+                            try:
+                                await self.refresh_tools()
+                            except Exception as e:
+                                print(f"Error listing the tools of MCP server '{self.description}': {e}")
+                    await lost.wait()
+        except Exception as e:
+            self._error = e
+            if not started:
+                print(f"Error starting MCP server '{self.description}': {e}")
+        finally:
+            self._session = None
+            if not self._stopping:
+                # Callers wait for the restart, or for the supervisor to give up
+                self._ready.clear()
+        return started
+
+    async def stop(self):
+        self._stopping = True
+        if self._lost is not None:
+            self._lost.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(self._task, timeout=10)
+            except Exception as e:
+                print(f"Error stopping MCP server '{self.description}': {e}")
+            self._task = None
+
+
+class MCPClientManager:
+    """Owns the background event loop and the pool of servers, one per server config"""
+
+    def __init__(self, catalog_path: str | Path = DEFAULT_CATALOG_PATH):
+        self.catalog = ToolCatalog(catalog_path)
+        self._servers: dict[str, MCPServer] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="agentic-mcp", daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def server(self, params: StdioServerParameters, max_concurrency: Optional[int] = None) -> MCPServer:
+        """The pooled server for this config. The first caller's `max_concurrency` applies."""
+        key = server_key(params)
+        with self._lock:
+            server = self._servers.get(key)
+            if server is None:
+                server = self._servers[key] = MCPServer(self, params, max_concurrency or DEFAULT_MAX_CONCURRENCY)
+            return server
+
+    def acquire(self, params: StdioServerParameters, max_concurrency: Optional[int] = None) -> MCPServer:
+        """Like `server`, but counts the caller as a holder until it calls `release`"""
+        server = self.server(params, max_concurrency)
+        with self._lock:
+            server.holders += 1
+        return server
+
+    async def release(self, server: MCPServer):
+        """Drop a hold on `server`, stopping it once nothing holds it. Runs on the manager's loop."""
+        with self._lock:
+            server.holders = max(0, server.holders - 1)
+            if server.holders:
+                return
+        await server.stop()
+
+    def submit(self, coro: Awaitable) -> Future:
+        """Schedule `coro` on the manager's loop"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run `coro` on the manager's loop and wait for its result. Don't call this from
+        the manager's loop itself."""
+        return self.submit(coro).result(timeout)
+
+    async def run_async(self, coro: Awaitable) -> Any:
+        """Await `coro` on the manager's loop from any event loop"""
+        if asyncio.get_running_loop() is self._loop:
+            return await coro
+        return await asyncio.wrap_future(self.submit(coro))
+
+    def close(self):
+        """Stop every server. Servers start again on their next call."""
+        if self._loop is None:
+            return
+        servers = list(self._servers.values())
+        if not any(server._task for server in servers):
+            return
+
+        async def stop_all():
+            await asyncio.gather(*(server.stop() for server in servers), return_exceptions=True)
+
+        try:
+            self.run(stop_all(), timeout=15)
+        except Exception as e:
+            print(f"Error stopping MCP servers: {e}")
+
+
+mcp_manager = MCPClientManager()
+atexit.register(mcp_manager.close)
@@ -0,0 +1,102 @@
+# A local cache of Open-Meteo responses for WeatherTool. Requests are keyed by their
+# parameters, with coordinates rounded to 2 decimals (about 1 km), so nearby lookups share
+# entries. Archive data for dates that are final never changes, so it's kept forever;
+# forecasts, and archive ranges that end in the last week, expire after a short TTL.
+# Responses are stored as Open-Meteo returns them, one array per variable, which loads
+# directly into a DataFrame.
+#
+#   AGENTIC_WEATHER_CACHE          the cache database (~/.agentic/weather_cache.db)
+#   AGENTIC_WEATHER_FORECAST_TTL   seconds to keep forecasts (default 900)
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Optional
+
+DEFAULT_CACHE_PATH = os.environ.get("AGENTIC_WEATHER_CACHE", "~/.agentic/weather_cache.db")
+FORECAST_TTL = float(os.environ.get("AGENTIC_WEATHER_FORECAST_TTL", "900"))
+# The archive fills in the last few days as reanalysis data arrives
+ARCHIVE_FINAL_AFTER_DAYS = 7
+
+
+def round_coordinate(value: str | float) -> str:
+    """A coordinate rounded to 2 decimals, or the value unchanged if it isn't a number"""
+    try:
+        return f"{round(float(value), 2):.2f}"
+    except (TypeError, ValueError):
+        return str(value)
+
+
+def is_final(end_date: str, today: Optional[date] = None) -> bool:
+    """Whether archive data up to `end_date` (YYYY-MM-DD) won't change any more"""
+    try:
+        end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return False
+    return end <= (today or date.today()) - timedelta(days=ARCHIVE_FINAL_AFTER_DAYS)
+
+
+def cache_key(url: str, params: dict) -> str:
+    # API keys don't change the response
+    return url + "?" + json.dumps({k: v for k, v in params.items() if k != "apikey"}, sort_keys=True)
+
+
+class WeatherCache:
+    def __init__(self, path: str | Path = DEFAULT_CACHE_PATH):
+        self.path = Path(path).expanduser()
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            # A null ttl never expires
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body TEXT, fetched REAL, ttl REAL)"
+            )
+            self._conn.execute("DELETE FROM responses WHERE ttl IS NOT NULL AND fetched + ttl < ?", (time.time(),))
+            self._conn.commit()
+        return self._conn
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT body, fetched, ttl FROM responses WHERE key=?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        body, fetched, ttl = row
+        if ttl is not None and fetched + ttl < time.time():
+            return None
+        return json.loads(body)
+
+    def put(self, key: str, data: Any, ttl: Optional[float] = None):
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)", (key, json.dumps(data), time.time(), ttl)
+            )
+            conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache_lock = threading.Lock()
+_weather_cache: Optional[WeatherCache] = None
+
+
+def get_weather_cache() -> WeatherCache:
+    global _weather_cache
+    with _cache_lock:
+        if _weather_cache is None:
+            _weather_cache = WeatherCache()
+        return _weather_cache
@@ -1,10 +1,20 @@
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable
-import requests
 from datetime import datetime, timedelta
 import zoneinfo
-import statistics
+
+import numpy as np
+import pandas as pd
 
 from agentic.tools.base import BaseAgenticTool
+from agentic.tools.utils.http_client import http_client
+from agentic.tools.utils.weather_cache import (
+    FORECAST_TTL,
+    cache_key,
+    get_weather_cache,
+    is_final,
+    round_coordinate,
+)
 from agentic.tools.utils.registry import tool_registry
 
 @tool_registry.register(
@@ -88,7 +98,7 @@ class WeatherTool(BaseAgenticTool):
             ],
         }
 
-        response = requests.get(url, params=params)
+        response = http_client.get(url, params=params)
         if response.status_code == 200:
             data = response.json()
             current_datetime = self._get_current_datetime_with_timezone()
@@ -213,8 +223,8 @@ class WeatherTool(BaseAgenticTool):
 
         # Base parameters
         params = {
-            "latitude": latitude,
-            "longitude": longitude,
+            "latitude": round_coordinate(latitude),
+            "longitude": round_coordinate(longitude),
             "timezone": "auto",
             "temperature_unit": temperature_unit.lower(),
         }
@@ -267,184 +277,189 @@ class WeatherTool(BaseAgenticTool):
         print(f"Making request to: {url}")
         print(f"With parameters: {params}")
 
-        response = requests.get(url, params=params)
+        # Forecasts change hourly at most, so a recent one for the same request is reused
+        cache = get_weather_cache()
+        key = cache_key(url, params)
+        data = cache.get(key)
+        if data is None:
+            response = http_client.get(url, params=params)
+            if response.status_code != 200:
+                return f"Failed to retrieve data: {response.status_code}\nResponse: {response.text}"
+            data = response.json()
+            cache.put(key, data, ttl=FORECAST_TTL)
+
         return_string = (
             f"Current Date and time is: {self._get_current_datetime_with_timezone()}\n"
         )
 
-        if response.status_code == 200:
-            data = response.json()
+        if forecast_type == "hourly":
+            hourly = data.get("hourly", {})
+            if hourly:
+                times = hourly.get("time", [])
+                for i in range(len(times)):
+                    return_string += f"Time: {times[i]}\n"
+
+                    temp = hourly.get("temperature_2m", [None] * len(times))[i]
+                    if temp is not None:
+                        return_string += f"  Temperature: {temp}{temp_symbol}\n"
+
+                    feels_like = hourly.get(
+                        "apparent_temperature", [None] * len(times)
+                    )[i]
+                    if feels_like is not None:
+                        return_string += (
+                            f"  Feels Like: {feels_like}{temp_symbol}\n"
+                        )
+
+                    precip = hourly.get("precipitation", [None] * len(times))[i]
+                    if precip is not None:
+                        return_string += f"  Precipitation: {precip}mm\n"
+
+                    rain = hourly.get("rain", [0] * len(times))[i]
+                    if rain and rain > 0:
+                        return_string += f"  Rain: {rain}mm\n"
+
+                    snow = hourly.get("snowfall", [0] * len(times))[i]
+                    if snow and snow > 0:
+                        return_string += f"  Snowfall: {snow}cm\n"
+
+                    weathercode = hourly.get("weathercode", [None] * len(times))[i]
+                    if weathercode is not None:
+                        return_string += f"  Weather Code: {weathercode}\n"
+
+                    cloud = hourly.get("cloudcover", [None] * len(times))[i]
+                    if cloud is not None:
+                        return_string += f"  Cloud Cover: {cloud}%\n"
+
+                    wind = hourly.get("windspeed_10m", [None] * len(times))[i]
+                    if wind is not None:
+                        return_string += f"  Wind Speed: {wind}km/h\n"
+
+                    gusts = hourly.get("windgusts_10m", [None] * len(times))[i]
+                    if gusts is not None:
+                        return_string += f"  Wind Gusts: {gusts}km/h\n"
+
+                    direction = hourly.get(
+                        "winddirection_10m", [None] * len(times)
+                    )[i]
+                    if direction is not None:
+                        return_string += f"  Wind Direction: {direction}°\n"
+
+                    humidity = hourly.get(
+                        "relative_humidity_2m", [None] * len(times)
+                    )[i]
+                    if humidity is not None:
+                        return_string += f"  Humidity: {humidity}%\n"
+
+                    visibility = hourly.get("visibility", [None] * len(times))[i]
+                    if visibility is not None:
+                        return_string += f"  Visibility: {visibility}m\n"
+
+                    uv = hourly.get("uv_index", [None] * len(times))[i]
+                    if uv is not None:
+                        return_string += f"  UV Index: {uv}\n"
+
+                    is_day = hourly.get("is_day", [None] * len(times))[i]
+                    if is_day is not None:
+                        return_string += (
+                            f"  Daylight: {'Yes' if is_day else 'No'}\n"
+                        )
+
+                    return_string += "------------------------\n"
 
-            if forecast_type == "hourly":
-                hourly = data.get("hourly", {})
-                if hourly:
-                    times = hourly.get("time", [])
-                    for i in range(len(times)):
-                        return_string += f"Time: {times[i]}\n"
-
-                        temp = hourly.get("temperature_2m", [None] * len(times))[i]
-                        if temp is not None:
-                            return_string += f"  Temperature: {temp}{temp_symbol}\n"
-
-                        feels_like = hourly.get(
-                            "apparent_temperature", [None] * len(times)
-                        )[i]
-                        if feels_like is not None:
-                            return_string += (
-                                f"  Feels Like: {feels_like}{temp_symbol}\n"
-                            )
-
-                        precip = hourly.get("precipitation", [None] * len(times))[i]
-                        if precip is not None:
-                            return_string += f"  Precipitation: {precip}mm\n"
-
-                        rain = hourly.get("rain", [0] * len(times))[i]
-                        if rain and rain > 0:
-                            return_string += f"  Rain: {rain}mm\n"
-
-                        snow = hourly.get("snowfall", [0] * len(times))[i]
-                        if snow and snow > 0:
-                            return_string += f"  Snowfall: {snow}cm\n"
-
-                        weathercode = hourly.get("weathercode", [None] * len(times))[i]
-                        if weathercode is not None:
-                            return_string += f"  Weather Code: {weathercode}\n"
-
-                        cloud = hourly.get("cloudcover", [None] * len(times))[i]
-                        if cloud is not None:
-                            return_string += f"  Cloud Cover: {cloud}%\n"
-
-                        wind = hourly.get("windspeed_10m", [None] * len(times))[i]
-                        if wind is not None:
-                            return_string += f"  Wind Speed: {wind}km/h\n"
-
-                        gusts = hourly.get("windgusts_10m", [None] * len(times))[i]
-                        if gusts is not None:
-                            return_string += f"  Wind Gusts: {gusts}km/h\n"
-
-                        direction = hourly.get(
-                            "winddirection_10m", [None] * len(times)
-                        )[i]
-                        if direction is not None:
-                            return_string += f"  Wind Direction: {direction}°\n"
-
-                        humidity = hourly.get(
-                            "relative_humidity_2m", [None] * len(times)
-                        )[i]
-                        if humidity is not None:
-                            return_string += f"  Humidity: {humidity}%\n"
-
-                        visibility = hourly.get("visibility", [None] * len(times))[i]
-                        if visibility is not None:
-                            return_string += f"  Visibility: {visibility}m\n"
-
-                        uv = hourly.get("uv_index", [None] * len(times))[i]
-                        if uv is not None:
-                            return_string += f"  UV Index: {uv}\n"
-
-                        is_day = hourly.get("is_day", [None] * len(times))[i]
-                        if is_day is not None:
-                            return_string += (
-                                f"  Daylight: {'Yes' if is_day else 'No'}\n"
-                            )
-
-                        return_string += "------------------------\n"
-
-            elif forecast_type == "daily":
-                daily = data.get("daily", {})
-                if daily:
-                    times = daily.get("time", [])
-                    for i in range(len(times)):
-                        return_string += f"Date: {times[i]}\n"
-
-                        # Temperature range
-                        temp_min = daily.get("temperature_2m_min", [None] * len(times))[
-                            i
-                        ]
-                        temp_max = daily.get("temperature_2m_max", [None] * len(times))[
-                            i
-                        ]
-                        if temp_min is not None and temp_max is not None:
-                            return_string += f"  Temperature Range: {temp_min}{temp_symbol} to {temp_max}{temp_symbol}\n"
-
-                        # Feels like range
-                        feel_min = daily.get(
-                            "apparent_temperature_min", [None] * len(times)
-                        )[i]
-                        feel_max = daily.get(
-                            "apparent_temperature_max", [None] * len(times)
-                        )[i]
-                        if feel_min is not None and feel_max is not None:
-                            return_string += f"  Feels Like Range: {feel_min}{temp_symbol} to {feel_max}{temp_symbol}\n"
-
-                        # Precipitation
-                        precip = daily.get("precipitation_sum", [None] * len(times))[i]
-                        precip_hours = daily.get(
-                            "precipitation_hours", [None] * len(times)
-                        )[i]
-                        if precip is not None and precip_hours is not None:
-                            return_string += f"  Precipitation: {precip}mm over {precip_hours} hours\n"
-
-                        # Precipitation probability
-                        prob = daily.get(
-                            "precipitation_probability_max", [None] * len(times)
-                        )[i]
-                        if prob is not None:
-                            return_string += f"  Precipitation Probability: {prob}%\n"
-
-                        # Rain and snow
-                        rain = daily.get("rain_sum", [0] * len(times))[i]
-                        if rain and rain > 0:
-                            return_string += f"  Rain: {rain}mm\n"
-
-                        snow = daily.get("snowfall_sum", [0] * len(times))[i]
-                        if snow and snow > 0:
-                            return_string += f"  Snowfall: {snow}cm\n"
-
-                        # Weather code
-                        weathercode = daily.get("weathercode", [None] * len(times))[i]
-                        if weathercode is not None:
-                            return_string += f"  Weather Code: {weathercode}\n"
-
-                        # Wind information
-                        wind = daily.get("windspeed_10m_max", [None] * len(times))[i]
-                        if wind is not None:
-                            return_string += f"  Max Wind Speed: {wind}km/h\n"
-
-                        gusts = daily.get("windgusts_10m_max", [None] * len(times))[i]
-                        if gusts is not None:
-                            return_string += f"  Max Wind Gusts: {gusts}km/h\n"
-
-                        direction = daily.get(
-                            "winddirection_10m_dominant", [None] * len(times)
-                        )[i]
-                        if direction is not None:
-                            return_string += (
-                                f"  Dominant Wind Direction: {direction}°\n"
-                            )
-
-                        # Sun information
-                        sunrise = daily.get("sunrise", [None] * len(times))[i]
-                        if sunrise is not None:
-                            return_string += f"  Sunrise: {sunrise}\n"
-
-                        sunset = daily.get("sunset", [None] * len(times))[i]
-                        if sunset is not None:
-                            return_string += f"  Sunset: {sunset}\n"
-
-                        # UV index
-                        uv = daily.get("uv_index_max", [None] * len(times))[i]
-                        if uv is not None:
-                            return_string += f"  Max UV Index: {uv}\n"
-
-                        return_string += "------------------------\n"
-
-            if return_string:
-                return return_string
-            else:
-                return "No forecast data found."
+        elif forecast_type == "daily":
+            daily = data.get("daily", {})
+            if daily:
+                times = daily.get("time", [])
+                for i in range(len(times)):
+                    return_string += f"Date: {times[i]}\n"
+
+                    # Temperature range
+                    temp_min = daily.get("temperature_2m_min", [None] * len(times))[
+                        i
+                    ]
+                    temp_max = daily.get("temperature_2m_max", [None] * len(times))[
+                        i
+                    ]
+                    if temp_min is not None and temp_max is not None:
+                        return_string += f"  Temperature Range: {temp_min}{temp_symbol} to {temp_max}{temp_symbol}\n"
+
+                    # Feels like range
+                    feel_min = daily.get(
+                        "apparent_temperature_min", [None] * len(times)
+                    )[i]
+                    feel_max = daily.get(
+                        "apparent_temperature_max", [None] * len(times)
+                    )[i]
+                    if feel_min is not None and feel_max is not None:
+                        return_string += f"  Feels Like Range: {feel_min}{temp_symbol} to {feel_max}{temp_symbol}\n"
+
+                    # Precipitation
+                    precip = daily.get("precipitation_sum", [None] * len(times))[i]
+                    precip_hours = daily.get(
+                        "precipitation_hours", [None] * len(times)
+                    )[i]
+                    if precip is not None and precip_hours is not None:
+                        return_string += f"  Precipitation: {precip}mm over {precip_hours} hours\n"
+
+                    # Precipitation probability
+                    prob = daily.get(
+                        "precipitation_probability_max", [None] * len(times)
+                    )[i]
+                    if prob is not None:
+                        return_string += f"  Precipitation Probability: {prob}%\n"
+
+                    # Rain and snow
+                    rain = daily.get("rain_sum", [0] * len(times))[i]
+                    if rain and rain > 0:
+                        return_string += f"  Rain: {rain}mm\n"
+
+                    snow = daily.get("snowfall_sum", [0] * len(times))[i]
+                    if snow and snow > 0:
+                        return_string += f"  Snowfall: {snow}cm\n"
+
+                    # Weather code
+                    weathercode = daily.get("weathercode", [None] * len(times))[i]
+                    if weathercode is not None:
+                        return_string += f"  Weather Code: {weathercode}\n"
+
+                    # Wind information
+                    wind = daily.get("windspeed_10m_max", [None] * len(times))[i]
+                    if wind is not None:
+                        return_string += f"  Max Wind Speed: {wind}km/h\n"
+
+                    gusts = daily.get("windgusts_10m_max", [None] * len(times))[i]
+                    if gusts is not None:
+                        return_string += f"  Max Wind Gusts: {gusts}km/h\n"
+
+                    direction = daily.get(
+                        "winddirection_10m_dominant", [None] * len(times)
+                    )[i]
+                    if direction is not None:
+                        return_string += (
+                            f"  Dominant Wind Direction: {direction}°\n"
+                        )
+
+                    # Sun information
+                    sunrise = daily.get("sunrise", [None] * len(times))[i]
+                    if sunrise is not None:
+                        return_string += f"  Sunrise: {sunrise}\n"
+
+                    sunset = daily.get("sunset", [None] * len(times))[i]
+                    if sunset is not None:
+                        return_string += f"  Sunset: {sunset}\n"
+
+                    # UV index
+                    uv = daily.get("uv_index_max", [None] * len(times))[i]
+                    if uv is not None:
+                        return_string += f"  Max UV Index: {uv}\n"
+
+                    return_string += "------------------------\n"
+
+        if return_string:
+            return return_string
         else:
-            return f"Failed to retrieve data: {response.status_code}\nResponse: {response.text}"
+            return "No forecast data found."
 
     def _get_historical_weather_data(
         self,
@@ -457,13 +472,13 @@ class WeatherTool(BaseAgenticTool):
     ) -> dict:
         """
         Internal function to fetch historical weather data for a specific date range.
-        Returns raw data or error information.
+        Returns raw data or error information. Ranges that are final are cached for good.
         """
         url = "https://archive-api.open-meteo.com/v1/archive"
 
         params = {
-            "latitude": latitude,
-            "longitude": longitude,
+            "latitude": round_coordinate(latitude),
+            "longitude": round_coordinate(longitude),
             "timezone": "auto",
             "temperature_unit": temperature_unit.lower(),
             "start_date": start_date,
@@ -489,12 +504,25 @@ class WeatherTool(BaseAgenticTool):
         if api_key:
             params["apikey"] = api_key
 
+        cache = get_weather_cache()
+        key = cache_key(url, params)
+        data = cache.get(key)
+        if data is not None:
+            return {
+                "status": "success",
+                "data": data,
+                "message": "Data retrieved from cache",
+            }
+
         try:
-            response = requests.get(url, params=params)
+            response = http_client.get(url, params=params)
             if response.status_code == 200:
+                data = response.json()
+                # The last few days may still be revised, so those ranges expire like forecasts
+                cache.put(key, data, ttl=None if is_final(end_date) else FORECAST_TTL)
                 return {
                     "status": "success",
-                    "data": response.json(),
+                    "data": data,
                     "message": "Data retrieved successfully",
                 }
             else:
@@ -688,28 +716,25 @@ class WeatherTool(BaseAgenticTool):
             for year_offset in range(5):
                 years_to_analyze.append(start_year - year_offset)
 
-            # Collect historical data for each year
-            all_data = []
-            for year in years_to_analyze:
-                start_date = target_start.replace(year=year).strftime("%Y-%m-%d")
-                end_date = target_end.replace(year=year).strftime("%Y-%m-%d")
-
-                result = self._get_historical_weather_data(
+            # Collect historical data for each year. Cached years return right away, and
+            # the rest are fetched concurrently.
+            def fetch_year(year: int) -> dict:
+                return self._get_historical_weather_data(
                     longitude=longitude,
                     latitude=latitude,
-                    start_date=start_date,
-                    end_date=end_date,
+                    start_date=target_start.replace(year=year).strftime("%Y-%m-%d"),
+                    end_date=target_end.replace(year=year).strftime("%Y-%m-%d"),
                     temperature_unit=temperature_unit,
                     api_key=api_key,
                 )
 
-                if result["status"] == "success":
-                    all_data.append(result["data"])
+            with ThreadPoolExecutor(max_workers=len(years_to_analyze)) as pool:
+                results = list(pool.map(fetch_year, years_to_analyze))
+            all_data = [result["data"] for result in results if result["status"] == "success"]
 
             if not all_data:
                 return "Error: No historical data could be retrieved"
 
-            # Initialize storage for averaging
             daily_fields = [
                 "temperature_2m_max",
                 "temperature_2m_min",
@@ -725,36 +750,27 @@ class WeatherTool(BaseAgenticTool):
                 "winddirection_10m_dominant",
             ]
 
-            # Initialize storage for each field
-            averaged_data = {field: [] for field in daily_fields}
-
             # Number of days in the date range
             num_days = (target_end - target_start).days + 1
 
-            # Calculate averages for each day in the range
-            for day_index in range(num_days):
-                day_values = {field: [] for field in daily_fields}
-
-                # Collect values from all years for this day
-                for year_data in all_data:
-                    if "daily" in year_data:
-                        for field in daily_fields:
-                            if field in year_data["daily"]:
-                                value = year_data["daily"][field][day_index]
-                                if value is not None:  # Skip None values
-                                    day_values[field].append(value)
-
-                # Calculate averages for each field
-                for field in daily_fields:
-                    values = day_values[field]
-                    if values:
-                        if averaging_method == "median":
-                            avg_value = statistics.median(values)
-                        else:  # default to mean
-                            avg_value = statistics.mean(values)
-                        averaged_data[field].append(round(avg_value, 2))
-                    else:
-                        averaged_data[field].append(None)
+            # Stack the years into one frame, numbering each year's days from the start
+            # of the range, and average each day across the years. Missing values are skipped.
+            frames = []
+            for year_data in all_data:
+                frame = pd.DataFrame(year_data.get("daily", {})).reindex(columns=daily_fields)
+                frame["day_index"] = np.arange(len(frame))
+                frames.append(frame)
+            combined = pd.concat(frames, ignore_index=True).astype({field: float for field in daily_fields})
+            averages = (
+                combined.groupby("day_index")[daily_fields]
+                .agg("median" if averaging_method == "median" else "mean")
+                .reindex(range(num_days))
+                .round(2)
+            )
+            averaged_data = {
+                field: [None if np.isnan(value) else value for value in averages[field].to_numpy()]
+                for field in daily_fields
+            }
 
             # Format the response
             dates = [
@@ -0,0 +1,293 @@
+# Tracing of agent requests, to see where the time in a slow turn went. Spans nest like this:
+#
+#   agent.request          one start_request, from submitting it until its last event
+#     agent.turn           the proxy's turn, including logging its events
+#       llm.completion     one streamed completion, with ttft_ms, stream_ms and tokens_per_second
+#         llm.render_prompt, llm.count_tokens, llm.compress_context
+#       tool.call          one tool call
+#       agent.subagent     a call to a sub-agent, with the sub-agent's own spans inside it
+#       db.create_thread, db.flush
+#
+# Tracing is off until an exporter is set, with set_exporter() or AGENTIC_TRACING:
+#
+#   AGENTIC_TRACING=jsonl            append spans to AGENTIC_TRACE_FILE (~/.agentic/traces.jsonl)
+#   AGENTIC_TRACING=otel             send spans to an OTLP endpoint (needs agentic-framework[tracing])
+#   AGENTIC_TRACE_SAMPLE_RATE=0.1    trace 10% of requests (default all of them)
+#
+# When tracing is off, or the request wasn't sampled, starting a span returns a shared no-op
+# span, so the instrumented code costs little more than a function call.
+import atexit
+import contextvars
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from agentic.utils.json import dumps
+
+DEFAULT_TRACE_FILE = "~/.agentic/traces.jsonl"
+
+
+class Span:
+    """A timed operation. Trace and span IDs use the W3C/OpenTelemetry sizes (128 and 64 bits)."""
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "error")
+    recording = True
+
+    def __init__(self, name: str, trace_id: int, parent_id: Optional[int], attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = random.getrandbits(64)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_attributes(self, **attributes):
+        self.attributes.update(attributes)
+
+    def record_error(self, error: BaseException | str):
+        self.error = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        return None if self.end_ns is None else (self.end_ns - self.start_ns) / 1e6
+
+    def end(self):
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        exporter = _exporter
+        if exporter is not None:
+            try:
+                exporter.export(self)
+            except Exception as e:
+                print(f"Error exporting span {self.name}: {e}")
+
+    def to_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "trace_id": f"{self.trace_id:032x}",
+            "span_id": f"{self.span_id:016x}",
+            "parent_id": f"{self.parent_id:016x}" if self.parent_id else None,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+    def __repr__(self):
+        return f"Span({self.name}, {self.duration_ms}ms, {self.attributes})"
+
+
+class _NoopSpan(Span):
+    """Stands in for spans that aren't recorded. Its children aren't recorded either."""
+
+    recording = False
+
+    def __init__(self):
+        self.name = ""
+        self.trace_id = self.span_id = self.start_ns = 0
+        self.parent_id = self.end_ns = None
+        self.attributes = {}
+        self.error = None
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, **attributes):
+        pass
+
+    def record_error(self, error: BaseException | str):
+        pass
+
+    def end(self):
+        pass
+
+
+# Returned when tracing is off
+NOOP_SPAN = _NoopSpan()
+# Returned for requests that weren't sampled, and made current so their spans are skipped too
+UNSAMPLED_SPAN = _NoopSpan()
+
+
+class SpanExporter:
+    """Receives each span as it ends. Spans end before their parents."""
+
+    def export(self, span: Span):
+        raise NotImplementedError
+
+    def shutdown(self):
+        pass
+
+
+class JsonLinesExporter(SpanExporter):
+    """Appends each span to a file as a line of JSON"""
+
+    def __init__(self, path: str | Path = DEFAULT_TRACE_FILE):
+        self.path = Path(path).expanduser()
+        self._lock = threading.Lock()
+        self._file = None
+
+    def export(self, span: Span):
+        line = dumps(span.to_dict()) + b"\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, "ab")
+            self._file.write(line)
+            self._file.flush()
+
+    def shutdown(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class OpenTelemetryExporter(SpanExporter):
+    """Hands spans to an OpenTelemetry SDK span exporter through a BatchSpanProcessor, so
+    exporting happens off the agent's thread. Span and trace IDs are kept, so the spans
+    nest in any OpenTelemetry backend. Defaults to the OTLP/HTTP exporter, which is
+    configured with the usual OTEL_EXPORTER_OTLP_* variables."""
+
+    def __init__(self, span_exporter=None, service_name: str = "agentic"):
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+
+        if span_exporter is None:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+            span_exporter = OTLPSpanExporter()
+        self._processor = BatchSpanProcessor(span_exporter)
+        self._resource = Resource.create({"service.name": service_name})
+
+    def export(self, span: Span):
+        from opentelemetry.sdk.trace import ReadableSpan
+        from opentelemetry.trace import SpanContext, TraceFlags
+        from opentelemetry.trace.status import Status, StatusCode
+
+        def context(span_id: int) -> SpanContext:
+            return SpanContext(span.trace_id, span_id, is_remote=False, trace_flags=TraceFlags(TraceFlags.SAMPLED))
+
+        self._processor.on_end(ReadableSpan(
+            name=span.name,
+            context=context(span.span_id),
+            parent=context(span.parent_id) if span.parent_id else None,
+            resource=self._resource,
+            attributes={key: value for key, value in span.attributes.items() if value is not None},
+            status=Status(StatusCode.ERROR, span.error) if span.error else Status(StatusCode.OK),
+            start_time=span.start_ns,
+            end_time=span.end_ns,
+        ))
+
+    def shutdown(self):
+        self._processor.shutdown()
+
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("agentic_span", default=None)
+_exporter: Optional[SpanExporter] = None
+_sample_rate: float = 1.0
+
+
+def set_exporter(exporter: Optional[SpanExporter], sample_rate: float = 1.0):
+    """Send spans to `exporter`, or turn tracing off with None. `sample_rate` is the fraction
+    of requests (root spans) that are traced."""
+    global _exporter, _sample_rate
+    previous = _exporter
+    _exporter, _sample_rate = exporter, sample_rate
+    if previous is not None and previous is not exporter:
+        previous.shutdown()
+
+
+def get_exporter() -> Optional[SpanExporter]:
+    return _exporter
+
+
+def is_enabled() -> bool:
+    return _exporter is not None
+
+
+def current_span() -> Span:
+    """The active span, or NOOP_SPAN"""
+    return _current_span.get() or NOOP_SPAN
+
+
+def start_span(name: str, parent: Optional[Span] = None, **attributes) -> Span:
+    """Start a span as a child of `parent`, or of the current span. The caller must `end()`
+    it; use `span()` to also make it the current span for the code it wraps."""
+    if _exporter is None:
+        return NOOP_SPAN
+    parent = parent or _current_span.get()
+    if parent is None:
+        if _sample_rate < 1.0 and random.random() >= _sample_rate:
+            return UNSAMPLED_SPAN
+        return Span(name, random.getrandbits(128), None, attributes)
+    if not parent.recording:
+        return parent
+    return Span(name, parent.trace_id, parent.span_id, attributes)
+
+
+@contextmanager
+def activate(span: Span, end: bool = True) -> Iterator[Span]:
+    """Make `span` the current span, eg. on the thread that runs a request, and end it
+    on exit unless `end` is False. An exception raised inside is recorded on the span."""
+    if span is NOOP_SPAN:
+        yield span
+        return
+    previous = _current_span.get()
+    _current_span.set(span)
+    try:
+        yield span
+    except Exception as e:
+        span.record_error(e)
+        raise
+    finally:
+        # Set rather than reset, since a generator may be closed in another context
+        _current_span.set(previous)
+        if end:
+            span.end()
+
+
+def span(name: str, **attributes):
+    """Context manager for a span that is current while it's open:
+
+        with tracing.span("tool.call", tool=name) as span:
+            ...
+            span.set_attribute("rows", len(rows))
+    """
+    return activate(start_span(name, **attributes))
+
+
+def shutdown():
+    """Flush and close the exporter"""
+    if _exporter is not None:
+        _exporter.shutdown()
+
+
+def _configure_from_env():
+    mode = os.environ.get("AGENTIC_TRACING", "").lower()
+    if mode in ("", "0", "off", "false"):
+        return
+    sample_rate = float(os.environ.get("AGENTIC_TRACE_SAMPLE_RATE", "1.0"))
+    if mode == "jsonl":
+        set_exporter(JsonLinesExporter(os.environ.get("AGENTIC_TRACE_FILE", DEFAULT_TRACE_FILE)), sample_rate)
+    elif mode == "otel":
+        try:
+            set_exporter(OpenTelemetryExporter(), sample_rate)
+        except ImportError:
+            print("AGENTIC_TRACING=otel needs the OpenTelemetry SDK: pip install 'agentic-framework[tracing]'")
+    else:
+        print(f"Unknown AGENTIC_TRACING value '{mode}', expected 'jsonl' or 'otel'")
+
+
+_configure_from_env()
+atexit.register(shutdown)
@@ -1,8 +1,14 @@
 from litellm.types.utils import Message
 from pydantic import BaseModel
 from datetime import datetime, date
+import json
 import traceback
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 def get_tc_args(tc):
     if isinstance(tc, dict):
         return make_json_serializable(tc)
@@ -60,3 +66,39 @@ def make_json_serializable(obj):
     except Exception as e:
         traceback.print_exc()
         return str(obj)
+
+
+def _encode_default(obj):
+    # Only called for types the encoder doesn't handle natively, so plain data never
+    # goes through the recursive make_json_serializable.
+    if isinstance(obj, (Message, BaseModel, date)):
+        return make_json_serializable(obj)
+    return str(obj)
+
+
+def dumps(obj) -> bytes:
+    """Encode obj as compact JSON bytes, with orjson when it's installed. Handles the same
+    types as make_json_serializable (Message, pydantic models, datetimes) without first
+    copying the whole structure."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, default=_encode_default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # eg. integers wider than 64 bits
+            pass
+    return json.dumps(obj, default=_encode_default, separators=(",", ":")).encode()
+
+
+def dumps_str(obj) -> str:
+    return dumps(obj).decode()
+
+
+def loads(data: str | bytes):
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is strict, but rows written by the stdlib encoder (older versions, or
+            # the fallback in dumps) can hold NaN and Infinity
+            pass
+    return json.loads(data)
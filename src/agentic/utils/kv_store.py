@@ -0,0 +1,96 @@
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Callable, Optional
+
+
+class CachedTable:
+    """
+    A `(name TEXT PRIMARY KEY, value TEXT)` table in a SQLite file, read through an in-memory
+    cache.
+
+    The table is read in full the first time it's needed and again only after it changes.
+    Writes through this object update the cache directly. Writes from other connections
+    (another process, or another `CachedTable` on the same file) are noticed through
+    `PRAGMA data_version`, which costs one cheap query per lookup instead of opening a new
+    connection.
+
+    One long-lived connection in WAL mode is shared by all threads, guarded by a lock.
+    `decode` is applied to values as they are loaded, so callers get decrypted values
+    straight from the cache.
+    """
+
+    def __init__(self, db_path: str | Path, table: str, decode: Optional[Callable[[str], Optional[str]]] = None):
+        self.db_path = Path(db_path)
+        self.table = table
+        self.decode = decode
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._values: Optional[dict[str, Optional[str]]] = None
+        self._data_version: Optional[int] = None
+
+    def connection(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.table} (name TEXT PRIMARY KEY, value TEXT)"
+                )
+                self._conn.commit()
+            return self._conn
+
+    def values(self) -> dict[str, Optional[str]]:
+        """A copy of all decoded values, keyed by name"""
+        with self._lock:
+            return dict(self._load())
+
+    def get(self, name: str) -> tuple[bool, Optional[str]]:
+        """Returns (found, value)"""
+        with self._lock:
+            values = self._load()
+            return name in values, values.get(name)
+
+    def _load(self) -> dict[str, Optional[str]]:
+        with self._lock:
+            conn = self.connection()
+            data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+            if self._values is None or data_version != self._data_version:
+                rows = conn.execute(f"SELECT name, value FROM {self.table}").fetchall()
+                self._values = {
+                    name: self.decode(value) if self.decode else value for name, value in rows
+                }
+                self._data_version = data_version
+            return self._values
+
+    def set(self, name: str, stored_value: str, value: Optional[str]):
+        """Write `stored_value` to the table, and cache it as `value`"""
+        with self._lock:
+            conn = self.connection()
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (name, value) VALUES (?, ?)",
+                (name, stored_value),
+            )
+            conn.commit()
+            # Our own writes don't change data_version, so patch the cache in place
+            if self._values is not None:
+                self._values[name] = value
+
+    def delete(self, name: str):
+        with self._lock:
+            conn = self.connection()
+            conn.execute(f"DELETE FROM {self.table} WHERE name=?", (name,))
+            conn.commit()
+            if self._values is not None:
+                self._values.pop(name, None)
+
+    def invalidate(self):
+        with self._lock:
+            self._values = None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._values = None
@@ -1,6 +1,9 @@
 from pathlib import Path
 from datetime import datetime
+import atexit
 import hashlib
+import threading
+import time
 from typing import Dict, Any, List, Optional
 
 from weaviate import WeaviateClient
@@ -133,6 +136,111 @@ def init_chunker(threshold: float, delimiters: str) -> SemanticChunker:
         delim=delimiters.split(",")
     )
 
+class RAGResources:
+    """
+    Process-wide Weaviate client, collections, embedding models and chunkers.
+
+    Starting embedded Weaviate and loading an ONNX embedding model each take seconds, so
+    everything is created lazily on first use and then shared by every caller in the
+    process. The client is health checked (at most every `health_check_interval` seconds,
+    or right after a caller reports a failure) and reconnected if it has gone away.
+    """
+
+    def __init__(self, health_check_interval: float = 30.0):
+        self.health_check_interval = health_check_interval
+        self._lock = threading.RLock()
+        self._client: Optional[WeaviateClient] = None
+        self._last_health_check = 0.0
+        self._collections: Dict[str, Any] = {}
+        # Collections we've already made sure exist
+        self._created: set[str] = set()
+        self._embedding_models: Dict[str, TextEmbedding] = {}
+        self._chunkers: Dict[tuple, SemanticChunker] = {}
+
+    def get_client(self) -> WeaviateClient:
+        with self._lock:
+            if self._client is None:
+                self._client = init_weaviate()
+                self._last_health_check = time.monotonic()
+            elif time.monotonic() - self._last_health_check > self.health_check_interval:
+                if not self.is_healthy():
+                    return self.reconnect()
+            return self._client
+
+    def is_healthy(self) -> bool:
+        with self._lock:
+            if self._client is None:
+                return False
+            self._last_health_check = time.monotonic()
+            try:
+                return bool(self._client.is_ready())
+            except Exception:
+                return False
+
+    def report_failure(self):
+        """Force a health check on the next `get_client` call"""
+        self._last_health_check = 0.0
+
+    def reconnect(self) -> WeaviateClient:
+        with self._lock:
+            self._close_client()
+            return self.get_client()
+
+    def get_collection(
+        self,
+        index_name: str,
+        create: bool = True,
+        distance_metric: VectorDistances = VectorDistances.COSINE,
+    ) -> Any:
+        with self._lock:
+            client = self.get_client()
+            if create and index_name not in self._created:
+                create_collection(client, index_name, distance_metric)
+                self._created.add(index_name)
+            if index_name not in self._collections:
+                self._collections[index_name] = client.collections.get(index_name)
+            return self._collections[index_name]
+
+    def forget_collection(self, index_name: str):
+        """Drop a cached collection handle, eg. after the collection is deleted or renamed"""
+        with self._lock:
+            self._collections.pop(index_name, None)
+            self._created.discard(index_name)
+
+    def get_embedding_model(self, model_name: str) -> TextEmbedding:
+        with self._lock:
+            if model_name not in self._embedding_models:
+                self._embedding_models[model_name] = init_embedding_model(model_name)
+            return self._embedding_models[model_name]
+
+    def get_chunker(self, threshold: float, delimiters: str) -> SemanticChunker:
+        with self._lock:
+            key = (threshold, delimiters)
+            if key not in self._chunkers:
+                self._chunkers[key] = init_chunker(threshold, delimiters)
+            return self._chunkers[key]
+
+    def close(self):
+        """Close the Weaviate client and release the models"""
+        with self._lock:
+            self._close_client()
+            self._embedding_models.clear()
+            self._chunkers.clear()
+
+    def _close_client(self):
+        client, self._client = self._client, None
+        self._collections.clear()
+        self._created.clear()
+        if client is not None:
+            try:
+                client.close()
+            except Exception as e:
+                print(f"Error closing Weaviate client: {e}")
+
+
+rag_resources = RAGResources()
+atexit.register(rag_resources.close)
+
 from rich.status import Status as RichStatus
 # Make a no op context manager to replace 'Status' one:
 class NOOPStatus:
@@ -159,17 +267,15 @@ def rag_index_file(
     """Index a file using configurable Weaviate Embedded and chunking parameters"""
 
     console = Console()
-    client_created = False
     try:
         with Status("[bold green]Initializing Weaviate..."):
             if client is None:
-                client = init_weaviate()
-                client_created = True
+                client = rag_resources.get_client()
             create_collection(client, index_name, distance_metric)
             
         with Status("[bold green]Initializing models..."):
-            embed_model = init_embedding_model(embedding_model)
-            chunker = init_chunker(chunk_threshold, chunk_delimiters)
+            embed_model = rag_resources.get_embedding_model(embedding_model)
+            chunker = rag_resources.get_chunker(chunk_threshold, chunk_delimiters)
             
         with Status(f"[bold green]Processing {file_path}...", console=console):
             text, mime_type = read_file(str(file_path))
@@ -230,9 +336,9 @@ def rag_index_file(
                 )
                 
         console.print(f"[bold green]✅ Indexed {len(chunks)} chunks in {index_name}")
-    finally:
-        if client and client_created:
-            client.close()
+    except Exception:
+        rag_resources.report_failure()
+        raise
     return "indexed"
         
 
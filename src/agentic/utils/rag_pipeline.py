@@ -0,0 +1,435 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, asdict
+from queue import Queue, Empty
+from typing import Any, Callable, Iterable, Optional
+
+from weaviate import WeaviateClient
+from weaviate.classes.config import VectorDistances
+from weaviate.classes.query import Filter
+
+from agentic.utils.file_reader import read_file
+from agentic.utils.rag_helper import (
+    GPT_DEFAULT_MODEL,
+    check_document_exists,
+    create_collection,
+    prepare_document_metadata,
+    rag_resources,
+)
+from agentic.utils.summarizer import agenerate_document_summary
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+_DONE = object()
+
+
+@dataclass
+class IngestStats:
+    files_total: int = 0
+    files_read: int = 0
+    files_skipped: int = 0
+    files_indexed: int = 0
+    files_failed: int = 0
+    chunks_indexed: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    errors: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def files_done(self) -> int:
+        return self.files_skipped + self.files_indexed + self.files_failed
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def files_per_second(self) -> float:
+        return self.files_done / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks_indexed / self.elapsed if self.elapsed else 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self) | {
+            "elapsed": self.elapsed,
+            "files_per_second": self.files_per_second,
+            "chunks_per_second": self.chunks_per_second,
+        }
+
+
+@dataclass
+class _Document:
+    file_path: str
+    text: str = ""
+    mime_type: str = ""
+    metadata: dict = field(default_factory=dict)
+    chunks: list = field(default_factory=list)
+    vectors: list = field(default_factory=list)
+
+
+def _read_document(file_path: str) -> _Document:
+    """Parse a file and compute its metadata. Runs in a worker process."""
+    text, mime_type = read_file(str(file_path))
+    metadata = prepare_document_metadata(file_path, text, mime_type, GPT_DEFAULT_MODEL)
+    return _Document(file_path=file_path, text=text, mime_type=mime_type, metadata=metadata)
+
+
+class _InlineExecutor(Executor):
+    """Runs submitted work immediately, for `workers=0`"""
+
+    def submit(self, fn, /, *args, **kwargs):
+        from concurrent.futures import Future
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+class IngestionPipeline:
+    """
+    Indexes many files into a RAG index at once.
+
+    Files move through a series of stages that all run at the same time:
+
+    - parsing (PDF, docx, etc.) in a pool of `workers` processes, or inline with
+      `workers=0`. The processes are spawned, so they import the `__main__` module:
+      run the pipeline under `if __name__ == "__main__":` when using them.
+    - the fingerprint check against the index, which skips unchanged documents so an
+      interrupted run can simply be started again
+    - document summaries, as concurrent async LLM calls limited to `summary_concurrency`
+      at once and optionally `summaries_per_minute`
+    - chunking and embedding, with chunks from several documents embedded together in
+      batches of `embed_batch_size`
+    - a single Weaviate batch writer
+
+    The chunk with index 0 is written last for each document, so the fingerprint check
+    can tell a completely written document from one that was interrupted part way.
+    """
+
+    def __init__(
+        self,
+        index_name: str,
+        workers: int = DEFAULT_WORKERS,
+        summary_concurrency: int = 8,
+        summaries_per_minute: Optional[int] = None,
+        embed_batch_size: int = 256,
+        chunk_threshold: float = 0.5,
+        chunk_delimiters: str = ". ,! ,? ,\n",
+        embedding_model: str = "BAAI/bge-small-en-v1.5",
+        summary_model: str = GPT_DEFAULT_MODEL,
+        client: WeaviateClient | None = None,
+        distance_metric: VectorDistances = VectorDistances.COSINE,
+        ignore_errors: bool = True,
+        progress: Optional[Callable[[IngestStats], None]] = None,
+    ):
+        self.index_name = index_name
+        self.workers = workers
+        self.summary_concurrency = summary_concurrency
+        self.summaries_per_minute = summaries_per_minute
+        self.embed_batch_size = embed_batch_size
+        self.chunk_threshold = chunk_threshold
+        self.chunk_delimiters = chunk_delimiters
+        self.embedding_model = embedding_model
+        self.summary_model = summary_model
+        self.client = client
+        self.distance_metric = distance_metric
+        self.ignore_errors = ignore_errors
+        self.progress = progress
+
+        self.stats = IngestStats()
+        self._stats_lock = threading.Lock()
+        self._embed_queue: Queue = Queue(maxsize=max(4, summary_concurrency * 2))
+        self._write_queue: Queue = Queue(maxsize=4)
+        self._summary_slots = threading.Semaphore(summary_concurrency * 2)
+        self._cancelled = threading.Event()
+
+    def run(self, file_paths: Iterable[str]) -> IngestStats:
+        """Index the files and return the final stats. Raises the first error unless
+        `ignore_errors` is set."""
+        file_paths = list(file_paths)
+        self.stats = IngestStats(files_total=len(file_paths))
+        if not file_paths:
+            return self.stats
+
+        client = self.client or rag_resources.get_client()
+        create_collection(client, self.index_name, self.distance_metric)
+        collection = client.collections.get(self.index_name)
+        embed_model = rag_resources.get_embedding_model(self.embedding_model)
+        chunker = rag_resources.get_chunker(self.chunk_threshold, self.chunk_delimiters)
+
+        loop = asyncio.new_event_loop()
+        loop_thread = threading.Thread(target=loop.run_forever, name="rag-summaries", daemon=True)
+        embedder = threading.Thread(
+            target=self._embed_stage, args=(embed_model, chunker), name="rag-embedder", daemon=True
+        )
+        writer = threading.Thread(
+            target=self._write_stage, args=(collection,), name="rag-writer", daemon=True
+        )
+        for thread in (loop_thread, embedder, writer):
+            thread.start()
+
+        reads = self._read_stage(file_paths)
+        try:
+            summary_limiter = _RateLimiter(self.summary_concurrency, self.summaries_per_minute)
+            pending_summaries = []
+            for document in reads:
+                if self._cancelled.is_set():
+                    break
+                if not self._needs_indexing(collection, document):
+                    continue
+                self._summary_slots.acquire()
+                pending_summaries.append(asyncio.run_coroutine_threadsafe(
+                    self._summarize(document, summary_limiter), loop
+                ))
+            for future in pending_summaries:
+                future.result()
+        finally:
+            reads.close()
+            self._embed_queue.put(_DONE)
+            embedder.join()
+            writer.join()
+            loop.call_soon_threadsafe(loop.stop)
+            loop_thread.join()
+            loop.close()
+
+        if self.stats.errors and not self.ignore_errors:
+            file_path, error = self.stats.errors[0]
+            raise RuntimeError(f"Failed to index {file_path}: {error}")
+        return self.stats
+
+    def _read_stage(self, file_paths: list[str]):
+        """Parse files in worker processes, yielding documents as they finish."""
+        if self.workers > 0:
+            # Spawn rather than fork, since this process is already running threads
+            executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            executor = _InlineExecutor()
+
+        with executor:
+            # Keep a bounded number of files in flight so huge folders don't pile up in memory
+            max_in_flight = max(1, self.workers) * 4
+            remaining = iter(file_paths)
+            in_flight = {}
+            while True:
+                while len(in_flight) < max_in_flight and not self._cancelled.is_set():
+                    file_path = next(remaining, None)
+                    if file_path is None:
+                        break
+                    in_flight[executor.submit(_read_document, file_path)] = file_path
+                if not in_flight:
+                    return
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file_path = in_flight.pop(future)
+                    try:
+                        document = future.result()
+                    except BrokenProcessPool as e:
+                        # Not a problem with this file, so it's raised even with ignore_errors.
+                        # Usually the workers failed to import the caller's __main__ module.
+                        self._cancelled.set()
+                        raise RuntimeError(
+                            "The document parsing processes crashed. When indexing with workers, "
+                            "start the indexing under `if __name__ == \"__main__\":`, or use workers=0."
+                        ) from e
+                    except Exception as e:
+                        self._failed(file_path, e)
+                        continue
+                    self._update(files_read=1)
+                    yield document
+
+    def _needs_indexing(self, collection: Any, document: _Document) -> bool:
+        metadata = document.metadata
+        try:
+            _, status = check_document_exists(
+                collection, metadata["document_id"], metadata["fingerprint"]
+            )
+            if status == "unchanged" and not _is_complete(collection, metadata["document_id"]):
+                # An earlier run was interrupted while writing this document
+                status = "changed"
+            if status in ("unchanged", "duplicate"):
+                self._update(files_skipped=1)
+                return False
+            if status == "changed":
+                collection.data.delete_many(
+                    where=Filter.by_property("document_id").equal(metadata["document_id"])
+                )
+            return True
+        except Exception as e:
+            self._failed(document.file_path, e)
+            return False
+
+    async def _summarize(self, document: _Document, limiter: "_RateLimiter"):
+        try:
+            async with limiter:
+                document.metadata["summary"] = await agenerate_document_summary(
+                    text=document.text[:12000],
+                    mime_type=document.mime_type,
+                    model=self.summary_model,
+                )
+            # Blocking put applies backpressure from the embedder to the summaries
+            await asyncio.to_thread(self._embed_queue.put, document)
+        except Exception as e:
+            self._failed(document.file_path, e)
+        finally:
+            self._summary_slots.release()
+
+    def _embed_stage(self, embed_model, chunker):
+        pending: list[_Document] = []
+        pending_chunks = 0
+        finished = False
+
+        while not finished:
+            try:
+                item = self._embed_queue.get(timeout=0.5)
+            except Empty:
+                item = None
+
+            if item is _DONE:
+                finished = True
+            elif item is not None:
+                try:
+                    item.chunks = [chunk.text for chunk in chunker(item.text)]
+                except Exception as e:
+                    self._failed(item.file_path, e)
+                    continue
+                if not item.chunks:
+                    self._failed(item.file_path, ValueError("No text chunks generated from document"))
+                    continue
+                pending.append(item)
+                pending_chunks += len(item.chunks)
+
+            # Embed when we have a full batch, or when the stream goes quiet
+            if pending and (pending_chunks >= self.embed_batch_size or item is None or finished):
+                self._embed_batch(embed_model, pending)
+                pending, pending_chunks = [], 0
+
+        self._write_queue.put(_DONE)
+
+    def _embed_batch(self, embed_model, documents: list[_Document]):
+        texts = [text for document in documents for text in document.chunks]
+        try:
+            vectors = []
+            for i in range(0, len(texts), self.embed_batch_size):
+                vectors.extend(embed_model.embed(texts[i:i + self.embed_batch_size]))
+        except Exception as e:
+            for document in documents:
+                self._failed(document.file_path, e)
+            return
+
+        offset = 0
+        for document in documents:
+            document.vectors = vectors[offset:offset + len(document.chunks)]
+            offset += len(document.chunks)
+            self._write_queue.put(document)
+
+    def _write_stage(self, collection: Any):
+        try:
+            with collection.batch.dynamic() as batch:
+                while True:
+                    document = self._write_queue.get()
+                    if document is _DONE:
+                        break
+                    # Chunk 0 goes last, it marks the document as completely written
+                    for i in list(range(1, len(document.chunks))) + [0]:
+                        batch.add_object(
+                            properties={
+                                **document.metadata,
+                                "content": document.chunks[i],
+                                "chunk_index": i,
+                            },
+                            vector=_to_list(document.vectors[i]),
+                        )
+                    self._update(files_indexed=1, chunks_indexed=len(document.chunks))
+        except Exception as e:
+            self._update(errors=[("weaviate batch", str(e))])
+            self._cancelled.set()
+            # Keep draining so the other stages don't block on a full queue
+            while self._write_queue.get() is not _DONE:
+                pass
+            return
+
+        failed = getattr(collection.batch, "failed_objects", None) or []
+        if failed:
+            for obj in failed:
+                self._update(errors=[("weaviate batch", str(getattr(obj, "message", obj)))])
+            self._report()
+
+    def _failed(self, file_path: str, error: Exception):
+        self._update(files_failed=1, errors=[(file_path, str(error))])
+        if not self.ignore_errors:
+            self._cancelled.set()
+
+    def _update(self, errors: list | None = None, **counts):
+        with self._stats_lock:
+            for name, value in counts.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+            if errors:
+                self.stats.errors.extend(errors)
+        if any(name in counts for name in ("files_skipped", "files_indexed", "files_failed")):
+            self._report()
+
+    def _report(self):
+        if self.progress:
+            try:
+                self.progress(self.stats)
+            except Exception as e:
+                print(f"Error reporting indexing progress: {e}")
+
+
+class _RateLimiter:
+    """Limits how many summaries run at once, and optionally how many start per minute"""
+
+    def __init__(self, concurrency: int, per_minute: Optional[int] = None):
+        self._concurrency = concurrency
+        self._semaphore: asyncio.Semaphore | None = None
+        self._interval = 60.0 / per_minute if per_minute else 0.0
+        self._next_start = 0.0
+
+    async def __aenter__(self):
+        if self._semaphore is None:
+            # Created lazily so it binds to the pipeline's event loop
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        await self._semaphore.acquire()
+        if self._interval:
+            now = time.monotonic()
+            start = max(now, self._next_start)
+            self._next_start = start + self._interval
+            if start > now:
+                await asyncio.sleep(start - now)
+
+    async def __aexit__(self, *exc):
+        self._semaphore.release()
+
+
+def _is_complete(collection: Any, document_id: str) -> bool:
+    result = collection.query.fetch_objects(
+        limit=1,
+        filters=(
+            Filter.by_property("document_id").equal(document_id)
+            & Filter.by_property("chunk_index").equal(0)
+        ),
+    )
+    return bool(result.objects)
+
+
+def _to_list(vector) -> list:
+    return vector.tolist() if hasattr(vector, "tolist") else list(vector)
+
+
+def index_files(
+    file_paths: Iterable[str],
+    index_name: str,
+    **kwargs,
+) -> IngestStats:
+    """Index many files with an IngestionPipeline. Takes the same options as the pipeline."""
+    return IngestionPipeline(index_name, **kwargs).run(file_paths)
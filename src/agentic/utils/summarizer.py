@@ -2,51 +2,73 @@ import litellm
 from litellm import completion
 from agentic.llm import setup_model_key
 
+def _document_summary_request(text: str, mime_type: str, model: str) -> dict|None:
+    """Build the completion arguments for a document summary, or None if the model's
+    context window is too small"""
+    setup_model_key(model)
+    
+    # Get model context window from LiteLLM's model list
+    model_info = litellm.get_model_info(model)
+    context_window = model_info.get("max_input_tokens", 128000)
+    max_output_tokens = model_info.get("max_output_tokens", 4096)
+    
+    system_message = f"Generate a 3-sentence summary of this {mime_type} document."
+    system_tokens = litellm.token_counter(
+        model=model, 
+        text=system_message,
+        count_response_tokens=True
+    )
+    
+    max_input_tokens = min(
+        int(context_window * 0.8) - system_tokens,
+        context_window - max_output_tokens - system_tokens
+    )
+    
+    if max_input_tokens <= 0:
+        return None
+
+    truncated_text = _truncate_for_model(
+        text=text,
+        model=model,
+        max_tokens=max_input_tokens
+    )
+
+    # Ensure max_tokens doesn't exceed model's output limit
+    safe_max_tokens = min(int(context_window * 0.2), max_output_tokens)
+    
+    return dict(
+        model=model,
+        messages=[{
+            "role": "system",
+            "content": system_message
+        }, {
+            "role": "user", 
+            "content": truncated_text
+        }],
+        max_tokens=safe_max_tokens
+    )
+
 def generate_document_summary(text: str, mime_type: str, model: str = "openai/gpt-4o") -> str:
     """Generate a concise document summary using LLM"""
     try:
-        setup_model_key(model)
-        
-        # Get model context window from LiteLLM's model list
-        model_info = litellm.get_model_info(model)
-        context_window = model_info.get("max_input_tokens", 128000)
-        max_output_tokens = model_info.get("max_output_tokens", 4096)
-        
-        system_message = f"Generate a 3-sentence summary of this {mime_type} document."
-        system_tokens = litellm.token_counter(
-            model=model, 
-            text=system_message,
-            count_response_tokens=True
-        )
-        
-        max_input_tokens = min(
-            int(context_window * 0.8) - system_tokens,
-            context_window - max_output_tokens - system_tokens
-        )
-        
-        if max_input_tokens <= 0:
+        request = _document_summary_request(text, mime_type, model)
+        if request is None:
             return "Error: Context window too small for summary generation"
 
-        truncated_text = _truncate_for_model(
-            text=text,
-            model=model,
-            max_tokens=max_input_tokens
-        )
-
-        # Ensure max_tokens doesn't exceed model's output limit
-        safe_max_tokens = min(int(context_window * 0.2), max_output_tokens)
+        response = completion(**request)
+        return response.choices[0].message.content
         
-        response = completion(
-            model=model,
-            messages=[{
-                "role": "system",
-                "content": system_message
-            }, {
-                "role": "user", 
-                "content": truncated_text
-            }],
-            max_tokens=safe_max_tokens
-        )
+    except Exception as e:
+        return f"Summary generation failed: {str(e)}"
+
+async def agenerate_document_summary(text: str, mime_type: str, model: str = "openai/gpt-4o") -> str:
+    """Async version of generate_document_summary, for summarizing many documents at once"""
+    try:
+        request = _document_summary_request(text, mime_type, model)
+        if request is None:
+            return "Error: Context window too small for summary generation"
+
+        response = await litellm.acompletion(**request)
         return response.choices[0].message.content
         
     except Exception as e:
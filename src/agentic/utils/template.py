@@ -1,7 +1,84 @@
 import inspect
 import os
+import re
 import sys
-from typing import Optional
+import threading
+from functools import lru_cache
+from typing import Any, Optional
+
+import yaml
+from jinja2 import DebugUndefined, Template, Undefined
+
+TEMPLATE_CACHE_SIZE = 256
+_TEMPLATE_MARKERS = ("{{", "{%", "{#")
+_COMMENT_START = re.compile(r"\{#")
+
+_prompt_files: dict[str, tuple[int, Optional[dict]]] = {}
+_prompt_files_lock = threading.Lock()
+
+
+def has_template_syntax(source: str) -> bool:
+    return any(marker in source for marker in _TEMPLATE_MARKERS)
+
+
+def escape_unclosed_comments(source: str) -> str:
+    """Escape every `{#` that has no `#}` after it, which Jinja would otherwise reject"""
+    last_close = source.rfind("#}")
+    parts = []
+    start = 0
+    for match in _COMMENT_START.finditer(source):
+        if match.end() > last_close:
+            parts.append(source[start:match.start()])
+            parts.append("{% raw %}{#{% endraw %}")
+            start = match.end()
+    parts.append(source[start:])
+    return "".join(parts)
+
+
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(source: str, debug_undefined: bool = False, keep_trailing_newline: bool = False) -> Template:
+    """The compiled Jinja template for `source`, parsed once and then reused"""
+    return Template(
+        escape_unclosed_comments(source),
+        undefined=DebugUndefined if debug_undefined else Undefined,
+        keep_trailing_newline=keep_trailing_newline,
+    )
+
+
+def render_template(
+    source: str, context: dict[str, Any], debug_undefined: bool = False, keep_trailing_newline: bool = False
+) -> str:
+    """Render `source` as a Jinja template. Text with no template syntax is returned without
+    going through Jinja at all. `debug_undefined` leaves unknown variables in place."""
+    if not has_template_syntax(source) and "\r" not in source:
+        # Match Jinja, which drops a single trailing newline by default
+        if not keep_trailing_newline and source.endswith("\n"):
+            return source[:-1]
+        return source
+    return compile_template(source, debug_undefined, keep_trailing_newline).render(context)
+
+
+def load_prompt_file(path: str) -> Optional[dict]:
+    """The parsed contents of a prompts YAML file. It is re-read only when its mtime
+    changes. Returns None if the file is missing or can't be parsed."""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _prompt_files_lock:
+        cached = _prompt_files.get(path)
+    if cached is None or cached[0] != mtime:
+        try:
+            with open(path, "r") as f:
+                prompts = yaml.safe_load(f)
+        except Exception as e:
+            print(f"Error loading prompt template: {e}")
+            prompts = None
+        cached = (mtime, prompts)
+        with _prompt_files_lock:
+            _prompt_files[path] = cached
+    # Callers get their own copy, since the parsed file is shared
+    return dict(cached[1]) if isinstance(cached[1], dict) else cached[1]
 
 def find_template_path() -> Optional[str]:
     """Find the template path based on the caller's file location."""
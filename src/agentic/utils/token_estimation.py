@@ -1,7 +1,21 @@
 import litellm
+from functools import lru_cache
 from typing import List, Dict, Any, Tuple, Optional
 import logging
 
+DEFAULT_CONTEXT_WINDOW = 128000
+
+@lru_cache(maxsize=None)
+def get_context_window(model: str) -> int:
+    """Get the max input tokens for a model. Memoized since model info never changes."""
+    try:
+        model_info = litellm.get_model_info(model)
+        return model_info.get("max_input_tokens") or DEFAULT_CONTEXT_WINDOW
+    except Exception as e:
+        # Fallback to default if model info can't be retrieved
+        logging.warning(f"Failed to get model info for {model}: {e}")
+        return DEFAULT_CONTEXT_WINDOW
+
 def count_tokens_in_messages(messages: List[Dict[str, Any]], model: str) -> int:
     """
     Count tokens in a message array with robust fallbacks
@@ -46,10 +60,117 @@ def count_tokens_in_messages(messages: List[Dict[str, Any]], model: str) -> int:
                 
         return token_count
 
+class TokenLedger:
+    """
+    Running token count for an agent's message history.
+
+    Each message is tokenized once, the first time the ledger sees it, so checking the
+    size of a growing history doesn't re-tokenize the whole conversation on every step.
+    The estimate is corrected with the prompt token count the provider reports back,
+    which also accounts for things we don't count ourselves (like tool schemas).
+
+    The history is expected to grow by appending. If messages earlier in the list are
+    replaced (compression, reloading a thread) the ledger recounts from the first change.
+    """
+
+    def __init__(self):
+        self.model: Optional[str] = None
+        # Tokens the counter adds once per request (reply priming), not per message
+        self._base_tokens = 0
+        self._messages: list = []
+        self._counts: list[int] = []
+        self._history_tokens = 0
+        self._system_content: Optional[str] = None
+        self._system_tokens = 0
+        # Provider-reported prompt tokens minus our estimate for the same messages
+        self._correction = 0
+        self._last_estimate: Optional[int] = None
+
+    @property
+    def total(self) -> int:
+        return max(0, self._base_tokens + self._system_tokens + self._history_tokens + self._correction)
+
+    def reset(self):
+        self.__init__()
+
+    def count(self, messages: List[Dict[str, Any]], model: str) -> int:
+        """Bring the ledger up to date with `messages` and return the estimated prompt size"""
+        if model != self.model:
+            self.reset()
+            self.model = model
+            self._base_tokens = count_tokens_in_messages([], model)
+
+        offset = 0
+        if messages and _get(messages[0], "role") == "system":
+            content = _get(messages[0], "content")
+            if content != self._system_content:
+                self._system_content = content
+                self._system_tokens = self._count_message(messages[0])
+            offset = 1
+
+        history_len = len(messages) - offset
+        known = len(self._messages)
+        if (
+            history_len >= known
+            and (known == 0 or (
+                messages[offset] is self._messages[0]
+                and messages[offset + known - 1] is self._messages[-1]
+            ))
+        ):
+            matched = known
+        else:
+            matched = 0
+            for i in range(min(history_len, known)):
+                if messages[offset + i] is not self._messages[i]:
+                    break
+                matched += 1
+
+        if matched < known:
+            self._history_tokens -= sum(self._counts[matched:])
+            del self._messages[matched:]
+            del self._counts[matched:]
+            # Our correction was for a history that no longer exists
+            self._correction = 0
+
+        for message in messages[offset + matched:]:
+            tokens = self._count_message(message)
+            self._messages.append(message)
+            self._counts.append(tokens)
+            self._history_tokens += tokens
+
+        self._last_estimate = self._base_tokens + self._system_tokens + self._history_tokens
+        return self.total
+
+    def _count_message(self, message) -> int:
+        if not isinstance(message, dict):
+            # litellm Message objects from completions go into history as-is
+            message = message.model_dump() if hasattr(message, "model_dump") else dict(message)
+        return max(0, count_tokens_in_messages([message], self.model) - self._base_tokens)
+
+    def discard_estimate(self):
+        """The messages last counted were not the ones sent (eg. they were compressed),
+        so the next provider usage report shouldn't be used as a correction."""
+        self._last_estimate = None
+
+    def record_usage(self, prompt_tokens: Optional[int]):
+        """Correct the estimate with the prompt tokens the provider reported for the
+        messages passed to the last `count` call."""
+        if prompt_tokens and self._last_estimate is not None:
+            self._correction = prompt_tokens - self._last_estimate
+        self._last_estimate = None
+
+
+def _get(message, key: str):
+    if isinstance(message, dict):
+        return message.get(key)
+    return getattr(message, key, None)
+
+
 def should_compress_context(
     messages: List[Dict[str, Any]], 
     model: str,
-    safety_factor: float = 0.3
+    safety_factor: float = 0.3,
+    ledger: Optional[TokenLedger] = None,
 ) -> Tuple[bool, int, int]:
     """
     Check if the current context should be compressed based on token count
@@ -58,25 +179,23 @@ def should_compress_context(
         messages: List of message objects
         model: Model name
         safety_factor: Percentage of context window to reserve (0.0-1.0)
+        ledger: Optional TokenLedger tracking these messages, to avoid recounting all of them
         
     Returns:
         Tuple[bool, int, int]: (should_compress, current_tokens, max_allowed_tokens)
     """
     # Get model context window size
-    try:
-        model_info = litellm.get_model_info(model)
-        context_window = model_info.get("max_input_tokens", 128000)
-    except Exception as e:
-        # Fallback to default if model info can't be retrieved
-        logging.warning(f"Failed to get model info for {model}: {e}")
-        context_window = 128000
+    context_window = get_context_window(model)
     
     # Calculate safety margin
     safety_margin = int(context_window * safety_factor)
     max_allowed_tokens = context_window - safety_margin
     
     # Count tokens in current messages
-    current_tokens = count_tokens_in_messages(messages, model)
+    if ledger is not None:
+        current_tokens = ledger.count(messages, model)
+    else:
+        current_tokens = count_tokens_in_messages(messages, model)
     
     # Determine if compression is needed
     return current_tokens > max_allowed_tokens, current_tokens, max_allowed_tokens
@@ -104,13 +223,7 @@ def create_compressed_messages(
     from agentic.utils.summarizer import summarize_chat_history
     
     # Get model context window size
-    try:
-        model_info = litellm.get_model_info(model)
-        context_window = model_info.get("max_input_tokens", 128000)
-    except Exception as e:
-        # Fallback to default if model info can't be retrieved
-        logging.warning(f"Failed to get model info for {model}: {e}")
-        context_window = 128000
+    context_window = get_context_window(model)
     
     # Calculate target token count
     target_token_count = int(context_window * target_percentage)
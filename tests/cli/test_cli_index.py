@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import Mock, patch
 from typer.testing import CliRunner
 from agentic.cli import app
+from agentic.utils.rag_helper import rag_resources
 from weaviate.collections.collections.sync import _Collections
 from weaviate.collections.collection import Collection
 
@@ -9,12 +10,14 @@ runner = CliRunner()
 
 @pytest.fixture
 def mock_weaviate_client():
+    rag_resources.close()
     with patch('agentic.utils.rag_helper.init_weaviate') as mock_init:
         mock_client = Mock()
         mock_collections = Mock(spec=_Collections)
         mock_client.collections = mock_collections
         mock_init.return_value = mock_client
         yield mock_client
+    rag_resources.close()
 
 @pytest.fixture
 def mock_embedding_model():
@@ -3,16 +3,19 @@ from typer.testing import CliRunner
 from unittest.mock import patch, MagicMock
 from pathlib import Path
 from agentic.cli import app
+from agentic.utils.rag_helper import rag_resources
 from contextlib import contextmanager
 
 runner = CliRunner()
 
 @pytest.fixture
 def mock_weaviate_client():
+    rag_resources.close()
     with patch('agentic.utils.rag_helper.init_weaviate') as mock_init:
         client = MagicMock()
         mock_init.return_value = client
         yield client
+    rag_resources.close()
 
 @pytest.fixture
 def mock_collection():
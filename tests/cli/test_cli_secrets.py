@@ -23,6 +23,7 @@ def mock_typer():
 def setup_test_db(temp_dir):
     """Setup a test database for secrets"""
     # Override the database path for testing
+    original_db_path, original_cache_dir = agentic_secrets.db_path, agentic_secrets.cache_dir
     agentic_secrets.db_path = temp_dir / "test_secrets.db"
     agentic_secrets.cache_dir = temp_dir
     agentic_secrets.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -35,6 +36,7 @@ def setup_test_db(temp_dir):
     # Cleanup
     if agentic_secrets.db_path.exists():
         agentic_secrets.db_path.unlink()
+    agentic_secrets.db_path, agentic_secrets.cache_dir = original_db_path, original_cache_dir
 
 def test_secrets_set(mock_typer):
     """Test setting a secret"""
@@ -0,0 +1,24 @@
+# A small MCP server for the MCP session pool tests
+import asyncio
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+server = FastMCP("agentic-test")
+
+
+@server.tool()
+async def slow_echo(text: str, seconds: float = 0.0) -> str:
+    """Echo the text back after a delay"""
+    await asyncio.sleep(seconds)
+    return f"{text} from {os.getpid()}"
+
+
+@server.tool()
+def crash() -> str:
+    """Exit the server process"""
+    os._exit(1)
+
+
+if __name__ == "__main__":
+    server.run()
@@ -0,0 +1,45 @@
+from agentic.benchmarks.agent_runtime import BenchmarkConfig, compare, run
+from agentic.common import Agent
+from agentic.custom_models.mock_provider import MockStep
+from agentic.events import ToolResult
+from agentic.models import mock_provider
+
+
+def test_scripted_tool_calls(tmp_path):
+    def lookup(key: str) -> str:
+        """Look up a key"""
+        return f"value for {key}"
+
+    mock_provider.set_script([
+        MockStep(tool_calls=[("lookup", {"key": "a"}), ("lookup", {"key": "b"})]),
+        MockStep(content="Found them both"),
+    ], model="mock/scripted")
+    try:
+        agent = Agent(name="Scripted", model="mock/scripted", tools=[lookup], db_path=str(tmp_path / "threads.db"))
+        request_id = agent.start_request("look up a and b").request_id
+        events = list(agent.get_events(request_id))
+    finally:
+        mock_provider.clear_scripts()
+
+    assert [e.result for e in events if isinstance(e, ToolResult)] == ["value for a", "value for b"]
+    assert events[-1].result == "Found them both"
+
+
+def test_runtime_benchmark_and_compare():
+    config = BenchmarkConfig(turns=2, warmup=0, tokens=5, tool_steps=2, parallel_tools=2,
+                             tool_delay=0.01, history_turns=5)
+    results = run(["chat", "tool_loop", "parallel_tools", "handoff", "resume"], config)
+
+    assert results["scenarios"]["tool_loop"]["steps_per_turn"] == 3
+    for metrics in results["scenarios"].values():
+        assert metrics["turns"] == 2
+        assert metrics["turn_p50_ms"] > 0
+        assert metrics["events_per_second"] > 0
+        assert metrics["db_rows_per_second"] > 0
+
+    slower = {"scenarios": {"chat": dict(results["scenarios"]["chat"])}}
+    slower["scenarios"]["chat"]["turn_p50_ms"] *= 2
+    _, regressed = compare(results, slower)
+    assert regressed
+    _, regressed = compare(slower, results)
+    assert not regressed
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from agentic.actor_agents import ActorBaseAgent
+from agentic.api import AgentAPIServer
+from agentic.common import AsyncAgent
+from agentic.event_channel import EventChannel
+from agentic.events import ChatOutput, ToolResult, TurnEnd
+from agentic.swarm.types import ChatCompletionMessageToolCall, Function, ThreadContext
+
+
+def make_tool_call(index: int, name: str, **args) -> ChatCompletionMessageToolCall:
+    return ChatCompletionMessageToolCall(
+        id=f"call_{index}",
+        type="function",
+        function=Function(name=name, arguments=json.dumps(args)),
+    )
+
+
+def make_agent(functions: list, max_tool_concurrency: int = 1) -> tuple[ActorBaseAgent, ThreadContext]:
+    agent = ActorBaseAgent(name="AsyncAgent")
+    agent.functions = functions
+    agent.tools = []
+    agent.max_tool_concurrency = max_tool_concurrency
+    return agent, ThreadContext(agent=agent, agent_name=agent.name)
+
+
+def test_async_turn_with_mock_model(tmp_path):
+    agent = AsyncAgent(
+        name="Echo",
+        model="mock/default",
+        db_path=str(tmp_path / "threads.db"),
+        mock_settings={"pattern": r"say (\w+)", "response": "You said $1"},
+    )
+
+    async def run():
+        request_id = (await agent.astart_request("say hello")).request_id
+        return [event async for event in agent.aget_events(request_id)]
+
+    events = asyncio.run(run())
+    assert any(isinstance(e, ChatOutput) for e in events)
+    assert isinstance(events[-1], TurnEnd)
+    assert events[-1].result == "You said hello"
+    assert agent.get_db_manager().get_thread_logs(agent.thread_id)
+
+
+def test_async_tools_run_on_the_loop():
+    loop_thread = []
+
+    async def lookup(key: str) -> str:
+        """Look up a key"""
+        loop_thread.append(threading.get_ident())
+        await asyncio.sleep(0.3)
+        return f"async value for {key}"
+
+    def blocking_lookup(key: str) -> str:
+        """Look up a key with a blocking client"""
+        time.sleep(0.3)
+        return f"value for {key}"
+
+    agent, thread_context = make_agent([lookup, blocking_lookup], max_tool_concurrency=4)
+    tool_calls = [
+        make_tool_call(0, "lookup", key="a"),
+        make_tool_call(1, "blocking_lookup", key="b"),
+        make_tool_call(2, "lookup", key="c"),
+        make_tool_call(3, "missing_tool"),
+    ]
+
+    async def run():
+        ticks = 0
+
+        async def heartbeat():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        beat = asyncio.create_task(heartbeat())
+        start = time.time()
+        result = await agent._aexecute_tool_calls(tool_calls, agent.functions, thread_context)
+        elapsed = time.time() - start
+        beat.cancel()
+        return result, elapsed, ticks, threading.get_ident()
+
+    (response, events), elapsed, ticks, main_thread = asyncio.run(run())
+
+    assert elapsed < 0.6
+    # The blocking tool ran off the loop, so the heartbeat kept going
+    assert ticks > 10
+    assert loop_thread == [main_thread, main_thread]
+    assert [m["content"] for m in response.messages] == [
+        "async value for a", "value for b", "async value for c", "Error: Tool missing_tool not found.",
+    ]
+    assert [e.tool_call_id for e in events if isinstance(e, ToolResult)] == ["call_0", "call_1", "call_2"]
+
+
+def test_many_conversations_on_one_loop(tmp_path):
+    agents = [
+        AsyncAgent(
+            name=f"Echo{i}",
+            model="mock/default",
+            db_path=str(tmp_path / "threads.db"),
+            mock_settings={"pattern": r"say (\w+)", "response": "You said $1"},
+        )
+        for i in range(20)
+    ]
+
+    async def run():
+        return await asyncio.gather(*(
+            agent.agrab_final_result(f"say word{i}") for i, agent in enumerate(agents)
+        ))
+
+    assert asyncio.run(run()) == [f"You said word{i}" for i in range(20)]
+
+
+def test_concurrent_requests_on_one_agent(tmp_path):
+    agent = AsyncAgent(
+        name="Echo",
+        model="mock/default",
+        db_path=str(tmp_path / "threads.db"),
+        mock_settings={"pattern": r"say (\w+)", "response": "You said $1"},
+    )
+
+    async def run():
+        return await asyncio.gather(*(agent.agrab_final_result(f"say word{i}") for i in range(5)))
+
+    # The requests share the agent's history, so they take turns rather than interleaving
+    assert asyncio.run(run()) == [f"You said word{i}" for i in range(5)]
+    assert [message["content"] for message in agent._agent.history if message["role"] == "user"] == [
+        f"say word{i}" for i in range(5)
+    ]
+
+
+def test_channel_aput_waits_for_room():
+    async def run():
+        channel = EventChannel(maxsize=2)
+        received = []
+
+        async def produce():
+            for i in range(5):
+                await channel.aput(i)
+            channel.close()
+
+        producer = asyncio.create_task(produce())
+        async for item in channel:
+            received.append(item)
+            assert channel.qsize() <= 2
+        await producer
+        return received
+
+    assert asyncio.run(run()) == [0, 1, 2, 3, 4]
+
+
+def test_api_process_with_async_agent(tmp_path):
+    agent = AsyncAgent(
+        name="Echo",
+        model="mock/default",
+        db_path=str(tmp_path / "threads.db"),
+        mock_settings={"pattern": r"say (\w+)", "response": "You said $1"},
+    )
+    # The context manager keeps one event loop running across requests, like uvicorn
+    with TestClient(AgentAPIServer([agent]).app) as client:
+        request_id = client.post(f"/{agent.safe_name}/process", json={"prompt": "say hi"}).json()["request_id"]
+        events = client.get(f"/{agent.safe_name}/getevents", params={"request_id": request_id}).json()
+    assert events[-1]["type"] == "turn_end"
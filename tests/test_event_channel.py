@@ -0,0 +1,130 @@
+import asyncio
+import threading
+import time
+from queue import Empty, Full
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agentic.api import AgentAPIServer
+from agentic.common import Agent
+from agentic.event_channel import EventChannel
+
+
+def test_sync_consumer_reads_until_closed():
+    channel = EventChannel()
+
+    def produce():
+        for i in range(3):
+            channel.put(i)
+        channel.close()
+
+    threading.Thread(target=produce).start()
+    assert list(channel) == [0, 1, 2]
+
+    with pytest.raises(EOFError):
+        channel.get()
+
+
+def test_get_times_out():
+    with pytest.raises(Empty):
+        EventChannel().get(timeout=0.05)
+
+
+def test_async_consumer_does_not_block_the_loop():
+    channel = EventChannel()
+    ticks = []
+
+    async def ticker():
+        while not channel.closed:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.01)
+
+    def produce():
+        for i in range(5):
+            time.sleep(0.05)
+            channel.put(i)
+        channel.close()
+
+    async def main():
+        threading.Thread(target=produce).start()
+        tick_task = asyncio.create_task(ticker())
+        events = [event async for event in channel]
+        await tick_task
+        return events
+
+    assert asyncio.run(main()) == [0, 1, 2, 3, 4]
+    # The loop kept running other tasks while the consumer waited
+    assert len(ticks) > 10
+
+
+def test_full_channel_applies_backpressure():
+    channel = EventChannel(maxsize=2)
+    produced = []
+
+    def produce():
+        for i in range(5):
+            channel.put(i)
+            produced.append(i)
+        channel.close()
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    time.sleep(0.1)
+    assert produced == [0, 1]
+
+    assert list(channel) == [0, 1, 2, 3, 4]
+    producer.join(1)
+    assert not producer.is_alive()
+
+
+def test_cancel_releases_producer():
+    channel = EventChannel(maxsize=1)
+    producer = threading.Thread(target=lambda: [channel.put(i) for i in range(100)])
+    producer.start()
+    time.sleep(0.05)
+    assert producer.is_alive()
+
+    channel.cancel()
+    producer.join(1)
+    assert not producer.is_alive()
+    with pytest.raises(EOFError):
+        channel.get()
+
+
+
+def test_unread_channel_gives_up_after_put_timeout():
+    channel = EventChannel(maxsize=1, put_timeout=0.1)
+    producer = threading.Thread(target=lambda: [channel.put(i) for i in range(100)])
+    producer.start()
+    producer.join(1)
+    assert not producer.is_alive()
+    assert channel.cancelled
+
+    # An explicit timeout still raises
+    channel = EventChannel(maxsize=1, put_timeout=0.1)
+    channel.put(0)
+    with pytest.raises(Full):
+        channel.put(1, timeout=0.05)
+    assert not channel.cancelled
+
+    async def produce():
+        channel = EventChannel(maxsize=1, put_timeout=0.1)
+        for i in range(100):
+            await channel.aput(i)
+        return channel
+
+    assert asyncio.run(asyncio.wait_for(produce(), 1)).cancelled
+
+
+def test_api_getevents():
+    agent = Agent(name="Channel Agent", model="mock/default", mock_settings={"response": "Hello from the channel"})
+    client = TestClient(AgentAPIServer([agent]).app)
+
+    request_id = client.post(f"/{agent.safe_name}/process", json={"prompt": "hi"}).json()["request_id"]
+    events = client.get(f"/{agent.safe_name}/getevents", params={"request_id": request_id}).json()
+
+    chat_output = [e["payload"]["content"] for e in events if e["type"] == "chat_output"]
+    # The mock model streams a word at a time
+    assert "".join(chat_output) == "Hello from the channel"
+    assert events[-1]["type"] == "turn_end"
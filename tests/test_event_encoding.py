@@ -0,0 +1,51 @@
+import json
+import pickle
+from datetime import datetime, timedelta
+
+from litellm.types.utils import Message
+
+from agentic.events import ChatOutput, FinishCompletion, Output, ToolResult, TurnEnd
+from agentic.utils.json import loads, make_json_serializable
+
+
+def test_chat_output_matches_validated_event():
+    payload = {"content": "hello ", "role": "assistant"}
+    event = ChatOutput("Agent", payload, depth=1)
+    validated = Output("Agent", payload, depth=1)
+    validated.type = "chat_output"
+
+    assert event.model_dump() == validated.model_dump()
+    assert pickle.loads(pickle.dumps(event)).encode() == event.encode()
+
+
+def test_encoding_matches_make_json_serializable():
+    message = Message(content="done", role="assistant")
+    events = [
+        FinishCompletion.create("Agent", message, "gpt-4o", 0.1, 10, 2, timedelta(seconds=1), 0),
+        ToolResult("Agent", "lookup", {"when": datetime(2025, 1, 2, 3, 4, 5)}, tool_call_id="call_1"),
+        TurnEnd("Agent", [message]),
+    ]
+    for event in events:
+        expected = make_json_serializable(event.payload)
+        assert event.json_payload() == expected
+        assert json.loads(event.encode())["payload"] == expected
+
+    assert json.loads(events[1].encode())["result"] == {"when": "2025-01-02T03:04:05"}
+
+
+def test_encoding_is_cached_until_changed():
+    event = TurnEnd("Agent", [{"role": "assistant", "content": "draft"}])
+    encoded = event.encode()
+    assert event.encode() is encoded
+
+    event.set_result("final")
+    assert json.loads(event.encode())["payload"]["messages"][0]["content"] == "final"
+
+
+def test_loads_reads_stdlib_json_with_nan():
+    # The stdlib encoder writes NaN and Infinity, which orjson rejects
+    data = json.dumps({"score": float("nan"), "limit": float("inf")})
+    loaded = loads(data)
+    assert loaded["score"] != loaded["score"]
+    assert loaded["limit"] == float("inf")
+    assert loads(data.encode()).keys() == {"score", "limit"}
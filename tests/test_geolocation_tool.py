@@ -37,14 +37,15 @@ async def test_get_timezone(geolocation_tool, mocker):
 
 @pytest.mark.asyncio
 async def test_get_ip_success(geolocation_tool, mocker):
-    # Mock the requests
-    mock_requests = mocker.patch('agentic.tools.geolocation_tool.requests')
+    # Mock the shared HTTP client
+    mock_http = mocker.patch('agentic.tools.geolocation_tool.http_client')
+    mock_http.aget = AsyncMock()
     
     # Mock the ipify response
     ip_response = MagicMock()
     ip_response.json.return_value = {'ip': '123.45.67.89'}
     ip_response.raise_for_status.return_value = None
-    mock_requests.get.return_value = ip_response
+    mock_http.aget.return_value = ip_response
     
     # Call the method
     result = await geolocation_tool.get_ip()
@@ -53,21 +54,21 @@ async def test_get_ip_success(geolocation_tool, mocker):
     assert '123.45.67.89' in result
     
     # Verify the request was made correctly
-    mock_requests.get.assert_called_once()
-    assert 'ipify.org' in mock_requests.get.call_args[0][0]
+    mock_http.aget.assert_called_once()
+    assert 'ipify.org' in mock_http.aget.call_args[0][0]
 
 @pytest.mark.asyncio
 async def test_get_ip_request_error(geolocation_tool, mocker):
-    # Mock the requests module and its exceptions
-    mock_requests = mocker.patch('agentic.tools.geolocation_tool.requests')
+    # Mock the shared HTTP client
+    mock_http = mocker.patch('agentic.tools.geolocation_tool.http_client')
+    mock_http.aget = AsyncMock()
     
     # Create a mock exception class that inherits from Exception
     class MockRequestException(Exception):
         pass
     
     # Set up the mock to raise our custom exception
-    mock_requests.exceptions.RequestException = MockRequestException
-    mock_requests.get.side_effect = MockRequestException("Network error")
+    mock_http.aget.side_effect = MockRequestException("Network error")
     
     # Call the method and expect an exception to be caught and printed
     with patch('builtins.print') as mock_print:
@@ -79,8 +80,9 @@ async def test_get_ip_request_error(geolocation_tool, mocker):
 
 @pytest.mark.asyncio
 async def test_get_location_success(geolocation_tool, mocker):
-    # Mock the requests
-    mock_requests = mocker.patch('agentic.tools.geolocation_tool.requests')
+    # Mock the shared HTTP client
+    mock_http = mocker.patch('agentic.tools.geolocation_tool.http_client')
+    mock_http.aget = AsyncMock()
     
     # Mock the ipinfo response
     location_response = MagicMock()
@@ -94,7 +96,7 @@ async def test_get_location_success(geolocation_tool, mocker):
         'timezone': 'America/New_York'
     }
     location_response.raise_for_status.return_value = None
-    mock_requests.get.return_value = location_response
+    mock_http.aget.return_value = location_response
     
     # Call the method with a test IP
     test_ip = '123.45.67.89'
@@ -110,14 +112,15 @@ async def test_get_location_success(geolocation_tool, mocker):
     assert test_ip in result
     
     # Verify the request was made correctly
-    mock_requests.get.assert_called_once()
-    assert test_ip in mock_requests.get.call_args[0][0]
-    assert 'ipinfo.io' in mock_requests.get.call_args[0][0]
+    mock_http.aget.assert_called_once()
+    assert test_ip in mock_http.aget.call_args[0][0]
+    assert 'ipinfo.io' in mock_http.aget.call_args[0][0]
 
 @pytest.mark.asyncio
 async def test_get_location_without_ip(geolocation_tool, mocker):
-    # Mock the requests
-    mock_requests = mocker.patch('agentic.tools.geolocation_tool.requests')
+    # Mock the shared HTTP client
+    mock_http = mocker.patch('agentic.tools.geolocation_tool.http_client')
+    mock_http.aget = AsyncMock()
     
     # Mock the ipify response
     ip_response = MagicMock()
@@ -138,7 +141,7 @@ async def test_get_location_without_ip(geolocation_tool, mocker):
     location_response.raise_for_status.return_value = None
     
     # Set up the mock to return different responses for different URLs
-    mock_requests.get.side_effect = [ip_response, location_response]
+    mock_http.aget.side_effect = [ip_response, location_response]
     
     # Call the method without an IP
     result = await geolocation_tool.get_location()
@@ -148,9 +151,9 @@ async def test_get_location_without_ip(geolocation_tool, mocker):
     assert '123.45.67.89' in result
     
     # Verify both requests were made
-    assert mock_requests.get.call_count == 2
-    assert 'ipify.org' in mock_requests.get.call_args_list[0][0][0]
-    assert 'ipinfo.io' in mock_requests.get.call_args_list[1][0][0]
+    assert mock_http.aget.call_count == 2
+    assert 'ipify.org' in mock_http.aget.call_args_list[0][0][0]
+    assert 'ipinfo.io' in mock_http.aget.call_args_list[1][0][0]
 
 @pytest.mark.asyncio
 async def test_get_tools(geolocation_tool):
@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from agentic.tools.utils.github_api import (
+    GitHubAPI,
+    GitHubRateLimitError,
+    RateLimiter,
+    ResponseCache,
+    parse_links,
+)
+from agentic.tools.utils.http_client import SharedHTTPClient
+
+ISSUES = [{"number": n, "title": f"Issue {n}"} for n in range(1, 251)]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send(self, status: int, body: bytes = b"", headers: dict = {}):
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        page, per_page = int(query.get("page", 1)), int(query.get("per_page", 30))
+        etag = f'"issues-{page}-{per_page}-{server.version}"'
+        with server.lock:
+            server.requests.append(page)
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+        try:
+            time.sleep(0.05)
+            headers = {
+                "ETag": etag,
+                "X-RateLimit-Limit": "5000",
+                "X-RateLimit-Remaining": str(server.remaining),
+                "X-RateLimit-Reset": str(int(time.time()) + 3600),
+                "X-RateLimit-Resource": "core",
+            }
+            if self.headers.get("If-None-Match") == etag:
+                with server.lock:
+                    server.not_modified += 1
+                self._send(304, headers=headers)
+                return
+            last = -(-len(ISSUES) // per_page)
+            base = f"{server.url}{url.path}?per_page={per_page}"
+            links = []
+            if page < last:
+                links.append(f'<{base}&page={page + 1}>; rel="next"')
+            links.append(f'<{base}&page={last}>; rel="last"')
+            headers["Link"] = ", ".join(links)
+            headers["Content-Type"] = "application/json"
+            body = json.dumps(ISSUES[(page - 1) * per_page:page * per_page]).encode()
+            self._send(200, body, headers)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def do_POST(self):
+        server = self.server
+        request = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        variables = request["variables"]
+        start = int(variables["cursor"] or 0)
+        end = min(start + variables["first"], 120)
+        server.graphql.append(variables)
+        nodes = [{"number": n, "reviews": {"nodes": [{"state": "APPROVED"}]}} for n in range(start, end)]
+        body = json.dumps({"data": {"repository": {"items": {
+            "nodes": nodes,
+            "pageInfo": {"hasNextPage": end < 120, "endCursor": str(end)},
+        }}}}).encode()
+        self._send(200, body, {"Content-Type": "application/json"})
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.lock = threading.Lock()
+    httpd.requests, httpd.graphql = [], []
+    httpd.active = httpd.peak = httpd.not_modified = 0
+    httpd.version, httpd.remaining = 1, 4000
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def api(server, tmp_path):
+    client = SharedHTTPClient()
+    yield GitHubAPI("test-token", cache=ResponseCache(tmp_path / "github.db"), base_url=server.url, client=client)
+    client.close()
+
+
+def test_parse_links():
+    links = parse_links('<https://api.github.com/x?page=2>; rel="next", <https://api.github.com/x?page=5>; rel="last"')
+    assert links == {"next": "https://api.github.com/x?page=2", "last": "https://api.github.com/x?page=5"}
+
+
+@pytest.mark.asyncio
+async def test_paginate_fetches_pages_concurrently(server, api):
+    response = await api.paginate("/repos/o/r/issues", per_page=25)
+    assert response.ok and not response.truncated
+    assert [issue["number"] for issue in response.data] == list(range(1, 251))
+    assert sorted(server.requests) == list(range(1, 11))
+    assert server.peak > 1
+
+    response = await api.paginate("/repos/o/r/issues", per_page=25, max_pages=3)
+    assert response.truncated
+    assert len(response.data) == 75
+
+
+@pytest.mark.asyncio
+async def test_conditional_requests_use_the_cache(server, api):
+    first = await api.paginate("/repos/o/r/issues")
+    assert not first.cached
+    second = await api.paginate("/repos/o/r/issues")
+    assert second.cached
+    assert second.data == first.data
+    assert server.not_modified == 3
+
+    # New content has a new ETag
+    server.version = 2
+    third = await api.request("GET", "/repos/o/r/issues", {"per_page": 100})
+    assert not third.cached
+    assert third.data == first.data[:100]
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_budget(server, api):
+    server.remaining = 2
+    await api.request("GET", "/repos/o/r/issues")
+    assert api.rate_limits.budget(api.token_key, "core") == 2
+
+    # An exhausted budget that resets soon is waited for; one that resets later fails
+    limiter = RateLimiter(max_wait=5)
+    limiter.update("key", "core", {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(time.time() + 0.2)})
+    start = time.monotonic()
+    await limiter.acquire("key", "core")
+    assert time.monotonic() - start >= 0.2
+
+    limiter.update("key", "search", {"X-RateLimit-Remaining": "1", "X-RateLimit-Reset": str(time.time() + 600)})
+    await limiter.acquire("key", "search")
+    with pytest.raises(GitHubRateLimitError):
+        await limiter.acquire("key", "search")
+
+
+@pytest.mark.asyncio
+async def test_graphql_listing_follows_cursors(server, api):
+    pulls = await api.list_pull_requests("o", "r", states=["OPEN"], max_items=110)
+    assert [pr["number"] for pr in pulls] == list(range(110))
+    assert pulls[0]["reviews"]["nodes"][0]["state"] == "APPROVED"
+    assert [variables["first"] for variables in server.graphql] == [50, 50, 10]
+    assert server.graphql[0]["states"] == ["OPEN"]
@@ -0,0 +1,120 @@
+from datetime import UTC, datetime
+from unittest.mock import Mock
+from uuid import uuid4
+
+import pytest
+
+from agentic.common import ThreadContext
+from agentic.db.db_manager import DatabaseManager
+from agentic.db.models import new_id
+from agentic.events import ChatOutput, PromptStarted, ToolCall, ToolResult, TurnEnd
+from agentic.thread_manager import (
+    ThreadManager,
+    check_history_snapshot,
+    load_chat_history,
+    rebuild_history_snapshots,
+    reconstruct_chat_history_from_thread_logs,
+)
+
+
+@pytest.fixture
+def temp_db_path(tmp_path):
+    return str(tmp_path / "test_threads.db")
+
+
+@pytest.fixture
+def db_manager(temp_db_path):
+    return DatabaseManager(db_path=temp_db_path)
+
+
+@pytest.fixture
+def thread_manager(temp_db_path):
+    return ThreadManager(initial_thread_id=str(uuid4()), db_path=temp_db_path)
+
+
+@pytest.fixture
+def thread_context():
+    return ThreadContext(agent_name="test_agent", agent=Mock(), debug_level=None)
+
+
+def run_turn(thread_manager, thread_context, prompt, reply, end=True):
+    thread_manager.handle_event(PromptStarted(agent="test_agent", message=prompt), thread_context)
+    call_id = f"call_{prompt.replace(' ', '_')}"
+    thread_manager.handle_event(
+        ToolCall(agent="test_agent", name="lookup", arguments={"q": prompt}, tool_call_id=call_id), thread_context
+    )
+    thread_manager.handle_event(
+        ToolResult(agent="test_agent", name="lookup", result="found", tool_call_id=call_id), thread_context
+    )
+    for token in reply.split(" "):
+        thread_manager.handle_event(
+            ChatOutput(agent="test_agent", payload={"content": token + " ", "role": "assistant"}),
+            thread_context,
+        )
+    if end:
+        thread_manager.handle_event(TurnEnd(agent="test_agent", messages=[]), thread_context)
+    thread_manager.event_sink.flush()
+
+
+def full_history(db_manager, thread_id):
+    return reconstruct_chat_history_from_thread_logs(db_manager.get_thread_logs(thread_id))
+
+
+def test_turn_end_updates_snapshot(db_manager, thread_manager, thread_context):
+    run_turn(thread_manager, thread_context, "first question", "first answer")
+    run_turn(thread_manager, thread_context, "second question", "second answer")
+    thread_id = thread_context.thread_id
+
+    snapshot = db_manager.get_history_snapshot(thread_id)
+    assert snapshot is not None
+    assert snapshot.log_count == len(db_manager.get_thread_logs(thread_id))
+    assert check_history_snapshot(db_manager, thread_id)
+
+
+def test_resume_replays_only_the_tail(db_manager, thread_manager, thread_context, monkeypatch):
+    run_turn(thread_manager, thread_context, "first question", "first answer")
+    # This turn never finishes, so its rows are only in the log
+    run_turn(thread_manager, thread_context, "second question", "second answer", end=False)
+    thread_id = thread_context.thread_id
+    expected = full_history(db_manager, thread_id)
+
+    def no_full_read(thread_id):
+        raise AssertionError("resume read every log row")
+
+    monkeypatch.setattr(db_manager, "get_thread_logs", no_full_read)
+    history = load_chat_history(db_manager, thread_id)
+
+    assert history == expected
+    assert {"role": "user", "content": "second question"} in history
+
+
+def test_rebuild_fixes_a_bad_snapshot(db_manager, thread_manager, thread_context):
+    run_turn(thread_manager, thread_context, "question", "answer")
+    thread_id = thread_context.thread_id
+
+    snapshot = db_manager.get_history_snapshot(thread_id)
+    snapshot.state = {"history": [{"role": "user", "content": "wrong"}], "pending": None}
+    db_manager.save_history_snapshot(snapshot)
+    assert not check_history_snapshot(db_manager, thread_id)
+
+    assert rebuild_history_snapshots(db_manager) == 1
+    assert check_history_snapshot(db_manager, thread_id)
+
+
+def test_logs_with_the_same_timestamp_keep_their_order(db_manager):
+    thread = db_manager.create_thread(agent_id="test_agent", user_id="test_user", initial_prompt="Hi")
+    created_at = datetime.now(UTC)
+    # A batch of rows written with one timestamp, as the event sink can
+    rows = [
+        {"id": new_id(), "thread_id": thread.id, "agent_id": "test_agent", "user_id": "test_user",
+         "role": "system", "depth": 0, "created_at": created_at, "event_name": f"event_{n}",
+         "event": {"n": n}, "version": 1}
+        for n in range(50)
+    ]
+    db_manager.log_events(rows)
+
+    logs = db_manager.get_thread_logs(thread.id)
+    assert [log.event_name for log in logs] == [f"event_{n}" for n in range(50)]
+    # A cursor inside the batch continues right after it
+    after = db_manager.get_thread_logs_after(thread.id, logs[19].created_at, logs[19].id)
+    assert [log.event_name for log in after] == [f"event_{n}" for n in range(20, 50)]
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from agentic.tools.utils.http_client import SharedHTTPClient
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.ports.append(self.client_address[1])
+            server.active += 1
+            server.peak = max(server.peak, server.active)
+            failures = server.failures
+            server.failures = max(0, failures - 1)
+        try:
+            if self.path.startswith("/slow"):
+                time.sleep(0.2)
+            if self.path.startswith("/flaky") and failures:
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = b'{"ok": true}'
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with server.lock:
+                server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.lock = threading.Lock()
+    httpd.ports, httpd.active, httpd.peak, httpd.failures = [], 0, 0, 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def client():
+    client = SharedHTTPClient(backoff=0.01)
+    yield client
+    client.close()
+
+
+def test_connections_are_reused_across_threads_and_loops(server, client):
+    assert client.get(f"{server.url}/a").json() == {"ok": True}
+    # A request from a different thread, on its own event loop
+    with ThreadPoolExecutor(1) as pool:
+        response = pool.submit(asyncio.run, client.aget(f"{server.url}/b")).result()
+    assert response.status_code == 200
+    assert client.get(f"{server.url}/c").status_code == 200
+
+    assert len(server.ports) == 3
+    assert len(set(server.ports)) == 1
+
+
+def test_retries_honor_retry_after(server, client):
+    server.failures = 2
+    response = client.get(f"{server.url}/flaky")
+    assert response.status_code == 200
+    assert len(server.ports) == 3
+
+    server.failures = 5
+    assert client.get(f"{server.url}/flaky", retries=1).status_code == 503
+
+
+def test_read_timeouts_are_not_retried(server, client):
+    with pytest.raises(httpx.ReadTimeout):
+        client.get(f"{server.url}/slow", timeout=0.05)
+    assert len(server.ports) == 1
+
+
+def test_per_host_concurrency_limit(server, client):
+    client.configure_host("127.0.0.1", max_concurrency=2)
+
+    async def fetch_all():
+        return await asyncio.gather(*(client.aget(f"{server.url}/slow") for _ in range(6)))
+
+    responses = asyncio.run(fetch_all())
+    assert [response.status_code for response in responses] == [200] * 6
+    assert server.peak == 2
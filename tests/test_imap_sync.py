@@ -0,0 +1,252 @@
+import imaplib
+import re
+from email.message import EmailMessage
+from functools import lru_cache
+
+import pytest
+
+from agentic.tools import imap_tool
+from agentic.tools.imap_tool import IMAPTool
+from agentic.tools.utils.imap_sync import IMAPConnectionPool, IMAPSync, MailCache, uid_ranges
+
+
+@lru_cache(maxsize=None)
+def _message(uid: int) -> bytes:
+    msg = EmailMessage()
+    msg["From"] = f"sender{uid}@example.com"
+    msg["To"] = "me@example.com"
+    msg["Subject"] = f"Message {uid}"
+    msg["Date"] = "Mon, 02 Jun 2025 10:00:00 +0000"
+    msg.set_content(f"Body of message {uid}")
+    return msg.as_bytes()
+
+
+class FakeIMAP:
+    """Just enough of imaplib.IMAP4 for the sync engine, recording each command"""
+
+    def __init__(self, server: dict):
+        self.server = server
+        self.commands = []
+        self.logins = 0
+        self._responses = {}
+
+    def login(self, user, password):
+        self.logins += 1
+        return "OK", [b"Logged in"]
+
+    def logout(self):
+        return "BYE", []
+
+    def noop(self):
+        return "OK", []
+
+    def select(self, folder, readonly=False):
+        self.commands.append(("SELECT", folder))
+        self.folder = folder.strip('"')
+        self.readonly = readonly
+        box = self.server[self.folder]
+        self._responses = {
+            "UIDVALIDITY": [str(box["uidvalidity"]).encode()],
+            "UIDNEXT": [str(max(box["messages"], default=0) + 1).encode()],
+        }
+        return "OK", [str(len(box["messages"])).encode()]
+
+    def response(self, code):
+        return code, self._responses.pop(code, [None])
+
+    def uid(self, command, *args):
+        self.commands.append((command, *args))
+        messages = self.server[self.folder]["messages"]
+        if command == "SEARCH":
+            criteria = " ".join(arg for arg in args if arg)
+            match = re.match(r"UID (\d+):\*", criteria)
+            uids = sorted(messages)
+            if "UNSEEN" in criteria:
+                uids = [uid for uid in uids if uid not in self.server[self.folder].get("seen", set())]
+            if match:
+                # Like a real server, "n:*" includes the last message
+                uids = [uid for uid in uids if uid >= int(match.group(1))] or uids[-1:]
+            return "OK", [" ".join(map(str, uids)).encode()]
+        if command == "FETCH":
+            wanted = set()
+            for part in args[0].split(","):
+                low, _, high = part.partition(":")
+                wanted.update(range(int(low), int(high or low) + 1))
+            data = []
+            for uid in sorted(wanted & set(messages)):
+                raw = messages[uid]
+                literal = raw.split(b"\n\n")[0] + b"\n\n" if "HEADER" in args[1] else raw
+                data.append((f"{uid} (UID {uid} {args[1][5:-1]} {{{len(literal)}}}".encode(), literal))
+                data.append(b")")
+            return "OK", data
+        if command == "STORE":
+            if self.readonly:
+                return "NO", [b"Mailbox is read-only"]
+            assert args[1:] == ("+FLAGS", "(\\Seen)")
+            seen = self.server[self.folder].setdefault("seen", set())
+            for part in args[0].split(","):
+                low, _, high = part.partition(":")
+                seen.update(range(int(low), int(high or low) + 1))
+            return "OK", []
+        raise AssertionError(command)
+
+
+@pytest.fixture
+def server():
+    return {"INBOX": {"uidvalidity": 1, "messages": {uid: _message(uid) for uid in range(1, 501)}}}
+
+
+def _fetches(imap: FakeIMAP) -> list:
+    return [command for command in imap.commands if command[0] == "FETCH"]
+
+
+def test_uid_ranges():
+    assert uid_ranges([7, 1, 2, 3, 9, 10]) == "1:3,7,9:10"
+    assert uid_ranges([]) == ""
+
+
+def test_incremental_sync(server, tmp_path):
+    cache = MailCache(tmp_path / "imap.db")
+    sync = IMAPSync(cache, batch_size=200)
+    imap = FakeIMAP(server)
+
+    # 500 headers in 3 batched fetches, not 500
+    assert sync.select(imap, "me", "INBOX") == 500
+    assert len(_fetches(imap)) == 3
+    assert cache.headers("me", "INBOX", [42])[42].subject == "Message 42"
+
+    # Nothing new: no search or fetch at all
+    imap.commands.clear()
+    assert sync.select(imap, "me", "INBOX") == 0
+    assert imap.commands == [("SELECT", "INBOX")]
+
+    server["INBOX"]["messages"][501] = _message(501)
+    assert sync.select(imap, "me", "INBOX") == 1
+    assert _fetches(imap) == [("FETCH", "501", "(UID RFC822.HEADER)")]
+
+    # Bodies are fetched once, in one batch, then served from the cache
+    imap.commands.clear()
+    bodies = sync.fetch_bodies(imap, "me", "INBOX", [10, 11, 12, 400])
+    assert b"Body of message 400" in bodies[400]
+    assert _fetches(imap) == [("FETCH", "10:12,400", "(UID BODY.PEEK[])")]
+    imap.commands.clear()
+    sync.fetch_bodies(imap, "me", "INBOX", [10, 11])
+    assert _fetches(imap) == []
+
+
+def test_new_uidvalidity_resets_the_folder(server, tmp_path):
+    cache = MailCache(tmp_path / "imap.db")
+    sync = IMAPSync(cache)
+    imap = FakeIMAP(server)
+    sync.select(imap, "me", "INBOX")
+
+    server["INBOX"] = {"uidvalidity": 2, "messages": {1: _message(900)}}
+    sync.select(imap, "me", "INBOX")
+    assert cache.headers("me", "INBOX", [1])[1].subject == "Message 900"
+    assert cache.headers("me", "INBOX", [2]) == {}
+
+
+def test_connections_are_pooled():
+    created = []
+
+    def factory(host, port):
+        created.append(FakeIMAP({}))
+        return created[-1]
+
+    pool = IMAPConnectionPool(factory=factory)
+    with pool.connection("imap.example.com", 993, "me", "pw") as first:
+        pass
+    with pool.connection("imap.example.com", 993, "me", "pw") as second:
+        assert second is first
+        with pool.connection("imap.example.com", 993, "me", "pw") as third:
+            assert third is not first
+    with pool.connection("imap.example.com", 993, "other", "pw") as other:
+        assert other not in (first, third)
+    assert len(created) == 3
+    assert all(imap.logins == 1 for imap in created)
+
+
+def test_pooled_connections_need_the_same_password():
+    class CheckedIMAP(FakeIMAP):
+        def login(self, user, password):
+            if password != "new":
+                raise imaplib.IMAP4.error("Authentication failed")
+            return super().login(user, password)
+
+    created = []
+
+    def factory(host, port):
+        created.append(CheckedIMAP({}))
+        return created[-1]
+
+    pool = IMAPConnectionPool(factory=factory)
+    with pool.connection("imap.example.com", 993, "me", "new") as first:
+        pass
+    # A wrong password logs in again, rather than getting the pooled connection
+    with pytest.raises(imaplib.IMAP4.error):
+        with pool.connection("imap.example.com", 993, "me", "wrong"):
+            pass
+    with pool.connection("imap.example.com", 993, "me", "new") as second:
+        assert second is first
+    assert len(created) == 2
+
+
+def test_retrieve_emails_once_tracks_read_messages(server, tmp_path, monkeypatch):
+    imap = FakeIMAP(server)
+    pool = IMAPConnectionPool(factory=lambda host, port: imap)
+    cache = MailCache(tmp_path / "imap.db")
+    monkeypatch.setattr(imap_tool, "imap_connections", pool)
+    monkeypatch.setattr(imap_tool, "get_mail_cache", lambda: cache)
+
+    class Context:
+        agent_name = "Mail Agent"
+
+        def get_secret(self, key, default=None):
+            return "me@example.com" if key == "IMAP_USERNAME" else "pw"
+
+        def debug(self, *args):
+            pass
+
+        info = error = debug
+
+    tool = IMAPTool()
+    first = tool.retrieve_emails_once(Context(), limit=3)
+    assert [email["subject"] for email in first] == ["Message 500", "Message 499", "Message 498"]
+    second = tool.retrieve_emails_once(Context(), limit=3)
+    assert [email["subject"] for email in second] == ["Message 497", "Message 496", "Message 495"]
+    # Without tracking the newest are returned again, from the cache
+    imap.commands.clear()
+    again = tool.retrieve_emails(Context(), limit=3)
+    assert [email["subject"] for email in again] == ["Message 500", "Message 499", "Message 498"]
+    assert _fetches(imap) == []
+
+    listed = tool.list_emails(Context(), limit=2, days_back_from_today=0, direct_mail_only=False)
+    assert listed[0] == {"id": "500", "subject": "Message 500", "sender": "sender500@example.com",
+                         "date": "Mon, 02 Jun 2025 10:00:00 +0000"}
+    assert imap.logins == 1
+
+
+def test_retrieved_emails_are_marked_seen(server, tmp_path, monkeypatch):
+    imap = FakeIMAP(server)
+    monkeypatch.setattr(imap_tool, "imap_connections", IMAPConnectionPool(factory=lambda host, port: imap))
+    monkeypatch.setattr(imap_tool, "get_mail_cache", lambda: MailCache(tmp_path / "imap.db"))
+
+    class Context:
+        agent_name = "Mail Agent"
+
+        def get_secret(self, key, default=None):
+            return "me@example.com" if key == "IMAP_USERNAME" else "pw"
+
+        def debug(self, *args):
+            pass
+
+        info = error = debug
+
+    tool = IMAPTool()
+    first = tool.retrieve_emails(Context(), limit=2, search_criteria="UNSEEN")
+    assert [email["subject"] for email in first] == ["Message 500", "Message 499"]
+    assert server["INBOX"]["seen"] == {499, 500}
+
+    # Polling UNSEEN moves on to the next messages
+    second = tool.retrieve_emails(Context(), limit=2, search_criteria="UNSEEN")
+    assert [email["subject"] for email in second] == ["Message 498", "Message 497"]
@@ -108,7 +108,7 @@ async def test_get_linkedin_profile_info(linkedin_tool):
     mock_response.json.return_value = MOCK_PROFILE_RESPONSE
     mock_response.raise_for_status.return_value = None
     
-    with patch('httpx.AsyncClient.get', return_value=mock_response):
+    with patch('agentic.tools.linkedin_tool.http_client.aget', return_value=mock_response):
         result = await linkedin_tool.get_linkedin_profile_info(
             "https://www.linkedin.com/in/adamselipsky/"
         )
@@ -129,7 +129,7 @@ async def test_search_location(linkedin_tool):
     mock_response.json.return_value = MOCK_LOCATION_RESPONSE
     mock_response.raise_for_status.return_value = None
     
-    with patch('httpx.AsyncClient.get', return_value=mock_response):
+    with patch('agentic.tools.linkedin_tool.http_client.aget', return_value=mock_response):
         result = await linkedin_tool.search_location("San Francisco, CA")
         assert result == "102277331"
 
@@ -139,7 +139,7 @@ async def test_get_company_linkedin_info(linkedin_tool):
     mock_response.json.return_value = MOCK_COMPANY_RESPONSE
     mock_response.raise_for_status.return_value = None
     
-    with patch('httpx.AsyncClient.get', return_value=mock_response):
+    with patch('agentic.tools.linkedin_tool.http_client.aget', return_value=mock_response):
         result = await linkedin_tool.get_company_linkedin_info("google")
         
         assert isinstance(result, pd.DataFrame)
@@ -158,7 +158,7 @@ async def test_linkedin_people_search(linkedin_tool):
     people_mock.raise_for_status.return_value = None
     
     # Use side_effect to return different responses for sequential calls
-    with patch('httpx.AsyncClient.get', side_effect=[location_mock, people_mock]):
+    with patch('agentic.tools.linkedin_tool.http_client.aget', side_effect=[location_mock, people_mock]):
         result = await linkedin_tool.linkedin_people_search(
             name="Max",
             location="San Francisco, CA"
@@ -173,7 +173,7 @@ async def test_api_error_handling(linkedin_tool):
     mock_response = Mock()
     mock_response.raise_for_status.side_effect = Exception("API Error")
     
-    with patch('httpx.AsyncClient.get', return_value=mock_response):
+    with patch('agentic.tools.linkedin_tool.http_client.aget', return_value=mock_response):
         with pytest.raises(Exception):
             await linkedin_tool.get_linkedin_profile_info(
                 "https://www.linkedin.com/in/nonexistent/"
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import litellm
+import numpy as np
+import pytest
+from litellm.types.utils import ModelResponse
+
+from agentic import llm_cache
+from agentic.common import Agent
+from agentic.events import ChatOutput, FinishCompletion
+from agentic.llm_cache import CompletionCache, HIT, MISS, SEMANTIC_HIT
+
+
+def response(content: str) -> ModelResponse:
+    return ModelResponse(choices=[{"message": {"role": "assistant", "content": content}}])
+
+
+def params(content: str, **kwargs) -> dict:
+    return {"model": "mock/default", "messages": [{"role": "user", "content": content}], **kwargs}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CompletionCache(tmp_path / "llm_cache.db")
+    yield cache
+    cache.close()
+
+
+def test_exact_hit_and_key_parameters(cache):
+    assert cache.lookup(params("hello")) == (None, MISS)
+    cache.record(params("hello"), response("hi there"))
+
+    cached, status = cache.lookup(params("hello"))
+    assert status == HIT
+    assert cached.choices[0].message.content == "hi there"
+
+    # Anything that shapes the response is part of the key
+    assert cache.lookup(params("hello", temperature=0.5))[1] == MISS
+    assert cache.lookup(params("hello", tools=[{"type": "function"}]))[1] == MISS
+    assert cache.stats().hits == 1
+
+
+def test_ttl_and_lru_eviction(tmp_path):
+    cache = CompletionCache(tmp_path / "llm_cache.db", max_entries=2)
+    cache.record(params("one"), response("1"))
+    cache.record(params("two"), response("2"))
+    time.sleep(0.01)
+    cache.lookup(params("one"))
+    cache.record(params("three"), response("3"))
+
+    # "two" was the least recently used
+    assert cache.lookup(params("two"))[1] == MISS
+    assert cache.lookup(params("one"))[1] == HIT
+    assert cache.stats().evictions == 1
+
+    cache.ttl_seconds = 0
+    time.sleep(0.01)
+    assert cache.lookup(params("three"))[1] == MISS
+    cache.close()
+
+
+def test_semantic_hit(tmp_path, monkeypatch):
+    cache = CompletionCache(tmp_path / "llm_cache.db", semantic=True, similarity=0.9)
+    vocabulary = ["weather", "paris", "today", "stock", "price"]
+
+    def fake_embed(text):
+        words = text.lower().replace("?", "").split()
+        vector = np.array([words.count(w) for w in vocabulary], dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    monkeypatch.setattr(cache, "_embed", fake_embed)
+    cache.record(params("weather in paris today"), response("Sunny"))
+
+    cached, status = cache.lookup(params("weather in Paris today?"))
+    assert status == SEMANTIC_HIT
+    assert cached.choices[0].message.content == "Sunny"
+    assert cache.lookup(params("stock price today"))[1] == MISS
+    cache.close()
+
+
+def test_semantic_matches_only_the_latest_user_turn(tmp_path, monkeypatch):
+    cache = CompletionCache(tmp_path / "llm_cache.db", semantic=True, similarity=0.9)
+    embedded = []
+
+    def fake_embed(text):
+        # Like a model that truncates its input: long texts all look the same
+        embedded.append(text)
+        vector = np.array([len(text) > 200, "weather" in text, "stock" in text], dtype=np.float32)
+        return vector / np.linalg.norm(vector)
+
+    monkeypatch.setattr(cache, "_embed", fake_embed)
+    instructions = {"role": "system", "content": "You are a helpful assistant. " * 50}
+
+    def conversation(*messages):
+        return {"model": "mock/default", "messages": [instructions, *messages]}
+
+    cache.record(conversation({"role": "user", "content": "What's the weather?"}), response("Sunny"))
+    assert embedded == ["What's the weather?"]
+
+    # A different question after the same long instructions doesn't match
+    assert cache.lookup(conversation({"role": "user", "content": "What's the stock price?"}))[1] == MISS
+    assert cache.lookup(conversation({"role": "user", "content": "weather?"}))[1] == SEMANTIC_HIT
+
+    # Nor does a similar question in a different conversation
+    earlier = [{"role": "user", "content": "Hi"}, {"role": "assistant", "content": "Hello"}]
+    assert cache.lookup(conversation(*earlier, {"role": "user", "content": "weather?"}))[1] == MISS
+    cache.close()
+
+
+@pytest.mark.asyncio
+async def test_record_async_stores_off_the_event_loop(cache, monkeypatch):
+    loop_thread = threading.get_ident()
+    put_threads = []
+    put = cache._put
+    monkeypatch.setattr(cache, "_put", lambda *args: (put_threads.append(threading.get_ident()), put(*args)))
+
+    assert (await cache.record_async(params("hello"), response("hi"))).choices[0].message.content == "hi"
+    assert put_threads and put_threads[0] != loop_thread
+    assert cache.lookup(params("hello"))[1] == HIT
+
+
+def test_agent_replays_cached_stream(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "_caches", {"exact": CompletionCache(tmp_path / "llm_cache.db")})
+    calls = []
+    completion = litellm.completion
+
+    def counting_completion(**kwargs):
+        calls.append(kwargs)
+        return completion(**kwargs)
+
+    monkeypatch.setattr(litellm, "completion", counting_completion)
+
+    def run_turn():
+        agent = Agent(
+            name="Cached Agent", model="mock/default", llm_cache="exact",
+            mock_settings={"response": "Cached answer"},
+        )
+        return list(agent.final_result("What is the answer?"))
+
+    statuses = []
+    outputs = []
+    for _ in range(2):
+        events = run_turn()
+        finish = next(e for e in events if isinstance(e, FinishCompletion))
+        statuses.append(finish.usage[FinishCompletion.CACHE_KEY])
+        outputs.append("".join(str(e) for e in events if isinstance(e, ChatOutput)))
+
+    assert statuses == ["miss", "hit"]
+    assert outputs[0] == outputs[1] == "Cached answer"
+    assert len(calls) == 1
@@ -0,0 +1,117 @@
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from agentic.tools import mcp_tool
+from agentic.tools.mcp_tool import MCPTool
+from agentic.tools.utils.mcp_client import MCPClientManager, MCPServerError
+
+SERVER = str(Path(__file__).parent / "data" / "mcp_test_server.py")
+
+
+def _text(result) -> str:
+    return result.content[0].text
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    manager = MCPClientManager(tmp_path / "mcp_tools.json")
+    monkeypatch.setattr(mcp_tool, "mcp_manager", manager)
+    yield manager
+    manager.close()
+
+
+def test_tools_share_a_server_and_run_concurrently(manager):
+    first = MCPTool(sys.executable, [SERVER])
+    second = MCPTool(sys.executable, [SERVER])
+    assert first._server is second._server
+    assert len(manager._servers) == 1
+
+    echo = {tool.__name__: tool for tool in first.get_tools()}["slow_echo"]
+    started = time.monotonic()
+    with ThreadPoolExecutor(4) as pool:
+        results = list(pool.map(lambda i: echo(text=f"call {i}", seconds=0.5), range(4)))
+    assert time.monotonic() - started < 1.5
+
+    pids = {_text(result).split(" from ")[1] for result in results}
+    assert len(pids) == 1
+    assert _text(results[2]).startswith("call 2")
+
+
+def test_cached_catalog_skips_discovery(manager, tmp_path):
+    MCPTool(sys.executable, [SERVER])
+    catalog = json.loads((tmp_path / "mcp_tools.json").read_text())
+    (entry,) = catalog.values()
+    assert {tool["function"]["name"] for tool in entry["tools"]} == {"slow_echo", "crash"}
+    assert entry["version"].startswith("agentic-test@")
+
+    # A new process: the tools come from the cache without waiting for the server
+    fresh = MCPClientManager(tmp_path / "mcp_tools.json")
+    mcp_tool.mcp_manager = fresh
+    try:
+        tool = MCPTool(sys.executable, [SERVER])
+        assert not tool._server.connected
+        echo = {t.__name__: t for t in tool.get_tools()}["slow_echo"]
+        assert _text(echo(text="warm")).startswith("warm")
+    finally:
+        fresh.close()
+
+
+def test_tools_see_the_refreshed_catalog(manager, tmp_path):
+    MCPTool(sys.executable, [SERVER])
+    # Pretend the cache was written by an older server version with fewer tools
+    path = tmp_path / "mcp_tools.json"
+    catalog = json.loads(path.read_text())
+    (entry,) = catalog.values()
+    entry["version"] = "agentic-test@0"
+    entry["tools"] = [tool for tool in entry["tools"] if tool["function"]["name"] == "slow_echo"]
+    path.write_text(json.dumps(catalog))
+
+    fresh = MCPClientManager(path)
+    mcp_tool.mcp_manager = fresh
+    try:
+        tool = MCPTool(sys.executable, [SERVER])
+        assert set(tool._tool_schema_map) == {"slow_echo"}
+        # The server starts in the background, reports a new version and lists its tools again
+        deadline = time.monotonic() + 10
+        while "crash" not in tool._tool_schema_map and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert {t.__name__ for t in tool.get_tools()} == {"slow_echo", "crash"}
+    finally:
+        fresh.close()
+
+
+def test_crashed_server_is_restarted(manager):
+    tool = MCPTool(sys.executable, [SERVER])
+    functions = {t.__name__: t for t in tool.get_tools()}
+    first_pid = _text(functions["slow_echo"](text="a")).split(" from ")[1]
+
+    with pytest.raises(MCPServerError):
+        functions["crash"]()
+
+    second_pid = _text(functions["slow_echo"](text="b")).split(" from ")[1]
+    assert second_pid != first_pid
+    assert tool._server.restarts == 1
+
+
+def test_cleanup_stops_the_server_after_the_last_holder(manager):
+    first = MCPTool(sys.executable, [SERVER])
+    second = MCPTool(sys.executable, [SERVER])
+    assert first._server.holders == 2
+    echo = {tool.__name__: tool for tool in second.get_tools()}["slow_echo"]
+
+    with ThreadPoolExecutor(1) as pool:
+        call = pool.submit(echo, text="in flight", seconds=0.5)
+        time.sleep(0.2)
+        # Cleaning up one tool, twice, leaves the server to the other
+        manager.run(first.cleanup())
+        manager.run(first.cleanup())
+        assert _text(call.result(5)).startswith("in flight")
+    assert second._server.connected
+
+    manager.run(second.cleanup())
+    assert not second._server.connected
@@ -0,0 +1,74 @@
+import re
+
+from fastapi.testclient import TestClient
+
+from agentic import metrics
+from agentic.api import AgentAPIServer
+from agentic.common import Agent
+from agentic.custom_models.mock_provider import MockStep
+from agentic.models import mock_provider
+
+
+def sample(text: str, name: str, **labels) -> float:
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    pattern = re.escape(name + ("{" + label_text + "}" if labels else "")) + r" (\S+)"
+    match = re.search("^" + pattern + "$", text, re.MULTILINE)
+    return float(match.group(1)) if match else 0.0
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = metrics.MetricsRegistry()
+    histogram = registry.histogram("test_seconds", "Test timings", ("op",), buckets=(0.1, 1.0))
+    counter = registry.counter("test_total", "Test count", ("op",))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, "read")
+    counter.inc("read", amount=2)
+
+    text = registry.render()
+    assert sample(text, "test_seconds_bucket", op="read", le="0.1") == 1
+    assert sample(text, "test_seconds_bucket", op="read", le="1") == 2
+    assert sample(text, "test_seconds_bucket", op="read", le="+Inf") == 3
+    assert sample(text, "test_seconds_count", op="read") == 3
+    assert sample(text, "test_seconds_sum", op="read") == 5.55
+    assert sample(text, "test_total", op="read") == 2
+    assert "# TYPE test_seconds histogram" in text
+
+
+def test_metrics_endpoint(tmp_path):
+    def metrics_lookup(key: str) -> str:
+        """Look up a key"""
+        if key == "bad":
+            raise ValueError("no such key")
+        return f"value for {key}"
+
+    mock_provider.set_script([
+        MockStep(tool_calls=[("metrics_lookup", {"key": "a"}), ("metrics_lookup", {"key": "bad"})]),
+        MockStep(content="All done"),
+    ], model="mock/metrics_test")
+    agent = Agent(
+        name="Metrics", model="mock/metrics_test", tools=[metrics_lookup], db_path=str(tmp_path / "threads.db")
+    )
+    try:
+        with TestClient(AgentAPIServer([agent]).app) as client:
+            request_id = client.post(f"/{agent.safe_name}/process", json={"prompt": "look"}).json()["request_id"]
+            client.get(f"/{agent.safe_name}/getevents", params={"request_id": request_id})
+            client.get("/no_such_agent/describe")
+            response = client.get("/metrics")
+    finally:
+        mock_provider.clear_scripts()
+
+    assert response.headers["content-type"].startswith("text/plain")
+    text = response.text
+    assert sample(text, "agentic_http_requests_total",
+                  agent=agent.safe_name, endpoint="process_request", method="POST", status="200") == 1
+    assert sample(text, "agentic_http_request_duration_seconds_count", agent=agent.safe_name, endpoint="get_events") == 1
+    assert sample(text, "agentic_http_requests_total", agent="", endpoint="describe", method="GET", status="404") >= 1
+
+    assert sample(text, "agentic_tool_calls_total", tool="metrics_lookup") == 2
+    assert sample(text, "agentic_tool_errors_total", tool="metrics_lookup") == 1
+    assert sample(text, "agentic_tool_call_duration_seconds_count", tool="metrics_lookup") == 2
+    assert sample(text, "agentic_llm_completions_total", model="mock/metrics_test", cache="") == 2
+    assert sample(text, "agentic_llm_time_to_first_token_seconds_count", model="mock/metrics_test") == 2
+    assert sample(text, "agentic_llm_tokens_total", model="mock/metrics_test", direction="output") > 0
+    assert sample(text, "agentic_agent_turns_active", agent="Metrics") == 0
+    assert sample(text, "agentic_thread_log_write_seconds_count") > 0
@@ -72,7 +72,7 @@ async def test_exchange_code_for_token(oauth_tool, mock_thread_context, monkeypa
     monkeypatch.setenv("TEST_CLIENT_ID", "test_client_id")
     monkeypatch.setenv("TEST_CLIENT_SECRET", "test_client_secret")
     
-    with patch('httpx.AsyncClient.post', new_callable=AsyncMock) as mock_post:
+    with patch('agentic.tools.oauth_tool.http_client.apost', new_callable=AsyncMock) as mock_post:
         mock_response = AsyncMock()
         mock_response.status_code = 200
         # Mock json as a regular method, not async
@@ -90,7 +90,7 @@ async def test_exchange_code_for_token_failure(oauth_tool, mock_thread_context,
     monkeypatch.setenv("TEST_CLIENT_ID", "test_client_id")
     monkeypatch.setenv("TEST_CLIENT_SECRET", "test_client_secret")
     
-    with patch('httpx.AsyncClient.post', new_callable=AsyncMock) as mock_post:
+    with patch('agentic.tools.oauth_tool.http_client.apost', new_callable=AsyncMock) as mock_post:
         mock_response = AsyncMock()
         mock_response.status_code = 400
         mock_response.json = Mock(return_value={})
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+
+from agentic.actor_agents import ActorBaseAgent
+from agentic.events import PauseForInputResult, ToolCall, ToolResult
+from agentic.swarm.types import (
+    ChatCompletionMessageToolCall,
+    Function,
+    ThreadContext,
+)
+
+
+def slow_lookup(key: str) -> str:
+    """Pretend to call a slow HTTP service"""
+    time.sleep(0.3)
+    return f"value for {key}"
+
+
+async def slow_async_lookup(key: str) -> str:
+    """Pretend to call a slow async HTTP service"""
+    await asyncio.sleep(0.3)
+    return f"async value for {key}"
+
+
+def logging_lookup(key: str, thread_context: ThreadContext) -> str:
+    """Log progress while calling a slow HTTP service"""
+    thread_context.log(f"looking up {key}")
+    time.sleep(0.2)
+    thread_context.log(f"found {key}")
+    return f"value for {key}"
+
+
+async def async_logging_lookup(key: str, thread_context: ThreadContext) -> str:
+    """Log progress while calling a slow async HTTP service"""
+    thread_context.log(f"looking up {key}")
+    await asyncio.sleep(0.2)
+    thread_context.log(f"found {key}")
+    return f"async value for {key}"
+
+
+def ask_user(question: str):
+    """Ask the user for more input"""
+    return PauseForInputResult({"question": question})
+
+
+def make_tool_call(index: int, name: str, **args) -> ChatCompletionMessageToolCall:
+    return ChatCompletionMessageToolCall(
+        id=f"call_{index}",
+        type="function",
+        function=Function(name=name, arguments=json.dumps(args)),
+    )
+
+
+def make_agent(functions: list, max_tool_concurrency: int) -> tuple[ActorBaseAgent, ThreadContext]:
+    agent = ActorBaseAgent(name="ParallelAgent")
+    agent.functions = functions
+    agent.tools = []
+    agent.max_tool_concurrency = max_tool_concurrency
+    return agent, ThreadContext(agent=agent, agent_name=agent.name)
+
+
+def test_concurrent_tool_calls_keep_order():
+    agent, thread_context = make_agent([slow_lookup, slow_async_lookup], max_tool_concurrency=4)
+    tool_calls = [
+        make_tool_call(0, "slow_lookup", key="a"),
+        make_tool_call(1, "slow_async_lookup", key="b"),
+        make_tool_call(2, "slow_lookup", key="c"),
+        make_tool_call(3, "slow_async_lookup", key="d"),
+        make_tool_call(4, "missing_tool"),
+    ]
+
+    start = time.time()
+    response, events = agent._execute_tool_calls(tool_calls, agent.functions, thread_context)
+    elapsed = time.time() - start
+
+    # Four 0.3s tools run serially would take 1.2s
+    assert elapsed < 0.9
+
+    assert [m["tool_call_id"] for m in response.messages] == [f"call_{i}" for i in range(5)]
+    assert response.messages[0]["content"] == "value for a"
+    assert response.messages[1]["content"] == "async value for b"
+    assert response.messages[4]["content"] == "Error: Tool missing_tool not found."
+
+    call_ids = [e.tool_call_id for e in events if isinstance(e, ToolCall)]
+    result_ids = [e.tool_call_id for e in events if isinstance(e, ToolResult)]
+    assert call_ids == result_ids == [f"call_{i}" for i in range(4)]
+
+
+def test_serial_tool_calls_by_default():
+    agent, thread_context = make_agent([slow_lookup], max_tool_concurrency=1)
+    tool_calls = [make_tool_call(i, "slow_lookup", key=str(i)) for i in range(2)]
+
+    start = time.time()
+    response, _ = agent._execute_tool_calls(tool_calls, agent.functions, thread_context)
+
+    assert time.time() - start >= 0.6
+    assert [m["content"] for m in response.messages] == ["value for 0", "value for 1"]
+
+
+def test_concurrent_pause_result_wins():
+    agent, thread_context = make_agent([slow_lookup, ask_user], max_tool_concurrency=4)
+    tool_calls = [
+        make_tool_call(0, "ask_user", question="Which city?"),
+        make_tool_call(1, "slow_lookup", key="a"),
+    ]
+
+    response, _ = agent._execute_tool_calls(tool_calls, agent.functions, thread_context)
+
+    assert isinstance(response.last_tool_result, PauseForInputResult)
+    assert response.last_tool_result.tool_function._request_id == "call_0"
+    assert response.messages[1]["content"] == "value for a"
+
+
+def test_concurrent_tool_calls_keep_their_own_logs():
+    agent, thread_context = make_agent([logging_lookup, async_logging_lookup], max_tool_concurrency=4)
+    tool_calls = [
+        make_tool_call(0, "logging_lookup", key="a"),
+        make_tool_call(1, "async_logging_lookup", key="b"),
+        make_tool_call(2, "logging_lookup", key="c"),
+        make_tool_call(3, "async_logging_lookup", key="d"),
+    ]
+
+    _, events = agent._execute_tool_calls(tool_calls, agent.functions, thread_context)
+
+    # Each call's logs are published just before its own result
+    logs = []
+    for event in events:
+        if isinstance(event, ToolResult) and event.payload["is_log"]:
+            logs.append(event.result)
+        elif isinstance(event, ToolResult):
+            key = "abcd"[int(event.tool_call_id.split("_")[1])]
+            assert logs == [f"looking up {key}", f"found {key}"]
+            logs = []
+    assert thread_context.get_logs() == []
@@ -0,0 +1,145 @@
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from agentic.utils.rag_helper import rag_resources
+from agentic.utils.rag_pipeline import IngestionPipeline
+
+
+class FakeBatch:
+    def __init__(self):
+        self.objects = []
+        self.failed_objects = []
+
+    @contextmanager
+    def dynamic(self):
+        yield self
+
+    def add_object(self, properties, vector):
+        self.objects.append((properties, vector))
+
+
+class FakeEmbedding:
+    def __init__(self):
+        self.batches = []
+
+    def embed(self, texts):
+        self.batches.append(list(texts))
+        return [np.ones(3) for _ in texts]
+
+
+def fake_chunker(text):
+    return [SimpleNamespace(text=sentence) for sentence in text.split(".") if sentence.strip()]
+
+
+@pytest.fixture
+def pipeline_env(monkeypatch):
+    collection = MagicMock()
+    collection.batch = FakeBatch()
+    client = MagicMock()
+    client.collections.get.return_value = collection
+    embedding = FakeEmbedding()
+
+    async def fake_summary(text, mime_type, model):
+        return f"summary of {len(text)} chars"
+
+    monkeypatch.setattr(rag_resources, "get_embedding_model", lambda name: embedding)
+    monkeypatch.setattr(rag_resources, "get_chunker", lambda threshold, delimiters: fake_chunker)
+    with patch("agentic.utils.rag_pipeline.create_collection"), \
+         patch("agentic.utils.rag_pipeline.agenerate_document_summary", side_effect=fake_summary), \
+         patch("agentic.utils.rag_pipeline.check_document_exists", return_value=(False, "new")) as exists:
+        yield SimpleNamespace(client=client, collection=collection, embedding=embedding, exists=exists)
+
+
+def write_files(tmp_path, count: int) -> list[str]:
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"doc{i}.txt"
+        path.write_text(f"Document {i} first sentence. Second sentence. Third sentence.")
+        paths.append(str(path))
+    return paths
+
+
+def test_pipeline_indexes_files(pipeline_env, tmp_path):
+    paths = write_files(tmp_path, 5)
+    progress = []
+
+    stats = IngestionPipeline(
+        "docs", workers=0, client=pipeline_env.client, embed_batch_size=8,
+        progress=lambda s: progress.append(s.files_done),
+    ).run(paths + [str(tmp_path / "missing.txt")])
+
+    assert stats.files_indexed == 5
+    assert stats.files_failed == 1
+    assert stats.chunks_indexed == 15
+    assert progress[-1] == 6
+
+    objects = pipeline_env.collection.batch.objects
+    assert len(objects) == 15
+    # Each document's chunk 0 is written after its other chunks
+    for path in paths:
+        indexes = [props["chunk_index"] for props, _ in objects if props["source_url"] == path]
+        assert indexes == [1, 2, 0]
+    assert objects[0][0]["summary"].startswith("summary of")
+
+    # Chunks from different documents share embedding batches
+    assert all(len(batch) <= 8 for batch in pipeline_env.embedding.batches)
+    assert any(len(batch) > 3 for batch in pipeline_env.embedding.batches)
+
+
+def test_pipeline_skips_unchanged_and_resumes_partial(pipeline_env, tmp_path):
+    paths = write_files(tmp_path, 2)
+    pipeline_env.exists.return_value = (True, "unchanged")
+
+    # The first document was completely written, the second was interrupted
+    with patch("agentic.utils.rag_pipeline._is_complete", side_effect=[True, False]):
+        stats = IngestionPipeline("docs", workers=0, client=pipeline_env.client).run(paths)
+
+    assert stats.files_skipped == 1
+    assert stats.files_indexed == 1
+    pipeline_env.collection.data.delete_many.assert_called_once()
+
+
+def test_pipeline_raises_without_ignore_errors(pipeline_env, tmp_path):
+    with pytest.raises(RuntimeError, match="missing.txt"):
+        IngestionPipeline(
+            "docs", workers=0, client=pipeline_env.client, ignore_errors=False
+        ).run([str(tmp_path / "missing.txt")])
+
+
+def test_pipeline_parses_in_worker_processes(pipeline_env, tmp_path):
+    paths = write_files(tmp_path, 3)
+
+    stats = IngestionPipeline("docs", workers=2, client=pipeline_env.client).run(paths)
+
+    assert stats.files_read == 3
+    assert stats.files_indexed == 3
+
+
+def test_pipeline_raises_when_the_worker_pool_crashes(pipeline_env, tmp_path):
+    from concurrent.futures import Future
+    from concurrent.futures.process import BrokenProcessPool
+
+    class CrashedPool:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            pass
+
+        def submit(self, fn, *args):
+            future = Future()
+            future.set_exception(BrokenProcessPool("A process in the process pool was terminated abruptly"))
+            return future
+
+    paths = write_files(tmp_path, 2)
+    with patch("agentic.utils.rag_pipeline.ProcessPoolExecutor", CrashedPool):
+        # A crashed pool isn't a per-file error, so ignore_errors doesn't hide it
+        with pytest.raises(RuntimeError, match="parsing processes crashed"):
+            IngestionPipeline("docs", workers=2, client=pipeline_env.client, ignore_errors=True).run(paths)
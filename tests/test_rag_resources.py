@@ -0,0 +1,76 @@
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from agentic.utils.rag_helper import RAGResources
+
+
+@pytest.fixture
+def factories():
+    with patch("agentic.utils.rag_helper.init_weaviate") as init_weaviate, \
+         patch("agentic.utils.rag_helper.init_embedding_model") as init_embedding_model, \
+         patch("agentic.utils.rag_helper.init_chunker") as init_chunker, \
+         patch("agentic.utils.rag_helper.create_collection") as create_collection:
+        init_weaviate.side_effect = lambda: MagicMock()
+        yield init_weaviate, init_embedding_model, init_chunker, create_collection
+
+
+def test_resources_are_created_once(factories):
+    init_weaviate, init_embedding_model, init_chunker, create_collection = factories
+    resources = RAGResources()
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(resources.get_client()))
+        for _ in range(8)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert init_weaviate.call_count == 1
+    assert all(client is results[0] for client in results)
+
+    model = resources.get_embedding_model("BAAI/bge-small-en-v1.5")
+    assert resources.get_embedding_model("BAAI/bge-small-en-v1.5") is model
+    assert init_embedding_model.call_count == 1
+
+    chunker = resources.get_chunker(0.5, ". ,! ,? ,\n")
+    assert resources.get_chunker(0.5, ". ,! ,? ,\n") is chunker
+    assert init_chunker.call_count == 1
+
+    collection = resources.get_collection("docs")
+    assert resources.get_collection("docs") is collection
+    assert create_collection.call_count == 1
+
+
+def test_unhealthy_client_is_reconnected(factories):
+    init_weaviate = factories[0]
+    resources = RAGResources()
+
+    client = resources.get_client()
+    resources.get_collection("docs")
+    client.is_ready.return_value = False
+    resources.report_failure()
+
+    new_client = resources.get_client()
+    assert new_client is not client
+    assert init_weaviate.call_count == 2
+    client.close.assert_called_once()
+
+    # Collection handles from the old connection are dropped
+    resources.get_collection("docs")
+    new_client.collections.get.assert_called_once_with("docs")
+
+
+def test_close_releases_everything(factories):
+    resources = RAGResources()
+    client = resources.get_client()
+    resources.get_embedding_model("BAAI/bge-small-en-v1.5")
+
+    resources.close()
+
+    client.close.assert_called_once()
+    assert resources.get_client() is not client
@@ -0,0 +1,162 @@
+import json
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from agentic.api import AgentAPIServer
+from agentic.common import Agent
+from agentic.request_executor import RequestExecutor, RequestRejected
+from agentic.swarm.types import ChatCompletionMessageToolCall, Function, ThreadContext
+
+
+def wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_limits_concurrency_and_reuses_workers():
+    executor = RequestExecutor(max_workers=2, max_queued=10)
+    release = threading.Event()
+    running = []
+    peak = []
+
+    def job(i):
+        running.append(i)
+        peak.append(len(running))
+        release.wait(2)
+        running.remove(i)
+
+    for i in range(5):
+        executor.submit(job, i)
+
+    wait_until(lambda: executor.stats().running == 2)
+    stats = executor.stats()
+    assert stats.queued == 3
+    assert stats.workers == 2
+
+    release.set()
+    wait_until(lambda: executor.stats().completed == 5)
+    assert max(peak) == 2
+    assert executor.stats().wait_seconds_max > 0
+    executor.shutdown()
+
+
+def test_per_key_limit_and_priority():
+    executor = RequestExecutor(max_workers=4, max_per_key=1, max_queued=10)
+    release = threading.Event()
+    order = []
+
+    def job(name):
+        order.append(name)
+        release.wait(2)
+
+    executor.submit(job, "a1", key="a")
+    wait_until(lambda: executor.stats().running == 1)
+    executor.submit(job, "a2", key="a")
+    executor.submit(job, "a3", key="a", priority=-1)
+    executor.submit(job, "b1", key="b")
+
+    # "b" has room even though two "a" requests are waiting ahead of it
+    wait_until(lambda: "b1" in order)
+    assert executor.stats().queued_by_key == {"a": 2}
+
+    release.set()
+    wait_until(lambda: executor.stats().completed == 4)
+    assert order == ["a1", "b1", "a3", "a2"]
+    executor.shutdown()
+
+
+def test_rejects_when_queue_full():
+    executor = RequestExecutor(max_workers=1, max_queued=1)
+    release = threading.Event()
+
+    executor.submit(release.wait, 2)
+    wait_until(lambda: executor.stats().running == 1)
+    executor.submit(release.wait, 2)
+
+    with pytest.raises(RequestRejected):
+        executor.submit(release.wait, 2)
+    assert executor.stats().rejected == 1
+
+    release.set()
+    executor.shutdown()
+
+
+def test_nested_requests_run_inline():
+    executor = RequestExecutor(max_workers=1, max_queued=1)
+    done = threading.Event()
+
+    def parent():
+        # With one worker, queueing the child would never let it run
+        child_done = threading.Event()
+        executor.submit(child_done.set)
+        assert child_done.wait(2)
+        done.set()
+
+    executor.submit(parent)
+    assert done.wait(2)
+    assert executor.stats().inline == 1
+    executor.shutdown()
+
+
+def test_nested_requests_from_pooled_tool_calls_run_inline():
+    executor = RequestExecutor(max_workers=1, max_queued=4)
+
+    def ask_child(question: str) -> str:
+        """Start a sub-agent request and wait for it, like agent.grab_final_result"""
+        child_done = threading.Event()
+        executor.submit(child_done.set)
+        return f"{question}: {child_done.wait(2)}"
+
+    parent = Agent(name="Parent Agent", model="mock/default", tools=[ask_child], max_tool_concurrency=2)
+    parent_agent = parent._get_agent_for_request("parent")
+    thread_context = ThreadContext(agent=parent_agent, agent_name=parent_agent.name)
+    tool_calls = [
+        ChatCompletionMessageToolCall(
+            id=f"call_{i}", type="function",
+            function=Function(name="ask_child", arguments=json.dumps({"question": f"child {i}"})),
+        )
+        for i in range(2)
+    ]
+    results = []
+    done = threading.Event()
+
+    def request():
+        # The tool calls run on the tool pool's threads while this request holds the only slot
+        response, _ = parent_agent._execute_tool_calls(tool_calls, parent_agent.functions, thread_context)
+        results.extend(message["content"] for message in response.messages)
+        done.set()
+
+    executor.submit(request)
+    assert done.wait(5)
+    assert results == ["child 0: True", "child 1: True"]
+    assert executor.stats().inline == 2
+    executor.shutdown()
+
+
+def test_finished_request_queues_are_released():
+    agent = Agent(name="Executor Agent", model="mock/default", mock_settings={"response": "done"})
+
+    request_id = agent.start_request("hi").request_id
+    events = list(agent.get_events(request_id))
+
+    assert events
+    assert request_id not in agent.request_queues
+
+
+def test_api_returns_429_when_rejected(monkeypatch):
+    agent = Agent(name="Busy Agent", model="mock/default", mock_settings={"response": "done"})
+    client = TestClient(AgentAPIServer([agent]).app)
+
+    def reject(*args, **kwargs):
+        raise RequestRejected("Too many requests", queued=1, running=1)
+
+    monkeypatch.setattr("agentic.actor_agents.request_executor.submit", reject)
+    response = client.post(f"/{agent.safe_name}/process", json={"prompt": "hi"})
+
+    assert response.status_code == 429
+    assert agent.request_queues == {}
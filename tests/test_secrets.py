@@ -195,3 +195,40 @@ def test_copy_secrets_to_env(secret_manager):
     
     for name, value in secrets.items():
         assert os.environ[name] == value
+
+def test_lookups_are_cached(secret_manager):
+    """Repeated lookups reuse one connection and don't decrypt again."""
+    secret_manager.set_secret("cached_secret", "value")
+    secret_manager.get_secret("cached_secret")
+
+    with patch("sqlite3.connect") as connect, \
+         patch.object(secret_manager.encrypter, "decrypt") as decrypt:
+        for _ in range(10):
+            assert secret_manager.get_secret("cached_secret") == "value"
+    connect.assert_not_called()
+    decrypt.assert_not_called()
+
+def test_cache_sees_writes_from_other_instances(temp_db_path, test_key):
+    """A cached reader notices updates and deletes made through another connection."""
+    reader = SecretManager(db_path=temp_db_path, key=test_key)
+    writer = SecretManager(db_path=temp_db_path, key=test_key)
+
+    writer.set_secret("shared", "v1")
+    assert reader.get_secret("shared") == "v1"
+    writer.set_secret("shared", "v2")
+    assert reader.get_secret("shared") == "v2"
+    writer.delete_secret("shared")
+    assert reader.get_secret("shared") is None
+
+def test_copy_secrets_to_env_without_overwrite(secret_manager, monkeypatch):
+    """Existing environment variables are kept when overwrite is False."""
+    monkeypatch.setenv("ENV_KEEP", "original")
+    monkeypatch.delenv("ENV_NEW", raising=False)
+    secret_manager.set_secret("ENV_KEEP", "secret")
+    secret_manager.set_secret("ENV_NEW", "secret")
+
+    secret_manager.copy_secrets_to_env(overwrite=False)
+
+    assert os.environ["ENV_KEEP"] == "original"
+    assert os.environ["ENV_NEW"] == "secret"
+    monkeypatch.delenv("ENV_NEW")
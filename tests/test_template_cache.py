@@ -0,0 +1,72 @@
+import os
+
+import yaml
+
+from agentic.actor_agents import ActorBaseAgent
+from agentic.utils import template
+from agentic.utils.template import compile_template, load_prompt_file, render_template
+
+
+class Context:
+    def __init__(self, values):
+        self.values = values
+
+    def get_context(self):
+        return self.values
+
+
+def test_plain_text_skips_jinja(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("compiled a template with no template syntax")
+
+    monkeypatch.setattr(template, "compile_template", fail)
+    assert render_template("You are a helpful assistant.\n", {}) == "You are a helpful assistant."
+    assert render_template("Line\n", {}, keep_trailing_newline=True) == "Line\n"
+
+
+def test_templates_compiled_once():
+    source = "Hello {{ name }} #cache-test"
+    render_template(source, {"name": "a"})
+    hits = compile_template.cache_info().hits
+    assert render_template(source, {"name": "b"}) == "Hello b #cache-test"
+    assert compile_template.cache_info().hits == hits + 1
+
+
+def test_unclosed_comment_is_escaped():
+    assert render_template("Use {# carefully {{ x }}", {"x": 1}) == "Use {# carefully 1"
+    assert render_template("{# note #} kept {#", {}) == " kept {#"
+
+
+def test_prompt_file_reloaded_on_change(tmp_path):
+    path = tmp_path / "agent.prompts.yaml"
+    path.write_text(yaml.dump({"greeting": "hi"}))
+    first = load_prompt_file(str(path))
+    first["greeting"] = "changed by caller"
+    assert load_prompt_file(str(path)) == {"greeting": "hi"}
+
+    path.write_text(yaml.dump({"greeting": "hello"}))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert load_prompt_file(str(path)) == {"greeting": "hello"}
+    assert load_prompt_file(str(tmp_path / "missing.yaml")) is None
+
+
+def test_memory_block_rendered_once(monkeypatch):
+    agent = ActorBaseAgent.__new__(ActorBaseAgent)
+    agent.instructions_str = "You are {{ name }}."
+    agent.memories = ["  likes tea  ", "lives in Paris"]
+
+    rendered = []
+    original = template.render_template
+
+    def counting(source, context, **kwargs):
+        rendered.append(source)
+        return original(source, context, **kwargs)
+
+    monkeypatch.setattr("agentic.actor_agents.render_template", counting)
+    for _ in range(3):
+        instructions = agent.get_instructions(Context({"name": "Bob"}))
+
+    assert instructions.startswith("You are Bob.\n    <memory blocks>\n")
+    assert "likes tea" in instructions and instructions.endswith("lives in Paris\n    </memory>\n    ")
+    assert sum("MEMORIES" in source for source in rendered) == 1
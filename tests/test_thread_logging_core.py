@@ -1,13 +1,16 @@
 import pytest
 from datetime import datetime
 from unittest.mock import Mock
+from sqlalchemy import text
 
-from agentic.db.db_manager import DatabaseManager
+from agentic.db.db_manager import DatabaseManager, close_db_managers, get_db_manager
 from agentic.db.models import ThreadLog
+from agentic.db.event_sink import EventSink
 from agentic.thread_manager import ThreadManager
 from agentic.common import ThreadContext
 from agentic.events import (
     PromptStarted,
+    ChatOutput,
     FinishCompletion,
     ToolCall,
     ToolResult,
@@ -212,3 +215,91 @@ def test_thread_manager_handle_events(db_manager, thread_manager, thread_context
     # Test handling TurnEnd event
     turn_end = TurnEnd(agent="test_agent", messages=[])
     thread_manager.handle_event(turn_end, thread_context)
+
+def test_thread_manager_batches_and_coalesces_chat_output(db_manager, thread_manager, thread_context):
+    """Streamed ChatOutput deltas are stored as one row, and TurnEnd flushes the batch."""
+    thread_manager.handle_event(PromptStarted(agent="test_agent", message="Tell me a story"), thread_context)
+    for token in ["Once ", "upon ", "a ", "time"]:
+        thread_manager.handle_event(
+            ChatOutput(agent="test_agent", payload={"content": token, "role": "assistant"}),
+            thread_context,
+        )
+    thread_manager.handle_event(TurnEnd(agent="test_agent", messages=[]), thread_context)
+
+    logs = db_manager.get_thread_logs(thread_context.thread_id)
+    assert [log.event_name for log in logs] == ["prompt_started", "chat_output", "turn_end"]
+    assert logs[1].event["content"] == "Once upon a time"
+
+    stats = thread_manager.event_sink.stats
+    assert stats.events_coalesced >= 3
+    assert stats.queue_depth == 0
+    assert stats.flush_count > 0
+
+def test_event_sink_sync_mode(db_manager, thread_context):
+    """The "sync" durability mode writes each event before returning."""
+    thread = db_manager.create_thread(agent_id="test_agent", user_id="test_user", initial_prompt="Hi")
+    sink = EventSink(db_manager, durability="sync")
+    sink.log_event(
+        thread_id=thread.id,
+        agent_id="test_agent",
+        user_id="test_user",
+        role="system",
+        depth=0,
+        event_name="test_event",
+        event_data={"test": "data"},
+    )
+    assert len(db_manager.get_thread_logs(thread.id)) == 1
+
+def test_get_db_manager_is_shared(temp_db_path, monkeypatch):
+    """One manager, engine and migration pass per database, with SQLite tuned for concurrency."""
+    created = []
+    monkeypatch.setattr(DatabaseManager, "create_db_and_tables", lambda self: created.append(self))
+
+    manager = get_db_manager(temp_db_path)
+    assert get_db_manager(temp_db_path) is manager
+    assert ThreadManager(db_path=temp_db_path).db_manager is manager
+    assert len(created) == 1
+
+    with manager.engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1
+
+    close_db_managers()
+    assert get_db_manager(temp_db_path) is not manager
+    assert len(created) == 2
+
+def test_event_sink_counts_dropped_events(db_manager, caplog):
+    """A failed batch write is logged, and its rows counted as dropped."""
+    db_manager.log_events = Mock(side_effect=RuntimeError("disk full"))
+    sink = EventSink(db_manager, durability="turn")
+    for n in range(3):
+        sink.log_event(
+            thread_id="thread",
+            agent_id="test_agent",
+            user_id="test_user",
+            role="system",
+            depth=0,
+            event_name="test_event",
+            event_data={"n": n},
+        )
+    assert sink.flush(timeout=5)
+    sink.close()
+    assert sink.stats.write_errors == 1
+    assert sink.stats.events_dropped == 3
+    assert sink.stats.rows_written == 0
+    assert "Dropped 3 thread log events" in caplog.text
+
+def test_invalid_durability_fails_at_construction(temp_db_path, monkeypatch):
+    monkeypatch.setattr("agentic.thread_manager.DEFAULT_DURABILITY", "fast")
+    with pytest.raises(ValueError, match="AGENTIC_LOG_DURABILITY"):
+        ThreadManager(db_path=temp_db_path)
+    with pytest.raises(ValueError):
+        EventSink(Mock(), durability="fast")
+
+def test_event_sinks_are_shared_per_durability(temp_db_path):
+    """Managers for one database share a sink only when they asked for the same durability."""
+    batched = ThreadManager(db_path=temp_db_path, durability="turn")
+    synced = ThreadManager(db_path=temp_db_path, durability="sync")
+    assert batched.event_sink.durability == "turn"
+    assert synced.event_sink.durability == "sync"
+    assert ThreadManager(db_path=temp_db_path, durability="sync").event_sink is synced.event_sink
@@ -0,0 +1,119 @@
+import json
+import sqlite3
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import inspect, update
+
+from agentic.api import AgentAPIServer
+from agentic.common import Agent
+from agentic.db.db_manager import DatabaseManager
+from agentic.db.models import Thread, new_id
+
+
+@pytest.fixture
+def temp_db_path(tmp_path):
+    return str(tmp_path / "test_threads.db")
+
+
+@pytest.fixture
+def db_manager(temp_db_path):
+    return DatabaseManager(db_path=temp_db_path)
+
+
+def add_logs(db_manager, thread_id, count):
+    start = datetime.now(UTC)
+    db_manager.log_events([
+        {
+            "id": new_id(),
+            "thread_id": thread_id,
+            "agent_id": "Pager",
+            "user_id": "default",
+            "role": "system",
+            "depth": 0,
+            # Pairs of rows share a timestamp, so the id has to break ties
+            "created_at": start + timedelta(milliseconds=i // 2),
+            "event_name": "chat_output" if i % 3 else "tool_call",
+            "event": {"content": "x" * 100, "index": i},
+        }
+        for i in range(count)
+    ])
+
+
+def test_log_pages_cover_every_row_once(db_manager):
+    thread_id = db_manager.create_thread(agent_id="Pager", user_id="default", initial_prompt="hi").id
+    add_logs(db_manager, thread_id, 25)
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = db_manager.query_thread_logs(thread_id, limit=4, cursor=cursor)
+        seen.extend(row["event"]["index"] for row in rows)
+        if cursor is None:
+            break
+    # In the order they were written, even where timestamps tie
+    assert seen == list(range(25))
+    assert [log.id for log in db_manager.get_thread_logs(thread_id)] == [
+        row["id"] for row in db_manager.stream_thread_logs(thread_id, batch_size=4)
+    ]
+
+    rows, _ = db_manager.query_thread_logs(thread_id, event_names=["tool_call"], fields=["event_name"])
+    assert len(rows) == 9
+    assert set(rows[0]) == {"id", "created_at", "event_name"}
+
+    with pytest.raises(ValueError):
+        db_manager.query_thread_logs(thread_id, fields=["nope"])
+
+
+def test_thread_pages_newest_first(db_manager):
+    ids = [
+        db_manager.create_thread(agent_id="Pager", user_id="default", initial_prompt=str(i)).id
+        for i in range(5)
+    ]
+    # Threads updated by one batch of logs share updated_at, and then sort by creation
+    with db_manager.get_session() as session:
+        session.execute(update(Thread).values(updated_at=datetime.now(UTC)))
+        session.commit()
+    first, cursor = db_manager.query_threads(agent_id="Pager", limit=3)
+    rest, last = db_manager.query_threads(agent_id="Pager", limit=3, cursor=cursor)
+
+    assert [row["id"] for row in first + rest] == list(reversed(ids))
+    assert last is None
+
+
+def test_indexes_added_to_existing_database(temp_db_path, db_manager):
+    db_manager.engine.dispose()
+    conn = sqlite3.connect(temp_db_path)
+    conn.execute("DROP INDEX ix_thread_logs_thread_created")
+    conn.commit()
+    conn.close()
+
+    reopened = DatabaseManager(db_path=temp_db_path)
+    names = {index["name"] for index in inspect(reopened.engine).get_indexes("thread_logs")}
+    assert "ix_thread_logs_thread_created" in names
+
+
+def test_api_pagination_and_ndjson(temp_db_path, db_manager):
+    agent = Agent(name="Pager", model="mock/default", db_path=temp_db_path)
+    thread_id = db_manager.create_thread(agent_id="Pager", user_id="default", initial_prompt="hi").id
+    add_logs(db_manager, thread_id, 10)
+    client = TestClient(AgentAPIServer([agent]).app)
+    url = f"/{agent.safe_name}/threads/{thread_id}/logs"
+
+    page = client.get(url, params={"limit": 6, "fields": "event_name"})
+    assert page.status_code == 200
+    assert len(page.json()) == 6
+    assert "event" not in page.json()[0]
+    cursor = page.headers["X-Next-Cursor"]
+    rest = client.get(url, params={"limit": 6, "cursor": cursor})
+    assert len(rest.json()) == 4
+    assert "X-Next-Cursor" not in rest.headers
+
+    export = client.get(url, params={"format": "ndjson", "event_names": "tool_call"})
+    assert export.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in export.text.splitlines()]
+    assert [line["event"]["index"] for line in lines] == [0, 3, 6, 9]
+
+    assert client.get(url, params={"cursor": "garbage"}).status_code == 400
+    threads = client.get(f"/{agent.safe_name}/threads", params={"limit": 1})
+    assert threads.json()[0]["id"] == thread_id
@@ -0,0 +1,80 @@
+from unittest.mock import patch
+
+from agentic.utils.token_estimation import (
+    TokenLedger,
+    get_context_window,
+    should_compress_context,
+)
+
+MODEL = "gpt-4o-mini"
+
+
+def make_history(count: int) -> list[dict]:
+    return [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"message number {i} about the weather"}
+        for i in range(count)
+    ]
+
+
+def fake_counter(messages, model):
+    # 3 tokens of reply priming per request, 10 per message
+    return 3 + 10 * len(messages)
+
+
+def test_ledger_only_counts_new_messages():
+    ledger = TokenLedger()
+    system = {"role": "system", "content": "You are a helpful agent."}
+    history = make_history(4)
+
+    with patch("agentic.utils.token_estimation.count_tokens_in_messages", side_effect=fake_counter) as counter:
+        assert ledger.count([system] + history, MODEL) == 53
+        # One call for the per-request overhead, then one per message
+        assert counter.call_count == 6
+
+        history.append({"role": "user", "content": "one more"})
+        # The system message is rebuilt on every call but its content is unchanged
+        assert ledger.count([dict(system)] + history, MODEL) == 63
+        assert counter.call_count == 7
+
+
+def test_ledger_recounts_replaced_history():
+    ledger = TokenLedger()
+    history = make_history(6)
+    with patch("agentic.utils.token_estimation.count_tokens_in_messages", side_effect=fake_counter) as counter:
+        ledger.count(history, MODEL)
+        counter.reset_mock()
+
+        compressed = history[:1] + history[4:]
+        # Only the messages after the first change are counted again
+        assert ledger.count(compressed, MODEL) == 33
+        assert counter.call_count == 2
+
+
+def test_ledger_uses_reported_prompt_tokens():
+    ledger = TokenLedger()
+    history = make_history(2)
+    estimate = ledger.count(history, MODEL)
+
+    ledger.record_usage(estimate + 100)
+    assert ledger.total == estimate + 100
+
+    # A report for messages we didn't count (eg. after compression) is ignored
+    ledger.count(history, MODEL)
+    ledger.discard_estimate()
+    ledger.record_usage(5)
+    assert ledger.total == estimate + 100
+
+
+def test_should_compress_context_with_ledger():
+    ledger = TokenLedger()
+    messages = make_history(3)
+    assert should_compress_context(messages, MODEL, ledger=ledger) == should_compress_context(messages, MODEL)
+
+
+def test_context_window_lookup_is_memoized():
+    get_context_window.cache_clear()
+    with patch("litellm.get_model_info", return_value={"max_input_tokens": 1000}) as info:
+        assert get_context_window("some-model") == 1000
+        assert get_context_window("some-model") == 1000
+        assert info.call_count == 1
+    get_context_window.cache_clear()
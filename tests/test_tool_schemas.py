@@ -0,0 +1,67 @@
+from agentic.actor_agents import ActorBaseAgent
+from agentic.swarm.types import ThreadContext
+
+
+def lookup_weather(city: str, thread_context: ThreadContext) -> str:
+    """Look up the weather for a city"""
+    return f"It is sunny in {city}"
+
+
+def lookup_time(city: str, run_context: ThreadContext = None) -> str:
+    """Look up the local time for a city"""
+    return f"It is noon in {city}"
+
+
+def make_agent(functions: list) -> ActorBaseAgent:
+    agent = ActorBaseAgent(name="SchemaAgent")
+    agent.functions = []
+    agent.tools = []
+    for func in functions:
+        agent.add_tool(func)
+    return agent
+
+
+def test_tool_schemas_hide_context_params():
+    agent = make_agent([lookup_weather, lookup_time])
+    schemas = agent.get_tool_schemas()
+
+    weather_params = schemas[0]["function"]["parameters"]
+    assert list(weather_params["properties"]) == ["city"]
+    assert weather_params["required"] == ["city"]
+
+    time_params = schemas[1]["function"]["parameters"]
+    assert list(time_params["properties"]) == ["city"]
+
+    assert agent.list_functions() == ["lookup_weather", "lookup_time"]
+
+
+def test_tool_schemas_are_cached_until_functions_change():
+    agent = make_agent([lookup_weather])
+    schemas = agent.get_tool_schemas()
+    assert agent.get_tool_schemas() is schemas
+
+    agent.add_tool(lookup_time)
+    updated = agent.get_tool_schemas()
+    assert updated is not schemas
+    assert [s["function"]["name"] for s in updated] == ["lookup_weather", "lookup_time"]
+
+
+def test_dict_tool_schema_is_not_modified():
+    schema = {
+        "type": "function",
+        "function": {
+            "name": "search",
+            "description": "Search the web",
+            "parameters": {
+                "type": "object",
+                "properties": {"query": {"type": "string"}, "thread_context": {"type": "string"}},
+                "required": ["query", "thread_context"],
+            },
+        },
+    }
+    agent = ActorBaseAgent(name="SchemaAgent")
+    agent.functions = [schema]
+
+    params = agent.get_tool_schemas()[0]["function"]["parameters"]
+    assert params["required"] == ["query"]
+    assert "thread_context" in schema["function"]["parameters"]["properties"]
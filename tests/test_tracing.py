@@ -0,0 +1,92 @@
+import json
+
+from agentic import tracing
+from agentic.common import Agent
+from agentic.custom_models.mock_provider import MockStep
+from agentic.models import mock_provider
+
+
+class ListExporter(tracing.SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def run_traced_turn(tmp_path, exporter, sample_rate=1.0):
+    def lookup(key: str) -> str:
+        """Look up a key"""
+        if key == "bad":
+            raise ValueError("no such key")
+        return f"value for {key}"
+
+    mock_provider.set_script([MockStep(content="Found it")], model="mock/trace_helper")
+    mock_provider.set_script([
+        MockStep(tool_calls=[("lookup", {"key": "a"}), ("lookup", {"key": "bad"})]),
+        MockStep(tool_calls=[("call_trace_helper", {"message": "help"})]),
+        MockStep(content="All done"),
+    ], model="mock/traced")
+    tracing.set_exporter(exporter, sample_rate)
+    try:
+        helper = Agent(name="Trace Helper", model="mock/trace_helper", db_path=str(tmp_path / "threads.db"))
+        agent = Agent(name="Traced", model="mock/traced", tools=[lookup, helper], db_path=str(tmp_path / "threads.db"))
+        return agent.grab_final_result("look it up")
+    finally:
+        tracing.set_exporter(None)
+        mock_provider.clear_scripts()
+
+
+def test_spans_nest_under_the_request(tmp_path):
+    exporter = ListExporter()
+    assert run_traced_turn(tmp_path, exporter) == "All done"
+
+    by_id = {span.span_id: span for span in exporter.spans}
+    names = [span.name for span in exporter.spans]
+    request = next(span for span in exporter.spans if span.name == "agent.request")
+    assert request.parent_id is None
+    assert {span.trace_id for span in exporter.spans} == {request.trace_id}
+    # Children end before their parents
+    assert names[-1] == "agent.request"
+
+    def parent(span):
+        return by_id[span.parent_id].name
+
+    turn = next(span for span in exporter.spans if span.name == "agent.turn")
+    assert parent(turn) == "agent.request"
+    completions = [span for span in exporter.spans if span.name == "llm.completion"]
+    # Three for the agent, one for the sub-agent inside its call
+    assert len(completions) == 4
+    assert [parent(span) for span in completions].count("agent.subagent") == 1
+    assert completions[0].attributes["output_tokens"] > 0
+    assert "ttft_ms" in completions[0].attributes
+
+    tools = [span for span in exporter.spans if span.name == "tool.call"]
+    assert [span.attributes["tool"] for span in tools] == ["lookup", "lookup"]
+    assert tools[0].error is None and "no such key" in tools[1].error
+    assert all(parent(span) == "agent.turn" for span in tools)
+    assert "db.flush" in names and "llm.count_tokens" in names
+
+
+def test_sampling_skips_whole_requests(tmp_path):
+    exporter = ListExporter()
+    assert run_traced_turn(tmp_path, exporter, sample_rate=0.0) == "All done"
+    assert exporter.spans == []
+    assert tracing.start_span("anything") is tracing.NOOP_SPAN
+
+
+def test_json_lines_exporter(tmp_path):
+    exporter = tracing.JsonLinesExporter(tmp_path / "traces.jsonl")
+    tracing.set_exporter(exporter)
+    try:
+        with tracing.span("outer", step=1):
+            with tracing.span("inner") as inner:
+                inner.set_attribute("rows", 3)
+    finally:
+        tracing.set_exporter(None)
+
+    inner, outer = [json.loads(line) for line in (tmp_path / "traces.jsonl").read_text().splitlines()]
+    assert inner["parent_id"] == outer["span_id"]
+    assert inner["attributes"] == {"rows": 3}
+    assert outer["attributes"] == {"step": 1}
+    assert outer["duration_ms"] >= inner["duration_ms"]
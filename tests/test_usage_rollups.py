@@ -0,0 +1,118 @@
+import sqlite3
+from datetime import datetime, timedelta, UTC
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from typer.testing import CliRunner
+
+from agentic.api import AgentAPIServer
+from agentic.cli import app
+from agentic.db.db_manager import DatabaseManager
+
+
+@pytest.fixture
+def temp_db_path(tmp_path):
+    return str(tmp_path / "test_threads.db")
+
+
+@pytest.fixture
+def db_manager(temp_db_path):
+    return DatabaseManager(db_path=temp_db_path)
+
+
+def completion(thread_id, agent_id, model, cost, created_at=None, user_id="user"):
+    return {
+        "id": str(uuid4()),
+        "thread_id": thread_id,
+        "agent_id": agent_id,
+        "user_id": user_id,
+        "role": "system",
+        "depth": 0,
+        "created_at": created_at or datetime.now(UTC),
+        "event_name": "completion_end",
+        "event": {"usage": {
+            "model": model, "cost": cost, "input_tokens": 100, "output_tokens": 10, "elapsed_time": 0.5,
+        }},
+    }
+
+
+def new_thread(db_manager, agent_id):
+    return db_manager.create_thread(agent_id=agent_id, user_id="user", initial_prompt="hi").id
+
+
+def test_thread_usage_from_rollups(db_manager):
+    thread_id = new_thread(db_manager, "writer")
+    db_manager.log_events([
+        completion(thread_id, "writer", "gpt-4o", 0.25),
+        completion(thread_id, "writer", "gpt-4o", 0.25),
+        completion(thread_id, "writer", "claude", 1.0),
+    ])
+    db_manager.log_event(
+        thread_id=thread_id, agent_id="writer", user_id="user", role="system", depth=0,
+        event_name="completion_end", event_data=completion(thread_id, "writer", "claude", 1.0)["event"],
+    )
+
+    usage = db_manager.get_thread_usage(thread_id)
+    assert usage["gpt-4o"] == {
+        "input_tokens": 200, "output_tokens": 20, "cost": 0.5, "elapsed_time": 1.0, "call_count": 2,
+    }
+    assert usage["claude"]["call_count"] == 2
+
+    summary = db_manager.get_thread_summary(thread_id)
+    assert summary["total_cost"] == 2.5
+    assert summary["total_tokens"] == 440
+
+
+def test_cost_by_agent_for_recent_days(db_manager):
+    writer = new_thread(db_manager, "writer")
+    reviewer = new_thread(db_manager, "reviewer")
+    old = datetime.now(UTC) - timedelta(days=30)
+    db_manager.log_events([
+        completion(writer, "writer", "gpt-4o", 1.0),
+        completion(writer, "writer", "gpt-4o", 5.0, created_at=old),
+        completion(reviewer, "reviewer", "gpt-4o", 2.0),
+    ])
+
+    recent = db_manager.get_usage(group_by=["agent_id"], days=7)
+    assert [(row["agent_id"], row["cost"]) for row in recent] == [("reviewer", 2.0), ("writer", 1.0)]
+
+    all_time = db_manager.get_usage(group_by=["agent_id", "day"], agent_id="writer")
+    assert [row["call_count"] for row in all_time] == [1, 1]
+
+    with pytest.raises(ValueError):
+        db_manager.get_usage(group_by=["role"])
+
+
+def test_backfill_existing_database(temp_db_path, db_manager):
+    thread_id = new_thread(db_manager, "writer")
+    db_manager.log_events([completion(thread_id, "writer", "gpt-4o", 0.5) for _ in range(3)])
+
+    # A database from before the rollups existed
+    conn = sqlite3.connect(temp_db_path)
+    conn.execute("DROP TABLE usage_rollups")
+    conn.commit()
+    conn.close()
+
+    reopened = DatabaseManager(db_path=temp_db_path)
+    assert reopened.get_thread_usage(thread_id)["gpt-4o"]["call_count"] == 3
+
+    assert reopened.backfill_usage_rollups(thread_id) == 3
+    assert reopened.get_thread_usage(thread_id)["gpt-4o"]["cost"] == 1.5
+
+
+def test_usage_api_and_cli(temp_db_path, db_manager, monkeypatch):
+    thread_id = new_thread(db_manager, "writer")
+    db_manager.log_events([completion(thread_id, "writer", "gpt-4o", 0.5)])
+
+    monkeypatch.setattr("agentic.api.get_db_manager", lambda: db_manager)
+    client = TestClient(AgentAPIServer([]).app)
+    response = client.get("/_usage", params={"group_by": "agent_id,model", "days": 7})
+    assert response.status_code == 200
+    assert response.json()[0]["agent_id"] == "writer"
+    assert response.json()[0]["model"] == "gpt-4o"
+    assert client.get("/_usage", params={"group_by": "role"}).status_code == 400
+
+    result = CliRunner().invoke(app, ["threads", "usage", "--by", "model", "--db-path", temp_db_path])
+    assert result.exit_code == 0
+    assert "gpt-4o" in result.output
@@ -0,0 +1,104 @@
+import threading
+import time
+from datetime import date, datetime
+
+import httpx
+import pytest
+
+from agentic.tools import weather_tool
+from agentic.tools.utils.weather_cache import WeatherCache, is_final, round_coordinate
+from agentic.tools.weather_tool import WeatherTool
+
+
+class FakeOpenMeteo:
+    """Answers archive requests with a temperature of `year - 2000` on each day, and counts
+    the requests, and how many were in flight together"""
+
+    def __init__(self):
+        self.requests = []
+        self.active = self.peak = 0
+        self.lock = threading.Lock()
+
+    def get(self, url, params=None, **kwargs):
+        with self.lock:
+            self.requests.append((url, params))
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(0.1)
+            if "archive" not in url:
+                return httpx.Response(200, json={"daily": {"time": ["2025-01-01"], "temperature_2m_max": [50]}})
+            start, end = date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"])
+            days = (end - start).days + 1
+            value = start.year - 2000
+            daily = {"time": [str(start)] * days, "temperature_2m_mean": [value] * days}
+            # Some values are missing in odd years
+            daily["temperature_2m_max"] = [None if value % 2 else value + 10] * days
+            return httpx.Response(200, json={"daily": daily})
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def fake_api(monkeypatch, tmp_path):
+    fake = FakeOpenMeteo()
+    cache = WeatherCache(tmp_path / "weather.db")
+    monkeypatch.setattr(weather_tool, "http_client", fake)
+    monkeypatch.setattr(weather_tool, "get_weather_cache", lambda: cache)
+    yield fake
+    cache.close()
+
+
+def test_round_coordinate_and_is_final():
+    assert round_coordinate("37.87153") == "37.87"
+    assert round_coordinate("-122.2730") == "-122.27"
+    assert round_coordinate("north") == "north"
+    assert is_final("2024-01-01", today=date(2024, 2, 1))
+    assert not is_final("2024-01-30", today=date(2024, 2, 1))
+
+
+class FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return cls(2025, 6, 1, tzinfo=tz)
+
+
+def test_historical_averages_fetch_years_concurrently_and_cache_them(fake_api, monkeypatch):
+    # Pin today, so every year's range is final (cached forever) whenever the test runs
+    monkeypatch.setattr(weather_tool, "datetime", FixedDatetime)
+    monkeypatch.setattr(weather_tool, "is_final", lambda end_date: is_final(end_date, today=date(2025, 6, 1)))
+    # Only final data may be served from the cache below
+    monkeypatch.setattr(weather_tool, "FORECAST_TTL", -1)
+
+    tool = WeatherTool()
+    result = tool.get_historical_averages(target_start_date="01-10", target_end_date="01-12")
+    years = sorted(date.fromisoformat(params["start_date"]).year for _, params in fake_api.requests)
+    assert years == [2021, 2022, 2023, 2024, 2025]
+    assert fake_api.peak > 1
+    assert "Using mean averaging method" in result
+
+    # Means are over the years, skipping missing values
+    mean = sum(year - 2000 for year in years) / 5
+    max_values = [year - 2000 + 10 for year in years if year % 2 == 0]
+    assert f"Average Temperature: {round(mean, 2)}°F" in result
+    assert f"to {round(sum(max_values) / len(max_values), 2)}°F" in result
+
+    # Past years come from the cache
+    fake_api.requests.clear()
+    assert tool.get_historical_averages(target_start_date="01-10", target_end_date="01-12") == result
+    assert fake_api.requests == []
+
+
+def test_forecasts_are_cached_for_the_ttl(fake_api, monkeypatch):
+    tool = WeatherTool()
+    tool.get_forecast_weather(latitude="37.8715", longitude="-122.2730")
+    # A nearby point rounds to the same location
+    tool.get_forecast_weather(latitude="37.8712", longitude="-122.2731")
+    assert len(fake_api.requests) == 1
+    assert fake_api.requests[0][1]["latitude"] == "37.87"
+
+    monkeypatch.setattr(weather_tool, "FORECAST_TTL", -1)
+    tool.get_forecast_weather(latitude="40.7128", longitude="-74.0060")
+    tool.get_forecast_weather(latitude="40.7128", longitude="-74.0060")
+    assert len(fake_api.requests) == 3